@@ -0,0 +1,238 @@
+"""
+다단계 에이전트 체크포인트 (실패한 실행을 마지막 완료 단계부터 재개)
+요청에 실행 ID(runId)가 있으면 단계가 끝날 때마다 단계 결과(all_steps), 읽은 파일(accumulated_files),
+진행 상태를 로컬 SQLite에 저장합니다. 같은 실행 ID로 다시 요청하면 저장된 마지막 완료 단계부터
+이어서 실행하므로, 4단계에서 실패한 분석을 재시도할 때 앞 단계의 GitHub 조회와 LLM 호출을 반복하지 않습니다.
+
+    POST /api/ai/chat  {"message": "...", "runId": "b2f4...", ...}   (X-Agent-Run-Id 헤더도 동일)
+
+    with agent_run(run_id_from_request(data, request.headers)):
+        result = process_chat_message(...)   # 에이전트 안에서 load_checkpoint / save_checkpoint
+
+체크포인트는 (실행 ID, 에이전트 타입)별로 하나이며, 사용자 메시지/저장소가 다른 요청에는 사용하지 않습니다.
+실행이 끝까지 완료되면 삭제되고, 실패하거나 부분 결과로 끝나면 AGENT_CHECKPOINT_TTL 동안 유지됩니다.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+# 체크포인트 사용 여부
+AGENT_CHECKPOINT_ENABLED = os.getenv('AGENT_CHECKPOINT_ENABLED', 'true').lower() == 'true'
+# SQLite 체크포인트 파일 경로
+AGENT_CHECKPOINT_PATH = os.getenv(
+    'AGENT_CHECKPOINT_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'agent_checkpoints.sqlite3')
+)
+# 체크포인트 보관 시간 (초, 재시도 가능한 기간)
+AGENT_CHECKPOINT_TTL = float(os.getenv('AGENT_CHECKPOINT_TTL', '3600'))
+
+# 실행 ID 헤더 (요청 본문의 runId와 같음)
+RUN_ID_HEADER = 'X-Agent-Run-Id'
+# 실행 ID 최대 길이 (그 이상은 무시)
+MAX_RUN_ID_LENGTH = 128
+
+# 현재 실행 컨텍스트의 실행 ID (None이면 체크포인트를 사용하지 않음)
+_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('agent_run_id', default=None)
+
+
+def run_id_from_request(body: Optional[Dict[str, Any]], headers) -> Optional[str]:
+    """요청 본문의 runId 또는 X-Agent-Run-Id 헤더 (없거나 너무 길면 None)"""
+    value = (body or {}).get('runId') or headers.get(RUN_ID_HEADER)
+    if not value:
+        return None
+    value = str(value).strip()
+    if not value or len(value) > MAX_RUN_ID_LENGTH:
+        print(f"[Agent Checkpoint] 잘못된 실행 ID 무시: {value[:MAX_RUN_ID_LENGTH]}")
+        return None
+    return value
+
+
+@contextmanager
+def agent_run(run_id: Optional[str]):
+    """블록 안의 에이전트 실행에 실행 ID 지정 (None이면 바깥 실행 ID 유지)"""
+    if run_id is None:
+        yield
+        return
+    token = _run_id.set(run_id)
+    try:
+        yield
+    finally:
+        _run_id.reset(token)
+
+
+def current_run_id() -> Optional[str]:
+    """현재 실행 ID (체크포인트를 사용하지 않으면 None)"""
+    if not AGENT_CHECKPOINT_ENABLED:
+        return None
+    return _run_id.get()
+
+
+def run_fingerprint(context: Dict[str, Any], user_message: Optional[str]) -> str:
+    """같은 실행 ID로 다른 요청을 보냈을 때 체크포인트를 쓰지 않도록 요청의 핵심 입력을 해시"""
+    task = context.get('task') or {}
+    material = json.dumps(
+        [user_message or '', context.get('githubRepo') or '', context.get('projectName') or '', task.get('id'), task.get('title')],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    """
+    SQLite 체크포인트 저장소 (파일을 열 수 없으면 메모리에 저장)
+
+    여러 Flask 워커 스레드에서 공유하므로 모든 접근은 잠금으로 보호합니다.
+    """
+
+    def __init__(self, path: str = AGENT_CHECKPOINT_PATH, ttl: float = AGENT_CHECKPOINT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = None
+        self._memory: Dict[tuple, Dict[str, Any]] = {}
+        self._counters = {'saves': 0, 'resumes': 0, 'mismatches': 0, 'completed': 0}
+        self._open_db()
+
+    def _open_db(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS agent_checkpoints ('
+                'run_id TEXT NOT NULL, agent_type TEXT NOT NULL, fingerprint TEXT NOT NULL, '
+                'step INTEGER NOT NULL, state TEXT NOT NULL, updated_at REAL NOT NULL, expires_at REAL NOT NULL, '
+                'PRIMARY KEY (run_id, agent_type))'
+            )
+            # 만료된 체크포인트 정리
+            self._db.execute('DELETE FROM agent_checkpoints WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            print(f"[Agent Checkpoint] SQLite 저장소를 열 수 없습니다 ({self.path}), 메모리에 저장합니다: {e}")
+            self._db = None
+
+    def load(self, run_id: str, agent_type: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """저장된 상태 반환 (없거나 만료되었거나 다른 요청의 체크포인트면 None)"""
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        'SELECT fingerprint, state, expires_at FROM agent_checkpoints WHERE run_id = ? AND agent_type = ?',
+                        (run_id, agent_type)
+                    ).fetchone()
+                except Exception as e:
+                    print(f"[Agent Checkpoint] SQLite 조회 실패: {e}")
+                    row = None
+                entry = {'fingerprint': row[0], 'state': row[1], 'expires_at': row[2]} if row else None
+            else:
+                entry = self._memory.get((run_id, agent_type))
+            if not entry or entry['expires_at'] <= now:
+                return None
+            if entry['fingerprint'] != fingerprint:
+                self._counters['mismatches'] += 1
+                print(f"[Agent Checkpoint] 실행 ID {run_id}의 {agent_type} 체크포인트가 다른 요청의 것이므로 처음부터 실행")
+                return None
+            self._counters['resumes'] += 1
+        return json.loads(entry['state'])
+
+    def save(self, run_id: str, agent_type: str, fingerprint: str, step: int, state: Dict[str, Any]):
+        """단계 완료 상태 저장 (저장 실패는 실행을 중단시키지 않음)"""
+        try:
+            serialized = json.dumps(state, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            print(f"[Agent Checkpoint] 상태 직렬화 실패, 체크포인트 생략: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            self._counters['saves'] += 1
+            if self._db is None:
+                self._memory[(run_id, agent_type)] = {
+                    'fingerprint': fingerprint, 'state': serialized, 'expires_at': now + self.ttl
+                }
+                return
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO agent_checkpoints '
+                    '(run_id, agent_type, fingerprint, step, state, updated_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, agent_type, fingerprint, step, serialized, now, now + self.ttl)
+                )
+                self._db.commit()
+            except Exception as e:
+                print(f"[Agent Checkpoint] SQLite 저장 실패: {e}")
+
+    def delete(self, run_id: str, agent_type: str):
+        """완료된 실행의 체크포인트 삭제"""
+        with self._lock:
+            self._counters['completed'] += 1
+            self._memory.pop((run_id, agent_type), None)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'DELETE FROM agent_checkpoints WHERE run_id = ? AND agent_type = ?', (run_id, agent_type)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    print(f"[Agent Checkpoint] SQLite 삭제 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = len(self._memory)
+            if self._db is not None:
+                try:
+                    stored = self._db.execute(
+                        'SELECT COUNT(*) FROM agent_checkpoints WHERE expires_at > ?', (time.time(),)
+                    ).fetchone()[0]
+                except Exception:
+                    stored = None
+            return {'enabled': AGENT_CHECKPOINT_ENABLED, 'stored': stored, **self._counters}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """프로세스 공유 체크포인트 저장소 반환 (최초 호출 시 생성)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
+
+
+def load_checkpoint(agent_type: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """현재 실행 ID의 체크포인트 (실행 ID가 없으면 None)"""
+    run_id = current_run_id()
+    if run_id is None:
+        return None
+    return get_checkpoint_store().load(run_id, agent_type, fingerprint)
+
+
+def save_checkpoint(agent_type: str, fingerprint: str, step: int, state: Dict[str, Any]):
+    """현재 실행 ID로 단계 완료 상태 저장 (실행 ID가 없으면 무시)"""
+    run_id = current_run_id()
+    if run_id is None:
+        return
+    get_checkpoint_store().save(run_id, agent_type, fingerprint, step, state)
+
+
+def clear_checkpoint(agent_type: str):
+    """현재 실행 ID의 체크포인트 삭제 (실행이 끝까지 완료되었을 때)"""
+    run_id = current_run_id()
+    if run_id is None:
+        return
+    get_checkpoint_store().delete(run_id, agent_type)
+
+
+def checkpoint_stats() -> Dict[str, Any]:
+    """저장된 체크포인트 수, 저장/재개/불일치/완료 횟수"""
+    return get_checkpoint_store().stats()
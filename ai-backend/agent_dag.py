@@ -0,0 +1,245 @@
+"""
+에이전트 단계 DAG 실행
+에이전트 파이프라인을 입력(의존 단계)과 출력(단계 이름으로 저장되는 반환값)을 가진 단계들의
+의존 그래프로 선언하고, 의존 단계가 모두 끝난 단계들을 동시에 실행합니다.
+각 단계는 agent_io 요청을 yield하는 generator이며, 동시에 실행 중인 단계들의 요청은
+하나의 요청 리스트로 묶여 실행기(run_agent_sync / run_agent_async)에서 동시에 수행됩니다.
+
+    stages = [
+        Stage('readme', read_readme),
+        Stage('step1', step1, inputs=('readme',)),
+        Stage('file_list', scan_directories),                   # step1 LLM 호출과 동시에 실행
+        Stage('step2', step2, inputs=('step1', 'file_list')),
+    ]
+    values, trace = yield from run_stages('task_suggestion_agent', stages)
+    trace['critical_path']  # 실행 시간을 결정한 단계 체인 (예: ['readme', 'step1', 'step2'])
+
+initial에 이미 있는 단계는 실행하지 않으므로, on_stage_done으로 저장한 완료 단계 출력을
+initial로 넘기면 남은 단계만 실행합니다 (agent_checkpoint 참고).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Sequence, Tuple
+
+from agent_events import emit
+
+# 파이프라인별로 보관할 최근 실행 기록 수 (통계용)
+DAG_HISTORY_SIZE = int(os.getenv('DAG_HISTORY_SIZE', '50'))
+
+_lock = threading.Lock()
+_history: Dict[str, deque] = {}
+
+
+class Stage:
+    """
+    파이프라인 단계 하나
+
+    func(*inputs)는 agent_io 요청을 yield하는 generator를 반환해야 하며 (yield가 없는 함수도 가능),
+    generator의 반환값이 단계 이름으로 저장되어 이후 단계의 입력이 됩니다.
+    """
+
+    __slots__ = ('name', 'func', 'inputs')
+
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+
+    def __repr__(self):
+        return f"Stage({self.name} <- {', '.join(self.inputs) or '-'})"
+
+
+def _validate(stages: Sequence[Stage], initial: Iterable[str]):
+    """이름 중복, 알 수 없는 입력, 순환 의존 확인 (ValueError)"""
+    names = [stage.name for stage in stages]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"단계 이름 중복: {', '.join(sorted(duplicates))}")
+    known = set(names) | set(initial)
+    for stage in stages:
+        unknown = [name for name in stage.inputs if name not in known]
+        if unknown:
+            raise ValueError(f"{stage.name} 단계의 알 수 없는 입력: {', '.join(unknown)}")
+
+    resolved = set(initial)
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(name in resolved for name in stage.inputs)]
+        if not ready:
+            raise ValueError(f"순환 의존: {', '.join(stage.name for stage in remaining)}")
+        resolved.update(stage.name for stage in ready)
+        remaining = [stage for stage in remaining if stage not in ready]
+
+
+def _as_generator(value: Any) -> Generator:
+    """yield가 없는 단계 함수의 반환값을 바로 끝나는 generator로 감쌈"""
+    if isinstance(value, Generator):
+        return value
+
+    def finished():
+        return value
+        yield  # noqa: generator로 만들기 위한 도달하지 않는 yield
+
+    return finished()
+
+
+def _critical_path(stages: Sequence[Stage], timings: Dict[str, Dict[str, float]]) -> List[str]:
+    """가장 늦게 끝난 단계에서 시작해, 각 단계의 시작을 결정한(가장 늦게 끝난) 입력 단계를 거슬러 올라감"""
+    if not timings:
+        return []
+    inputs = {stage.name: stage.inputs for stage in stages}
+    current = max(timings, key=lambda name: timings[name]['end'])
+    path = [current]
+    while True:
+        deps = [name for name in inputs.get(current, ()) if name in timings]
+        if not deps:
+            break
+        current = max(deps, key=lambda name: timings[name]['end'])
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def run_stages(
+    pipeline: str,
+    stages: Sequence[Stage],
+    initial: Optional[Dict[str, Any]] = None,
+    on_stage_done: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Generator[Any, Any, Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    단계 그래프를 실행하는 generator (yield from으로 에이전트 generator 안에서 사용)
+
+    의존 단계가 모두 끝난 단계를 바로 시작하고, 실행 중인 단계가 여러 개면 각 단계의 요청을
+    하나의 리스트로 yield해 동시에 수행합니다. 단계가 하나만 실행 중이면 요청을 그대로 yield하므로
+    단일 요청 실패 시 예외가 해당 단계 안으로 던져지는 동작은 기존 에이전트 코드와 같습니다.
+    단계에서 처리하지 않은 예외는 나머지 단계를 종료한 뒤 그대로 전달됩니다.
+    initial에 출력이 있는 단계는 이미 완료된 것으로 보고 건너뛰며,
+    on_stage_done(name, values)은 단계가 끝날 때마다 호출됩니다.
+
+    Returns:
+        (values, trace) - values: 단계 이름 -> 출력 (initial 포함)
+                          trace: 단계별 시작/종료 시각(초, 실행 시작 기준), critical_path, 총 소요 시간
+    """
+    values: Dict[str, Any] = dict(initial or {})
+    _validate(stages, values.keys())
+
+    started_at = time.monotonic()
+    pending = [stage for stage in stages if stage.name not in values]
+    running: Dict[str, Tuple[Generator, Any]] = {}  # 단계 이름 -> (generator, 대기 중인 요청)
+    timings: Dict[str, Dict[str, float]] = {}
+
+    def elapsed() -> float:
+        return time.monotonic() - started_at
+
+    def advance(name: str, gen: Generator, result: Any = None, error: Optional[BaseException] = None):
+        """단계를 다음 요청까지 진행 (끝나면 출력 저장)"""
+        try:
+            request = gen.throw(error) if error is not None else gen.send(result)
+        except StopIteration as stop:
+            running.pop(name, None)
+            values[name] = stop.value
+            timings[name]['end'] = elapsed()
+            if on_stage_done is not None:
+                on_stage_done(name, values)
+            return
+        running[name] = (gen, request)
+
+    try:
+        while pending or running:
+            # 입력이 준비된 단계 시작 (I/O 없이 끝나는 단계가 있으면 다음 단계가 바로 준비될 수 있음)
+            started = True
+            while started:
+                started = False
+                for stage in list(pending):
+                    if all(name in values for name in stage.inputs):
+                        pending.remove(stage)
+                        timings[stage.name] = {'start': elapsed()}
+                        gen = _as_generator(stage.func(*[values[name] for name in stage.inputs]))
+                        advance(stage.name, gen)
+                        started = True
+
+            if not running:
+                break
+
+            if len(running) == 1:
+                name, (gen, request) = next(iter(running.items()))
+                try:
+                    result = yield request
+                except Exception as e:
+                    advance(name, gen, error=e)
+                else:
+                    advance(name, gen, result)
+                continue
+
+            # 실행 중인 단계들의 요청을 하나의 리스트로 묶어 동시에 수행
+            order = list(running.items())
+            batch: List[Any] = []
+            slices = []
+            for name, (gen, request) in order:
+                requests = request if isinstance(request, list) else [request]
+                slices.append((name, gen, isinstance(request, list), len(batch), len(requests)))
+                batch.extend(requests)
+            results = yield batch
+            for name, gen, is_list, offset, count in slices:
+                part = results[offset:offset + count]
+                if is_list:
+                    advance(name, gen, part)
+                elif isinstance(part[0], Exception):
+                    advance(name, gen, error=part[0])
+                else:
+                    advance(name, gen, part[0])
+    finally:
+        for gen, _ in running.values():
+            gen.close()
+
+    total = elapsed()
+    # critical path는 반올림 전 시각으로 계산 (반올림하면 거의 동시에 끝난 입력 단계가 같은 값이 됨)
+    path = _critical_path(stages, timings)
+    path_seconds = sum(timings[name]['end'] - timings[name]['start'] for name in path)
+    for timing in timings.values():
+        timing['seconds'] = round(timing['end'] - timing['start'], 3)
+        timing['start'] = round(timing['start'], 3)
+        timing['end'] = round(timing['end'], 3)
+    trace = {
+        'stages': timings,
+        'critical_path': path,
+        'critical_path_seconds': round(path_seconds, 3),
+        'total_seconds': round(total, 3),
+    }
+    _record(pipeline, trace)
+    print(f"[Agent DAG] {pipeline} 완료 ({total:.2f}초) - critical path: {' -> '.join(path)}")
+    emit('critical_path', {'pipeline': pipeline, 'critical_path': path, 'total_seconds': trace['total_seconds']})
+    return values, trace
+
+
+def _record(pipeline: str, trace: Dict[str, Any]):
+    with _lock:
+        history = _history.get(pipeline)
+        if history is None:
+            history = _history[pipeline] = deque(maxlen=DAG_HISTORY_SIZE)
+        history.append(trace)
+
+
+def dag_stats() -> Dict[str, Any]:
+    """파이프라인별 최근 실행 수, 평균 소요 시간, 마지막 critical path, critical path에 가장 자주 포함된 단계"""
+    with _lock:
+        histories = {pipeline: list(history) for pipeline, history in _history.items()}
+    stats = {}
+    for pipeline, traces in histories.items():
+        if not traces:
+            continue
+        on_path: Dict[str, int] = {}
+        for trace in traces:
+            for name in trace['critical_path']:
+                on_path[name] = on_path.get(name, 0) + 1
+        stats[pipeline] = {
+            'runs': len(traces),
+            'avgTotalSeconds': round(sum(trace['total_seconds'] for trace in traces) / len(traces), 3),
+            'lastCriticalPath': traces[-1]['critical_path'],
+            'lastStages': traces[-1]['stages'],
+            'criticalPathCounts': dict(sorted(on_path.items(), key=lambda item: -item[1])),
+        }
+    return stats
@@ -0,0 +1,88 @@
+"""
+에이전트 이벤트 전달
+에이전트 실행 중 발생하는 진행 메시지, 단계 결과, LLM 토큰을 실시간으로 전달합니다.
+/api/ai/chat/stream(SSE)에서 구독하며, 구독자가 없으면 아무 동작도 하지 않습니다.
+구독자가 연결을 끊으면 cancellation()으로 지정한 threading.Event를 설정하고,
+실행기(agent_io.run_agent_sync)가 다음 I/O 요청 전에 확인해 에이전트 실행을 중단합니다.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+# 현재 실행 컨텍스트(요청 스레드)의 이벤트 수신 함수
+_event_sink: contextvars.ContextVar[Optional[Callable[[str, Any], None]]] = contextvars.ContextVar(
+    'agent_event_sink', default=None
+)
+# 현재 실행 컨텍스트의 취소 신호 (설정되면 에이전트 실행 중단)
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    'agent_cancel_event', default=None
+)
+
+
+class AgentCancelled(BaseException):
+    """
+    구독자가 연결을 끊어 에이전트 실행을 중단함
+
+    asyncio.CancelledError처럼 BaseException을 상속하므로 에이전트 코드의
+    except Exception(부분 결과/오류 응답으로 대체)에 잡히지 않고 실행 전체를 종료합니다.
+    """
+
+
+@contextmanager
+def cancellation(cancel_event: threading.Event):
+    """블록 안의 에이전트 실행에 취소 신호 지정 (cancel_event.set()이면 다음 I/O 요청 전에 중단)"""
+    token = _cancel_event.set(cancel_event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def check_cancelled():
+    """취소 신호가 설정되었으면 AgentCancelled 발생"""
+    cancel_event = _cancel_event.get()
+    if cancel_event is not None and cancel_event.is_set():
+        raise AgentCancelled("클라이언트 연결이 끊어져 에이전트 실행을 중단합니다.")
+
+
+@contextmanager
+def event_sink(callback: Callable[[str, Any], None]):
+    """
+    블록 안에서 발생하는 이벤트를 callback(event, data)로 전달
+
+    Example:
+        with event_sink(lambda event, data: queue.put((event, data))):
+            process_chat_message(...)
+    """
+    token = _event_sink.set(callback)
+    try:
+        yield
+    finally:
+        _event_sink.reset(token)
+
+
+def has_event_sink() -> bool:
+    """현재 컨텍스트에 이벤트 구독자가 있는지 확인"""
+    return _event_sink.get() is not None
+
+
+def emit(event: str, data: Any):
+    """이벤트 발행 (구독자가 없으면 무시)"""
+    callback = _event_sink.get()
+    if callback is None:
+        return
+    try:
+        callback(event, data)
+    except Exception as e:
+        # 이벤트 전달 실패가 에이전트 실행을 중단시키지 않도록 함
+        print(f"[Agent Events] 이벤트 전달 실패 ({event}): {e}")
+
+
+class ProgressMessages(list):
+    """append 시 'progress' 이벤트를 함께 발행하는 진행 메시지 리스트"""
+
+    def append(self, message):
+        super().append(message)
+        emit('progress', {'message': message})
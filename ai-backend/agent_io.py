@@ -0,0 +1,228 @@
+"""
+에이전트 I/O 요청과 동기 실행기
+에이전트 로직은 LLM 호출/GitHub 조회를 직접 하지 않고 요청 객체를 yield합니다.
+실행기가 요청을 수행한 결과를 generator에 돌려보내므로, 같은 에이전트 코드를
+Flask(동기, run_agent_sync)와 ASGI(비동기, async_agents.run_agent_async) 양쪽에서 사용할 수 있습니다.
+
+    def _my_agent_steps(context):
+        content = yield llm_request(prompt, system_prompt)
+        files = yield read_files_request(github_repo, github_token, ["README.md"])
+        results = yield [llm_request(p1, s), llm_request(p2, s)]  # 리스트는 동시에 수행
+        return {...}
+
+    result = run_agent_sync(_my_agent_steps(context), call_llm_func)
+"""
+
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generator, List, Optional, Tuple
+
+from agent_events import AgentCancelled, check_cancelled, emit
+from llm_cache import cache_policy
+from llm_scheduler import LLMOverloadedError, lane_for_purpose, llm_priority
+from model_router import llm_model, needs_escalation, record_cascade, small_model_for
+from resilience import CircuitOpenError
+from structured_output import response_format
+
+# 재시도해도 같은 결과인 오류 (LLM 대기열 초과, 서킷 브레이커 열림)
+# 에이전트는 오류 응답으로 바꾸지 않고 그대로 전달하며, Flask/ASGI가 503 + Retry-After로 응답합니다.
+UNAVAILABLE_ERRORS = (LLMOverloadedError, CircuitOpenError)
+
+
+class AgentIORequest:
+    """에이전트가 yield하는 I/O 요청"""
+
+    __slots__ = ('kind', 'args', 'kwargs')
+
+    # kind 종류
+    LLM = 'llm'
+    READ_FILES = 'read_files'
+    LIST_DIRECTORY = 'list_directory'
+    EXISTING_PATHS = 'existing_paths'
+    SEMANTIC_SEARCH = 'semantic_search'
+
+    def __init__(self, kind: str, *args, **kwargs):
+        self.kind = kind
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"AgentIORequest({self.kind})"
+
+
+def llm_request(
+    prompt: str,
+    system_prompt: str,
+    max_tokens: Optional[int] = None,
+    purpose: Optional[str] = None,
+    lane: Optional[str] = None,
+    schema: Optional[str] = None
+) -> AgentIORequest:
+    """
+    LLM 호출 요청 -> 응답 텍스트
+
+    max_tokens를 지정하지 않으면 실행기에 전달된 LLM 함수를 그대로 사용하고,
+    지정하면 공유 LLM 클라이언트를 해당 토큰 제한으로 호출합니다.
+    purpose는 응답 캐시 TTL 선택과 모델 선택에 사용됩니다 (llm_cache.cache_policy, model_router 참고).
+    lane은 스케줄러 우선순위이며, 지정하지 않으면 purpose로 정합니다 (llm_scheduler 참고).
+    schema는 응답 JSON 스키마 이름이며, 모델이 해당 형식으로만 생성하도록 요청에 포함됩니다 (structured_output 참고).
+    """
+    return AgentIORequest(
+        AgentIORequest.LLM, prompt, system_prompt,
+        max_tokens=max_tokens, purpose=purpose, lane=lane, schema=schema
+    )
+
+
+@contextmanager
+def llm_request_policy(request: AgentIORequest):
+    """LLM 요청에 적용할 캐시 정책 + 스케줄러 우선순위 + 출력 형식 (두 실행기 공용)"""
+    purpose = request.kwargs.get('purpose')
+    lane = request.kwargs.get('lane') or lane_for_purpose(purpose)
+    with cache_policy(purpose=purpose), llm_priority(lane), response_format(request.kwargs.get('schema')):
+        yield
+
+
+def read_files_request(github_repo: str, github_token: Optional[str], file_paths: List[str], **kwargs) -> AgentIORequest:
+    """GitHub 파일 읽기 요청 -> get_file_contents()와 같은 형식의 결과 리스트"""
+    return AgentIORequest(AgentIORequest.READ_FILES, github_repo, github_token, file_paths, **kwargs)
+
+
+def list_directory_request(github_repo: str, github_token: Optional[str], directory_path: str, **kwargs) -> AgentIORequest:
+    """GitHub 디렉토리 목록 요청 -> list_directory_contents()와 같은 형식의 파일 경로 리스트"""
+    return AgentIORequest(AgentIORequest.LIST_DIRECTORY, github_repo, github_token, directory_path, **kwargs)
+
+
+def existing_paths_request(github_repo: str, github_token: Optional[str], paths: List[str], **kwargs) -> AgentIORequest:
+    """저장소 경로 존재 확인 요청 -> multi_step_agent.existing_paths()와 같은 형식의 실제 경로 리스트"""
+    return AgentIORequest(AgentIORequest.EXISTING_PATHS, github_repo, github_token, paths, **kwargs)
+
+
+def semantic_search_request(key: Optional[str], documents: List[Tuple[str, str]], queries: List[str], **kwargs) -> AgentIORequest:
+    """임베딩 인덱스 검색 요청 -> embedding_index.semantic_search()와 같은 형식의 질문별 [(id, 유사도), ...]"""
+    return AgentIORequest(AgentIORequest.SEMANTIC_SEARCH, key, documents, queries, **kwargs)
+
+
+def escalate_to_default_model(small_model: str, purpose: str, content: Optional[str], error: Optional[Exception]) -> bool:
+    """
+    작은 모델 호출 결과를 보고 기본 모델로 다시 호출할지 결정 (두 실행기 공용)
+
+    대기열 초과(LLMOverloadedError)와 서버 장애(CircuitOpenError)는 재호출해도 같은 결과이므로 그대로 전달합니다.
+    """
+    if isinstance(error, UNAVAILABLE_ERRORS):
+        raise error
+    reason = f"호출 실패: {error}" if error is not None else needs_escalation(content)
+    record_cascade(small_model, purpose, reason, failed=error is not None)
+    if reason:
+        emit('model_escalation', {'purpose': purpose, 'smallModel': small_model, 'reason': reason})
+    return bool(reason)
+
+
+def _call_llm_sync(request: AgentIORequest, call_llm_func: Callable) -> str:
+    prompt, system_prompt = request.args
+    max_tokens = request.kwargs.get('max_tokens')
+    if max_tokens is None:
+        return call_llm_func(prompt, system_prompt)
+    from llm_client import call_llm_streaming
+    return call_llm_streaming(prompt, system_prompt, max_tokens=max_tokens)
+
+
+def _perform_sync(request: AgentIORequest, call_llm_func: Callable) -> Any:
+    """단일 I/O 요청을 동기적으로 수행"""
+    if request.kind == AgentIORequest.LLM:
+        purpose = request.kwargs.get('purpose')
+        with llm_request_policy(request):
+            # 작은 모델로 먼저 호출하고, 응답을 쓸 수 없으면 기본 모델로 재호출
+            small_model = small_model_for(purpose)
+            if small_model:
+                content, error = None, None
+                try:
+                    with llm_model(small_model):
+                        content = _call_llm_sync(request, call_llm_func)
+                except Exception as e:
+                    error = e
+                if not escalate_to_default_model(small_model, purpose, content, error):
+                    return content
+            return _call_llm_sync(request, call_llm_func)
+
+    if request.kind == AgentIORequest.READ_FILES:
+        from multi_step_agent import get_file_contents
+        return get_file_contents(*request.args, **request.kwargs)
+
+    if request.kind == AgentIORequest.LIST_DIRECTORY:
+        from multi_step_agent import list_directory_contents
+        return list_directory_contents(*request.args, **request.kwargs)
+
+    if request.kind == AgentIORequest.EXISTING_PATHS:
+        from multi_step_agent import existing_paths
+        return existing_paths(*request.args, **request.kwargs)
+
+    if request.kind == AgentIORequest.SEMANTIC_SEARCH:
+        from embedding_index import semantic_search
+        return semantic_search(*request.args, **request.kwargs)
+
+    raise ValueError(f"알 수 없는 에이전트 I/O 요청: {request.kind}")
+
+
+def _perform_many_sync(requests: List[AgentIORequest], call_llm_func: Callable) -> List[Any]:
+    """여러 I/O 요청을 스레드 풀에서 동시에 수행 (실패한 요청은 예외 객체로 반환)"""
+    if len(requests) <= 1:
+        results = []
+        for request in requests:
+            try:
+                results.append(_perform_sync(request, call_llm_func))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def perform(request):
+        try:
+            return _perform_sync(request, call_llm_func)
+        except Exception as e:
+            return e
+
+    # 이벤트 구독자(contextvar)가 작업 스레드에서도 보이도록 요청마다 컨텍스트를 복사
+    with ThreadPoolExecutor(max_workers=min(len(requests), 10)) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, perform, request)
+            for request in requests
+        ]
+        return [future.result() for future in futures]
+
+
+def run_agent_sync(steps: Generator, call_llm_func: Callable) -> Any:
+    """
+    에이전트 generator를 동기적으로 실행하고 반환값을 돌려줌
+
+    요청 수행 중 발생한 예외는 generator 안으로 다시 던져지므로
+    에이전트 코드의 try/except가 그대로 동작합니다.
+    요청 리스트를 yield하면 결과 리스트를 돌려주며, 실패한 항목은 예외 객체로 채워집니다.
+    요청을 수행하기 전마다 취소 신호를 확인해, 구독자가 연결을 끊었으면 generator를 닫고
+    agent_events.AgentCancelled를 발생시킵니다 (남은 LLM 호출/GitHub 읽기를 하지 않음).
+    """
+    result = None
+    error = None
+    while True:
+        try:
+            if error is not None:
+                request = steps.throw(error)
+            else:
+                request = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+        try:
+            check_cancelled()
+        except AgentCancelled:
+            steps.close()
+            raise
+
+        result = None
+        error = None
+        try:
+            if isinstance(request, list):
+                result = _perform_many_sync(request, call_llm_func)
+            else:
+                result = _perform_sync(request, call_llm_func)
+        except Exception as e:
+            error = e
@@ -4,7 +4,9 @@ Agent 라우터 시스템
 모든 에이전트는 다단계 분석을 지원합니다 (최대 10단계).
 """
 
-import json
+from agent_checkpoint import clear_checkpoint, load_checkpoint, run_fingerprint, save_checkpoint
+from agent_dag import Stage, run_stages
+from agent_events import ProgressMessages, emit
 from prompt_optimizer import (
     create_intent_classification_prompt,
     create_optimized_task_suggestion_prompt,
@@ -14,7 +16,19 @@ from prompt_optimizer import (
     create_task_assignment_prompt,
     create_evidence_verification_prompt
 )
-from multi_step_agent import execute_multi_step_agent, verify_evidence_relevance
+from agent_io import (
+    UNAVAILABLE_ERRORS,
+    existing_paths_request,
+    list_directory_request,
+    llm_request,
+    read_files_request,
+    run_agent_sync,
+    semantic_search_request,
+)
+from embedding_index import EMBEDDING_INDEX_ENABLED, commit_documents, project_key, task_documents
+from llm_scheduler import LANE_BATCH
+from structured_output import GENERIC_JSON, parse_json_response
+from multi_step_agent import README_FILES, multi_step_agent_steps, verify_evidence_relevance_steps
 from prompt_functions import (
     create_task_suggestion_initial_prompt,
     create_task_suggestion_followup_prompt,
@@ -33,6 +47,29 @@ from prompt_functions import (
     create_task_assignment_followup_prompt
 )
 
+# Task 제안 2단계에서 1단계가 mainDirectories를 주지 않을 때 탐색할 디렉토리 (앞의 3개만 탐색)
+DEFAULT_SOURCE_DIRECTORIES = ["src", "app", "components", "pages", "routes", "controllers", "services", "utils", "backend", "frontend"]
+
+# 임베딩 검색으로 Task/질문과 연결하는 커밋/Task 수
+SEMANTIC_TOP_K = 10
+
+def semantic_matches_steps(context, query, documents, prefix=None, k=SEMANTIC_TOP_K):
+    """
+    질문과 의미가 가까운 문서 [(id, 코사인 유사도), ...] (에이전트 generator, embedding_index 참고)
+    
+    인덱스를 사용할 수 없거나 임베딩이 실패하면 빈 리스트를 반환하며, 호출한 쪽은 기존 순서를 사용합니다.
+    """
+    key = project_key(context)
+    if not EMBEDDING_INDEX_ENABLED or not key or not query or not documents:
+        return []
+    try:
+        results = yield semantic_search_request(key, documents, [query], k=k, prefix=prefix)
+    except Exception as e:
+        # 순위 보조 기능이므로 서킷 브레이커 열림 등 모든 임베딩 실패는 기존 순서로 대체 (503으로 전달하지 않음)
+        print(f"[Agent Router] 임베딩 검색 실패, 기존 순서 사용: {e}")
+        return []
+    return results[0] if results else []
+
 def check_github_required(agent_type):
     """
     에이전트 타입에 따라 GitHub 연동이 필요한지 확인
@@ -47,15 +84,29 @@ def check_github_required(agent_type):
     return agent_type in github_required_agents
 
 def process_chat_message(user_message, conversation_history, context, call_llm_func):
+    """
+    사용자 메시지를 분석하여 적절한 agent를 선택하고 실행합니다. (동기 실행)
+    
+    Args:
+        call_llm_func: LLM 호출 함수 (prompt, system_prompt) -> content
+    
+    Returns:
+        process_chat_message_steps 참고
+    """
+    return run_agent_sync(
+        process_chat_message_steps(user_message, conversation_history, context),
+        call_llm_func
+    )
+
+def process_chat_message_steps(user_message, conversation_history, context):
     """
     사용자 메시지를 분석하여 적절한 agent를 선택하고 실행합니다.
-    (의도 분류 + 라우팅 통합)
+    (의도 분류 + 라우팅 통합, 에이전트 generator - agent_io 참고)
     
     Args:
         user_message: 사용자 메시지
         conversation_history: 대화 히스토리 리스트
         context: agent 실행에 필요한 컨텍스트
-        call_llm_func: LLM 호출 함수 (prompt, system_prompt) -> content
     
     Returns:
         dict: {
@@ -81,33 +132,20 @@ def process_chat_message(user_message, conversation_history, context, call_llm_f
     system_prompt = "의도 분류 전문가. 사용자 질의를 분석하여 적절한 agent를 선택합니다. 반드시 한국어로만 응답. JSON만 응답."
     
     try:
-        content = call_llm_func(prompt, system_prompt)
-        
-        # JSON 파싱
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        content = content.strip()
-        if '{' in content:
-            content = content[content.find('{'):]
-        if '}' in content:
-            content = content[:content.rfind('}')+1]
-        
-        intent_result = json.loads(content)
+        content = yield llm_request(
+            prompt, system_prompt, purpose='intent_classification', schema='intent_classification'
+        )
         
-        # 기본값 설정
-        if 'agent_type' not in intent_result:
-            intent_result['agent_type'] = 'general_qa_agent'
-        if 'confidence' not in intent_result:
-            intent_result['confidence'] = 'medium'
+        # JSON 파싱 (빠진 agent_type/confidence는 스키마 기본값으로 채움)
+        intent_result = parse_json_response(content, 'intent_classification')
         
         agent_type = intent_result.get('agent_type', 'general_qa_agent')
         confidence = intent_result.get('confidence', 'medium')
         
         print(f'[Agent Router] 선택된 agent: {agent_type}, 신뢰도: {confidence}')
         
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Agent Router] 의도 분류 실패: {e}")
         # 기본값 사용
@@ -120,6 +158,8 @@ def process_chat_message(user_message, conversation_history, context, call_llm_f
             "extracted_info": {}
         }
     
+    emit('intent', {'agent_type': agent_type, 'confidence': confidence, 'reason': intent_result.get('reason', '')})
+    
     # 2. GitHub 연동 필요 여부 확인
     if check_github_required(agent_type):
         github_repo = context.get('githubRepo', '') or context.get('github_repo', '')
@@ -145,11 +185,11 @@ def process_chat_message(user_message, conversation_history, context, call_llm_f
     agent_result = None
     
     if agent_type == "task_suggestion_agent":
-        agent_result = execute_task_suggestion_agent(context, call_llm_func, user_message)
+        agent_result = yield from task_suggestion_agent_steps(context, user_message)
     elif agent_type == "progress_analysis_agent":
-        agent_result = execute_progress_analysis_agent(context, call_llm_func, user_message)
+        agent_result = yield from progress_analysis_agent_steps(context, user_message)
     elif agent_type == "task_completion_agent":
-        agent_result = execute_task_completion_agent(context, call_llm_func, user_message)
+        agent_result = yield from task_completion_agent_steps(context, user_message)
     elif agent_type == "task_assignment_agent":
         # 일괄 할당 요청인지 확인
         if user_message:
@@ -166,15 +206,15 @@ def process_chat_message(user_message, conversation_history, context, call_llm_f
             
             if is_batch_request:
                 print(f"[Agent Router] 일괄 Task 할당 요청 감지: {user_message}")
-                agent_result = execute_batch_task_assignment_agent(context, call_llm_func, user_message)
+                agent_result = yield from batch_task_assignment_agent_steps(context, user_message)
             else:
-                agent_result = execute_task_assignment_agent(context, call_llm_func, user_message)
+                agent_result = yield from task_assignment_agent_steps(context, user_message)
         else:
-            agent_result = execute_task_assignment_agent(context, call_llm_func, user_message)
+            agent_result = yield from task_assignment_agent_steps(context, user_message)
     elif agent_type == "batch_task_assignment_agent":
-        agent_result = execute_batch_task_assignment_agent(context, call_llm_func, user_message)
+        agent_result = yield from batch_task_assignment_agent_steps(context, user_message)
     elif agent_type == "general_qa_agent":
-        agent_result = execute_general_qa_agent(context, call_llm_func, user_message)
+        agent_result = yield from general_qa_agent_steps(context, user_message)
     else:
         agent_result = {
             "error": f"알 수 없는 agent 타입: {agent_type}",
@@ -312,6 +352,10 @@ def generate_task_suggestion_questions(context, missing_info):
 
 def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
     """Task 제안 agent 실행 (5단계 프로세스 재설계)"""
+    return run_agent_sync(task_suggestion_agent_steps(context, user_message), call_llm_func)
+
+def task_suggestion_agent_steps(context, user_message=None):
+    """Task 제안 agent generator (agent_io 참고)"""
     try:
         import time
         agent_start_time = time.time()
@@ -329,26 +373,27 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
         else:
             print(f"[Agent Router] Task 제안 - ⚠️ GitHub 토큰 없음 - rate limit 제한 가능성 (시간당 60회)")
         
-        progress_messages = []
-        all_steps = []
-        
-        # multi_step_agent의 파일 읽기 함수 import
-        from multi_step_agent import get_file_contents, list_directory_contents
+        progress_messages = ProgressMessages()  # 스트리밍 구독자에게도 전달
         
         print(f"[Agent Router] Task 제안 - 5단계 프로세스 시작 (프로젝트: {project_name})")
         
-        # ===== 1단계: 프로젝트 정보 파악 =====
-        print(f"[Agent Router] Task 제안 - 1단계: 프로젝트 정보 파악")
-        progress_messages.append("🔍 1단계: 프로젝트 정보 파악 중...")
+        # 단계 의존 그래프 (agent_dag 참고)
+        # - README 읽기와 기본 디렉토리 파일 목록 수집은 1단계 LLM 호출과 무관하므로 동시에 시작
+        # - 3단계(부족한 Task)와 4단계(보안/리팩토링)는 둘 다 2단계 결과와 읽은 파일만 필요하므로 동시에 실행
+        system_prompt = "소프트웨어 프로젝트 분석 전문가. 반드시 한국어로 응답. JSON만 응답."
         
-        # README 파일 읽기 (GitHub 연결 시)
-        read_files_step1 = []
-        if has_github:
+        def read_readme():
+            # README 파일 읽기 (GitHub 연결 시)
+            read_files_step1 = []
+            if not has_github:
+                print(f"[Agent Router] Task 제안 - 1단계 README 읽기 건너뜀 (GitHub 미연결)")
+                return read_files_step1
             step1_readme_start = time.time()
-            readme_files = ["README.md", "README.txt", "readme.md", "README", "readme"]
+            # 경로 인덱스로 실제 있는 README만 읽음
+            readme_files = yield existing_paths_request(github_repo, github_token, README_FILES)
             for readme_file in readme_files:
                 try:
-                    file_contents = get_file_contents(github_repo, github_token, [readme_file])
+                    file_contents = yield read_files_request(github_repo, github_token, [readme_file])
                     if file_contents and file_contents[0].get('content'):
                         read_files_step1.append({
                             "path": file_contents[0].get('filePath', readme_file),
@@ -356,80 +401,87 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                             "truncated": file_contents[0].get('truncated', False)
                         })
                         break
-                except:
+                except Exception:
                     continue
             step1_readme_elapsed = time.time() - step1_readme_start
             print(f"[Agent Router] Task 제안 - 1단계 README 읽기 소요 시간: {step1_readme_elapsed:.2f}초")
-        else:
-            print(f"[Agent Router] Task 제안 - 1단계 README 읽기 건너뜀 (GitHub 미연결)")
-        
-        # 1단계 프롬프트 생성 및 LLM 호출
-        step1_llm_start = time.time()
-        prompt_step1 = create_task_suggestion_step1_prompt(context, user_message, read_files_step1, [], 1)
-        system_prompt = "소프트웨어 프로젝트 분석 전문가. 반드시 한국어로 응답. JSON만 응답."
-        response_step1 = call_llm_func(prompt_step1, system_prompt)
-        step1_llm_elapsed = time.time() - step1_llm_start
-        print(f"[Agent Router] Task 제안 - 1단계 LLM 호출 소요 시간: {step1_llm_elapsed:.2f}초")
-        
-        # JSON 파싱
-        try:
-            if '```json' in response_step1:
-                response_step1 = response_step1.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_step1:
-                response_step1 = response_step1.split('```')[1].split('```')[0].strip()
-            step1_result = json.loads(response_step1)
-        except:
-            step1_result = {}
-        
-        all_steps.append(step1_result)
-        progress_messages.append("✅ 1단계 완료: 프로젝트 정보 파악")
-        
-        # ===== 2단계: 현재 Task 및 소스코드 구현 파악 =====
-        print(f"[Agent Router] Task 제안 - 2단계: 현재 Task 및 소스코드 구현 파악")
-        progress_messages.append("📋 2단계: 현재 Task 및 소스코드 구현 파악 중...")
-        step2_start_time = time.time()
-        
-        # 소스코드 파일 읽기 (GitHub 연결 시) - 논리적 읽기 방식
-        read_files_step2 = []
-        if has_github:
+            return read_files_step1
+        
+        def scan_directories(directories):
+            # 디렉토리별 파일 목록 (병렬 탐색, 실패한 디렉토리는 None)
+            if not has_github or not directories:
+                return {}
+            dir_results = yield [
+                list_directory_request(github_repo, github_token, dir_path)
+                for dir_path in directories
+            ]
+            listings = {}
+            for dir_path, dir_files in zip(directories, dir_results):
+                if isinstance(dir_files, Exception):
+                    print(f"[Agent Router] 디렉토리 탐색 실패 ({dir_path}): {dir_files}")
+                    dir_files = None
+                listings[dir_path] = dir_files
+            return listings
+        
+        def step1(read_files_step1):
+            # ===== 1단계: 프로젝트 정보 파악 =====
+            print(f"[Agent Router] Task 제안 - 1단계: 프로젝트 정보 파악")
+            progress_messages.append("🔍 1단계: 프로젝트 정보 파악 중...")
+            
+            # 1단계 프롬프트 생성 및 LLM 호출
+            step1_llm_start = time.time()
+            prompt_step1 = create_task_suggestion_step1_prompt(context, user_message, read_files_step1, [], 1)
+            response_step1 = yield llm_request(
+                prompt_step1, system_prompt, purpose='task_suggestion_agent', schema=GENERIC_JSON
+            )
+            step1_llm_elapsed = time.time() - step1_llm_start
+            print(f"[Agent Router] Task 제안 - 1단계 LLM 호출 소요 시간: {step1_llm_elapsed:.2f}초")
+            
+            # JSON 파싱
+            step1_result = parse_json_response(response_step1, default={})
+            emit('step', {'agent_type': 'task_suggestion_agent', 'step_number': 1, 'result': step1_result})
+            progress_messages.append("✅ 1단계 완료: 프로젝트 정보 파악")
+            return step1_result
+        
+        def select_files(step1_result, prescanned):
+            # ===== 2단계 파일 선택: 현재 Task 및 소스코드 구현 파악에 필요한 파일 =====
+            print(f"[Agent Router] Task 제안 - 2단계: 현재 Task 및 소스코드 구현 파악")
+            progress_messages.append("📋 2단계: 현재 Task 및 소스코드 구현 파악 중...")
+            step2_start_time = time.time()
+            
+            # 소스코드 파일 읽기 (GitHub 연결 시) - 논리적 읽기 방식
+            read_files_step2 = []
+            if not has_github:
+                return read_files_step2
+            
             # 주요 디렉토리 탐색 (파일 목록만 수집)
             project_structure = step1_result.get('projectInfo', {}).get('projectStructure', {})
             main_directories = project_structure.get('mainDirectories', [])
             
             # mainDirectories가 비어있으면 기본 디렉토리 목록 사용
             if not main_directories:
-                main_directories = ["src", "app", "components", "pages", "routes", "controllers", "services", "utils", "backend", "frontend"]
+                main_directories = DEFAULT_SOURCE_DIRECTORIES
             
             # 디렉토리에서 파일 목록만 수집 (파일 내용은 읽지 않음)
             all_files_list = []
             progress_messages.append("🔍 프로젝트 파일 목록 수집 중...")
             dir_collection_start = time.time()
             
-            # 디렉토리 탐색 개수 제한 및 병렬 처리
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-            
-            def collect_dir_files(dir_path):
-                """단일 디렉토리에서 파일 수집"""
-                try:
-                    dir_files = list_directory_contents(github_repo, github_token, dir_path)
-                    # JavaScript/TypeScript/Python 파일 선택
-                    code_files = [f for f in dir_files if f.endswith(('.js', '.jsx', '.ts', '.tsx', '.py'))]
-                    return code_files
-                except Exception as e:
-                    print(f"[Agent Router] 디렉토리 탐색 실패 ({dir_path}): {e}")
-                    return []
-            
-            # 병렬로 디렉토리 탐색 (최대 3개 동시)
-            directories_to_scan = main_directories[:3]  # 최대 3개 디렉토리만 (속도 향상)
-            if directories_to_scan:
-                with ThreadPoolExecutor(max_workers=3) as executor:
-                    future_to_dir = {executor.submit(collect_dir_files, dir_path): dir_path 
-                                   for dir_path in directories_to_scan}
-                    for future in as_completed(future_to_dir):
-                        code_files = future.result()
-                        all_files_list.extend(code_files)
-                        if len(all_files_list) >= 50:  # 최대 50개로 제한 (속도 향상)
-                            break
+            # 1단계와 동시에 미리 탐색하지 않은 디렉토리만 추가로 탐색 (최대 3개 디렉토리만, 속도 향상)
+            directories_to_scan = main_directories[:3]
+            dir_listings = dict(prescanned)
+            missing_directories = [dir_path for dir_path in directories_to_scan if dir_path not in dir_listings]
+            if missing_directories:
+                dir_listings.update((yield from scan_directories(missing_directories)))
+            for dir_path in directories_to_scan:
+                dir_files = dir_listings.get(dir_path)
+                if not dir_files:
+                    continue
+                # JavaScript/TypeScript/Python 파일 선택
+                code_files = [f for f in dir_files if f.endswith(('.js', '.jsx', '.ts', '.tsx', '.py'))]
+                all_files_list.extend(code_files)
+                if len(all_files_list) >= 50:  # 최대 50개로 제한 (속도 향상)
+                    break
             
             dir_collection_elapsed = time.time() - dir_collection_start
             print(f"[Agent Router] Task 제안 - 2단계에서 {len(all_files_list)}개 파일 목록 수집 (소요 시간: {dir_collection_elapsed:.2f}초)")
@@ -442,24 +494,17 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                 file_selection_prompt = create_task_suggestion_file_selection_prompt(
                     context, user_message, all_files_list, step1_result
                 )
-                file_selection_response = call_llm_func(file_selection_prompt, system_prompt)
+                # 파일 선택은 짧은 JSON이므로 작은 모델 사용 (배치 우선순위는 유지)
+                file_selection_response = yield llm_request(
+                    file_selection_prompt, system_prompt,
+                    purpose='file_selection', lane=LANE_BATCH, schema='file_selection'
+                )
                 file_selection_elapsed = time.time() - file_selection_start
                 print(f"[Agent Router] Task 제안 - 파일 선택 LLM 호출 소요 시간: {file_selection_elapsed:.2f}초")
                 
                 # JSON 파싱
                 try:
-                    if '```json' in file_selection_response:
-                        file_selection_response = file_selection_response.split('```json')[1].split('```')[0].strip()
-                    elif '```' in file_selection_response:
-                        file_selection_response = file_selection_response.split('```')[1].split('```')[0].strip()
-                    
-                    file_selection_response = file_selection_response.strip()
-                    if '{' in file_selection_response:
-                        file_selection_response = file_selection_response[file_selection_response.find('{'):]
-                    if '}' in file_selection_response:
-                        file_selection_response = file_selection_response[:file_selection_response.rfind('}')+1]
-                    
-                    file_selection_result = json.loads(file_selection_response)
+                    file_selection_result = parse_json_response(file_selection_response, 'file_selection')
                     selected_files = file_selection_result.get('selectedFiles', [])
                     selection_reason = file_selection_result.get('reason', '')
                     
@@ -469,7 +514,7 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                     # 선택된 파일만 읽기
                     if selected_files:
                         progress_messages.append(f"📄 선택된 파일 읽는 중... ({len(selected_files)}개)")
-                        file_contents = get_file_contents(github_repo, github_token, selected_files[:15], max_lines_per_file=500)  # 최대 15개로 제한
+                        file_contents = yield read_files_request(github_repo, github_token, selected_files[:15], max_lines_per_file=500)  # 최대 15개로 제한
                         read_files_step2 = [
                             {
                                 "path": f.get('filePath', ''),
@@ -485,7 +530,7 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                         progress_messages.append("⚠️ 파일 선택 실패, 기본 파일 읽기 시도")
                         # 폴백: 처음 10개 파일만 읽기
                         if all_files_list:
-                            file_contents = get_file_contents(github_repo, github_token, all_files_list[:10], max_lines_per_file=500)
+                            file_contents = yield read_files_request(github_repo, github_token, all_files_list[:10], max_lines_per_file=500)
                             read_files_step2 = [
                                 {
                                     "path": f.get('filePath', ''),
@@ -495,11 +540,13 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                                 for f in file_contents if f.get('content')
                             ]
                             print(f"[Agent Router] Task 제안 - 2단계에서 폴백으로 {len(read_files_step2)}개 파일 읽음")
+                except UNAVAILABLE_ERRORS:
+                    raise
                 except Exception as e:
                     print(f"[Agent Router] 파일 선택 파싱 실패: {e}")
                     # 폴백: 처음 10개 파일만 읽기
                     if all_files_list:
-                        file_contents = get_file_contents(github_repo, github_token, all_files_list[:10], max_lines_per_file=500)
+                        file_contents = yield read_files_request(github_repo, github_token, all_files_list[:10], max_lines_per_file=500)
                         read_files_step2 = [
                             {
                                 "path": f.get('filePath', ''),
@@ -509,91 +556,130 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                             for f in file_contents if f.get('content')
                         ]
                         print(f"[Agent Router] Task 제안 - 2단계에서 폴백으로 {len(read_files_step2)}개 파일 읽음")
-        
-        step2_file_read_elapsed = time.time() - step2_start_time
-        print(f"[Agent Router] Task 제안 - 2단계 파일 읽기 소요 시간: {step2_file_read_elapsed:.2f}초")
-        
-        # 2단계 프롬프트 생성 및 LLM 호출
-        step2_llm_start = time.time()
-        prompt_step2 = create_task_suggestion_step2_prompt(context, user_message, read_files_step2, [], 2, step1_result)
-        response_step2 = call_llm_func(prompt_step2, system_prompt)
-        step2_llm_elapsed = time.time() - step2_llm_start
-        print(f"[Agent Router] Task 제안 - 2단계 LLM 호출 소요 시간: {step2_llm_elapsed:.2f}초")
-        
-        # JSON 파싱
-        try:
-            if '```json' in response_step2:
-                response_step2 = response_step2.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_step2:
-                response_step2 = response_step2.split('```')[1].split('```')[0].strip()
-            step2_result = json.loads(response_step2)
-        except:
-            step2_result = {}
-        
-        all_steps.append(step2_result)
-        progress_messages.append("✅ 2단계 완료: 현재 Task 및 소스코드 구현 파악")
-        
-        # ===== 3단계: 부족한 Task 제안 =====
-        print(f"[Agent Router] Task 제안 - 3단계: 부족한 Task 제안")
-        progress_messages.append("💡 3단계: 부족한 Task 제안 중...")
-        
-        prompt_step3 = create_task_suggestion_step3_prompt(context, user_message, [], [], 3, all_steps)
-        response_step3 = call_llm_func(prompt_step3, system_prompt)
-        
-        # JSON 파싱
-        try:
-            if '```json' in response_step3:
-                response_step3 = response_step3.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_step3:
-                response_step3 = response_step3.split('```')[1].split('```')[0].strip()
-            step3_result = json.loads(response_step3)
-        except:
-            step3_result = {}
-        
-        all_steps.append(step3_result)
-        progress_messages.append("✅ 3단계 완료: 부족한 Task 제안")
-        
-        # ===== 4단계: 보안 및 리팩토링 개선점 제안 (GitHub 연결 시만) =====
-        step4_result = {}
-        if has_github:
+            
+            step2_file_read_elapsed = time.time() - step2_start_time
+            print(f"[Agent Router] Task 제안 - 2단계 파일 읽기 소요 시간: {step2_file_read_elapsed:.2f}초")
+            return read_files_step2
+        
+        def step2(read_files_step1, read_files_step2, step1_result):
+            # 2단계 프롬프트 생성 및 LLM 호출
+            step2_llm_start = time.time()
+            # 이후 단계는 모두 같은 파일 목록(README + 선택 파일)을 받아 프롬프트 접두부가 동일하게 유지됨
+            read_files_all = read_files_step1 + read_files_step2
+            prompt_step2 = create_task_suggestion_step2_prompt(context, user_message, read_files_all, [], 2, step1_result)
+            response_step2 = yield llm_request(
+                prompt_step2, system_prompt, purpose='task_suggestion_agent', schema=GENERIC_JSON
+            )
+            step2_llm_elapsed = time.time() - step2_llm_start
+            print(f"[Agent Router] Task 제안 - 2단계 LLM 호출 소요 시간: {step2_llm_elapsed:.2f}초")
+            
+            # JSON 파싱
+            step2_result = parse_json_response(response_step2, default={})
+            emit('step', {'agent_type': 'task_suggestion_agent', 'step_number': 2, 'result': step2_result})
+            progress_messages.append("✅ 2단계 완료: 현재 Task 및 소스코드 구현 파악")
+            return step2_result
+        
+        def step3(read_files_step1, read_files_step2, step1_result, step2_result):
+            # ===== 3단계: 부족한 Task 제안 =====
+            print(f"[Agent Router] Task 제안 - 3단계: 부족한 Task 제안")
+            progress_messages.append("💡 3단계: 부족한 Task 제안 중...")
+            
+            read_files_all = read_files_step1 + read_files_step2
+            prompt_step3 = create_task_suggestion_step3_prompt(
+                context, user_message, read_files_all, [], 3, [step1_result, step2_result]
+            )
+            response_step3 = yield llm_request(
+                prompt_step3, system_prompt, purpose='task_suggestion_agent', schema=GENERIC_JSON
+            )
+            
+            # JSON 파싱
+            step3_result = parse_json_response(response_step3, default={})
+            emit('step', {'agent_type': 'task_suggestion_agent', 'step_number': 3, 'result': step3_result})
+            progress_messages.append("✅ 3단계 완료: 부족한 Task 제안")
+            return step3_result
+        
+        def step4(read_files_step1, read_files_step2, step1_result, step2_result):
+            # ===== 4단계: 보안 및 리팩토링 개선점 제안 (GitHub 연결 시만) =====
+            # 2단계의 구현 기능/코드 구조와 읽은 파일만 사용하므로 3단계와 동시에 실행
+            if not has_github:
+                print(f"[Agent Router] Task 제안 - 4단계 건너뜀 (GitHub 미연결)")
+                progress_messages.append("⏭️ 4단계 건너뜀: GitHub 미연결로 보안/리팩토링 제안 생략")
+                return None
             print(f"[Agent Router] Task 제안 - 4단계: 보안 및 리팩토링 개선점 제안")
             progress_messages.append("🔒 4단계: 보안 및 리팩토링 개선점 제안 중...")
             
-            prompt_step4 = create_task_suggestion_step4_prompt(context, user_message, read_files_step2, [], 4, all_steps)
-            response_step4 = call_llm_func(prompt_step4, system_prompt)
+            read_files_all = read_files_step1 + read_files_step2
+            prompt_step4 = create_task_suggestion_step4_prompt(
+                context, user_message, read_files_all, [], 4, [step1_result, step2_result]
+            )
+            response_step4 = yield llm_request(
+                prompt_step4, system_prompt, purpose='task_suggestion_agent', schema=GENERIC_JSON
+            )
             
             # JSON 파싱
-            try:
-                if '```json' in response_step4:
-                    response_step4 = response_step4.split('```json')[1].split('```')[0].strip()
-                elif '```' in response_step4:
-                    response_step4 = response_step4.split('```')[1].split('```')[0].strip()
-                step4_result = json.loads(response_step4)
-            except:
-                step4_result = {}
-            
-            all_steps.append(step4_result)
+            step4_result = parse_json_response(response_step4, default={})
+            emit('step', {'agent_type': 'task_suggestion_agent', 'step_number': 4, 'result': step4_result})
             progress_messages.append("✅ 4단계 완료: 보안 및 리팩토링 개선점 제안")
-        else:
-            print(f"[Agent Router] Task 제안 - 4단계 건너뜀 (GitHub 미연결)")
-            progress_messages.append("⏭️ 4단계 건너뜀: GitHub 미연결로 보안/리팩토링 제안 생략")
+            return step4_result
+        
+        def step5(read_files_step1, read_files_step2, step1_result, step2_result, step3_result, step4_result):
+            # ===== 5단계: Task 형식으로 통합 및 출력 =====
+            print(f"[Agent Router] Task 제안 - 5단계: Task 형식으로 통합 및 출력")
+            progress_messages.append("📊 5단계: Task 형식으로 통합 및 출력 중...")
+            
+            read_files_all = read_files_step1 + read_files_step2
+            all_steps = [step1_result, step2_result, step3_result]
+            if step4_result is not None:
+                all_steps.append(step4_result)
+            prompt_step5 = create_task_suggestion_step5_prompt(context, user_message, read_files_all, [], 5, all_steps)
+            response_step5 = yield llm_request(
+                prompt_step5, system_prompt, purpose='task_suggestion_agent', schema='task_suggestion_final'
+            )
+            
+            # JSON 파싱
+            step5_result = parse_json_response(response_step5, 'task_suggestion_final', default={'suggestions': []})
+            emit('step', {'agent_type': 'task_suggestion_agent', 'step_number': 5, 'result': step5_result})
+            return step5_result
+        
+        stages = [
+            Stage('readme', read_readme),
+            # 1단계가 mainDirectories를 정하기 전에 기본 디렉토리 목록을 미리 수집 (1단계 LLM 호출과 동시에)
+            Stage('prescanned', lambda: scan_directories(DEFAULT_SOURCE_DIRECTORIES[:3])),
+            Stage('step1', step1, inputs=('readme',)),
+            Stage('selected_files', select_files, inputs=('step1', 'prescanned')),
+            Stage('step2', step2, inputs=('readme', 'selected_files', 'step1')),
+            Stage('step3', step3, inputs=('readme', 'selected_files', 'step1', 'step2')),
+            Stage('step4', step4, inputs=('readme', 'selected_files', 'step1', 'step2')),
+            Stage('step5', step5, inputs=('readme', 'selected_files', 'step1', 'step2', 'step3', 'step4')),
+        ]
         
-        # ===== 5단계: Task 형식으로 통합 및 출력 =====
-        print(f"[Agent Router] Task 제안 - 5단계: Task 형식으로 통합 및 출력")
-        progress_messages.append("📊 5단계: Task 형식으로 통합 및 출력 중...")
+        # 같은 실행 ID로 재시도한 요청이면 완료된 단계는 저장된 출력을 사용하고 남은 단계만 실행 (agent_checkpoint 참고)
+        fingerprint = run_fingerprint(context, user_message)
+        checkpoint = load_checkpoint('task_suggestion_agent', fingerprint)
+        completed_stages = {}
+        if checkpoint:
+            completed_stages = checkpoint['stages']
+            progress_messages.extend(checkpoint['progress_messages'])
+            print(f"[Agent Router] Task 제안 - 체크포인트에서 재개 (완료된 단계: {', '.join(completed_stages)})")
+            progress_messages.append(f"♻️ 이전 실행에서 완료된 {len(completed_stages)}개 단계 결과를 이어서 사용합니다.")
+        
+        def save_stage(name, values):
+            # 단계 완료 상태 저장 (마지막 단계가 끝나면 실행 완료로 삭제되므로 저장하지 않음)
+            if name != 'step5':
+                save_checkpoint('task_suggestion_agent', fingerprint, len(values), {
+                    "stages": values,
+                    "progress_messages": list(progress_messages),
+                })
         
-        prompt_step5 = create_task_suggestion_step5_prompt(context, user_message, [], [], 5, all_steps)
-        response_step5 = call_llm_func(prompt_step5, system_prompt)
+        stage_values, execution_trace = yield from run_stages(
+            'task_suggestion_agent', stages, completed_stages, on_stage_done=save_stage
+        )
+        clear_checkpoint('task_suggestion_agent')
         
-        # JSON 파싱
-        try:
-            if '```json' in response_step5:
-                response_step5 = response_step5.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_step5:
-                response_step5 = response_step5.split('```')[1].split('```')[0].strip()
-            step5_result = json.loads(response_step5)
-        except:
-            step5_result = {}
+        all_steps = [stage_values['step1'], stage_values['step2'], stage_values['step3']]
+        if stage_values['step4'] is not None:
+            all_steps.append(stage_values['step4'])
+        step5_result = stage_values['step5']
         
         suggestions = step5_result.get('suggestions', [])
         
@@ -652,7 +738,8 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
                 },
                 "analysis_steps": 5,
                 "confidence": "medium",
-                "progress_messages": progress_messages
+                "progress_messages": progress_messages,
+                "execution": execution_trace
             }
         
         # 카테고리별 정렬
@@ -730,8 +817,11 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
             "analysis_steps": 5,
             "confidence": "high",
             "progress_messages": progress_messages,
-            "all_steps": all_steps
+            "all_steps": all_steps,
+            "execution": execution_trace
         }
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Agent Router] Task 제안 agent 실행 실패: {e}")
         import traceback
@@ -748,28 +838,21 @@ def execute_task_suggestion_agent(context, call_llm_func, user_message=None):
 
 def execute_progress_analysis_agent(context, call_llm_func, user_message=None):
     """진행도 분석 agent 실행 (다단계 분석)"""
+    return run_agent_sync(progress_analysis_agent_steps(context, user_message), call_llm_func)
+
+def progress_analysis_agent_steps(context, user_message=None):
+    """진행도 분석 agent generator (agent_io 참고)"""
     try:
-        # 진행도 분석용 LLM 호출 함수 (더 긴 응답을 위해 토큰 제한 증가)
-        # app.py에서 전달된 call_llm_func를 래핑하여 토큰 제한 증가
-        import os
-        USE_OPENAI = os.getenv('USE_OPENAI', 'false').lower() == 'true'
-        
-        def call_llm_with_more_tokens(prompt, system_prompt):
-            # app.py의 함수를 직접 호출하기 위해 import
-            from app import call_openai, call_ollama
-            if USE_OPENAI:
-                return call_openai(prompt, system_prompt, max_tokens=3000)
-            else:
-                return call_ollama(prompt, system_prompt, max_tokens=3000)
-        
-        result = execute_multi_step_agent(
+        # 진행도 분석은 더 긴 응답을 위해 토큰 제한 증가
+        # (공유 LLM 클라이언트를 직접 사용하며, 스트리밍 요청이면 토큰 단위로 이벤트 발행)
+        result = yield from multi_step_agent_steps(
             agent_type="progress_analysis_agent",
             context=context,
-            call_llm_func=call_llm_with_more_tokens,
             user_message=user_message,
             initial_prompt_func=create_progress_analysis_initial_prompt,
             followup_prompt_func=create_progress_analysis_followup_prompt,
-            system_prompt="프로젝트 관리 전문가. 진행도 분석 및 예측. 반드시 한국어로 응답. JSON 형식으로 응답하되, narrativeResponse 필드에는 긴 문장 형태의 상세한 설명을 포함하세요."
+            system_prompt="프로젝트 관리 전문가. 진행도 분석 및 예측. 반드시 한국어로 응답. JSON 형식으로 응답하되, narrativeResponse 필드에는 긴 문장 형태의 상세한 설명을 포함하세요.",
+            max_tokens=3000
         )
         
         # 결과 처리 - 단계별 결과를 합쳐서 최종 응답 생성
@@ -1225,8 +1308,11 @@ def execute_progress_analysis_agent(context, call_llm_func, user_message=None):
             },
             "analysis_steps": result.get('analysis_steps', 1),
             "confidence": result.get('confidence', 'medium'),
-            "progress_messages": result.get('progress_messages', [])  # 진행 상황 메시지 추가
+            "progress_messages": result.get('progress_messages', []),  # 진행 상황 메시지 추가
+            "partial": result.get('partial', False)  # 마감 시간 때문에 일찍 종료한 부분 결과
         }
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Agent Router] 진행도 분석 agent 실행 실패: {e}")
         import traceback
@@ -1242,6 +1328,10 @@ def execute_progress_analysis_agent(context, call_llm_func, user_message=None):
 
 def execute_task_completion_agent(context, call_llm_func, user_message=None):
     """Task 완료 확인 agent 실행 (다단계 분석)"""
+    return run_agent_sync(task_completion_agent_steps(context, user_message), call_llm_func)
+
+def task_completion_agent_steps(context, user_message=None):
+    """Task 완료 확인 agent generator (agent_io 참고)"""
     import re
     
     # Task 정보 추출 (task_assignment_agent와 동일한 로직)
@@ -1345,21 +1435,10 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
         system_prompt = "Task 매칭 전문가. 사용자 메시지와 Task 목록을 비교하여 관련된 Task를 찾습니다. 반드시 한국어로만 응답. JSON만 응답."
         
         try:
-            content = call_llm_func(prompt, system_prompt)
+            content = yield llm_request(prompt, system_prompt, purpose='task_completion_agent', schema='task_matching')
             
             # JSON 파싱
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            content = content.strip()
-            if '{' in content:
-                content = content[content.find('{'):]
-            if '}' in content:
-                content = content[:content.rfind('}')+1]
-            
-            match_result = json.loads(content)
+            match_result = parse_json_response(content, 'task_matching')
             matched_task_ids = match_result.get('matched_task_ids', [])
             task_count = match_result.get('task_count', 0)
             reason = match_result.get('reason', '')
@@ -1415,6 +1494,8 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
                     }
                 }
         
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             print(f"[Agent Router] Task 완료 확인 - LLM 매칭 실패: {e}")
             return {
@@ -1440,6 +1521,18 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
     # task 객체를 context에 추가
     context['task'] = task
     
+    # Task와 의미가 가까운 커밋을 앞으로 정렬 (프롬프트에는 앞쪽 커밋만 들어감)
+    commits = context.get('commits') or []
+    matches = yield from semantic_matches_steps(
+        context, f"{task.get('title') or task_title}\n{task.get('description') or task_description or ''}".strip(),
+        commit_documents(commits), prefix='commit:'
+    )
+    if matches:
+        by_id = {f"commit:{commit.get('sha')}": commit for commit in commits}
+        linked = [by_id[doc_id] for doc_id, _ in matches if doc_id in by_id]
+        context['commits'] = linked + [commit for commit in commits if commit not in linked]
+        print(f"[Agent Router] Task 완료 확인 - Task와 관련된 커밋 {len(linked)}개 연결 (최고 유사도 {matches[0][1]})")
+    
     system_prompt = """당신은 코드 리뷰 전문가입니다. Task 완료 여부를 판단합니다.
 
 중요 규칙:
@@ -1448,10 +1541,9 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
 3. 사용자가 지정한 Task만 분석하세요. 다른 Task는 무시하세요."""
     
     try:
-        result = execute_multi_step_agent(
+        result = yield from multi_step_agent_steps(
             agent_type="task_completion_agent",
             context=context,
-            call_llm_func=call_llm_func,
             user_message=user_message,
             initial_prompt_func=create_task_completion_initial_prompt,
             followup_prompt_func=create_task_completion_followup_prompt,
@@ -1478,11 +1570,10 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
         # evidence가 있는 경우에만 검증 수행
         if evidence:
             print(f"[Agent Router] Task 완료 확인 - 근거 검증 시작: {len(evidence)}개 근거")
-            verification_result = verify_evidence_relevance(
+            verification_result = yield from verify_evidence_relevance_steps(
                 task_title=task_title,
                 task_description=task_description,
-                evidence=evidence,
-                call_llm_func=call_llm_func
+                evidence=evidence
             )
             
             is_relevant = verification_result.get('is_relevant', True)
@@ -1539,21 +1630,13 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
 3. Task 제목과 직접 관련된 근거만 생성하세요. 다른 Task는 무시하세요."""
                 
                 try:
-                    reanalysis_content = call_llm_func(reanalysis_prompt, system_prompt_reanalysis)
+                    reanalysis_content = yield llm_request(
+                        reanalysis_prompt, system_prompt_reanalysis,
+                        purpose='task_completion_agent', schema='task_completion'
+                    )
                     
                     # JSON 파싱
-                    if '```json' in reanalysis_content:
-                        reanalysis_content = reanalysis_content.split('```json')[1].split('```')[0].strip()
-                    elif '```' in reanalysis_content:
-                        reanalysis_content = reanalysis_content.split('```')[1].split('```')[0].strip()
-                    
-                    reanalysis_content = reanalysis_content.strip()
-                    if '{' in reanalysis_content:
-                        reanalysis_content = reanalysis_content[reanalysis_content.find('{'):]
-                    if '}' in reanalysis_content:
-                        reanalysis_content = reanalysis_content[:reanalysis_content.rfind('}')+1]
-                    
-                    reanalysis_result = json.loads(reanalysis_content)
+                    reanalysis_result = parse_json_response(reanalysis_content, 'task_completion')
                     
                     # 재분석 결과로 evidence 업데이트
                     final_result['evidence'] = reanalysis_result.get('evidence', verification_result.get('relevant_evidence', []))
@@ -1562,6 +1645,8 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
                     
                     print(f"[Agent Router] Task 완료 확인 - 근거 재분석 완료: {len(final_result.get('evidence', []))}개 근거")
                     reanalysis_count += 1
+                except UNAVAILABLE_ERRORS:
+                    raise
                 except Exception as e:
                     print(f"[Agent Router] Task 완료 확인 - 근거 재분석 실패: {e}")
                     # 재분석 실패 시 관련 있는 근거만 사용
@@ -1684,8 +1769,11 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
             },
             "analysis_steps": result.get('analysis_steps', 1),
             "confidence": result.get('confidence', 'low'),
-            "progress_messages": result.get('progress_messages', [])  # 진행 상황 메시지 추가
+            "progress_messages": result.get('progress_messages', []),  # 진행 상황 메시지 추가
+            "partial": result.get('partial', False)  # 마감 시간 때문에 일찍 종료한 부분 결과
         }
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Agent Router] Task 완료 확인 agent 실행 실패: {e}")
         import traceback
@@ -1701,6 +1789,10 @@ def execute_task_completion_agent(context, call_llm_func, user_message=None):
 
 def execute_general_qa_agent(context, call_llm_func, user_message=None):
     """일반적인 질문 답변 agent 실행 (다단계 분석)"""
+    return run_agent_sync(general_qa_agent_steps(context, user_message), call_llm_func)
+
+def general_qa_agent_steps(context, user_message=None):
+    """일반적인 질문 답변 agent generator (agent_io 참고)"""
     if not user_message:
         return {
             "agent_type": "general_qa_agent",
@@ -1711,11 +1803,23 @@ def execute_general_qa_agent(context, call_llm_func, user_message=None):
             }
         }
     
+    # 질문과 의미가 가까운 커밋/Task를 최근 항목 대신 프롬프트에 넣음
+    commits = context.get('commits') or []
+    tasks = context.get('tasks') or []
+    matches = yield from semantic_matches_steps(
+        context, user_message, commit_documents(commits) + task_documents(tasks), k=SEMANTIC_TOP_K * 2
+    )
+    if matches:
+        by_id = {f"commit:{commit.get('sha')}": commit for commit in commits}
+        by_id.update((f"task:{task.get('id')}", task) for task in tasks)
+        context['relevantCommits'] = [by_id[doc_id] for doc_id, _ in matches if doc_id.startswith('commit:') and doc_id in by_id][:SEMANTIC_TOP_K]
+        context['relevantTasks'] = [by_id[doc_id] for doc_id, _ in matches if doc_id.startswith('task:') and doc_id in by_id][:SEMANTIC_TOP_K]
+        print(f"[Agent Router] 질문 답변 - 관련 커밋 {len(context['relevantCommits'])}개, Task {len(context['relevantTasks'])}개 선택")
+    
     try:
-        result = execute_multi_step_agent(
+        result = yield from multi_step_agent_steps(
             agent_type="general_qa_agent",
             context=context,
-            call_llm_func=call_llm_func,
             user_message=user_message,
             initial_prompt_func=create_general_qa_initial_prompt,
             followup_prompt_func=create_general_qa_followup_prompt,
@@ -1775,7 +1879,8 @@ def execute_general_qa_agent(context, call_llm_func, user_message=None):
                 },
                 "analysis_steps": result.get('analysis_steps', 1),
                 "confidence": result.get('confidence', 'medium'),
-                "progress_messages": result.get('progress_messages', [])  # 진행 상황 메시지 추가
+                "progress_messages": result.get('progress_messages', []),  # 진행 상황 메시지 추가
+                "partial": result.get('partial', False)  # 마감 시간 때문에 일찍 종료한 부분 결과
             }
         else:
             suggestion = final_result.get('suggestion', '프로젝트 진행도, Task 제안, Task 완료 확인 등의 기능을 사용해주세요.')
@@ -1790,8 +1895,11 @@ def execute_general_qa_agent(context, call_llm_func, user_message=None):
                 },
                 "analysis_steps": result.get('analysis_steps', 1),
                 "confidence": result.get('confidence', 'medium'),
-                "progress_messages": result.get('progress_messages', [])  # 진행 상황 메시지 추가
+                "progress_messages": result.get('progress_messages', []),  # 진행 상황 메시지 추가
+                "partial": result.get('partial', False)  # 마감 시간 때문에 일찍 종료한 부분 결과
             }
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Agent Router] 일반 질문 답변 agent 실행 실패: {e}")
         import traceback
@@ -1807,6 +1915,10 @@ def execute_general_qa_agent(context, call_llm_func, user_message=None):
 
 def execute_task_assignment_agent(context, call_llm_func, user_message=None):
     """Task 할당 추천 agent 실행 (개선된 버전)"""
+    return run_agent_sync(task_assignment_agent_steps(context, user_message), call_llm_func)
+
+def task_assignment_agent_steps(context, user_message=None):
+    """Task 할당 추천 agent generator (agent_io 참고)"""
     import re
     
     # Task 정보 추출 (개선된 로직)
@@ -1982,10 +2094,9 @@ def execute_task_assignment_agent(context, call_llm_func, user_message=None):
     print(f"[Agent Router] Task 할당 - Task 정보: {task_title}, Tags: {task_tags}")
     
     try:
-        result = execute_multi_step_agent(
+        result = yield from multi_step_agent_steps(
             agent_type="task_assignment_agent",
             context=context,
-            call_llm_func=call_llm_func,
             user_message=user_message,
             initial_prompt_func=create_task_assignment_initial_prompt,
             followup_prompt_func=create_task_assignment_followup_prompt,
@@ -2112,8 +2223,11 @@ def execute_task_assignment_agent(context, call_llm_func, user_message=None):
             },
             "analysis_steps": result.get('analysis_steps', 1),
             "confidence": result.get('confidence', 'medium'),
-            "progress_messages": result.get('progress_messages', [])  # 진행 상황 메시지 추가
+            "progress_messages": result.get('progress_messages', []),  # 진행 상황 메시지 추가
+            "partial": result.get('partial', False)  # 마감 시간 때문에 일찍 종료한 부분 결과
         }
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Agent Router] Task 할당 추천 agent 실행 실패: {e}")
         import traceback
@@ -2129,6 +2243,10 @@ def execute_task_assignment_agent(context, call_llm_func, user_message=None):
 
 def execute_batch_task_assignment_agent(context, call_llm_func, user_message=None):
     """여러 Task를 한번에 할당 추천하는 agent 실행"""
+    return run_agent_sync(batch_task_assignment_agent_steps(context, user_message), call_llm_func)
+
+def batch_task_assignment_agent_steps(context, user_message=None):
+    """여러 Task를 한번에 할당 추천하는 agent generator (agent_io 참고)"""
     import json
     
     project_members_with_tags = context.get('projectMembersWithTags', [])
@@ -2205,9 +2323,8 @@ def execute_batch_task_assignment_agent(context, call_llm_func, user_message=Non
             task_context['taskId'] = task_id
             
             # 개별 Task 할당 추천 수행
-            result = execute_task_assignment_agent(
+            result = yield from task_assignment_agent_steps(
                 context=task_context,
-                call_llm_func=call_llm_func,
                 user_message=None
             )
             
@@ -2237,6 +2354,8 @@ def execute_batch_task_assignment_agent(context, call_llm_func, user_message=Non
                     "taskTitle": task_title,
                     "error": "추천 결과를 받을 수 없습니다."
                 })
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
             print(f"[Agent Router] 일괄 Task 할당 - Task {task_id} 처리 실패: {e}")
             errors.append({
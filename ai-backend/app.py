@@ -1,11 +1,15 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 from datetime import datetime
+import contextvars
+import functools
 import os
 import sys
 import json
-import httpx
+import queue
+import threading
+import time
 import requests
 
 # 출력 버퍼링 비활성화 (로그 즉시 출력)
@@ -19,6 +23,34 @@ from prompt_optimizer import (
     create_task_assignment_prompt
 )
 from agent_router import process_chat_message
+from agent_events import AgentCancelled, cancellation, emit, event_sink
+from llm_cache import cache_policy, get_llm_cache, wants_cache_bypass
+from llm_scheduler import LANE_BATCH, LANE_INTERACTIVE, LLMOverloadedError, get_llm_scheduler, llm_priority
+from single_flight import single_flight_stats
+from http_cache import http_cache_stats
+from model_router import cascade_stats
+from sufficiency_policy import sufficiency_stats
+from agent_dag import dag_stats
+from agent_checkpoint import agent_run, checkpoint_stats, run_id_from_request
+from speculative_prefetch import prefetch_stats
+from file_store import file_store_stats
+from embedding_index import embedding_stats
+from repo_snapshot import snapshot_stats
+from repo_tree import tree_stats
+from structured_output import extract_json, parse_json_response, response_format
+from resilience import CircuitOpenError, breaker_stats
+from multi_step_agent import github_get
+from request_deadline import deadline_exceeded, deadline_from_headers, remaining_seconds, request_deadline
+from llm_client import (
+    OLLAMA_MODEL,
+    OPENAI_MODEL,
+    USE_OPENAI,
+    call_llm_streaming,
+    call_ollama,
+    call_openai,
+    check_ollama_model,
+    get_llm_client
+)
 
 # Load environment variables
 load_dotenv()
@@ -26,98 +58,61 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
-# Ollama 설정 (로컬 모델)
-OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
-# 모델 옵션: qwen2.5:7b (빠름), qwen2.5:3b (매우 빠름), qwen2.5:14b (정확함)
-OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen2.5:14b')  # 기본값을 14b 모델로 변경
-
-# OpenAI 설정 (클라우드 모델 사용 시, 선택사항)
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', None)
-USE_OPENAI = os.getenv('USE_OPENAI', 'false').lower() == 'true' and OPENAI_API_KEY is not None
+# SSE 스트리밍 유휴 시 keep-alive 주석 전송 간격 (초)
+SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', '15'))
 
-if USE_OPENAI:
-    try:
-        from openai import OpenAI
-        openai_client = OpenAI(api_key=OPENAI_API_KEY)
-        print("OpenAI 모드로 실행됩니다.")
-    except ImportError:
-        openai_client = None
-        USE_OPENAI = False
-        print("Warning: OpenAI library not installed. Ollama를 사용합니다.")
-else:
-    openai_client = None
-    print(f"Ollama 모드로 실행됩니다. (모델: {OLLAMA_MODEL})")
-
-def check_ollama_model():
-    """Ollama 모델이 설치되어 있는지 확인"""
-    try:
-        response = httpx.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5.0)
-        response.raise_for_status()
-        models = response.json().get("models", [])
-        model_names = [m.get("name", "") for m in models]
-        return OLLAMA_MODEL in model_names
-    except Exception as e:
-        print(f"Ollama 모델 확인 실패: {e}")
-        return False
+def overloaded_payload(error):
+    """LLM 대기열 초과 응답 본문 (503, Retry-After 헤더와 함께 사용)"""
+    return {
+        'error': 'LLM_OVERLOADED',
+        'message': str(error),
+        'retryAfter': error.retry_after
+    }
 
-def call_ollama(prompt, system_prompt="당신은 도움이 되는 AI 어시스턴트입니다.", max_tokens=2000):
-    """Ollama API 호출"""
-    try:
-        # 모델 확인
-        if not check_ollama_model():
-            raise Exception(f"Ollama 모델 '{OLLAMA_MODEL}'이 설치되지 않았습니다. 다음 명령어로 설치하세요: ollama pull {OLLAMA_MODEL}")
-        
-        print(f'[AI Backend] call_ollama - 프롬프트 길이: {len(prompt)} 문자, 시스템 프롬프트: {len(system_prompt)} 문자')
-        print(f'[AI Backend] call_ollama - Ollama URL: {OLLAMA_BASE_URL}, 모델: {OLLAMA_MODEL}, max_tokens: {max_tokens}')
-        
-        request_data = {
-                "model": OLLAMA_MODEL,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-            "stream": False,
-            "options": {
-                "num_predict": max_tokens  # Ollama에서 토큰 제한 설정
-            }
-        }
-        
-        response = httpx.post(
-            f"{OLLAMA_BASE_URL}/api/chat",
-            json=request_data,
-            timeout=300.0  # 5분으로 증가 (큰 모델의 경우 더 오래 걸릴 수 있음)
-        )
-        response.raise_for_status()
-        return response.json()["message"]["content"]
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            raise Exception(f"Ollama 모델 '{OLLAMA_MODEL}'을 찾을 수 없습니다. 다음 명령어로 설치하세요: ollama pull {OLLAMA_MODEL}")
-        raise Exception(f"Ollama API 오류 ({e.response.status_code}): {e.response.text}")
-    except httpx.RequestError as e:
-        raise Exception(f"Ollama 서버 연결 실패: {e}. Ollama가 실행 중인지 확인하세요. (ollama serve)")
-    except Exception as e:
-        print(f"Ollama API 호출 오류: {str(e)}")
-        raise
+def upstream_unavailable_payload(error):
+    """외부 서비스 서킷 브레이커가 열려 있을 때 응답 본문 (503, Retry-After 헤더와 함께 사용)"""
+    return {
+        'error': 'UPSTREAM_UNAVAILABLE',
+        'message': str(error),
+        'upstream': error.upstream,
+        'retryAfter': error.retry_after
+    }
 
-def call_openai(prompt, system_prompt="당신은 도움이 되는 AI 어시스턴트입니다.", max_tokens=2000):
-    """OpenAI API 호출"""
-    if not openai_client:
-        raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
-    
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=max_tokens
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"OpenAI API 호출 오류: {str(e)}")
-        raise
+def llm_admission(lane):
+    """
+    LLM을 사용하는 엔드포인트의 입장 제어
+    대기열이 가득 차 있으면 작업을 시작하지 않고 바로 503 + Retry-After로 거절하고,
+    입장한 요청의 LLM 호출은 지정한 우선순위(lane)로 대기합니다.
+    X-Request-Timeout-Ms 헤더가 있으면 그 시간을 요청 마감 시간으로 에이전트에 전달합니다.
+    요청 본문의 runId(또는 X-Agent-Run-Id 헤더)가 있으면 에이전트 단계를 체크포인트로 저장하고,
+    같은 실행 ID로 재시도하면 마지막 완료 단계부터 재개합니다.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                get_llm_scheduler().check_admission(lane)
+            except LLMOverloadedError as e:
+                return handle_llm_overloaded(e)
+            run_id = run_id_from_request(request.get_json(silent=True), request.headers)
+            with llm_priority(lane), request_deadline(deadline_from_headers(request.headers)), agent_run(run_id):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@app.errorhandler(LLMOverloadedError)
+def handle_llm_overloaded(error):
+    response = jsonify(overloaded_payload(error))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+@app.errorhandler(CircuitOpenError)
+def handle_circuit_open(error):
+    response = jsonify(upstream_unavailable_payload(error))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -126,18 +121,45 @@ def health_check():
         'timestamp': datetime.now().isoformat(),
         'service': 'AI Backend',
         'mode': 'OpenAI' if USE_OPENAI else 'Ollama',
-        'model': 'gpt-3.5-turbo' if USE_OPENAI else OLLAMA_MODEL
+        'model': OPENAI_MODEL if USE_OPENAI else OLLAMA_MODEL
     })
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
     return jsonify({
         'message': f'AI Backend is running ({'OpenAI' if USE_OPENAI else 'Ollama'} mode)',
-        'model': 'gpt-3.5-turbo' if USE_OPENAI else OLLAMA_MODEL,
+        'model': OPENAI_MODEL if USE_OPENAI else OLLAMA_MODEL,
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/ai/cache/stats', methods=['GET'])
+def llm_cache_stats():
+    """LLM 응답 캐시 적중/실패 통계 (동일 요청 병합 통계, GitHub 조건부 요청 캐시 통계 포함)"""
+    stats = get_llm_cache().stats()
+    stats['singleFlight'] = single_flight_stats()
+    stats['githubHttp'] = http_cache_stats()
+    return jsonify(stats)
+
+@app.route('/api/ai/scheduler/stats', methods=['GET'])
+def llm_scheduler_stats():
+    """LLM 스케줄러 대기열 길이, 우선순위별 대기 시간, 거절 수, Ollama 서버별 상태, 모델 캐스케이드, JSON 조기 종료, 서킷 브레이커, 충분성 판단, 단계 DAG critical path, 에이전트 체크포인트, 파일 선읽기, 읽은 파일 저장소, 임베딩 인덱스, 저장소 스냅샷, 저장소 경로 인덱스"""
+    stats = get_llm_scheduler().stats()
+    stats['ollamaPool'] = get_llm_client().pool.stats()
+    stats['modelCascade'] = cascade_stats()
+    stats['jsonEarlyStop'] = get_llm_client().early_stop_stats()
+    stats['circuitBreakers'] = breaker_stats()
+    stats['sufficiency'] = sufficiency_stats()
+    stats['agentDag'] = dag_stats()
+    stats['agentCheckpoints'] = checkpoint_stats()
+    stats['prefetch'] = prefetch_stats()
+    stats['fileStore'] = file_store_stats()
+    stats['embeddings'] = embedding_stats()
+    stats['repoSnapshots'] = snapshot_stats()
+    stats['repoTrees'] = tree_stats()
+    return jsonify(stats)
+
 @app.route('/api/ai/task-suggestion', methods=['POST'])
+@llm_admission(LANE_BATCH)
 def task_suggestion():
     """
     코드 분석 기반 새로운 Task 제안 (코드 품질, 리팩토링, 보안 분석 포함)
@@ -227,22 +249,17 @@ def task_suggestion():
 
         # OpenAI 또는 Ollama 호출
         print(f'[AI Backend] task_suggestion - LLM 호출 시작 (모드: {"OpenAI" if USE_OPENAI else "Ollama"})')
-        if USE_OPENAI:
-            content = call_openai(prompt, system_prompt)
-        else:
-            content = call_ollama(prompt, system_prompt)
+        with response_format('task_suggestions'):
+            if USE_OPENAI:
+                content = call_openai(prompt, system_prompt)
+            else:
+                content = call_ollama(prompt, system_prompt)
         
         print(f'[AI Backend] task_suggestion - LLM 응답 수신 (길이: {len(content)} 문자)')
         
         # JSON 파싱 시도
         try:
-            # 코드 블록이 있는 경우 제거
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            suggestions = json.loads(content)
+            suggestions = extract_json(content, expect='array')
             
             if not isinstance(suggestions, list):
                 suggestions = [suggestions]
@@ -289,6 +306,9 @@ def task_suggestion():
                 }
             })
 
+    except (CircuitOpenError, LLMOverloadedError):
+        # 503 + Retry-After 응답 (handle_circuit_open / handle_llm_overloaded)
+        raise
     except Exception as e:
         print(f"[AI Backend] task_suggestion - 예외 발생: {str(e)}")
         import traceback
@@ -298,6 +318,7 @@ def task_suggestion():
         }), 500
 
 @app.route('/api/ai/progress-analysis', methods=['POST'])
+@llm_admission(LANE_BATCH)
 def progress_analysis():
     """
     AI 기반 프로젝트 진행도 분석 및 예측 (deprecated - /api/ai/chat을 사용하세요)
@@ -354,7 +375,7 @@ def progress_analysis():
         if progress_match:
             current_progress = float(progress_match.group(1))
         
-            return jsonify({
+        return jsonify({
             'currentProgress': current_progress,
             'activityTrend': analysis.get('activityTrend', 'stable'),
             'estimatedCompletionDate': analysis.get('estimatedCompletionDate'),
@@ -364,9 +385,13 @@ def progress_analysis():
             'narrativeResponse': message or analysis.get('narrativeResponse', ''),
             'agent_type': 'progress_analysis_agent',
             'analysis_steps': result.get('analysis_steps', 1),
-            'progress_messages': result.get('progress_messages', [])
+            'progress_messages': result.get('progress_messages', []),
+            'partial': result.get('partial', False)
         })
 
+    except (CircuitOpenError, LLMOverloadedError):
+        # 503 + Retry-After 응답 (handle_circuit_open / handle_llm_overloaded)
+        raise
     except Exception as e:
         print(f"[AI Backend] progress_analysis - 예외 발생: {str(e)}")
         import traceback
@@ -376,6 +401,7 @@ def progress_analysis():
         }), 500
 
 @app.route('/api/ai/task-completion-check', methods=['POST'])
+@llm_admission(LANE_INTERACTIVE)
 def task_completion_check():
     """
     Task 완료 여부 판단 (커밋 메시지와 코드 변경사항 기반)
@@ -438,39 +464,30 @@ def task_completion_check():
         print(f'[AI Backend] task_completion_check - 1차 분석 시작 (모드: {"OpenAI" if USE_OPENAI else "Ollama"})')
         initial_prompt = create_initial_completion_prompt(task, commits, projectDescription)
         
-        if USE_OPENAI:
-            initial_content = call_openai(initial_prompt, system_prompt)
-        else:
-            initial_content = call_ollama(initial_prompt, system_prompt)
+        initial_started = time.monotonic()
+        with response_format('task_completion'):
+            if USE_OPENAI:
+                initial_content = call_openai(initial_prompt, system_prompt)
+            else:
+                initial_content = call_ollama(initial_prompt, system_prompt)
         
+        initial_seconds = time.monotonic() - initial_started
         print(f'[AI Backend] task_completion_check - 1차 분석 응답 수신 (길이: {len(initial_content)} 문자)')
         
-        # JSON 파싱 (강화된 전처리)
+        # JSON 파싱
+        initial_result = None
         try:
-            # 코드 블록 제거
-            if '```json' in initial_content:
-                initial_content = initial_content.split('```json')[1].split('```')[0].strip()
-            elif '```' in initial_content:
-                initial_content = initial_content.split('```')[1].split('```')[0].strip()
-            
-            # 앞뒤 공백 제거
-            initial_content = initial_content.strip()
-            
-            # JSON 객체 시작 부분 찾기
-            if '{' in initial_content:
-                start_idx = initial_content.find('{')
-                initial_content = initial_content[start_idx:]
-            
-            # JSON 객체 끝 부분 찾기
-            if '}' in initial_content:
-                # 마지막 } 찾기 (중첩된 객체 고려)
-                last_brace_idx = initial_content.rfind('}')
-                initial_content = initial_content[:last_brace_idx+1]
-            
             print(f'[AI Backend] task_completion_check - 1차 분석 파싱할 내용 (처음 200자): {initial_content[:200]}')
-            initial_result = json.loads(initial_content)
+            initial_result = parse_json_response(initial_content, 'task_completion')
             print(f'[AI Backend] task_completion_check - 1차 분석 완료: needsMoreInfo={initial_result.get("needsMoreInfo", False)}')
             
+            # 마감 시간까지 2차 분석을 마칠 수 없으면 1차 결과를 부분 결과로 반환
+            if initial_result.get("needsMoreInfo", False) and deadline_exceeded(initial_seconds):
+                initial_result['analysisSteps'] = 1
+                initial_result['partial'] = True
+                print(f'[AI Backend] task_completion_check - 마감 시간 임박 (남은 시간: {remaining_seconds():.1f}초), 2차 분석 생략')
+                return jsonify(initial_result)
+            
             # 추가 정보가 필요한 경우 2차 분석 수행
             if initial_result.get("needsMoreInfo", False):
                 print(f'[AI Backend] task_completion_check - 추가 탐색 필요: {initial_result.get("searchStrategy", "N/A")}')
@@ -480,34 +497,15 @@ def task_completion_check():
                 print(f'[AI Backend] task_completion_check - 2차 분석 시작')
                 followup_prompt = create_followup_completion_prompt(task, initial_result, commits, projectDescription)
                 
-                if USE_OPENAI:
-                    followup_content = call_openai(followup_prompt, system_prompt)
-                else:
-                    followup_content = call_ollama(followup_prompt, system_prompt)
+                with response_format('task_completion'):
+                    if USE_OPENAI:
+                        followup_content = call_openai(followup_prompt, system_prompt)
+                    else:
+                        followup_content = call_ollama(followup_prompt, system_prompt)
                 
                 print(f'[AI Backend] task_completion_check - 2차 분석 응답 수신 (길이: {len(followup_content)} 문자)')
-                
-                # JSON 파싱 (강화된 전처리)
-                if '```json' in followup_content:
-                    followup_content = followup_content.split('```json')[1].split('```')[0].strip()
-                elif '```' in followup_content:
-                    followup_content = followup_content.split('```')[1].split('```')[0].strip()
-                
-                # 앞뒤 공백 제거
-                followup_content = followup_content.strip()
-                
-                # JSON 객체 시작 부분 찾기
-                if '{' in followup_content:
-                    start_idx = followup_content.find('{')
-                    followup_content = followup_content[start_idx:]
-                
-                # JSON 객체 끝 부분 찾기
-                if '}' in followup_content:
-                    last_brace_idx = followup_content.rfind('}')
-                    followup_content = followup_content[:last_brace_idx+1]
-                
                 print(f'[AI Backend] task_completion_check - 2차 분석 파싱할 내용 (처음 200자): {followup_content[:200]}')
-                final_result = json.loads(followup_content)
+                final_result = parse_json_response(followup_content, 'task_completion')
                 
                 # 1차 분석 결과와 통합
                 final_result['initialAnalysis'] = {
@@ -529,20 +527,11 @@ def task_completion_check():
             print(f"[AI Backend] task_completion_check - JSON 파싱 실패: {e}")
             print(f"[AI Backend] task_completion_check - 응답 내용 (전체): {initial_content}")
             
-            # 재시도: 더 공격적인 전처리
-            try:
-                # JSON 부분만 추출 시도
-                import re
-                json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', initial_content, re.DOTALL)
-                if json_match:
-                    cleaned_content = json_match.group(0)
-                    print(f"[AI Backend] task_completion_check - 정규식으로 JSON 추출 시도")
-                    initial_result = json.loads(cleaned_content)
-                    initial_result['analysisSteps'] = 1
-                    print(f"[AI Backend] task_completion_check - 재시도 성공")
-                    return jsonify(initial_result)
-            except:
-                pass
+            # 2차 분석 응답만 파싱에 실패한 경우 1차 분석 결과 반환
+            if initial_result is not None:
+                initial_result['analysisSteps'] = 1
+                print(f"[AI Backend] task_completion_check - 2차 분석 파싱 실패, 1차 분석 결과 사용")
+                return jsonify(initial_result)
             
             return jsonify({
                 'isCompleted': False,
@@ -552,6 +541,9 @@ def task_completion_check():
                 'rawResponse': initial_content[:500] if len(initial_content) > 500 else initial_content
             })
 
+    except (CircuitOpenError, LLMOverloadedError):
+        # 503 + Retry-After 응답 (handle_circuit_open / handle_llm_overloaded)
+        raise
     except Exception as e:
         print(f"[AI Backend] task_completion_check - 예외 발생: {str(e)}")
         import traceback
@@ -560,7 +552,49 @@ def task_completion_check():
             'error': f'Task 완료 여부 판단 실패: {str(e)}'
         }), 500
 
+def build_chat_response(result):
+    """
+    process_chat_message 결과를 /api/ai/chat 응답 형식으로 변환
+    
+    Returns:
+        (응답 dict, HTTP 상태 코드)
+    """
+    agent_type = result.get('agent_type', 'general_qa_agent')
+    confidence = result.get('confidence', 'medium')
+    intent_classification = result.get('intent_classification', {})
+    
+    # 에러 처리 (GITHUB_REQUIRED 등)
+    if 'error' in result:
+        error_code = result.get('error')
+        error_response = result.get('response', {})
+        error_message = error_response.get('message', '알 수 없는 오류가 발생했습니다.')
+        
+        # GITHUB_REQUIRED 에러는 400 상태 코드로 반환, 기타 에러는 500
+        status = 400 if error_code == 'GITHUB_REQUIRED' else 500
+        return {
+            'error': error_code,
+            'message': error_message,
+            'agent_type': agent_type,
+            'response': error_response
+        }, status
+    
+    # 정상 응답 구성
+    return {
+        'agent_type': agent_type,
+        'intent_classification': {
+            'confidence': confidence,
+            'reason': intent_classification.get('reason', ''),
+            'extracted_info': intent_classification.get('extracted_info', {})
+        },
+        'response': result.get('response', {}),
+        'message': result.get('response', {}).get('message', '응답을 생성했습니다.'),
+        'progress_messages': result.get('progress_messages', []),  # 진행 상황 메시지 추가
+        'analysis_steps': result.get('analysis_steps', 1),  # 분석 단계 수 추가
+        'partial': result.get('partial', False)  # 마감 시간 때문에 일찍 종료한 부분 결과
+    }, 200
+
 @app.route('/api/ai/chat', methods=['POST'])
+@llm_admission(LANE_INTERACTIVE)
 def chat():
     """
     챗봇 API - 사용자 메시지를 받아 적절한 agent를 선택하고 실행
@@ -579,7 +613,9 @@ def chat():
             "projectStartDate": "...",
             "projectDueDate": "...",
             "task": {...}  # task_completion_agent인 경우
-        }
+        },
+        "noCache": false,  # 선택사항: true면 LLM 응답 캐시를 사용하지 않음 (Cache-Control: no-cache 헤더도 동일)
+        "runId": "..."  # 선택사항: 실행 ID. 실패 후 같은 값으로 재시도하면 마지막 완료 단계부터 재개 (X-Agent-Run-Id 헤더도 동일)
     }
     """
     print('[AI Backend] chat 요청 수신')
@@ -605,54 +641,20 @@ def chat():
         
         # 의도 분류 + Agent 실행 (통합)
         print('[AI Backend] chat - 메시지 처리 시작')
-        result = process_chat_message(user_message, conversation_history, context, call_llm)
+        with cache_policy(bypass=wants_cache_bypass(data, request.headers)):
+            result = process_chat_message(user_message, conversation_history, context, call_llm)
         
-        agent_type = result.get('agent_type', 'general_qa_agent')
-        confidence = result.get('confidence', 'medium')
-        intent_classification = result.get('intent_classification', {})
+        payload, status = build_chat_response(result)
+        if status != 200:
+            print(f'[AI Backend] chat - 에러 발생: {payload.get("error")}')
+            return jsonify(payload), status
         
-        # 에러 처리 (GITHUB_REQUIRED 등)
-        if 'error' in result:
-            error_code = result.get('error')
-            error_response = result.get('response', {})
-            error_message = error_response.get('message', '알 수 없는 오류가 발생했습니다.')
-            
-            print(f'[AI Backend] chat - 에러 발생: {error_code}')
-            
-            # GITHUB_REQUIRED 에러는 400 상태 코드로 반환
-            if error_code == 'GITHUB_REQUIRED':
-                return jsonify({
-                    'error': error_code,
-                    'message': error_message,
-                    'agent_type': agent_type,
-                    'response': error_response
-                }), 400
-            
-            # 기타 에러는 500 상태 코드로 반환
-            return jsonify({
-                'error': error_code,
-                'message': error_message,
-                'agent_type': agent_type,
-                'response': error_response
-            }), 500
-        
-        # 정상 응답 구성
-        response = {
-            'agent_type': agent_type,
-            'intent_classification': {
-                'confidence': confidence,
-                'reason': intent_classification.get('reason', ''),
-                'extracted_info': intent_classification.get('extracted_info', {})
-            },
-            'response': result.get('response', {}),
-            'message': result.get('response', {}).get('message', '응답을 생성했습니다.'),
-            'progress_messages': result.get('progress_messages', []),  # 진행 상황 메시지 추가
-            'analysis_steps': result.get('analysis_steps', 1)  # 분석 단계 수 추가
-        }
-        
-        print(f'[AI Backend] chat - 응답 생성 완료 (진행 메시지: {len(response.get("progress_messages", []))}개)')
-        return jsonify(response)
+        print(f'[AI Backend] chat - 응답 생성 완료 (진행 메시지: {len(payload.get("progress_messages", []))}개)')
+        return jsonify(payload)
         
+    except (CircuitOpenError, LLMOverloadedError):
+        # 503 + Retry-After 응답 (handle_circuit_open / handle_llm_overloaded)
+        raise
     except Exception as e:
         print(f"[AI Backend] chat - 예외 발생: {str(e)}")
         import traceback
@@ -661,7 +663,104 @@ def chat():
             'error': f'챗봇 응답 생성 실패: {str(e)}'
         }), 500
 
+@app.route('/api/ai/chat/stream', methods=['POST'])
+@llm_admission(LANE_INTERACTIVE)
+def chat_stream():
+    """
+    챗봇 API (SSE 스트리밍) - /api/ai/chat과 같은 Request Body를 받습니다.
+    분석이 끝날 때까지 기다리지 않고 생성되는 즉시 이벤트로 전달합니다.
+    
+    이벤트 (text/event-stream):
+        intent    의도 분류 결과 {"agent_type", "confidence", "reason"}
+        progress  진행 상황 메시지 {"message"}
+        step      단계별 분석 결과 {"agent_type", "step_number", "result"}
+        token     LLM이 생성한 텍스트 조각 {"delta"}
+        result    최종 응답 (/api/ai/chat 응답과 동일한 형식, "status" 포함)
+        error     처리 중 예외 {"error"}
+        done      스트림 종료
+    
+    이벤트가 없는 동안에는 SSE_HEARTBEAT_INTERVAL초마다 주석(: keep-alive)을 보내
+    프록시가 유휴 연결을 끊지 않도록 합니다.
+    """
+    print('[AI Backend] chat_stream 요청 수신')
+    data = request.json or {}
+    user_message = data.get('message', '').strip()
+    conversation_history = data.get('conversationHistory', [])
+    context = data.get('context', {})
+    bypass_cache = wants_cache_bypass(data, request.headers)
+    run_id = run_id_from_request(data, request.headers)
+    
+    if not user_message:
+        return jsonify({
+            'error': '메시지가 필요합니다.'
+        }), 400
+    
+    print(f'[AI Backend] chat_stream - 메시지: {user_message[:50]}..., 히스토리: {len(conversation_history)}개')
+    
+    events = queue.Queue()
+    finished = object()
+    # 클라이언트 연결이 끊어지면 설정 (에이전트는 다음 I/O 요청 전에 중단하고, 이후 이벤트는 버림)
+    disconnected = threading.Event()
+    
+    def publish(event, payload):
+        if not disconnected.is_set():
+            events.put((event, payload))
+    
+    def run_agent():
+        # 에이전트 실행 스레드: 발생하는 이벤트를 큐에 넣음
+        with event_sink(publish), cancellation(disconnected), cache_policy(bypass=bypass_cache), agent_run(run_id):
+            try:
+                result = process_chat_message(user_message, conversation_history, context, call_llm_streaming)
+                payload, status = build_chat_response(result)
+                payload['status'] = status
+                emit('result', payload)
+                print(f'[AI Backend] chat_stream - 응답 생성 완료 (상태: {status})')
+            except LLMOverloadedError as e:
+                emit('error', {**overloaded_payload(e), 'status': 503})
+            except CircuitOpenError as e:
+                emit('error', {**upstream_unavailable_payload(e), 'status': 503})
+            except AgentCancelled:
+                print('[AI Backend] chat_stream - 클라이언트 연결 종료, 에이전트 실행 중단')
+            except Exception as e:
+                print(f"[AI Backend] chat_stream - 예외 발생: {str(e)}")
+                import traceback
+                print(f"[AI Backend] chat_stream - 트레이스백:\n{traceback.format_exc()}")
+                emit('error', {'error': f'챗봇 응답 생성 실패: {str(e)}'})
+            finally:
+                events.put(finished)
+    
+    # 요청 마감 시간, LLM 우선순위, 실행 ID 등 contextvars를 에이전트 스레드로 전달
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run_agent,), name='chat-stream-agent', daemon=True)
+    worker.start()
+    
+    def generate():
+        try:
+            while True:
+                try:
+                    item = events.get(timeout=SSE_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if item is finished:
+                    yield 'event: done\ndata: {}\n\n'
+                    return
+                event, payload = item
+                yield f'event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n'
+        finally:
+            # 응답이 끝나거나 클라이언트가 연결을 끊으면 (GeneratorExit) 에이전트 스레드에 중단 신호
+            disconnected.set()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # nginx 버퍼링 비활성화
+        }
+    )
+
 @app.route('/api/ai/create-project', methods=['POST'])
+@llm_admission(LANE_INTERACTIVE)
 def create_project():
     """
     자연어 입력을 받아 프로젝트 정보를 추출하는 API
@@ -694,21 +793,11 @@ def create_project():
         system_prompt = "프로젝트 관리 전문가. 자연어 입력을 분석하여 프로젝트 정보를 추출합니다. 반드시 한국어로만 응답. JSON만 응답."
         
         # LLM 호출
-        content = call_llm(prompt, system_prompt)
+        with response_format('project_creation'):
+            content = call_llm(prompt, system_prompt)
         
         # JSON 파싱
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        content = content.strip()
-        if '{' in content:
-            content = content[content.find('{'):]
-        if '}' in content:
-            content = content[:content.rfind('}')+1]
-        
-        result = json.loads(content)
+        result = parse_json_response(content, 'project_creation')
         
         print(f'[AI Backend] create-project - 추출 완료: {result.get("title", "N/A")}')
         
@@ -726,6 +815,9 @@ def create_project():
         return jsonify({
             'error': '프로젝트 정보 추출 실패: JSON 파싱 오류'
         }), 500
+    except (CircuitOpenError, LLMOverloadedError):
+        # 503 + Retry-After 응답 (handle_circuit_open / handle_llm_overloaded)
+        raise
     except Exception as e:
         print(f"[AI Backend] create-project - 예외 발생: {str(e)}")
         import traceback
@@ -786,8 +878,7 @@ def get_file_content():
             if ref != 'main':
                 url += f'?ref={ref}'
             
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = github_get(url, headers)
             
             file_data = response.json()
             
@@ -813,6 +904,9 @@ def get_file_content():
                 'truncated': truncated,
                 'totalLines': len(lines)
             })
+        except CircuitOpenError as e:
+            print(f'[AI Backend] GitHub API 호출 중단: {e}')
+            return handle_circuit_open(e)
         except requests.exceptions.RequestException as e:
             print(f'[AI Backend] GitHub API 호출 실패: {e}')
             return jsonify({
@@ -828,6 +922,7 @@ def get_file_content():
         }), 500
 
 @app.route('/api/ai/assign-task', methods=['POST'])
+@llm_admission(LANE_INTERACTIVE)
 def assign_task():
     """
     Task 할당을 추천하는 API
@@ -879,21 +974,11 @@ def assign_task():
         system_prompt = "프로젝트 관리 전문가. Task 내용을 분석하여 적합한 담당자를 추천합니다. 반드시 한국어로만 응답. JSON만 응답."
         
         # LLM 호출
-        content = call_llm(prompt, system_prompt)
+        with response_format('task_assignment'):
+            content = call_llm(prompt, system_prompt)
         
         # JSON 파싱
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        content = content.strip()
-        if '{' in content:
-            content = content[content.find('{'):]
-        if '}' in content:
-            content = content[:content.rfind('}')+1]
-        
-        result = json.loads(content)
+        result = parse_json_response(content, 'task_assignment')
         
         print(f'[AI Backend] assign-task - 추천 완료: 사용자 ID {result.get("recommendedUserId", "null")}')
         
@@ -912,6 +997,9 @@ def assign_task():
         return jsonify({
             'error': 'Task 할당 추천 실패: JSON 파싱 오류'
         }), 500
+    except (CircuitOpenError, LLMOverloadedError):
+        # 503 + Retry-After 응답 (handle_circuit_open / handle_llm_overloaded)
+        raise
     except Exception as e:
         print(f"[AI Backend] assign-task - 예외 발생: {str(e)}")
         import traceback
@@ -0,0 +1,173 @@
+"""
+ASGI 진입점
+챗봇 API(/api/ai/chat, /api/ai/chat/stream)는 asyncio로 직접 처리하고,
+나머지 엔드포인트는 기존 Flask 앱(app.py)을 WSGI 어댑터로 그대로 제공합니다.
+
+실행:
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+"""
+
+import asyncio
+import json
+import traceback
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from agent_checkpoint import agent_run, run_id_from_request
+from agent_events import emit, event_sink
+from app import SSE_HEARTBEAT_INTERVAL, app as flask_app, build_chat_response, overloaded_payload, upstream_unavailable_payload
+from async_agents import aclose_github_http, async_process_chat_message
+from llm_cache import cache_policy, wants_cache_bypass
+from llm_client import acall_llm_streaming, get_llm_client
+from llm_scheduler import LLMOverloadedError, get_llm_scheduler
+from request_deadline import deadline_from_headers, request_deadline
+from resilience import CircuitOpenError
+
+
+async def _read_chat_request(request: Request):
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    data = data or {}
+    return (
+        data.get('message', '').strip(),
+        data.get('conversationHistory', []),
+        data.get('context', {}),
+        wants_cache_bypass(data, request.headers),
+        run_id_from_request(data, request.headers)
+    )
+
+
+def _overloaded_response(error: LLMOverloadedError) -> JSONResponse:
+    return JSONResponse(
+        overloaded_payload(error),
+        status_code=503,
+        headers={'Retry-After': str(error.retry_after)}
+    )
+
+
+def _upstream_unavailable_response(error: CircuitOpenError) -> JSONResponse:
+    return JSONResponse(
+        upstream_unavailable_payload(error),
+        status_code=503,
+        headers={'Retry-After': str(error.retry_after)}
+    )
+
+
+async def chat(request: Request):
+    """챗봇 API (app.py의 /api/ai/chat과 같은 요청/응답 형식, asyncio로 처리)"""
+    print('[AI Backend] chat(async) 요청 수신')
+    try:
+        user_message, conversation_history, context, bypass_cache, run_id = await _read_chat_request(request)
+        if not user_message:
+            return JSONResponse({'error': '메시지가 필요합니다.'}, status_code=400)
+
+        print(f'[AI Backend] chat(async) - 메시지: {user_message[:50]}..., 히스토리: {len(conversation_history)}개')
+        get_llm_scheduler().check_admission()
+        with cache_policy(bypass=bypass_cache), request_deadline(deadline_from_headers(request.headers)), agent_run(run_id):
+            result = await async_process_chat_message(user_message, conversation_history, context)
+
+        payload, status = build_chat_response(result)
+        if status != 200:
+            print(f'[AI Backend] chat(async) - 에러 발생: {payload.get("error")}')
+        else:
+            print(f'[AI Backend] chat(async) - 응답 생성 완료 (진행 메시지: {len(payload.get("progress_messages", []))}개)')
+        return JSONResponse(payload, status_code=status)
+    except LLMOverloadedError as e:
+        return _overloaded_response(e)
+    except CircuitOpenError as e:
+        return _upstream_unavailable_response(e)
+    except Exception as e:
+        print(f"[AI Backend] chat(async) - 예외 발생: {str(e)}")
+        print(f"[AI Backend] chat(async) - 트레이스백:\n{traceback.format_exc()}")
+        return JSONResponse({'error': f'챗봇 응답 생성 실패: {str(e)}'}, status_code=500)
+
+
+async def chat_stream(request: Request):
+    """챗봇 API (SSE 스트리밍, app.py의 /api/ai/chat/stream과 같은 이벤트 형식)"""
+    print('[AI Backend] chat_stream(async) 요청 수신')
+    user_message, conversation_history, context, bypass_cache, run_id = await _read_chat_request(request)
+    if not user_message:
+        return JSONResponse({'error': '메시지가 필요합니다.'}, status_code=400)
+    try:
+        get_llm_scheduler().check_admission()
+    except LLMOverloadedError as e:
+        return _overloaded_response(e)
+
+    events = asyncio.Queue()
+    finished = object()
+
+    async def run_agent():
+        # 에이전트 실행 태스크: 발생하는 이벤트를 큐에 넣음
+        with event_sink(lambda event, payload: events.put_nowait((event, payload))), cache_policy(bypass=bypass_cache), request_deadline(deadline_from_headers(request.headers)), agent_run(run_id):
+            try:
+                result = await async_process_chat_message(
+                    user_message, conversation_history, context, acall_llm_streaming
+                )
+                payload, status = build_chat_response(result)
+                payload['status'] = status
+                emit('result', payload)
+                print(f'[AI Backend] chat_stream(async) - 응답 생성 완료 (상태: {status})')
+            except LLMOverloadedError as e:
+                emit('error', {**overloaded_payload(e), 'status': 503})
+            except CircuitOpenError as e:
+                emit('error', {**upstream_unavailable_payload(e), 'status': 503})
+            except Exception as e:
+                print(f"[AI Backend] chat_stream(async) - 예외 발생: {str(e)}")
+                print(f"[AI Backend] chat_stream(async) - 트레이스백:\n{traceback.format_exc()}")
+                emit('error', {'error': f'챗봇 응답 생성 실패: {str(e)}'})
+            finally:
+                events.put_nowait(finished)
+
+    async def generate():
+        task = asyncio.create_task(run_agent())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(events.get(), timeout=SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                if item is finished:
+                    yield 'event: done\ndata: {}\n\n'
+                    return
+                event, payload = item
+                yield f'event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n'
+        finally:
+            # 클라이언트 연결이 끊기면 에이전트 실행도 중단
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # nginx 버퍼링 비활성화
+        }
+    )
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # 종료 시 공유 비동기 HTTP 클라이언트 정리
+    await get_llm_client().aclose()
+    await aclose_github_http()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/ai/chat', chat, methods=['POST']),
+        Route('/api/ai/chat/stream', chat_stream, methods=['POST']),
+        # 그 외 엔드포인트는 기존 Flask 앱이 처리
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,355 @@
+"""
+비동기 에이전트 실행
+agent_router/multi_step_agent의 에이전트 generator를 asyncio 이벤트 루프에서 실행합니다.
+- LLM 호출: llm_client.acall_llm / acall_llm_streaming (httpx.AsyncClient)
+- GitHub 조회: httpx.AsyncClient + asyncio.gather (동시 요청 수 제한)
+요청마다 스레드를 점유하지 않으므로 ASGI 서버(asgi.py)에서 많은 요청을 동시에 처리할 수 있습니다.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Generator, List, Optional
+
+import httpx
+
+from agent_io import AgentIORequest, escalate_to_default_model, llm_request_policy
+from agent_router import (
+    batch_task_assignment_agent_steps,
+    general_qa_agent_steps,
+    process_chat_message_steps,
+    progress_analysis_agent_steps,
+    task_assignment_agent_steps,
+    task_completion_agent_steps,
+    task_suggestion_agent_steps,
+)
+from llm_client import acall_llm, acall_llm_streaming
+from http_cache import conditional_headers, get_http_cache
+from model_router import asmall_model_for, llm_model
+from repo_snapshot import get_snapshot
+from repo_tree import count_tree, get_tree_index
+from single_flight import github_flight
+from multi_step_agent import (
+    GITHUB_MAX_CONCURRENCY,
+    GITHUB_RETRY,
+    MAX_FILES_PER_BATCH,
+    decode_github_file,
+    filter_directory_listing,
+    github_breaker,
+    github_contents_url,
+    github_flight_key,
+    parse_github_repo,
+    existing_paths,
+    snapshot_file_results,
+    tree_directory_files,
+    tree_missing_results,
+    unique_paths,
+    warn_github_rate_limit,
+)
+from resilience import CircuitOpenError, aretry_call, is_transient_http_error
+
+_github_http = None
+
+
+def _get_github_http() -> httpx.AsyncClient:
+    """GitHub API용 공유 AsyncClient (현재 이벤트 루프에서 처음 호출될 때 생성)"""
+    global _github_http
+    if _github_http is None:
+        _github_http = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=GITHUB_MAX_CONCURRENCY, max_keepalive_connections=GITHUB_MAX_CONCURRENCY)
+        )
+    return _github_http
+
+
+async def aclose_github_http():
+    """GitHub AsyncClient 종료 (ASGI shutdown 시 호출)"""
+    global _github_http
+    if _github_http is not None:
+        await _github_http.aclose()
+        _github_http = None
+
+
+def _github_headers(github_token: Optional[str]) -> Dict[str, str]:
+    headers = {}
+    if github_token:
+        headers['Authorization'] = f'token {github_token}'
+    return headers
+
+
+async def _github_get(url: str, headers: Dict[str, str]) -> httpx.Response:
+    """multi_step_agent.github_get의 비동기 버전 (같은 재시도 정책, 서킷 브레이커, 조건부 요청 캐시 사용)"""
+    cache = get_http_cache()
+    # SQLite 조회/저장은 동기 코드이므로 이벤트 루프를 막지 않도록 스레드에서 수행
+    entry = await asyncio.to_thread(cache.lookup, url, headers)
+    request_headers = conditional_headers(headers, entry)
+
+    async def fetch():
+        response = await _get_github_http().get(url, headers=request_headers)
+        # httpx는 304도 raise_for_status에서 오류로 처리함
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    response = await aretry_call(fetch, GITHUB_RETRY, is_transient_http_error, github_breaker(), 'GitHub API')
+    if response.status_code == 304 and entry is not None:
+        cached_headers = dict(response.headers)
+        if entry.content_type:
+            cached_headers['Content-Type'] = entry.content_type
+        cached_headers.pop('content-length', None)
+        cached_headers.pop('content-encoding', None)
+        body = await asyncio.to_thread(cache.revalidated, entry)
+        return httpx.Response(200, headers=cached_headers, content=body, request=response.request)
+    if response.status_code == 200:
+        await asyncio.to_thread(cache.store, url, headers, response.headers, response.content)
+    return response
+
+
+async def async_list_directory_contents(
+    github_repo: str,
+    github_token: Optional[str],
+    directory_path: str,
+    ref: str = 'main',
+    max_depth: int = 1
+) -> List[str]:
+    """list_directory_contents의 비동기 버전 (하위 디렉토리는 동시에 탐색, 동일 조회는 병합)"""
+    if not github_repo or not directory_path:
+        return []
+
+    parsed = parse_github_repo(github_repo)
+    if not parsed:
+        return []
+    owner, repo = parsed
+
+    # HEAD 커밋 경로 인덱스가 있으면 API 호출 없이 답함 (HEAD 확인/트리 조회는 동기 코드이므로 스레드에서 수행)
+    tree = await asyncio.to_thread(get_tree_index, owner, repo, ref, github_token)
+    if tree is not None and (tree.complete or directory_path in tree):
+        count_tree(listingsServed=1)
+        return tree_directory_files(tree, directory_path, max_depth)
+
+    files, shared = await github_flight.ado(
+        github_flight_key('dir', owner, repo, directory_path, ref, github_token, max_depth),
+        lambda: _async_list_directory_contents_uncached(github_repo, github_token, owner, repo, directory_path, ref, max_depth)
+    )
+    if shared:
+        print(f"[Async Agents] 진행 중인 동일 디렉토리 조회 결과 공유: {directory_path}")
+    return list(files)
+
+
+async def _async_list_directory_contents_uncached(
+    github_repo: str,
+    github_token: Optional[str],
+    owner: str,
+    repo: str,
+    directory_path: str,
+    ref: str,
+    max_depth: int
+) -> List[str]:
+    try:
+        start_time = time.time()
+        response = await _github_get(github_contents_url(owner, repo, directory_path, ref), _github_headers(github_token))
+        warn_github_rate_limit(response.headers)
+
+        elapsed = time.time() - start_time
+        if elapsed > 2:
+            print(f"[Async Agents] 디렉토리 탐색 느림: {directory_path} ({elapsed:.2f}초)")
+
+        files, sub_dirs = filter_directory_listing(response.json())
+        if max_depth > 0 and sub_dirs and len(files) < 100:
+            sub_results = await asyncio.gather(*[
+                async_list_directory_contents(github_repo, github_token, sub_path, ref, max_depth - 1)
+                for sub_path in sub_dirs
+            ])
+            for sub_files in sub_results:
+                files.extend(sub_files)
+                # 파일이 너무 많아지면 중단
+                if len(files) >= 100:
+                    break
+
+        return files
+    except CircuitOpenError as e:
+        print(f"[Async Agents] 디렉토리 목록 조회 건너뜀 ({directory_path}): {e}")
+        return []
+    except Exception as e:
+        print(f"[Async Agents] 디렉토리 목록 조회 실패 ({directory_path}): {e}")
+        return []
+
+
+async def async_get_file_contents(
+    github_repo: str,
+    github_token: Optional[str],
+    file_paths: List[str],
+    ref: str = 'main',
+    max_lines_per_file: int = 500
+) -> List[Dict[str, Any]]:
+    """get_file_contents의 비동기 버전 (결과 형식 동일, 최대 50개 파일)"""
+    if not github_repo or not file_paths:
+        return []
+
+    parsed = parse_github_repo(github_repo)
+    if not parsed:
+        print(f"[Async Agents] ⚠️ GitHub URL 파싱 실패: {github_repo}")
+        return []
+    owner, repo = parsed
+
+    headers = _github_headers(github_token)
+    semaphore = asyncio.Semaphore(GITHUB_MAX_CONCURRENCY)
+
+    async def fetch_single_file(file_path):
+        """단일 파일 읽기 (동시에 같은 파일을 읽는 요청과 결과 공유)"""
+        result, shared = await github_flight.ado(
+            github_flight_key('file', owner, repo, file_path, ref, github_token, max_lines_per_file),
+            lambda: fetch_single_file_uncached(file_path)
+        )
+        if shared:
+            print(f"[Async Agents] 진행 중인 동일 파일 읽기 결과 공유: {file_path}")
+        return dict(result)
+
+    async def fetch_single_file_uncached(file_path):
+        try:
+            async with semaphore:
+                start_time = time.time()
+                response = await _github_get(github_contents_url(owner, repo, file_path, ref), headers)
+            warn_github_rate_limit(response.headers)
+
+            elapsed = time.time() - start_time
+            if elapsed > 1:
+                print(f"[Async Agents] 파일 읽기 느림: {file_path} ({elapsed:.2f}초)")
+
+            return decode_github_file(file_path, response.json(), max_lines_per_file)
+        except Exception as e:
+            return {
+                "filePath": file_path,
+                "content": None,
+                "error": str(e)
+            }
+
+    files_to_fetch = unique_paths(file_paths)[:MAX_FILES_PER_BATCH]
+    file_read_start = time.time()
+
+    # HEAD 커밋 스냅샷에서 읽을 수 있는 파일과 경로 인덱스에 없는 파일은 API 호출 없이 답함
+    snapshot = await asyncio.to_thread(get_snapshot, owner, repo, ref, github_token)
+    from_snapshot = snapshot_file_results(snapshot, files_to_fetch, max_lines_per_file) if snapshot is not None else {}
+    tree = await asyncio.to_thread(get_tree_index, owner, repo, ref, github_token)
+    if tree is not None:
+        from_snapshot.update(tree_missing_results(tree, [p for p in files_to_fetch if p not in from_snapshot]))
+    api_paths = [file_path for file_path in files_to_fetch if file_path not in from_snapshot]
+    if from_snapshot:
+        print(f"[Async Agents] 스냅샷/경로 인덱스로 답함: {len(from_snapshot)}개, API로 읽을 파일: {len(api_paths)}개")
+    fetched = await asyncio.gather(*[fetch_single_file(file_path) for file_path in api_paths])
+    fetched_by_path = dict(zip(api_paths, fetched))
+    results = [from_snapshot.get(file_path) or fetched_by_path[file_path] for file_path in files_to_fetch]
+
+    file_read_elapsed = time.time() - file_read_start
+    successful_reads = len([r for r in results if r.get('content')])
+    print(f"[Async Agents] 파일 읽기 완료: {successful_reads}/{len(files_to_fetch)}개 성공, 소요 시간: {file_read_elapsed:.2f}초")
+
+    return list(results)
+
+
+async def _call_llm_async(request: AgentIORequest, acall_llm_func: Callable) -> str:
+    prompt, system_prompt = request.args
+    max_tokens = request.kwargs.get('max_tokens')
+    if max_tokens is None:
+        return await acall_llm_func(prompt, system_prompt)
+    return await acall_llm_streaming(prompt, system_prompt, max_tokens=max_tokens)
+
+
+async def _perform_async(request: AgentIORequest, acall_llm_func: Callable) -> Any:
+    """단일 I/O 요청을 비동기로 수행"""
+    if request.kind == AgentIORequest.LLM:
+        purpose = request.kwargs.get('purpose')
+        with llm_request_policy(request):
+            small_model = await asmall_model_for(purpose)
+            if small_model:
+                content, error = None, None
+                try:
+                    with llm_model(small_model):
+                        content = await _call_llm_async(request, acall_llm_func)
+                except Exception as e:
+                    error = e
+                if not escalate_to_default_model(small_model, purpose, content, error):
+                    return content
+            return await _call_llm_async(request, acall_llm_func)
+
+    if request.kind == AgentIORequest.READ_FILES:
+        return await async_get_file_contents(*request.args, **request.kwargs)
+
+    if request.kind == AgentIORequest.LIST_DIRECTORY:
+        return await async_list_directory_contents(*request.args, **request.kwargs)
+
+    if request.kind == AgentIORequest.EXISTING_PATHS:
+        # 경로 인덱스 조회(HEAD 확인/트리 조회)는 동기 코드이므로 스레드에서 수행
+        return await asyncio.to_thread(existing_paths, *request.args, **request.kwargs)
+
+    if request.kind == AgentIORequest.SEMANTIC_SEARCH:
+        # 임베딩 요청과 메모리 매핑 행렬 계산은 동기 코드이므로 이벤트 루프를 막지 않도록 스레드에서 수행
+        from embedding_index import semantic_search
+        return await asyncio.to_thread(semantic_search, *request.args, **request.kwargs)
+
+    raise ValueError(f"알 수 없는 에이전트 I/O 요청: {request.kind}")
+
+
+async def run_agent_async(steps: Generator, acall_llm_func: Optional[Callable] = None) -> Any:
+    """
+    에이전트 generator를 비동기로 실행하고 반환값을 돌려줌 (agent_io.run_agent_sync와 같은 규칙)
+
+    Args:
+        steps: 에이전트 generator (예: process_chat_message_steps(...))
+        acall_llm_func: 비동기 LLM 호출 함수 (prompt, system_prompt) -> content (None이면 acall_llm)
+    """
+    acall_llm_func = acall_llm_func or acall_llm
+    result = None
+    error = None
+    while True:
+        try:
+            if error is not None:
+                request = steps.throw(error)
+            else:
+                request = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+        result = None
+        error = None
+        try:
+            if isinstance(request, list):
+                result = list(await asyncio.gather(
+                    *[_perform_async(r, acall_llm_func) for r in request],
+                    return_exceptions=True
+                ))
+            else:
+                result = await _perform_async(request, acall_llm_func)
+        except Exception as e:
+            error = e
+
+
+async def async_process_chat_message(user_message, conversation_history, context, acall_llm_func=None):
+    """process_chat_message의 비동기 버전"""
+    return await run_agent_async(
+        process_chat_message_steps(user_message, conversation_history, context),
+        acall_llm_func
+    )
+
+
+async def async_execute_task_suggestion_agent(context, acall_llm_func=None, user_message=None):
+    return await run_agent_async(task_suggestion_agent_steps(context, user_message), acall_llm_func)
+
+
+async def async_execute_progress_analysis_agent(context, acall_llm_func=None, user_message=None):
+    return await run_agent_async(progress_analysis_agent_steps(context, user_message), acall_llm_func)
+
+
+async def async_execute_task_completion_agent(context, acall_llm_func=None, user_message=None):
+    return await run_agent_async(task_completion_agent_steps(context, user_message), acall_llm_func)
+
+
+async def async_execute_general_qa_agent(context, acall_llm_func=None, user_message=None):
+    return await run_agent_async(general_qa_agent_steps(context, user_message), acall_llm_func)
+
+
+async def async_execute_task_assignment_agent(context, acall_llm_func=None, user_message=None):
+    return await run_agent_async(task_assignment_agent_steps(context, user_message), acall_llm_func)
+
+
+async def async_execute_batch_task_assignment_agent(context, acall_llm_func=None, user_message=None):
+    return await run_agent_async(batch_task_assignment_agent_steps(context, user_message), acall_llm_func)
@@ -0,0 +1,278 @@
+"""
+코드 검색 (BM25 어휘 검색)
+읽은 저장소 파일을 함수 단위 청크로 나누어 역색인을 만들고, Task 제목이나 사용자 질문과 관련된
+청크를 BM25 점수로 찾습니다. 하드코딩된 키워드 -> 경로 매핑 대신 저장소 구조와 관계없이 관련 파일/코드를 고릅니다.
+
+    index = CodeIndex()
+    index.add_files(read_files)                     # [{"path", "content"}, ...]
+    for score, chunk in index.search("로그인 기능 구현", k=5):
+        print(chunk.path, chunk.start, chunk.end, score)
+
+    rank_paths(query, listed_paths, k=10)           # 내용을 읽기 전 경로만으로 후보 파일 순위
+    select_excerpts(content, query, 600)            # 파일에서 질문과 관련된 청크만 발췌 (prompt_optimizer 참고)
+
+토큰화: 영문 식별자는 camelCase/snake_case를 나누고, 한글은 조사를 뗀 단어와 글자 bigram을 사용합니다.
+질문의 한글 기능 용어는 코드에서 쓰는 영문 용어로 확장합니다 (예: 로그인 -> login, auth).
+"""
+
+import math
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from token_budget import estimate_tokens
+
+# BM25 파라미터
+BM25_K1 = float(os.getenv('BM25_K1', '1.2'))
+BM25_B = float(os.getenv('BM25_B', '0.75'))
+# 청크 하나의 최대 줄 수 (함수가 더 길면 나눔)
+CODE_CHUNK_MAX_LINES = int(os.getenv('CODE_CHUNK_MAX_LINES', '60'))
+# 이보다 짧은 청크는 앞 청크에 합침
+CODE_CHUNK_MIN_LINES = 5
+# 경로 토큰 가중치 (경로에 나온 용어는 본문보다 파일 주제를 잘 나타냄)
+PATH_TOKEN_WEIGHT = 3
+
+# 함수/클래스/라우트 정의 시작 줄 (들여쓰기 4칸 이하)
+_BOUNDARY = re.compile(
+    r'^\s{0,4}(?:'
+    r'(?:async\s+)?def\s|class\s|'
+    r'(?:export\s+(?:default\s+)?)?(?:async\s+)?function\b|'
+    r'(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>|'
+    r'(?:router|app)\.(?:get|post|put|patch|delete|use)\s*\(|'
+    r'module\.exports|@app\.route'
+    r')'
+)
+_WORD = re.compile(r'[A-Za-z][A-Za-z0-9]*|[가-힣]+')
+_CAMEL = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+# 검색에 도움이 되지 않는 영문 키워드/불용어
+_STOPWORDS = frozenset("""
+a an and are as at be by for from if in is it of on or the to with
+const let var function return import export default require module exports async await new this self
+def class none null true false undefined else elif try catch except finally throw raise
+js jsx ts tsx py json md index src
+""".split())
+
+# 한글 단어 끝에서 떼어 내는 조사/어미 (긴 것부터)
+_KOREAN_SUFFIXES = ('으로', '에서', '하기', '기능', '을', '를', '이', '가', '은', '는', '에', '의', '로', '와', '과', '도')
+
+# 질문의 한글 기능 용어 -> 코드에서 쓰는 영문 용어
+QUERY_EXPANSIONS = {
+    '로그인': ('login', 'signin', 'auth', 'user'),
+    '로그아웃': ('logout', 'auth'),
+    '인증': ('auth', 'token', 'jwt'),
+    '회원가입': ('signup', 'register', 'user'),
+    '비밀번호': ('password',),
+    '사용자': ('user',),
+    '회원': ('user', 'member'),
+    '멤버': ('member',),
+    '프로필': ('profile', 'user'),
+    '작업': ('task',),
+    '할일': ('task', 'todo'),
+    '태스크': ('task',),
+    '프로젝트': ('project',),
+    '진행도': ('progress',),
+    '깃허브': ('github',),
+    '커밋': ('commit', 'github'),
+    '알림': ('notification',),
+    '댓글': ('comment',),
+    '검색': ('search',),
+    '대시보드': ('dashboard',),
+    '설정': ('settings', 'config'),
+    '에이전트': ('agent', 'ai'),
+    '채팅': ('chat',),
+    '업로드': ('upload', 'file'),
+    '파일': ('file',),
+    '일정': ('schedule', 'calendar'),
+    '마감': ('deadline', 'due'),
+}
+
+
+def _strip_korean_suffix(word: str) -> str:
+    for suffix in _KOREAN_SUFFIXES:
+        if len(word) > len(suffix) + 1 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def _singular(word: str) -> str:
+    """영문 복수형 -s 제거 (tasks -> task, 파일/함수 이름의 단수/복수 차이 흡수)"""
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """영문 식별자는 camelCase/snake_case 단위, 한글은 단어(조사 제거)와 글자 bigram으로 토큰화"""
+    tokens = []
+    for word in _WORD.findall(text or ''):
+        if word[0] >= '가':
+            word = _strip_korean_suffix(word)
+            tokens.append(word)
+            if len(word) > 2:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+            continue
+        parts = [_singular(part.lower()) for part in _CAMEL.findall(word)]
+        lowered = word.lower()
+        if len(parts) > 1 and lowered not in _STOPWORDS:
+            tokens.append(lowered)
+        tokens.extend(part for part in parts if len(part) > 1 and part not in _STOPWORDS)
+    return tokens
+
+
+def query_terms(query: Optional[str]) -> List[str]:
+    """질문 토큰 + 한글 기능 용어의 영문 확장 (중복 제거, 순서 유지)"""
+    terms = []
+    for token in tokenize(query):
+        terms.append(token)
+        terms.extend(QUERY_EXPANSIONS.get(token, ()))
+    return list(dict.fromkeys(terms))
+
+
+class Chunk:
+    """파일의 연속된 줄 범위 (start/end는 1부터 시작하는 줄 번호)"""
+
+    __slots__ = ('path', 'start', 'end', 'text')
+
+    def __init__(self, path: str, start: int, end: int, text: str):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Chunk({self.path}:{self.start}-{self.end})"
+
+
+def split_chunks(path: str, content: Optional[str], max_lines: int = CODE_CHUNK_MAX_LINES) -> List[Chunk]:
+    """함수/클래스/라우트 정의 경계로 파일을 청크로 나눔 (짧은 청크는 합치고 긴 청크는 max_lines 단위로 나눔)"""
+    if not content:
+        return []
+    lines = content.split('\n')
+    starts = [0] + [i for i, line in enumerate(lines) if i > 0 and _BOUNDARY.match(line)]
+    ranges = []
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(lines)
+        if ranges and end - start < CODE_CHUNK_MIN_LINES:
+            ranges[-1] = (ranges[-1][0], end)
+        elif ranges and ranges[-1][1] - ranges[-1][0] < CODE_CHUNK_MIN_LINES:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    chunks = []
+    for start, end in ranges:
+        for window_start in range(start, end, max_lines):
+            window_end = min(end, window_start + max_lines)
+            chunks.append(Chunk(path, window_start + 1, window_end, '\n'.join(lines[window_start:window_end])))
+    return chunks
+
+
+class CodeIndex:
+    """청크 역색인 (용어 -> {청크 번호: 빈도}) 과 BM25 검색"""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[Chunk] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def add_chunk(self, chunk: Chunk):
+        tokens = tokenize(chunk.path) * PATH_TOKEN_WEIGHT + tokenize(chunk.text)
+        chunk_id = len(self.chunks)
+        self.chunks.append(chunk)
+        self._lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        for token in tokens:
+            postings = self._postings.setdefault(token, {})
+            postings[chunk_id] = postings.get(chunk_id, 0) + 1
+
+    def add_file(self, path: str, content: Optional[str]):
+        for chunk in split_chunks(path, content):
+            self.add_chunk(chunk)
+
+    def add_files(self, files: Iterable[Dict[str, Any]]):
+        """읽은 파일 목록 ({"path", "content"} 또는 get_file_contents 결과 형식) 색인"""
+        for file_info in files or []:
+            self.add_file(file_info.get('path') or file_info.get('filePath', ''), file_info.get('content'))
+
+    def scores(self, query: Optional[str]) -> Dict[int, float]:
+        """청크 번호 -> BM25 점수 (질문 용어가 하나도 없는 청크는 제외)"""
+        if not self.chunks:
+            return {}
+        count = len(self.chunks)
+        average = self._total_length / count or 1.0
+        scores: Dict[int, float] = {}
+        for term in query_terms(query):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def search(self, query: Optional[str], k: int = 5) -> List[Tuple[float, Chunk]]:
+        """점수가 높은 청크 k개 [(점수, 청크), ...]"""
+        ranked = sorted(self.scores(query).items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(round(score, 4), self.chunks[chunk_id]) for chunk_id, score in ranked]
+
+    def top_files(self, query: Optional[str], k: int = 10) -> List[str]:
+        """가장 관련된 청크의 점수로 파일 순위를 매긴 경로 k개"""
+        best: Dict[str, float] = {}
+        for chunk_id, score in self.scores(query).items():
+            path = self.chunks[chunk_id].path
+            best[path] = max(best.get(path, 0.0), score)
+        return [path for path, _ in sorted(best.items(), key=lambda item: -item[1])[:k]]
+
+
+def rank_paths(query: Optional[str], paths: Iterable[str], k: int = 10) -> List[str]:
+    """파일 내용 없이 경로 토큰만으로 관련 파일 순위 (질문 용어가 경로에 없는 파일은 제외)"""
+    index = CodeIndex()
+    for path in dict.fromkeys(path for path in paths if path):
+        index.add_chunk(Chunk(path, 0, 0, ''))
+    return index.top_files(query, k)
+
+
+def select_excerpts(content: Optional[str], query: Optional[str], max_tokens: int) -> Optional[str]:
+    """
+    파일에서 질문과 관련된 청크만 골라 원래 순서대로 이어 붙인 발췌 (max_tokens 이내)
+
+    파일 하나의 청크만으로 점수를 매기므로 같은 파일/질문이면 다른 파일을 읽어도 결과가 같습니다
+    (프롬프트 접두부 유지). 관련 청크가 없으면 None을 반환하며, 호출한 쪽은 앞부분 발췌를 사용합니다.
+    """
+    # 경로 토큰은 파일 안의 모든 청크에 같으므로 본문만으로 점수를 매김
+    chunks = split_chunks('', content)
+    if len(chunks) < 2 or not query:
+        return None
+    index = CodeIndex()
+    for chunk in chunks:
+        index.add_chunk(chunk)
+    selected = []
+    used = 0
+    for _, chunk in index.search(query, k=len(chunks)):
+        cost = estimate_tokens(chunk.text) + 8
+        if used + cost > max_tokens:
+            continue
+        selected.append(chunk)
+        used += cost
+    if not selected:
+        return None
+    selected.sort(key=lambda chunk: chunk.start)
+    return "\n...\n".join(f"// L{chunk.start}-{chunk.end}\n{chunk.text}" for chunk in selected)
+
+
+def retrieval_query(context: Dict[str, Any], user_message: Optional[str] = None) -> str:
+    """에이전트 실행의 검색 질문 (Task 제목/설명 + 사용자 메시지)"""
+    task = context.get('task') or {}
+    parts = [
+        task.get('title') or context.get('taskTitle') or '',
+        task.get('description') or context.get('taskDescription') or '',
+        user_message or '',
+    ]
+    return ' '.join(part for part in parts if part).strip()
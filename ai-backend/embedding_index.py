@@ -0,0 +1,261 @@
+"""
+임베딩 인덱스 (프로젝트별 메모리 매핑 벡터 행렬)
+커밋 메시지/Task 같은 프로젝트 문서를 Ollama 임베딩(/api/embed)으로 벡터화해 프로젝트마다
+float16 행렬 파일(.npy)과 ID 사이드카(.ids.json)로 저장합니다. 행렬은 np.load(mmap_mode='r')로 열기 때문에
+서버를 다시 시작해도 다시 임베딩하지 않고 바로 사용할 수 있으며, 메모리에 전부 올리지 않습니다.
+
+    results = semantic_search(
+        project_key(context),
+        commit_documents(commits),          # [(id, text), ...] - 바뀐 문서만 임베딩해 인덱스에 반영
+        ["로그인 기능 구현"],               # 여러 질문을 한 번에 임베딩하고 행렬 곱 한 번으로 검색
+        k=10, prefix='commit:'
+    )
+    results[0]  # [('commit:3f2a...', 0.82), ...] 코사인 유사도 순
+
+행은 단위 벡터로 정규화해 저장하므로 코사인 유사도는 내적입니다.
+numpy가 설치되어 있지 않거나, OpenAI 모드이거나, EMBEDDING_INDEX_ENABLED=false면 검색 결과는 항상 비어 있습니다.
+임베딩 모델을 사용할 수 없을 때(Ollama 연결 실패, 모델 미설치)도 임베딩을 요청하지 않고 빈 결과를 반환합니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from llm_client import OLLAMA_EMBED_MODEL, USE_OPENAI, get_llm_client
+
+# 임베딩 인덱스 사용 여부 (numpy 필요)
+EMBEDDING_INDEX_ENABLED = os.getenv('EMBEDDING_INDEX_ENABLED', 'true').lower() == 'true'
+if EMBEDDING_INDEX_ENABLED and np is None:
+    EMBEDDING_INDEX_ENABLED = False
+    print("Warning: numpy not installed. 임베딩 인덱스를 사용하지 않습니다.")
+if EMBEDDING_INDEX_ENABLED and USE_OPENAI:
+    # 임베딩은 Ollama /api/embed로만 계산하므로 OpenAI 모드(Ollama 서버 없음)에서는 사용하지 않음
+    EMBEDDING_INDEX_ENABLED = False
+# 프로젝트별 행렬/사이드카 파일 디렉토리
+EMBEDDING_INDEX_DIR = os.getenv(
+    'EMBEDDING_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'embeddings')
+)
+# /api/embed 요청 하나에 넣는 최대 텍스트 수
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))
+# 문서 하나에서 임베딩하는 최대 글자 수
+EMBEDDING_TEXT_MAX_CHARS = 2000
+
+_stats_lock = threading.Lock()
+_stats = {'unavailable': 0, 'embedCalls': 0, 'embeddedTexts': 0, 'unchangedDocuments': 0, 'searches': 0, 'queries': 0}
+
+
+def _count(**counts: int):
+    with _stats_lock:
+        for name, value in counts.items():
+            _stats[name] += value
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def embed_texts(texts: Sequence[str], model: str = OLLAMA_EMBED_MODEL) -> 'np.ndarray':
+    """텍스트를 EMBEDDING_BATCH_SIZE개씩 임베딩해 단위 벡터 행렬(float32, 텍스트 수 x 차원)로 반환"""
+    client = get_llm_client()
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batch = [text[:EMBEDDING_TEXT_MAX_CHARS] for text in texts[start:start + EMBEDDING_BATCH_SIZE]]
+        vectors.extend(client.embed(batch, model))
+        _count(embedCalls=1, embeddedTexts=len(batch))
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingIndex:
+    """
+    프로젝트 하나의 임베딩 행렬 (메모리 매핑 float16, 행 = 문서) + ID 사이드카
+
+    문서 추가/변경 시에는 새 행렬을 임시 파일에 쓴 뒤 교체하므로, 이전 행렬을 읽고 있는 검색은 영향을 받지 않습니다.
+    """
+
+    def __init__(self, key: str, directory: str = EMBEDDING_INDEX_DIR, model: str = OLLAMA_EMBED_MODEL):
+        self.key = key
+        self.model = model
+        self.matrix_path = os.path.join(directory, f"{key}.f16.npy")
+        self.ids_path = os.path.join(directory, f"{key}.ids.json")
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self._hashes: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.matrix = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _load(self):
+        """저장된 행렬을 메모리 매핑으로 열기 (모델이 다르거나 파일이 맞지 않으면 빈 인덱스)"""
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.ids_path)):
+            return
+        try:
+            with open(self.ids_path, encoding='utf-8') as f:
+                sidecar = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except Exception as e:
+            print(f"[Embedding Index] {self.key} 인덱스를 읽을 수 없어 새로 만듭니다: {e}")
+            return
+        if sidecar.get('model') != self.model or matrix.shape[0] != len(sidecar.get('ids', [])):
+            print(f"[Embedding Index] {self.key} 인덱스의 모델/크기가 맞지 않아 새로 만듭니다")
+            return
+        self.ids = sidecar['ids']
+        self._hashes = sidecar['hashes']
+        self._positions = {doc_id: position for position, doc_id in enumerate(self.ids)}
+        self.matrix = matrix
+
+    def _save(self, matrix: 'np.ndarray', ids: List[str], hashes: List[str]):
+        os.makedirs(os.path.dirname(self.matrix_path), exist_ok=True)
+        temp_matrix = self.matrix_path + '.tmp.npy'
+        temp_ids = self.ids_path + '.tmp'
+        np.save(temp_matrix, matrix)
+        with open(temp_ids, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model, 'ids': ids, 'hashes': hashes}, f, ensure_ascii=False)
+        os.replace(temp_matrix, self.matrix_path)
+        os.replace(temp_ids, self.ids_path)
+
+    def upsert(self, documents: Sequence[Tuple[str, str]]) -> int:
+        """새 문서와 내용이 바뀐 문서만 임베딩해 반영 (임베딩한 문서 수 반환)"""
+        with self._lock:
+            changed = {}
+            for doc_id, text in documents:
+                if not doc_id or not text:
+                    continue
+                digest = _text_hash(text)
+                position = self._positions.get(doc_id)
+                if position is None or self._hashes[position] != digest:
+                    changed[doc_id] = (text, digest)
+            _count(unchangedDocuments=len(documents) - len(changed))
+            if not changed:
+                return 0
+
+            vectors = embed_texts([text for text, _ in changed.values()], self.model).astype(np.float16)
+            if self.matrix is not None and self.matrix.shape[1] != vectors.shape[1]:
+                raise ValueError(f"임베딩 차원이 인덱스와 다릅니다 ({vectors.shape[1]}/{self.matrix.shape[1]})")
+            matrix = np.array(self.matrix) if self.matrix is not None else np.zeros((0, vectors.shape[1]), np.float16)
+            ids = list(self.ids)
+            hashes = list(self._hashes)
+            appended = []
+            for row, (doc_id, (_, digest)) in zip(vectors, changed.items()):
+                position = self._positions.get(doc_id)
+                if position is None:
+                    appended.append(row)
+                    ids.append(doc_id)
+                    hashes.append(digest)
+                else:
+                    matrix[position] = row
+                    hashes[position] = digest
+            if appended:
+                matrix = np.vstack([matrix, np.asarray(appended, dtype=np.float16)])
+            self._save(matrix, ids, hashes)
+            self.ids = ids
+            self._hashes = hashes
+            self._positions = {doc_id: position for position, doc_id in enumerate(ids)}
+            self.matrix = np.load(self.matrix_path, mmap_mode='r')
+            print(f"[Embedding Index] {self.key} - 문서 {len(changed)}개 임베딩 (전체 {len(ids)}개)")
+            return len(changed)
+
+    def search(self, query_vectors: 'np.ndarray', k: int = 10, prefix: Optional[str] = None) -> List[List[Tuple[str, float]]]:
+        """질문 벡터 행렬(단위 벡터)마다 코사인 유사도가 높은 문서 k개 [(id, 유사도), ...] (prefix로 문서 종류 제한)"""
+        with self._lock:
+            matrix, ids = self.matrix, self.ids
+        if matrix is None or not len(ids) or not len(query_vectors):
+            return [[] for _ in range(len(query_vectors))]
+        rows = np.arange(len(ids))
+        if prefix:
+            rows = np.array([position for position, doc_id in enumerate(ids) if doc_id.startswith(prefix)], dtype=np.int64)
+            if not len(rows):
+                return [[] for _ in range(len(query_vectors))]
+        scores = np.asarray(query_vectors, dtype=np.float32) @ np.asarray(matrix[rows], dtype=np.float32).T
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_scores, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-query_scores[candidates])]
+            results.append([(ids[rows[i]], round(float(query_scores[i]), 4)) for i in ordered])
+        return results
+
+
+_indexes: Dict[str, EmbeddingIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_embedding_index(key: str) -> EmbeddingIndex:
+    """프로젝트 인덱스 반환 (처음 사용할 때 파일에서 열기)"""
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = EmbeddingIndex(key)
+        return index
+
+
+def project_key(context: Dict[str, Any]) -> Optional[str]:
+    """인덱스 파일 이름으로 쓰는 프로젝트 키 (GitHub 저장소 또는 프로젝트 ID, 없으면 None)"""
+    identity = (context.get('githubRepo') or '').strip() or str(context.get('projectId') or '')
+    if not identity:
+        return None
+    readable = re.sub(r'[^A-Za-z0-9_-]+', '_', identity.split('github.com/')[-1]).strip('_')[:40]
+    return f"{readable}-{_text_hash(identity)[:8]}"
+
+
+def commit_documents(commits: Sequence[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """커밋 -> (commit:sha, 메시지 + 변경 파일 경로)"""
+    documents = []
+    for commit in commits or []:
+        sha = commit.get('sha')
+        message = commit.get('message') or ''
+        if not sha or not message:
+            continue
+        paths = ' '.join(f.get('path') or f.get('filename') or '' for f in (commit.get('files') or [])[:20])
+        documents.append((f"commit:{sha}", f"{message}\n{paths}".strip()))
+    return documents
+
+
+def task_documents(tasks: Sequence[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """Task -> (task:id, 제목 + 설명)"""
+    return [
+        (f"task:{task.get('id')}", f"{task.get('title') or ''}\n{task.get('description') or ''}".strip())
+        for task in tasks or []
+        if task.get('id') is not None and task.get('title')
+    ]
+
+
+def semantic_search(
+    key: Optional[str],
+    documents: Sequence[Tuple[str, str]],
+    queries: Sequence[str],
+    k: int = 10,
+    prefix: Optional[str] = None
+) -> List[List[Tuple[str, float]]]:
+    """documents를 인덱스에 반영한 뒤 질문마다 top-k 검색 (비활성화, 키가 없음, 임베딩 모델 사용 불가면 빈 결과)"""
+    if not EMBEDDING_INDEX_ENABLED or not key or not queries:
+        return [[] for _ in queries]
+    index = get_embedding_index(key)
+    if not get_llm_client().check_model(index.model):
+        _count(unavailable=1)
+        return [[] for _ in queries]
+    index.upsert(documents)
+    results = index.search(embed_texts(list(queries), index.model), k, prefix)
+    _count(searches=1, queries=len(queries))
+    return results
+
+
+def embedding_stats() -> Dict[str, Any]:
+    """임베딩 요청/문서 수, 변경 없어 재사용한 문서 수, 검색 수, 열린 프로젝트 인덱스별 문서 수"""
+    with _indexes_lock:
+        indexes = {key: len(index) for key, index in _indexes.items()}
+    with _stats_lock:
+        return {'enabled': EMBEDDING_INDEX_ENABLED, 'model': OLLAMA_EMBED_MODEL, 'indexes': indexes, **_stats}
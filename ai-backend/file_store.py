@@ -0,0 +1,185 @@
+"""
+에이전트가 읽은 파일 저장소
+다단계 에이전트 실행 하나에서 읽은 파일을 보관합니다.
+- 경로 인덱스: 이미 읽은 파일인지 O(1)로 확인 (파일 수만큼 리스트를 훑지 않음)
+- blob SHA 중복 제거: 다른 경로로 같은 내용을 읽으면(README.md / readme.md 등) 한 번만 보관하고 경로는 별칭으로 기록
+- 전체 바이트 예산: 넘으면 관련도가 가장 낮은(같으면 가장 먼저 읽은) 파일부터 제거
+- 읽기 전용 뷰: 프롬프트 생성 함수에는 파일 dict의 튜플을 넘기며, 변경이 없으면 같은 튜플을 재사용
+
+    files = FileStore()
+    files.add("README.md", content, relevance=PINNED_RELEVANCE)
+    "README.md" in files                      # O(1)
+    prompt = initial_prompt_func(context, user_message, files.view(), ...)
+
+관련도: README/설정 파일처럼 분석의 기준이 되는 파일은 높게, 이후 단계에서 다시 요청된 파일은 touch()로 올립니다.
+프롬프트 접두부(prompt_optimizer.compose_prompt)는 읽은 순서를 유지하므로, 제거가 일어나지 않는 한 접두부는 바뀌지 않습니다.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 실행 하나에서 보관할 파일 내용의 최대 크기 (바이트, UTF-8 기준)
+FILE_STORE_MAX_BYTES = int(os.getenv('FILE_STORE_MAX_BYTES', str(2 * 1024 * 1024)))
+
+# 관련도 기본값
+DEFAULT_RELEVANCE = 1.0
+# 평가/이전 단계 결과가 직접 지목한 파일
+SUGGESTED_RELEVANCE = 2.0
+# README/설정 파일 (제거 대상에서 가장 나중)
+PINNED_RELEVANCE = 10.0
+
+_lock = threading.Lock()
+_stats = {'stores': 0, 'files': 0, 'duplicates': 0, 'evictions': 0, 'evictedBytes': 0}
+
+
+def content_sha(content: str) -> str:
+    """GitHub blob SHA와 같은 방식의 내용 해시 (응답에 sha가 없을 때 사용)"""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class FileStore:
+    """에이전트 실행 하나에서 읽은 파일 (경로 -> {"path", "content", "truncated"}, 읽은 순서 유지)"""
+
+    def __init__(self, max_bytes: int = FILE_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._meta: Dict[str, Tuple[str, float, int, int]] = {}  # 경로 -> (sha, 관련도, 크기, 읽은 순번)
+        self._by_sha: Dict[str, str] = {}    # sha -> 보관 중인 경로
+        self._aliases: Dict[str, str] = {}   # 같은 내용의 다른 경로 -> 보관 중인 경로
+        self._sequence = 0
+        self._view: Optional[Tuple[Dict[str, Any], ...]] = None
+        with _lock:
+            _stats['stores'] += 1
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.view())
+
+    def __contains__(self, path: str) -> bool:
+        """이미 읽은 경로인지 (같은 내용으로 중복 제거된 경로 포함)"""
+        return path in self._files or path in self._aliases
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        return self._files.get(self._aliases.get(path, path))
+
+    def view(self) -> Tuple[Dict[str, Any], ...]:
+        """프롬프트 생성용 읽기 전용 뷰 (읽은 순서, 변경이 없으면 같은 튜플 반환)"""
+        if self._view is None:
+            self._view = tuple(self._files.values())
+        return self._view
+
+    def add(
+        self,
+        path: str,
+        content: str,
+        truncated: bool = False,
+        sha: Optional[str] = None,
+        relevance: float = DEFAULT_RELEVANCE
+    ) -> Optional[Dict[str, Any]]:
+        """
+        파일 추가 (추가한 파일 dict 반환)
+
+        이미 있는 경로이거나 같은 내용(blob SHA)이 다른 경로로 있으면 추가하지 않고 관련도만 올린 뒤 None을 반환합니다.
+        예산보다 큰 파일은 추가하지 않습니다.
+        """
+        if not path or not content:
+            return None
+        if path in self:
+            self.touch(path, relevance)
+            return None
+        sha = sha or content_sha(content)
+        existing = self._by_sha.get(sha)
+        if existing is not None:
+            self._aliases[path] = existing
+            self.touch(existing, relevance)
+            with _lock:
+                _stats['duplicates'] += 1
+            print(f"[File Store] 같은 내용의 파일 중복 제거: {path} -> {existing}")
+            return None
+        size = len(content.encode('utf-8'))
+        if size > self.max_bytes:
+            print(f"[File Store] 파일이 예산보다 커서 보관하지 않음: {path} ({size}바이트)")
+            return None
+
+        file_info = {"path": path, "content": content, "truncated": truncated}
+        self._sequence += 1
+        self._files[path] = file_info
+        self._meta[path] = (sha, relevance, size, self._sequence)
+        self._by_sha[sha] = path
+        self.total_bytes += size
+        self._view = None
+        with _lock:
+            _stats['files'] += 1
+        self._evict(keep=path)
+        return file_info if path in self._files else None
+
+    def touch(self, path: str, amount: float = DEFAULT_RELEVANCE):
+        """다시 요청된 파일의 관련도 올리기 (제거 순서가 뒤로 밀림)"""
+        path = self._aliases.get(path, path)
+        meta = self._meta.get(path)
+        if meta is not None:
+            sha, relevance, size, sequence = meta
+            self._meta[path] = (sha, relevance + amount, size, sequence)
+
+    def _evict(self, keep: str):
+        """예산을 넘으면 관련도가 낮고 먼저 읽은 파일부터 제거 (방금 추가한 파일은 마지막까지 유지)"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        order = sorted(
+            (path for path in self._files if path != keep),
+            key=lambda path: (self._meta[path][1], self._meta[path][3])
+        )
+        evicted = []
+        for path in order:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            evicted.append(path)
+        if evicted:
+            with _lock:
+                _stats['evictions'] += len(evicted)
+            print(f"[File Store] 바이트 예산({self.max_bytes}) 초과로 관련도가 낮은 파일 {len(evicted)}개 제거: {evicted}")
+
+    def _remove(self, path: str):
+        sha, _, size, _ = self._meta.pop(path)
+        del self._files[path]
+        self._by_sha.pop(sha, None)
+        for alias in [alias for alias, target in self._aliases.items() if target == path]:
+            del self._aliases[alias]
+        self.total_bytes -= size
+        self._view = None
+        with _lock:
+            _stats['evictedBytes'] += size
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """직렬화용 목록 (체크포인트 저장, sha/관련도 포함)"""
+        return [
+            {**file_info, "sha": self._meta[path][0], "relevance": self._meta[path][1]}
+            for path, file_info in self._files.items()
+        ]
+
+    @classmethod
+    def from_list(cls, files: List[Dict[str, Any]], max_bytes: int = FILE_STORE_MAX_BYTES) -> 'FileStore':
+        """to_list() 결과(또는 {"path", "content", "truncated"} 목록)로 복원"""
+        store = cls(max_bytes)
+        for file_info in files or []:
+            store.add(
+                file_info.get('path', ''),
+                file_info.get('content') or '',
+                file_info.get('truncated', False),
+                file_info.get('sha'),
+                file_info.get('relevance', DEFAULT_RELEVANCE)
+            )
+        return store
+
+
+def file_store_stats() -> Dict[str, Any]:
+    """생성된 저장소 수, 보관한 파일 수, 중복 제거/예산 초과 제거 수"""
+    with _lock:
+        return {'maxBytes': FILE_STORE_MAX_BYTES, **_stats}
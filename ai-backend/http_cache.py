@@ -0,0 +1,212 @@
+"""
+GitHub API 조건부 요청 캐시 (ETag / If-None-Match)
+GitHub는 If-None-Match/If-Modified-Since 요청에 변경이 없으면 본문 없이 304 Not Modified로 답하며,
+304 응답은 rate limit에 포함되지 않습니다. 응답 본문과 ETag를 URL + 토큰 범위별로 로컬 SQLite에 저장해 두고,
+같은 URL을 다시 요청할 때 조건부 헤더를 붙여 304를 받으면 저장한 본문을 그대로 사용합니다.
+
+    entry = get_http_cache().lookup(url, headers)
+    response = requests.get(url, headers=conditional_headers(headers, entry))
+    if response.status_code == 304 and entry is not None:
+        body = get_http_cache().revalidated(entry)              # 저장한 본문 (rate limit 사용 없음)
+    else:
+        get_http_cache().store(url, headers, response.headers, response.content)
+
+multi_step_agent.github_get(동기)과 async_agents._github_get(비동기)이 사용하므로,
+에이전트 파일 읽기, HEAD 확인, 트리 조회와 /api/ai/get-file-content가 같은 캐시를 공유합니다.
+토큰 범위는 Authorization/Accept 헤더의 해시이므로 다른 토큰으로 저장한 본문은 사용하지 않습니다.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+# 조건부 요청 캐시 사용 여부
+GITHUB_HTTP_CACHE_ENABLED = os.getenv('GITHUB_HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+# SQLite 캐시 파일 경로
+GITHUB_HTTP_CACHE_PATH = os.getenv(
+    'GITHUB_HTTP_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'github_http_cache.sqlite3')
+)
+# 보관할 최대 응답 수 (넘으면 가장 오래 사용하지 않은 응답부터 삭제)
+GITHUB_HTTP_CACHE_MAX_ENTRIES = int(os.getenv('GITHUB_HTTP_CACHE_MAX_ENTRIES', '5000'))
+# 저장할 응답 본문의 최대 크기 (바이트, tarball 등 큰 응답은 저장하지 않음)
+GITHUB_HTTP_CACHE_MAX_BODY_BYTES = int(os.getenv('GITHUB_HTTP_CACHE_MAX_BODY_BYTES', str(2 * 1024 * 1024)))
+# 오래된 응답 정리 주기 (저장 횟수)
+PRUNE_EVERY = 100
+
+
+class CachedResponse:
+    """저장된 응답 (검증자 + 본문)"""
+
+    __slots__ = ('url', 'scope', 'etag', 'last_modified', 'content_type', 'body')
+
+    def __init__(self, url: str, scope: str, etag: Optional[str], last_modified: Optional[str], content_type: Optional[str], body: bytes):
+        self.url = url
+        self.scope = scope
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+        self.body = body
+
+
+def request_scope(headers: Mapping[str, str]) -> str:
+    """토큰 범위 (Authorization + Accept 헤더 해시, 토큰 원문은 저장하지 않음)"""
+    material = f"{headers.get('Authorization', '')}\n{headers.get('Accept', '')}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]
+
+
+def conditional_headers(headers: Mapping[str, str], entry: Optional[CachedResponse]) -> Dict[str, str]:
+    """저장된 응답이 있으면 If-None-Match/If-Modified-Since를 붙인 요청 헤더"""
+    request_headers = dict(headers)
+    if entry is not None:
+        if entry.etag:
+            request_headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            request_headers['If-Modified-Since'] = entry.last_modified
+    return request_headers
+
+
+class ConditionalCache:
+    """
+    URL + 토큰 범위별 응답 저장소 (SQLite, 파일을 열 수 없으면 메모리 LRU)
+
+    여러 Flask 워커 스레드에서 공유하므로 모든 접근은 잠금으로 보호합니다.
+    """
+
+    def __init__(self, path: str = GITHUB_HTTP_CACHE_PATH, max_entries: int = GITHUB_HTTP_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = None
+        self._memory: 'OrderedDict[tuple, CachedResponse]' = OrderedDict()
+        self._stores_since_prune = 0
+        self._counters = {'lookups': 0, 'revalidated': 0, 'stored': 0, 'notCacheable': 0, 'savedBytes': 0}
+        self._open_db()
+
+    def _open_db(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS github_http_cache ('
+                'url TEXT NOT NULL, scope TEXT NOT NULL, etag TEXT, last_modified TEXT, content_type TEXT, '
+                'body BLOB NOT NULL, stored_at REAL NOT NULL, used_at REAL NOT NULL, '
+                'PRIMARY KEY (url, scope))'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS github_http_cache_used_at ON github_http_cache (used_at)')
+            self._db.commit()
+        except Exception as e:
+            print(f"[GitHub HTTP Cache] SQLite 저장소를 열 수 없습니다 ({self.path}), 메모리에 저장합니다: {e}")
+            self._db = None
+
+    def lookup(self, url: str, headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        """저장된 응답 (없으면 None)"""
+        if not GITHUB_HTTP_CACHE_ENABLED:
+            return None
+        scope = request_scope(headers)
+        with self._lock:
+            self._counters['lookups'] += 1
+            if self._db is None:
+                return self._memory.get((url, scope))
+            try:
+                row = self._db.execute(
+                    'SELECT etag, last_modified, content_type, body FROM github_http_cache WHERE url = ? AND scope = ?',
+                    (url, scope)
+                ).fetchone()
+            except Exception as e:
+                print(f"[GitHub HTTP Cache] SQLite 조회 실패: {e}")
+                return None
+        if row is None:
+            return None
+        return CachedResponse(url, scope, row[0], row[1], row[2], bytes(row[3]))
+
+    def revalidated(self, entry: CachedResponse) -> bytes:
+        """304 응답을 받은 저장 응답의 본문 (사용 시각 갱신)"""
+        with self._lock:
+            self._counters['revalidated'] += 1
+            self._counters['savedBytes'] += len(entry.body)
+            if self._db is None:
+                self._memory.move_to_end((entry.url, entry.scope))
+            else:
+                try:
+                    self._db.execute(
+                        'UPDATE github_http_cache SET used_at = ? WHERE url = ? AND scope = ?',
+                        (time.time(), entry.url, entry.scope)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    print(f"[GitHub HTTP Cache] SQLite 갱신 실패: {e}")
+        return entry.body
+
+    def store(self, url: str, headers: Mapping[str, str], response_headers: Mapping[str, str], body: bytes):
+        """검증자(ETag/Last-Modified)가 있는 200 응답 저장 (없거나 본문이 너무 크면 저장하지 않음)"""
+        if not GITHUB_HTTP_CACHE_ENABLED:
+            return
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if not (etag or last_modified) or len(body) > GITHUB_HTTP_CACHE_MAX_BODY_BYTES:
+            with self._lock:
+                self._counters['notCacheable'] += 1
+            return
+        entry = CachedResponse(url, request_scope(headers), etag, last_modified, response_headers.get('Content-Type'), body)
+        now = time.time()
+        with self._lock:
+            self._counters['stored'] += 1
+            if self._db is None:
+                self._memory[(entry.url, entry.scope)] = entry
+                self._memory.move_to_end((entry.url, entry.scope))
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+                return
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO github_http_cache '
+                    '(url, scope, etag, last_modified, content_type, body, stored_at, used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (entry.url, entry.scope, etag, last_modified, entry.content_type, sqlite3.Binary(body), now, now)
+                )
+                self._stores_since_prune += 1
+                if self._stores_since_prune >= PRUNE_EVERY:
+                    self._stores_since_prune = 0
+                    # 가장 오래 사용하지 않은 응답부터 정리
+                    self._db.execute(
+                        'DELETE FROM github_http_cache WHERE rowid IN ('
+                        'SELECT rowid FROM github_http_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)',
+                        (self.max_entries,)
+                    )
+                self._db.commit()
+            except Exception as e:
+                print(f"[GitHub HTTP Cache] SQLite 저장 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = len(self._memory)
+            if self._db is not None:
+                try:
+                    stored = self._db.execute('SELECT COUNT(*) FROM github_http_cache').fetchone()[0]
+                except Exception:
+                    stored = None
+            return {'enabled': GITHUB_HTTP_CACHE_ENABLED, 'entries': stored, **self._counters}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> ConditionalCache:
+    """프로세스 공유 조건부 요청 캐시 반환 (최초 호출 시 생성)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ConditionalCache()
+    return _cache
+
+
+def http_cache_stats() -> Dict[str, Any]:
+    """저장된 응답 수, 조회/304 재검증/저장 횟수, 304로 다시 받지 않은 본문 크기"""
+    return get_http_cache().stats()
@@ -0,0 +1,402 @@
+"""
+LLM 응답 캐시
+같은 프롬프트에 대한 LLM 응답을 재사용합니다.
+- 1단계: 메모리 LRU (응답 크기 기준으로 제거)
+- 2단계: SQLite 파일 (서버 재시작 후에도 유지)
+
+캐시 키는 (모델, 시스템 프롬프트, 프롬프트 해시, max_tokens, 샘플링 옵션)입니다.
+TTL은 호출 목적(purpose, 보통 에이전트 타입)별로 다르게 적용하며,
+cache_policy()로 현재 실행 컨텍스트의 목적과 캐시 우회 여부를 지정합니다.
+출력 형식(JSON/스키마)이 지정된 호출은 파싱할 수 있는 응답만 저장합니다 (잘린/깨진 JSON은 다시 생성).
+
+    with cache_policy(purpose='intent_classification'):
+        call_llm(prompt, system_prompt)
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from structured_output import GENERIC_JSON, current_format, parse_json_response
+
+# 캐시 사용 여부 (false면 모든 호출이 LLM으로 바로 전달됨)
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+# SQLite 캐시 파일 경로
+LLM_CACHE_PATH = os.getenv(
+    'LLM_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'llm_cache.sqlite3')
+)
+# 메모리 캐시 최대 크기 (바이트)
+LLM_CACHE_MEMORY_BYTES = int(os.getenv('LLM_CACHE_MEMORY_BYTES', str(32 * 1024 * 1024)))
+# 목적이 지정되지 않은 호출의 TTL (초)
+LLM_CACHE_DEFAULT_TTL = float(os.getenv('LLM_CACHE_DEFAULT_TTL', '3600'))
+
+# 목적별 TTL (초, 0이면 캐시하지 않음)
+# 프롬프트에 프로젝트 데이터(커밋, Task, 파일 내용)가 포함되므로 데이터가 바뀌면 키도 바뀝니다.
+DEFAULT_PURPOSE_TTLS = {
+    'intent_classification': 86400,
+    'task_suggestion_agent': 3600,
+    'progress_analysis_agent': 1800,
+    'task_completion_agent': 900,
+    'general_qa_agent': 3600,
+    'task_assignment_agent': 1800,
+    'sufficiency_evaluation': 1800,
+    'evidence_verification': 3600,
+}
+
+
+def _parse_purpose_ttls(value: str) -> Dict[str, float]:
+    """LLM_CACHE_TTLS 환경 변수 파싱 (예: "intent_classification=86400,task_completion_agent=0")"""
+    ttls = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        purpose, ttl = item.split('=', 1)
+        try:
+            ttls[purpose.strip()] = float(ttl)
+        except ValueError:
+            print(f"[LLM Cache] 잘못된 TTL 설정 무시: {item}")
+    return ttls
+
+
+LLM_CACHE_TTLS = {**DEFAULT_PURPOSE_TTLS, **_parse_purpose_ttls(os.getenv('LLM_CACHE_TTLS', ''))}
+
+# 현재 실행 컨텍스트의 캐시 정책 {"purpose": str, "bypass": bool}
+_cache_policy: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar('llm_cache_policy', default={})
+
+
+@contextmanager
+def cache_policy(purpose: Optional[str] = None, bypass: Optional[bool] = None):
+    """
+    블록 안의 LLM 호출에 적용할 캐시 정책 지정 (지정하지 않은 값은 바깥 정책을 유지)
+
+    Args:
+        purpose: 호출 목적 (TTL 선택에 사용, 보통 에이전트 타입)
+        bypass: True면 캐시를 읽지도 저장하지도 않음
+    """
+    policy = dict(_cache_policy.get())
+    if purpose is not None:
+        policy['purpose'] = purpose
+    if bypass is not None:
+        policy['bypass'] = policy.get('bypass', False) or bypass
+    token = _cache_policy.set(policy)
+    try:
+        yield
+    finally:
+        _cache_policy.reset(token)
+
+
+def bypass_requested() -> bool:
+    """현재 정책이 캐시 우회를 요청했는지 여부"""
+    return bool(_cache_policy.get().get('bypass'))
+
+
+def wants_cache_bypass(body: Optional[Dict[str, Any]], headers) -> bool:
+    """요청 본문의 noCache 플래그 또는 Cache-Control: no-cache 헤더 확인"""
+    if body and body.get('noCache'):
+        return True
+    return 'no-cache' in (headers.get('Cache-Control') or '').lower()
+
+
+def make_cache_key(
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    max_tokens: int,
+    options: Optional[Dict[str, Any]] = None
+) -> str:
+    """캐시 키 생성"""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    material = json.dumps(
+        [model, system_prompt, prompt_hash, max_tokens, options or {}],
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    메모리 LRU + SQLite 2단계 응답 캐시
+
+    조회 순서는 메모리 -> SQLite이며, SQLite에서 찾은 응답은 메모리로 올립니다.
+    여러 Flask 워커 스레드에서 공유하므로 모든 접근은 잠금으로 보호합니다.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, memory_bytes: int = LLM_CACHE_MEMORY_BYTES):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        # {키: (응답, 만료 시각, 크기)}
+        self._memory: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'stores': 0,
+            'rejected': 0,
+            'evictions': 0,
+        }
+        self._purpose_counters: Dict[str, Dict[str, int]] = {}
+        self._open_db()
+
+    def _open_db(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS llm_responses ('
+                'key TEXT PRIMARY KEY, response TEXT NOT NULL, model TEXT, purpose TEXT, '
+                'created_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            # 만료된 항목 정리
+            self._db.execute('DELETE FROM llm_responses WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+        except Exception as e:
+            # 디스크 캐시를 사용할 수 없어도 메모리 캐시는 동작
+            print(f"[LLM Cache] SQLite 캐시를 열 수 없습니다 ({self.path}): {e}")
+            self._db = None
+
+    def _count(self, counter: str, purpose: Optional[str] = None):
+        self._counters[counter] += 1
+        if purpose:
+            per_purpose = self._purpose_counters.setdefault(purpose, {'hits': 0, 'misses': 0})
+            if counter in ('memory_hits', 'disk_hits'):
+                per_purpose['hits'] += 1
+            elif counter == 'misses':
+                per_purpose['misses'] += 1
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        """메모리 캐시에 저장 (잠금을 잡은 상태에서 호출)"""
+        size = len(key) + len(response.encode('utf-8'))
+        if size > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old:
+            self._memory_size -= old[2]
+        self._memory[key] = (response, expires_at, size)
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes and self._memory:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_size -= evicted_size
+            self._counters['evictions'] += 1
+
+    def get(self, key: str, purpose: Optional[str] = None) -> Optional[str]:
+        """캐시된 응답 반환 (없거나 만료되었으면 None)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                response, expires_at, size = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count('memory_hits', purpose)
+                    return response
+                del self._memory[key]
+                self._memory_size -= size
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        'SELECT response, expires_at FROM llm_responses WHERE key = ?', (key,)
+                    ).fetchone()
+                except Exception as e:
+                    print(f"[LLM Cache] SQLite 조회 실패: {e}")
+                    row = None
+                if row and row[1] > now:
+                    self._remember(key, row[0], row[1])
+                    self._count('disk_hits', purpose)
+                    return row[0]
+
+            self._count('misses', purpose)
+            return None
+
+    def set(self, key: str, response: str, ttl: float, model: str = '', purpose: Optional[str] = None):
+        """응답 저장 (메모리와 SQLite 모두)"""
+        if not response or ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, response, expires_at)
+            self._counters['stores'] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO llm_responses (key, response, model, purpose, created_at, expires_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?)',
+                        (key, response, model, purpose, now, expires_at)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    print(f"[LLM Cache] SQLite 저장 실패: {e}")
+
+    def record_bypass(self):
+        with self._lock:
+            self._counters['bypassed'] += 1
+
+    def record_rejected(self):
+        with self._lock:
+            self._counters['rejected'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            counters = dict(self._counters)
+            hits = counters['memory_hits'] + counters['disk_hits']
+            lookups = hits + counters['misses']
+            disk_entries = None
+            if self._db is not None:
+                try:
+                    disk_entries = self._db.execute('SELECT COUNT(*) FROM llm_responses').fetchone()[0]
+                except Exception:
+                    pass
+            return {
+                'enabled': LLM_CACHE_ENABLED,
+                **counters,
+                'hits': hits,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_size,
+                'memory_max_bytes': self.memory_bytes,
+                'disk_entries': disk_entries,
+                'by_purpose': {purpose: dict(c) for purpose, c in self._purpose_counters.items()},
+            }
+
+    def clear(self):
+        """메모리/디스크 캐시 모두 비우기"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM llm_responses')
+                self._db.commit()
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """프로세스 공유 캐시 반환 (최초 호출 시 생성)"""
+    global _llm_cache
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache()
+    return _llm_cache
+
+
+def _current_ttl() -> Tuple[Optional[float], Optional[str]]:
+    """현재 정책의 (TTL, 목적) 반환. TTL이 None이면 캐시를 사용하지 않음"""
+    policy = _cache_policy.get()
+    purpose = policy.get('purpose')
+    if not LLM_CACHE_ENABLED or policy.get('bypass'):
+        return None, purpose
+    ttl = LLM_CACHE_TTLS.get(purpose, LLM_CACHE_DEFAULT_TTL) if purpose else LLM_CACHE_DEFAULT_TTL
+    if ttl <= 0:
+        return None, purpose
+    return ttl, purpose
+
+
+def lookup(
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    max_tokens: int,
+    options: Optional[Dict[str, Any]] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    캐시 조회
+
+    Returns:
+        (캐시 키, 캐시된 응답). 캐시를 사용하지 않는 호출이면 키가 None입니다.
+    """
+    ttl, purpose = _current_ttl()
+    if ttl is None:
+        if LLM_CACHE_ENABLED:
+            get_llm_cache().record_bypass()
+        return None, None
+    key = make_cache_key(model, system_prompt, prompt, max_tokens, options)
+    return key, get_llm_cache().get(key, purpose)
+
+
+def usable_response(response: Optional[str]) -> bool:
+    """
+    캐시에 저장해도 되는 응답인지 (빈 응답은 저장하지 않음)
+
+    출력 형식(structured_output.response_format)이 지정된 호출은 JSON으로 파싱되고 스키마의
+    최상위 타입이 맞는 응답만 저장합니다. 잘리거나 깨진 JSON을 저장하면 TTL 동안 같은 질문에
+    같은 실패 응답이 반환되므로, 저장하지 않고 다음 호출에서 다시 생성합니다.
+    """
+    if not response or not response.strip():
+        return False
+    output_format = current_format()
+    if output_format is None:
+        return True
+    try:
+        parse_json_response(response, None if output_format == GENERIC_JSON else output_format)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def store(key: Optional[str], response: str, model: str = ''):
+    """lookup()에서 받은 키로 응답 저장 (키가 None이거나 쓸 수 없는 응답이면 무시)"""
+    if key is None:
+        return
+    ttl, purpose = _current_ttl()
+    if ttl is None:
+        return
+    if not usable_response(response):
+        print(f"[LLM Cache] 형식에 맞지 않는 응답은 저장하지 않음 (목적: {purpose or '없음'}, 응답 길이: {len(response or '')})")
+        get_llm_cache().record_rejected()
+        return
+    get_llm_cache().set(key, response, ttl, model, purpose)
+
+
+def cached_call(
+    model: str,
+    prompt: str,
+    system_prompt: str,
+    max_tokens: int,
+    options: Optional[Dict[str, Any]],
+    produce: Callable[[], str]
+) -> str:
+    """캐시에 있으면 반환하고, 없으면 produce()로 생성하여 저장"""
+    key, cached = lookup(model, system_prompt, prompt, max_tokens, options)
+    if cached is not None:
+        print(f"[LLM Cache] 캐시 적중 (모델: {model}, 응답 길이: {len(cached)})")
+        return cached
+    response = produce()
+    store(key, response, model)
+    return response
+
+
+async def acached_call(
+    model: str,
+    prompt: str,
+    system_prompt: str,
+    max_tokens: int,
+    options: Optional[Dict[str, Any]],
+    produce: Callable[[], Awaitable[str]]
+) -> str:
+    """cached_call의 비동기 버전 (SQLite 조회는 기본 키 조회라 이벤트 루프에서 바로 수행)"""
+    key, cached = lookup(model, system_prompt, prompt, max_tokens, options)
+    if cached is not None:
+        print(f"[LLM Cache] 캐시 적중 (모델: {model}, 응답 길이: {len(cached)})")
+        return cached
+    response = await produce()
+    store(key, response, model)
+    return response
@@ -0,0 +1,840 @@
+"""
+LLM 클라이언트
+Ollama/OpenAI 호출을 한 곳에서 관리합니다.
+- keep-alive 연결 풀을 공유하는 httpx.Client 사용 (호출마다 새 연결을 열지 않음)
+- Ollama 모델 설치 여부를 TTL 동안 캐시 (404 또는 연결 오류 시에만 재확인)
+- ASGI(asgi.py) 경로를 위한 httpx.AsyncClient 기반 비동기 호출 (acall_llm, acall_llm_streaming)
+- 응답 캐시(llm_cache) 적용: 같은 (모델, 프롬프트, 옵션) 호출은 저장된 응답을 재사용
+- 여러 Ollama 서버(OLLAMA_BASE_URLS)에 부하 분산, 연결 실패 시 다른 서버로 재시도 (ollama_pool)
+app.py, agent_router.py, multi_step_agent.py가 모두 이 모듈을 통해 LLM을 호출합니다.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+
+import httpx
+from dotenv import load_dotenv
+
+import llm_cache
+from llm_scheduler import get_llm_scheduler
+from model_router import current_model
+from token_budget import estimate_tokens, num_ctx_for
+from ollama_pool import FAILOVER_ERRORS, UNAVAILABLE_STATUS_CODES, OllamaPool, parse_base_urls, raise_for_node_status
+from resilience import RetryPolicy, retry_after_seconds
+from single_flight import llm_flight
+from structured_output import JsonCompletionTracker, current_format, ollama_format, openai_response_format
+from agent_events import emit, has_event_sink
+
+# 다른 모듈보다 먼저 import될 수 있으므로 여기서도 환경 변수 로드
+load_dotenv()
+
+# Ollama 설정 (로컬 모델)
+OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+# 여러 Ollama 서버를 쓸 때 쉼표로 구분 (지정하지 않으면 OLLAMA_BASE_URL 하나만 사용)
+OLLAMA_BASE_URLS = parse_base_urls(os.getenv('OLLAMA_BASE_URLS', '') or OLLAMA_BASE_URL)
+# 서버 상태 확인(/api/tags) 주기, 장애 서버 제외 시간 (초), 제외까지의 연속 실패 수
+OLLAMA_HEALTH_CHECK_INTERVAL = float(os.getenv('OLLAMA_HEALTH_CHECK_INTERVAL', '15'))
+OLLAMA_EJECT_SECONDS = float(os.getenv('OLLAMA_EJECT_SECONDS', '30'))
+OLLAMA_FAILURE_THRESHOLD = int(os.getenv('OLLAMA_FAILURE_THRESHOLD', '2'))
+# 모든 서버 요청이 실패했을 때 전체 시도 횟수 (지수 백오프 + 지터, 서킷 브레이커가 모두 열리면 중단)
+LLM_RETRY = RetryPolicy(int(os.getenv('LLM_RETRY_ATTEMPTS', '3')))
+# 모델별 num_ctx를 줄이지 않고 유지 (창 크기 변경으로 인한 모델 재로드 방지)
+LLM_NUM_CTX_STICKY = os.getenv('LLM_NUM_CTX_STICKY', 'true').lower() == 'true'
+# JSON 응답을 기대하는 호출은 스트리밍으로 받으면서 최상위 JSON이 닫히는 즉시 생성 중단
+LLM_JSON_EARLY_STOP = os.getenv('LLM_JSON_EARLY_STOP', 'true').lower() == 'true'
+# 모델 옵션: qwen2.5:7b (빠름), qwen2.5:3b (매우 빠름), qwen2.5:14b (정확함)
+OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen2.5:14b')  # 기본값을 14b 모델로 변경
+# 모델 설치 확인 결과 캐시 유지 시간 (초, 설치된 경우만 캐시)
+OLLAMA_MODEL_CHECK_TTL = float(os.getenv('OLLAMA_MODEL_CHECK_TTL', '600'))
+# 연결 풀 크기
+OLLAMA_MAX_CONNECTIONS = int(os.getenv('OLLAMA_MAX_CONNECTIONS', '10'))
+# 요청 후 모델(과 프롬프트 KV 캐시)을 메모리에 유지하는 시간 (Ollama 기본값 5m)
+# 다단계 에이전트는 같은 접두부로 여러 번 호출하므로 단계 사이에 모델이 내려가지 않도록 길게 유지
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')
+# 임베딩 모델 (embedding_index 참고)
+OLLAMA_EMBED_MODEL = os.getenv('OLLAMA_EMBED_MODEL', 'nomic-embed-text')
+
+DEFAULT_SYSTEM_PROMPT = "당신은 도움이 되는 AI 어시스턴트입니다."
+
+# OpenAI 설정 (클라우드 모델 사용 시, 선택사항)
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', None)
+OPENAI_MODEL = 'gpt-3.5-turbo'
+OPENAI_TEMPERATURE = 0.7
+USE_OPENAI = os.getenv('USE_OPENAI', 'false').lower() == 'true' and OPENAI_API_KEY is not None
+
+if USE_OPENAI:
+    try:
+        from openai import AsyncOpenAI, OpenAI
+        openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        async_openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        print("OpenAI 모드로 실행됩니다.")
+    except ImportError:
+        openai_client = None
+        async_openai_client = None
+        USE_OPENAI = False
+        print("Warning: OpenAI library not installed. Ollama를 사용합니다.")
+else:
+    openai_client = None
+    async_openai_client = None
+    print(f"Ollama 모드로 실행됩니다. (모델: {OLLAMA_MODEL})")
+
+
+class LLMClient:
+    """
+    Ollama 호출용 공유 클라이언트
+
+    프로세스 전체에서 하나의 인스턴스를 공유합니다 (get_llm_client() 사용).
+    httpx.Client는 스레드 안전하므로 Flask 워커 스레드 간에 그대로 공유합니다.
+    비동기 메서드(achat, achat_stream)는 처음 사용될 때 httpx.AsyncClient를 만들어
+    ASGI 이벤트 루프 안에서 공유하며, 모델 확인 캐시는 동기 경로와 함께 사용합니다.
+    Ollama 서버가 여러 대면 요청마다 진행 중인 요청이 가장 적은 서버를 고릅니다 (OllamaPool).
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str] = OLLAMA_BASE_URLS,
+        model: str = OLLAMA_MODEL,
+        model_check_ttl: float = OLLAMA_MODEL_CHECK_TTL,
+        max_connections: int = OLLAMA_MAX_CONNECTIONS,
+        timeout: float = 300.0  # 5분 (큰 모델의 경우 더 오래 걸릴 수 있음)
+    ):
+        self.model = model
+        self.model_check_ttl = model_check_ttl
+        self.timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0
+        )
+        # 서버별 연결 풀 (동기 httpx.Client, 비동기 httpx.AsyncClient는 처음 사용할 때 생성)
+        self.pool = OllamaPool(
+            base_urls,
+            timeout=timeout,
+            limits=self._limits,
+            health_check_interval=OLLAMA_HEALTH_CHECK_INTERVAL,
+            eject_seconds=OLLAMA_EJECT_SECONDS,
+            failure_threshold=OLLAMA_FAILURE_THRESHOLD
+        )
+        self.pool.start_health_checks()
+        # 모델 설치 확인 캐시: {모델명: (확인 시각, True)} (설치되지 않은 결과는 캐시하지 않고 매번 다시 확인)
+        self._model_checks = {}
+        # 모델별 마지막으로 사용한 num_ctx
+        self._num_ctx = {}
+        # JSON 조기 종료 집계
+        self._early_stop = {'json_calls': 0, 'early_stops': 0, 'tokens_generated': 0, 'tokens_saved': 0}
+        self._lock = threading.Lock()
+
+    def check_model(self, model: Optional[str] = None, force: bool = False) -> bool:
+        """Ollama 모델이 설치되어 있는지 확인 (TTL 캐시 사용)"""
+        model = model or self.model
+        now = time.time()
+        with self._lock:
+            cached = self._model_checks.get(model)
+        if cached and not force and now - cached[0] < self.model_check_ttl:
+            return True
+
+        # 모든 서버의 /api/tags를 확인하고, 모델이 설치된 정상 서버가 하나라도 있으면 사용 가능
+        self.pool.check_health()
+        available = self.pool.has_model(model)
+        if not available and not self.pool.any_reachable():
+            print(f"Ollama 모델 확인 실패: 연결 가능한 서버 없음 ({', '.join(self.pool.base_urls)})")
+            # 확인 실패는 캐시하지 않음 (다음 호출에서 다시 확인)
+            return False
+
+        # 설치된 경우만 캐시 (방금 pull한 모델을 TTL 동안 없는 것으로 보지 않도록)
+        with self._lock:
+            if available:
+                self._model_checks[model] = (now, True)
+            else:
+                self._model_checks.pop(model, None)
+        return available
+
+    async def acheck_model(self, model: Optional[str] = None, force: bool = False) -> bool:
+        """check_model의 비동기 버전 (캐시 공유)"""
+        model = model or self.model
+        now = time.time()
+        with self._lock:
+            cached = self._model_checks.get(model)
+        if cached and not force and now - cached[0] < self.model_check_ttl:
+            return True
+
+        await self.pool.acheck_health()
+        available = self.pool.has_model(model)
+        if not available and not self.pool.any_reachable():
+            print(f"Ollama 모델 확인 실패: 연결 가능한 서버 없음 ({', '.join(self.pool.base_urls)})")
+            return False
+
+        with self._lock:
+            if available:
+                self._model_checks[model] = (now, True)
+            else:
+                self._model_checks.pop(model, None)
+        return available
+
+    def invalidate_model_cache(self, model: Optional[str] = None):
+        """모델 확인 캐시 무효화 (404 또는 연결 오류 발생 시 호출)"""
+        with self._lock:
+            if model:
+                self._model_checks.pop(model, None)
+            else:
+                self._model_checks.clear()
+
+    def _build_request(self, prompt, system_prompt, max_tokens, model, stream):
+        # 프롬프트 + 응답이 들어가는 가장 작은 컨텍스트 창 (Ollama 기본 2048에서 잘리거나 불필요하게 크게 잡지 않도록)
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        num_ctx = num_ctx_for(prompt_tokens, max_tokens, model)
+        if LLM_NUM_CTX_STICKY:
+            # num_ctx가 바뀌면 Ollama가 모델을 다시 로드하므로(KV 캐시 손실) 이미 쓴 창보다 줄이지 않음
+            with self._lock:
+                num_ctx = max(num_ctx, self._num_ctx.get(model, 0))
+                self._num_ctx[model] = num_ctx
+        print(f'[LLM Client] call_ollama - 추정 입력 토큰: {prompt_tokens}, num_ctx: {num_ctx}')
+        if prompt_tokens + max_tokens > num_ctx:
+            print(f'[LLM Client] 경고: 프롬프트가 컨텍스트 창({num_ctx})보다 길어 앞부분이 잘릴 수 있습니다.')
+        request_data = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "stream": stream,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "num_predict": max_tokens,  # Ollama에서 토큰 제한 설정
+                "num_ctx": num_ctx
+            }
+        }
+        # 응답 형식이 지정된 요청은 JSON 스키마로 생성을 제한 (structured_output.response_format)
+        output_format = ollama_format()
+        if output_format is not None:
+            request_data["format"] = output_format
+        return request_data
+
+    def _raise_if_unavailable(self):
+        if not self.pool.any_available():
+            raise self.pool.unavailable_error()
+
+    def _ensure_model(self, model, prompt, system_prompt, max_tokens):
+        # 모든 서버의 서킷 브레이커가 열려 있으면 상태 확인도 보내지 않고 바로 실패
+        self._raise_if_unavailable()
+        # 모델 확인 (캐시된 결과 사용)
+        if not self.check_model(model):
+            self._raise_if_unavailable()
+            raise Exception(f"Ollama 모델 '{model}'이 설치되지 않았습니다. 다음 명령어로 설치하세요: ollama pull {model}")
+        self._log_call(model, prompt, system_prompt, max_tokens)
+
+    async def _aensure_model(self, model, prompt, system_prompt, max_tokens):
+        self._raise_if_unavailable()
+        if not await self.acheck_model(model):
+            self._raise_if_unavailable()
+            raise Exception(f"Ollama 모델 '{model}'이 설치되지 않았습니다. 다음 명령어로 설치하세요: ollama pull {model}")
+        self._log_call(model, prompt, system_prompt, max_tokens)
+
+    def _log_call(self, model, prompt, system_prompt, max_tokens):
+        print(f'[LLM Client] call_ollama - 프롬프트 길이: {len(prompt)} 문자, 시스템 프롬프트: {len(system_prompt)} 문자')
+        print(f'[LLM Client] call_ollama - Ollama URL: {", ".join(self.pool.base_urls)}, 모델: {model}, max_tokens: {max_tokens}')
+
+    def _translate_error(self, e: Exception, model: str) -> Exception:
+        """httpx 예외를 사용자에게 보여줄 메시지로 변환"""
+        if isinstance(e, httpx.HTTPStatusError):
+            if e.response.status_code == 404:
+                # 모델이 삭제되었을 수 있으므로 다음 호출에서 다시 확인
+                self.invalidate_model_cache(model)
+                return Exception(f"Ollama 모델 '{model}'을 찾을 수 없습니다. 다음 명령어로 설치하세요: ollama pull {model}")
+            try:
+                detail = e.response.text
+            except httpx.ResponseNotRead:
+                detail = ''
+            return Exception(f"Ollama API 오류 ({e.response.status_code}): {detail}")
+        if isinstance(e, httpx.RequestError):
+            # 서버 재시작 등으로 모델 상태가 바뀌었을 수 있음
+            self.invalidate_model_cache(model)
+            return Exception(f"Ollama 서버 연결 실패: {e}. Ollama가 실행 중인지 확인하세요. (ollama serve)")
+        return e
+
+    def chat(
+        self,
+        prompt: str,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_tokens: int = 2000,
+        model: Optional[str] = None
+    ) -> str:
+        """Ollama /api/chat 호출 후 응답 텍스트 반환"""
+        model = model or self.model
+        if self._json_tracker() is not None:
+            # JSON 응답은 스트리밍으로 받아 최상위 값이 닫히면 중단 (뒤에 붙는 설명문 생성 비용 절약)
+            return ''.join(self.chat_stream(prompt, system_prompt, max_tokens, model=model))
+        try:
+            self._ensure_model(model, prompt, system_prompt, max_tokens)
+            request_data = self._build_request(prompt, system_prompt, max_tokens, model, stream=False)
+            # 생성 요청은 스케줄러 슬롯을 얻은 뒤에 보냄 (우선순위 순서, 동시 실행 수 제한)
+            with get_llm_scheduler().slot():
+                response = self._post_with_failover(model, request_data)
+            response.raise_for_status()
+            return response.json()["message"]["content"]
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            raise self._translate_error(e, model)
+        except Exception as e:
+            print(f"Ollama API 호출 오류: {str(e)}")
+            raise
+
+    def chat_stream(
+        self,
+        prompt: str,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_tokens: int = 2000,
+        model: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Ollama /api/chat을 stream: true로 호출하여 생성되는 텍스트 조각을 순서대로 반환
+
+        Ollama는 줄 단위 JSON(NDJSON)으로 {"message": {"content": "..."}, "done": false}를 보냅니다.
+        응답 형식(JSON)이 지정된 호출은 최상위 JSON 값이 닫히면 연결을 끊어 생성을 중단합니다.
+        """
+        model = model or self.model
+        tracker = self._json_tracker()
+        generated = 0
+        stopped_early = False
+        try:
+            self._ensure_model(model, prompt, system_prompt, max_tokens)
+            request_data = self._build_request(prompt, system_prompt, max_tokens, model, stream=True)
+            with get_llm_scheduler().slot():
+                # 모든 서버가 연결 단계에서 실패하면 지터 백오프 후 다시 시도
+                for attempt in range(LLM_RETRY.attempts):
+                    last_error = None
+                    for node in self.pool.attempts(model):
+                        try:
+                            with self.pool.lease(node), node.http.stream("POST", "/api/chat", json=request_data) as response:
+                                if response.status_code >= 400:
+                                    response.read()
+                                self._check_response(node, response)
+                                for line in response.iter_lines():
+                                    if not line:
+                                        continue
+                                    chunk = json.loads(line)
+                                    if chunk.get("error"):
+                                        raise Exception(f"Ollama 스트리밍 오류: {chunk['error']}")
+                                    content = chunk.get("message", {}).get("content", "")
+                                    generated += 1
+                                    end = tracker.feed(content) if tracker is not None and content else None
+                                    if end is not None:
+                                        # 응답을 닫으면 Ollama가 남은 생성을 취소함
+                                        stopped_early = not chunk.get("done")
+                                        if content[:end]:
+                                            yield content[:end]
+                                        break
+                                    if content:
+                                        yield content
+                                    if chunk.get("done"):
+                                        break
+                            if tracker is not None:
+                                self._record_json_call(model, generated, max_tokens, stopped_early)
+                            return
+                        except FAILOVER_ERRORS as e:
+                            # 연결 단계에서 실패 (아직 토큰을 보내지 않음) -> 다른 서버로 재시도
+                            self._record_failover(node, e)
+                            last_error = e
+                        except httpx.TransportError as e:
+                            # 응답 도중 실패 (이미 생성 중이었을 수 있으므로 다시 보내지 않음)
+                            self.pool.record_failure(node, e)
+                            raise
+                    time.sleep(self._retry_delay(attempt, last_error))
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            raise self._translate_error(e, model)
+        except Exception as e:
+            print(f"Ollama 스트리밍 호출 오류: {str(e)}")
+            raise
+
+    async def achat(
+        self,
+        prompt: str,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_tokens: int = 2000,
+        model: Optional[str] = None
+    ) -> str:
+        """chat의 비동기 버전"""
+        model = model or self.model
+        if self._json_tracker() is not None:
+            return ''.join([piece async for piece in self.achat_stream(prompt, system_prompt, max_tokens, model=model)])
+        try:
+            await self._aensure_model(model, prompt, system_prompt, max_tokens)
+            request_data = self._build_request(prompt, system_prompt, max_tokens, model, stream=False)
+            async with get_llm_scheduler().aslot():
+                response = await self._apost_with_failover(model, request_data)
+            response.raise_for_status()
+            return response.json()["message"]["content"]
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            raise self._translate_error(e, model)
+        except Exception as e:
+            print(f"Ollama API 호출 오류: {str(e)}")
+            raise
+
+    async def achat_stream(
+        self,
+        prompt: str,
+        system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+        max_tokens: int = 2000,
+        model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """chat_stream의 비동기 버전"""
+        model = model or self.model
+        tracker = self._json_tracker()
+        generated = 0
+        stopped_early = False
+        try:
+            await self._aensure_model(model, prompt, system_prompt, max_tokens)
+            request_data = self._build_request(prompt, system_prompt, max_tokens, model, stream=True)
+            async with get_llm_scheduler().aslot():
+                # 모든 서버가 연결 단계에서 실패하면 지터 백오프 후 다시 시도
+                for attempt in range(LLM_RETRY.attempts):
+                    last_error = None
+                    for node in self.pool.attempts(model):
+                        try:
+                            with self.pool.lease(node):
+                                async with node.get_async_http().stream("POST", "/api/chat", json=request_data) as response:
+                                    if response.status_code >= 400:
+                                        await response.aread()
+                                    self._check_response(node, response)
+                                    async for line in response.aiter_lines():
+                                        if not line:
+                                            continue
+                                        chunk = json.loads(line)
+                                        if chunk.get("error"):
+                                            raise Exception(f"Ollama 스트리밍 오류: {chunk['error']}")
+                                        content = chunk.get("message", {}).get("content", "")
+                                        generated += 1
+                                        end = tracker.feed(content) if tracker is not None and content else None
+                                        if end is not None:
+                                            stopped_early = not chunk.get("done")
+                                            if content[:end]:
+                                                yield content[:end]
+                                            break
+                                        if content:
+                                            yield content
+                                        if chunk.get("done"):
+                                            break
+                            if tracker is not None:
+                                self._record_json_call(model, generated, max_tokens, stopped_early)
+                            return
+                        except FAILOVER_ERRORS as e:
+                            self._record_failover(node, e)
+                            last_error = e
+                        except httpx.TransportError as e:
+                            # 응답 도중 실패 (이미 생성 중이었을 수 있으므로 다시 보내지 않음)
+                            self.pool.record_failure(node, e)
+                            raise
+                    await asyncio.sleep(self._retry_delay(attempt, last_error))
+        except (httpx.HTTPStatusError, httpx.RequestError) as e:
+            raise self._translate_error(e, model)
+        except Exception as e:
+            print(f"Ollama 스트리밍 호출 오류: {str(e)}")
+            raise
+
+    def _json_tracker(self) -> Optional[JsonCompletionTracker]:
+        """JSON 응답 형식이 지정된 호출이면 조기 종료용 추적기 반환"""
+        if LLM_JSON_EARLY_STOP and current_format() is not None:
+            return JsonCompletionTracker()
+        return None
+
+    def _record_json_call(self, model, generated, max_tokens, stopped_early):
+        """
+        JSON 호출의 생성 토큰 수 집계 (Ollama 스트리밍은 조각 하나가 토큰 하나)
+
+        절약한 토큰은 num_predict 한도까지 남은 양으로 계산합니다 (조기 종료하지 않았다면 생성될 수 있었던 최대치).
+        """
+        saved = max(0, max_tokens - generated) if stopped_early else 0
+        with self._lock:
+            self._early_stop['json_calls'] += 1
+            self._early_stop['tokens_generated'] += generated
+            if stopped_early:
+                self._early_stop['early_stops'] += 1
+                self._early_stop['tokens_saved'] += saved
+        if stopped_early:
+            print(f"[LLM Client] JSON 완료 후 생성 중단 (모델: {model}, 생성 토큰: {generated}, 절약 토큰: 최대 {saved})")
+
+    def early_stop_stats(self) -> dict:
+        """JSON 호출 수, 조기 종료 수, 생성/절약 토큰 수"""
+        with self._lock:
+            stats = dict(self._early_stop)
+        stats['enabled'] = LLM_JSON_EARLY_STOP
+        return stats
+
+    def _record_failover(self, node, error):
+        self.pool.record_failure(node, error)
+        if len(self.pool.nodes) > 1:
+            print(f"[LLM Client] Ollama 서버 연결 실패, 다른 서버로 재시도: {node.base_url} ({error})")
+
+    def _check_response(self, node, response: httpx.Response):
+        """응답 상태 확인 (과부하/장애 응답이 아니면 노드 성공으로 기록)"""
+        if response.status_code not in UNAVAILABLE_STATUS_CODES:
+            self.pool.record_success(node)
+        raise_for_node_status(response)
+
+    def _retry_delay(self, attempt: int, last_error: Optional[Exception]) -> float:
+        """
+        모든 서버 요청이 실패한 뒤 다음 시도까지 대기 시간
+
+        보낼 수 있는 서버가 없었으면(모든 서킷 브레이커 열림) CircuitOpenError,
+        마지막 시도였으면 마지막 오류를 발생시킵니다.
+        """
+        if last_error is None:
+            raise self.pool.unavailable_error()
+        if attempt + 1 >= LLM_RETRY.attempts:
+            raise last_error
+        delay = LLM_RETRY.delay(attempt, retry_after_seconds(last_error))
+        print(f"[LLM Client] 모든 Ollama 서버 요청 실패, {delay:.2f}초 후 재시도 ({attempt + 1}/{LLM_RETRY.attempts - 1}): {last_error}")
+        return delay
+
+    def embed(self, texts: Sequence[str], model: Optional[str] = None) -> List[List[float]]:
+        """Ollama /api/embed로 여러 텍스트를 한 번의 요청으로 임베딩 (텍스트 순서대로 벡터 반환)"""
+        model = model or OLLAMA_EMBED_MODEL
+        request_data = {"model": model, "input": list(texts), "keep_alive": OLLAMA_KEEP_ALIVE}
+        response = self._post_with_failover(model, request_data, path="/api/embed")
+        embeddings = response.json().get('embeddings') or []
+        if len(embeddings) != len(texts):
+            raise ValueError(f"임베딩 수가 텍스트 수와 다릅니다 ({len(embeddings)}/{len(texts)})")
+        return embeddings
+
+    def _post_with_failover(self, model, request_data, path: str = "/api/chat") -> httpx.Response:
+        """
+        진행 중인 요청이 가장 적은 서버로 요청 (기본 /api/chat)
+
+        연결 실패나 과부하 응답(502/503/504)이면 다음 서버로, 모든 서버가 실패하면 백오프 후 다시 시도합니다.
+        """
+        for attempt in range(LLM_RETRY.attempts):
+            last_error = None
+            for node in self.pool.attempts(model):
+                try:
+                    with self.pool.lease(node):
+                        response = node.http.post(path, json=request_data)
+                    self._check_response(node, response)
+                    return response
+                except FAILOVER_ERRORS as e:
+                    self._record_failover(node, e)
+                    last_error = e
+                except httpx.TransportError as e:
+                    # 요청을 보낸 뒤 실패 (생성이 진행 중이었을 수 있으므로 다시 보내지 않음)
+                    self.pool.record_failure(node, e)
+                    raise
+            time.sleep(self._retry_delay(attempt, last_error))
+
+    async def _apost_with_failover(self, model, request_data) -> httpx.Response:
+        """_post_with_failover의 비동기 버전"""
+        for attempt in range(LLM_RETRY.attempts):
+            last_error = None
+            for node in self.pool.attempts(model):
+                try:
+                    with self.pool.lease(node):
+                        response = await node.get_async_http().post("/api/chat", json=request_data)
+                    self._check_response(node, response)
+                    return response
+                except FAILOVER_ERRORS as e:
+                    self._record_failover(node, e)
+                    last_error = e
+                except httpx.TransportError as e:
+                    self.pool.record_failure(node, e)
+                    raise
+            await asyncio.sleep(self._retry_delay(attempt, last_error))
+
+    def close(self):
+        self.pool.close()
+
+    async def aclose(self):
+        await self.pool.aclose()
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """프로세스 공유 LLMClient 반환 (최초 호출 시 생성)"""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
+
+
+def check_ollama_model():
+    """Ollama 모델이 설치되어 있는지 확인"""
+    return get_llm_client().check_model()
+
+
+def _flight_key(model, prompt, system_prompt, max_tokens, options):
+    """동일 요청 병합 키 (캐시 키 + 캐시 우회 여부: 우회 요청이 캐시된 응답을 공유받지 않도록)"""
+    key = llm_cache.make_cache_key(model, system_prompt, prompt, max_tokens, options)
+    return (key, llm_cache.bypass_requested())
+
+
+def _coalesced_cached_call(model, prompt, system_prompt, max_tokens, options, produce):
+    """캐시 조회/생성/저장을 동일 요청끼리 한 번만 수행"""
+    content, shared = llm_flight.do(
+        _flight_key(model, prompt, system_prompt, max_tokens, options),
+        lambda: llm_cache.cached_call(model, prompt, system_prompt, max_tokens, options, produce)
+    )
+    if shared:
+        print(f"[LLM Client] 진행 중인 동일 요청의 응답 공유 (모델: {model}, 응답 길이: {len(content)})")
+    return content
+
+
+def call_ollama(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """Ollama API 호출 (응답 캐시, 동일 요청 병합 사용)"""
+    client = get_llm_client()
+    model = current_model(client.model)
+    return _coalesced_cached_call(
+        model, prompt, system_prompt, max_tokens, _with_format(None),
+        lambda: client.chat(prompt, system_prompt, max_tokens, model=model)
+    )
+
+
+def call_openai(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """OpenAI API 호출 (응답 캐시, 동일 요청 병합 사용)"""
+    model = current_model(OPENAI_MODEL)
+    return _coalesced_cached_call(
+        model, prompt, system_prompt, max_tokens, _with_format({'temperature': OPENAI_TEMPERATURE}),
+        lambda: _call_openai_uncached(prompt, system_prompt, max_tokens, model)
+    )
+
+
+def _call_openai_uncached(prompt, system_prompt, max_tokens, model=OPENAI_MODEL):
+    if not openai_client:
+        raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
+
+    try:
+        response = openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=max_tokens,
+            **_openai_format_kwargs(model)
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        print(f"OpenAI API 호출 오류: {str(e)}")
+        raise
+
+
+def call_llm(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """설정된 모드(OpenAI 또는 Ollama)에 따라 LLM 호출"""
+    if USE_OPENAI:
+        return call_openai(prompt, system_prompt, max_tokens=max_tokens)
+    return call_ollama(prompt, system_prompt, max_tokens=max_tokens)
+
+
+def stream_ollama(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """Ollama 스트리밍 호출 (텍스트 조각 generator)"""
+    client = get_llm_client()
+    return client.chat_stream(prompt, system_prompt, max_tokens, model=current_model(client.model))
+
+
+def stream_openai(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """OpenAI 스트리밍 호출 (텍스트 조각 generator)"""
+    if not openai_client:
+        raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
+
+    model = current_model(OPENAI_MODEL)
+    try:
+        stream = openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=max_tokens,
+            stream=True,
+            **_openai_format_kwargs(model)
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        print(f"OpenAI 스트리밍 호출 오류: {str(e)}")
+        raise
+
+
+def call_llm_streaming(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """
+    스트리밍으로 LLM을 호출하면서 각 조각을 'token' 이벤트로 발행하고, 전체 응답 텍스트를 반환
+
+    call_llm과 같은 시그니처이므로 에이전트의 call_llm_func로 그대로 사용할 수 있습니다.
+    이벤트 구독자가 없으면 일반 호출(call_llm)과 동일하게 동작합니다.
+    """
+    if not has_event_sink():
+        return call_llm(prompt, system_prompt, max_tokens=max_tokens)
+
+    model, options = _cache_identity()
+    cache_key, cached = llm_cache.lookup(model, system_prompt, prompt, max_tokens, options)
+    if cached is not None:
+        return _emit_cached_response(prompt, cached)
+
+    def stream_and_store():
+        # 병합을 주도한 요청만 토큰 단위로 스트리밍
+        stream = stream_openai if USE_OPENAI else stream_ollama
+        parts = []
+        emit('llm_start', {'promptLength': len(prompt)})
+        for piece in stream(prompt, system_prompt, max_tokens):
+            parts.append(piece)
+            emit('token', {'delta': piece})
+        content = ''.join(parts)
+        emit('llm_end', {'responseLength': len(content)})
+        llm_cache.store(cache_key, content, model)
+        return content
+
+    content, shared = llm_flight.do(_flight_key(model, prompt, system_prompt, max_tokens, options), stream_and_store)
+    if shared:
+        return _emit_cached_response(prompt, content, reason='coalesced')
+    return content
+
+
+def _cache_identity():
+    """현재 모드의 캐시 키 구성 요소 (모델, 샘플링 옵션)"""
+    if USE_OPENAI:
+        return current_model(OPENAI_MODEL), _with_format({'temperature': OPENAI_TEMPERATURE})
+    return current_model(get_llm_client().model), _with_format(None)
+
+
+def _with_format(options):
+    """캐시 키 옵션에 응답 형식 추가 (같은 프롬프트라도 형식 지정 여부에 따라 응답이 다름)"""
+    output_format = current_format()
+    if output_format is None:
+        return options
+    return {**(options or {}), 'format': output_format}
+
+
+def _openai_format_kwargs(model):
+    """OpenAI chat.completions.create에 넘길 response_format 인자 (형식 미지정 시 빈 dict)"""
+    output_format = openai_response_format(model)
+    return {'response_format': output_format} if output_format is not None else {}
+
+
+def _emit_cached_response(prompt, content, reason='cached'):
+    """캐시된(또는 동일 요청에서 공유받은) 응답을 스트리밍 이벤트로 한 번에 전달"""
+    emit('llm_start', {'promptLength': len(prompt), reason: True})
+    emit('token', {'delta': content})
+    emit('llm_end', {'responseLength': len(content), reason: True})
+    return content
+
+
+async def _acoalesced_cached_call(model, prompt, system_prompt, max_tokens, options, produce):
+    """_coalesced_cached_call의 비동기 버전"""
+    content, shared = await llm_flight.ado(
+        _flight_key(model, prompt, system_prompt, max_tokens, options),
+        lambda: llm_cache.acached_call(model, prompt, system_prompt, max_tokens, options, produce)
+    )
+    if shared:
+        print(f"[LLM Client] 진행 중인 동일 요청의 응답 공유 (모델: {model}, 응답 길이: {len(content)})")
+    return content
+
+
+async def acall_ollama(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """Ollama API 비동기 호출 (응답 캐시, 동일 요청 병합 사용)"""
+    client = get_llm_client()
+    model = current_model(client.model)
+    return await _acoalesced_cached_call(
+        model, prompt, system_prompt, max_tokens, _with_format(None),
+        lambda: client.achat(prompt, system_prompt, max_tokens, model=model)
+    )
+
+
+async def acall_openai(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """OpenAI API 비동기 호출 (응답 캐시, 동일 요청 병합 사용)"""
+    model = current_model(OPENAI_MODEL)
+    return await _acoalesced_cached_call(
+        model, prompt, system_prompt, max_tokens, _with_format({'temperature': OPENAI_TEMPERATURE}),
+        lambda: _acall_openai_uncached(prompt, system_prompt, max_tokens, model)
+    )
+
+
+async def _acall_openai_uncached(prompt, system_prompt, max_tokens, model=OPENAI_MODEL):
+    if not async_openai_client:
+        raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
+
+    try:
+        response = await async_openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=max_tokens,
+            **_openai_format_kwargs(model)
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        print(f"OpenAI API 호출 오류: {str(e)}")
+        raise
+
+
+async def acall_llm(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """call_llm의 비동기 버전"""
+    if USE_OPENAI:
+        return await acall_openai(prompt, system_prompt, max_tokens=max_tokens)
+    return await acall_ollama(prompt, system_prompt, max_tokens=max_tokens)
+
+
+async def astream_openai(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """OpenAI 비동기 스트리밍 호출 (텍스트 조각 async generator)"""
+    if not async_openai_client:
+        raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다.")
+
+    model = current_model(OPENAI_MODEL)
+    try:
+        stream = await async_openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=max_tokens,
+            stream=True,
+            **_openai_format_kwargs(model)
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        print(f"OpenAI 스트리밍 호출 오류: {str(e)}")
+        raise
+
+
+async def acall_llm_streaming(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT, max_tokens=2000):
+    """call_llm_streaming의 비동기 버전 (이벤트 구독자가 없으면 acall_llm과 동일)"""
+    if not has_event_sink():
+        return await acall_llm(prompt, system_prompt, max_tokens=max_tokens)
+
+    model, options = _cache_identity()
+    cache_key, cached = llm_cache.lookup(model, system_prompt, prompt, max_tokens, options)
+    if cached is not None:
+        return _emit_cached_response(prompt, cached)
+
+    async def stream_and_store():
+        if USE_OPENAI:
+            stream = astream_openai(prompt, system_prompt, max_tokens)
+        else:
+            stream = get_llm_client().achat_stream(prompt, system_prompt, max_tokens, model=model)
+        parts = []
+        emit('llm_start', {'promptLength': len(prompt)})
+        async for piece in stream:
+            parts.append(piece)
+            emit('token', {'delta': piece})
+        content = ''.join(parts)
+        emit('llm_end', {'responseLength': len(content)})
+        llm_cache.store(cache_key, content, model)
+        return content
+
+    content, shared = await llm_flight.ado(_flight_key(model, prompt, system_prompt, max_tokens, options), stream_and_store)
+    if shared:
+        return _emit_cached_response(prompt, content, reason='coalesced')
+    return content
@@ -0,0 +1,298 @@
+"""
+LLM 요청 스케줄러 (입장 제어 + 우선순위 대기열)
+Ollama는 동시에 처리할 수 있는 요청 수가 적으므로, 실제 생성 요청 수를 제한하고
+대화형 요청(interactive)을 배치/백그라운드 요청(batch)보다 먼저 처리합니다.
+
+- 동시 실행 수: LLM_MAX_CONCURRENCY
+- 대기열이 LLM_MAX_QUEUE_DEPTH 이상이면 새 API 요청은 즉시 거절 (503 + Retry-After)
+- 이미 시작된 분석의 LLM 호출은 거절하지 않고 대기 (LLM_QUEUE_TIMEOUT 초과 시 실패)
+
+    with llm_priority(LANE_BATCH):
+        call_llm(prompt, system_prompt)   # LLMClient가 slot()/aslot()으로 순서를 기다림
+"""
+
+import asyncio
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, Optional
+
+from ollama_pool import parse_base_urls
+
+# 동시에 Ollama로 보내는 생성 요청 수 (Ollama의 OLLAMA_NUM_PARALLEL과 맞추는 것을 권장)
+# 지정하지 않으면 Ollama 서버당 2개
+_OLLAMA_NODE_COUNT = len(parse_base_urls(os.getenv('OLLAMA_BASE_URLS', '') or os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', str(2 * max(1, _OLLAMA_NODE_COUNT))))
+# 대기 중인 LLM 호출이 이 수 이상이면 새 요청을 거절
+LLM_MAX_QUEUE_DEPTH = int(os.getenv('LLM_MAX_QUEUE_DEPTH', '20'))
+# LLM 호출 하나가 대기열에서 기다리는 최대 시간 (초)
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '300'))
+
+# 우선순위 (앞에 있을수록 먼저 처리)
+LANE_INTERACTIVE = 'interactive'
+LANE_BATCH = 'batch'
+LANES = (LANE_INTERACTIVE, LANE_BATCH)
+
+# 배치 대기열로 보내는 호출 목적 (여러 단계의 긴 분석)
+BATCH_PURPOSES = {'progress_analysis_agent', 'task_suggestion_agent'}
+
+# 현재 실행 컨텍스트의 우선순위
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar('llm_lane', default=LANE_INTERACTIVE)
+
+
+class LLMOverloadedError(Exception):
+    """LLM 대기열이 가득 찼거나 대기 시간이 초과됨 (retry_after초 후 재시도 권장)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def lane_for_purpose(purpose: Optional[str]) -> Optional[str]:
+    """호출 목적에 맞는 우선순위 (지정할 필요가 없으면 None -> 바깥 우선순위 유지)"""
+    return LANE_BATCH if purpose in BATCH_PURPOSES else None
+
+
+@contextmanager
+def llm_priority(lane: Optional[str]):
+    """블록 안의 LLM 호출 우선순위 지정 (None이면 바깥 우선순위 유지)"""
+    if lane is None:
+        yield
+        return
+    if lane not in LANES:
+        raise ValueError(f"알 수 없는 우선순위: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class _Waiter:
+    """대기열 항목 (슬롯이 배정되면 wake() 호출)"""
+
+    __slots__ = ('lane', 'enqueued_at', 'granted', 'wake')
+
+    def __init__(self, lane: str, wake: Callable[[], None]):
+        self.lane = lane
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.wake = wake
+
+
+class _LaneStats:
+    __slots__ = ('admitted', 'rejected', 'timed_out', 'wait_total', 'wait_max', 'recent_waits')
+
+    def __init__(self):
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=500)
+
+    def record_wait(self, waited: float):
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.recent_waits.append(waited)
+
+    def to_dict(self, queued: int) -> Dict[str, Any]:
+        recent = sorted(self.recent_waits)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            'queued': queued,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timedOut': self.timed_out,
+            'avgWaitMs': round(self.wait_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+            'p95WaitMs': round(p95 * 1000, 1),
+            'maxWaitMs': round(self.wait_max * 1000, 1),
+        }
+
+
+class LLMScheduler:
+    """
+    동시 실행 수 제한 + 우선순위 대기열
+
+    Flask 스레드와 asyncio 코루틴이 같은 Ollama를 공유하므로 하나의 잠금으로 두 경로를 함께 관리합니다.
+    슬롯이 비면 interactive 대기열의 가장 오래된 호출부터 배정합니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_queue_depth: int = LLM_MAX_QUEUE_DEPTH,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {lane: deque() for lane in LANES}
+        self._stats: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in LANES}
+        # 생성 요청 하나의 평균 처리 시간 (초, 지수 이동 평균) - Retry-After 계산용
+        self._avg_service = 10.0
+
+    def _queue_depth_locked(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _retry_after_locked(self) -> int:
+        waiting = self._queue_depth_locked() + 1
+        seconds = math.ceil(waiting / self.max_concurrency * self._avg_service)
+        return max(1, min(seconds, 120))
+
+    def retry_after(self) -> int:
+        """지금 대기열이 비워질 때까지의 예상 시간 (초)"""
+        with self._lock:
+            return self._retry_after_locked()
+
+    def check_admission(self, lane: Optional[str] = None):
+        """새 API 요청 입장 확인 (대기열이 가득 찼으면 LLMOverloadedError)"""
+        lane = lane or current_lane()
+        with self._lock:
+            depth = self._queue_depth_locked()
+            if depth < self.max_queue_depth:
+                return
+            self._stats[lane].rejected += 1
+            retry_after = self._retry_after_locked()
+        print(f"[LLM Scheduler] 대기열 초과로 요청 거절 (우선순위: {lane}, 대기: {depth}개, Retry-After: {retry_after}초)")
+        raise LLMOverloadedError(
+            f"AI 서버가 혼잡합니다. {retry_after}초 후 다시 시도해주세요.",
+            retry_after
+        )
+
+    def _grant_locked(self):
+        """빈 슬롯을 우선순위 순서대로 대기 중인 호출에 배정"""
+        while self._running < self.max_concurrency:
+            waiter = None
+            for lane in LANES:
+                if self._queues[lane]:
+                    waiter = self._queues[lane].popleft()
+                    break
+            if waiter is None:
+                return
+            self._running += 1
+            waiter.granted = True
+            self._stats[waiter.lane].record_wait(time.monotonic() - waiter.enqueued_at)
+            waiter.wake()
+
+    def _try_acquire_now_locked(self, lane: str) -> bool:
+        if self._running < self.max_concurrency and self._queue_depth_locked() == 0:
+            self._running += 1
+            self._stats[lane].record_wait(0.0)
+            return True
+        return False
+
+    def _release(self, service_time: float):
+        with self._lock:
+            self._running -= 1
+            self._avg_service = self._avg_service * 0.8 + service_time * 0.2
+            self._grant_locked()
+
+    def _timeout_error(self, waiter: _Waiter) -> LLMOverloadedError:
+        """대기 시간 초과 처리 (잠금 안에서 호출)"""
+        self._queues[waiter.lane].remove(waiter)
+        self._stats[waiter.lane].timed_out += 1
+        return LLMOverloadedError(
+            f"AI 서버 대기 시간({self.queue_timeout:.0f}초)을 초과했습니다.",
+            self._retry_after_locked()
+        )
+
+    @contextmanager
+    def slot(self, lane: Optional[str] = None):
+        """LLM 생성 슬롯 점유 (동기, 블록이 끝나면 반환)"""
+        lane = lane or current_lane()
+        event = threading.Event()
+        with self._lock:
+            waiter = None
+            if not self._try_acquire_now_locked(lane):
+                waiter = _Waiter(lane, event.set)
+                self._queues[lane].append(waiter)
+
+        if waiter is not None:
+            event.wait(self.queue_timeout)
+            with self._lock:
+                if not waiter.granted:
+                    raise self._timeout_error(waiter)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def aslot(self, lane: Optional[str] = None):
+        """slot()의 비동기 버전"""
+        lane = lane or current_lane()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            # 다른 스레드(Flask 워커)에서 슬롯이 반환될 수 있으므로 이벤트 루프로 전달
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            waiter = None
+            if not self._try_acquire_now_locked(lane):
+                waiter = _Waiter(lane, wake)
+                self._queues[lane].append(waiter)
+
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if not waiter.granted:
+                        raise self._timeout_error(waiter)
+            except asyncio.CancelledError:
+                # 대기 중 취소: 이미 배정된 슬롯이면 반환, 아니면 대기열에서 제거
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._queues[lane].remove(waiter)
+                if granted:
+                    self._release(0.0)
+                raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'maxConcurrency': self.max_concurrency,
+                'maxQueueDepth': self.max_queue_depth,
+                'running': self._running,
+                'queueDepth': self._queue_depth_locked(),
+                'avgServiceSeconds': round(self._avg_service, 2),
+                'retryAfter': self._retry_after_locked(),
+                'lanes': {lane: self._stats[lane].to_dict(len(self._queues[lane])) for lane in LANES}
+            }
+
+
+_llm_scheduler = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """프로세스 공유 스케줄러 반환 (최초 호출 시 생성)"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        with _llm_scheduler_lock:
+            if _llm_scheduler is None:
+                _llm_scheduler = LLMScheduler()
+    return _llm_scheduler
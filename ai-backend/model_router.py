@@ -0,0 +1,177 @@
+"""
+호출 목적별 모델 선택 (모델 캐스케이드)
+의도 분류, 정보 충분성 평가처럼 짧은 JSON만 만드는 호출은 작은 모델로 먼저 처리하고,
+응답 JSON을 파싱할 수 없거나 신뢰도(confidence)가 낮으면 기본(큰) 모델로 다시 호출합니다.
+최종 분석/답변 생성은 항상 기본 모델(OLLAMA_MODEL / OPENAI_MODEL)을 사용합니다.
+
+    small_model = small_model_for('intent_classification')   # 예: qwen2.5:3b
+    with llm_model(small_model):
+        content = call_llm(prompt, system_prompt)
+    if needs_escalation(content):
+        content = call_llm(prompt, system_prompt)            # 기본 모델로 재호출
+"""
+
+import contextvars
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from structured_output import extract_json
+
+# 작은 모델 (비워 두면 캐스케이드 사용 안 함)
+OLLAMA_SMALL_MODEL = os.getenv('OLLAMA_SMALL_MODEL', 'qwen2.5:3b')
+OPENAI_SMALL_MODEL = os.getenv('OPENAI_SMALL_MODEL', '')
+
+# 작은 모델로 먼저 처리하는 호출 목적 (짧은 구조화 JSON 응답)
+SMALL_MODEL_PURPOSES = {
+    'intent_classification',
+    'sufficiency_evaluation',
+    'evidence_verification',
+    'file_selection',
+}
+
+# 응답의 confidence가 이 값들이면 큰 모델로 재호출
+LOW_CONFIDENCE_VALUES = {'low', '낮음'}
+# confidence가 숫자(0~1 또는 0~100)일 때의 기준
+LLM_CASCADE_MIN_CONFIDENCE = float(os.getenv('LLM_CASCADE_MIN_CONFIDENCE', '0.5'))
+
+
+def _parse_model_routes(value: str) -> Dict[str, str]:
+    """LLM_MODEL_ROUTES 환경 변수 파싱 (예: "intent_classification=qwen2.5:3b,file_selection=")"""
+    routes = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        purpose, model = item.split('=', 1)
+        routes[purpose.strip()] = model.strip()
+    return routes
+
+
+# 목적별 작은 모델 지정 (기본값 대신 사용, 빈 값이면 해당 목적은 캐스케이드 사용 안 함)
+LLM_MODEL_ROUTES = _parse_model_routes(os.getenv('LLM_MODEL_ROUTES', ''))
+
+# 현재 실행 컨텍스트에서 사용할 모델 (None이면 기본 모델)
+_model_override: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('llm_model_override', default=None)
+
+_lock = threading.Lock()
+_stats = {'small_calls': 0, 'escalations': 0, 'small_failures': 0}
+
+
+@contextmanager
+def llm_model(model: Optional[str]):
+    """블록 안의 LLM 호출에 사용할 모델 지정 (None이면 바깥 설정 유지)"""
+    if not model:
+        yield
+        return
+    token = _model_override.set(model)
+    try:
+        yield
+    finally:
+        _model_override.reset(token)
+
+
+def current_model(default: str) -> str:
+    """현재 컨텍스트의 모델 (지정되지 않았으면 default)"""
+    return _model_override.get() or default
+
+
+def _route(purpose: Optional[str]) -> Optional[str]:
+    """호출 목적에 지정된 작은 모델 (설치 여부는 확인하지 않음)"""
+    if not purpose:
+        return None
+    # 순환 import 방지 (llm_client가 이 모듈을 사용)
+    from llm_client import OLLAMA_MODEL, OPENAI_MODEL, USE_OPENAI
+
+    if purpose in LLM_MODEL_ROUTES:
+        model = LLM_MODEL_ROUTES[purpose]
+    elif purpose in SMALL_MODEL_PURPOSES:
+        model = OPENAI_SMALL_MODEL if USE_OPENAI else OLLAMA_SMALL_MODEL
+    else:
+        return None
+
+    default_model = OPENAI_MODEL if USE_OPENAI else OLLAMA_MODEL
+    if not model or model == default_model:
+        return None
+    return model
+
+
+def small_model_for(purpose: Optional[str]) -> Optional[str]:
+    """
+    호출 목적에 맞는 작은 모델 (캐스케이드를 사용하지 않으면 None)
+
+    Ollama 모드에서는 작은 모델이 설치되어 있을 때만 사용합니다 (모델 확인 캐시 사용).
+    """
+    from llm_client import USE_OPENAI, get_llm_client
+
+    model = _route(purpose)
+    if model and not USE_OPENAI and not get_llm_client().check_model(model):
+        return None
+    return model
+
+
+async def asmall_model_for(purpose: Optional[str]) -> Optional[str]:
+    """small_model_for의 비동기 버전"""
+    from llm_client import USE_OPENAI, get_llm_client
+
+    model = _route(purpose)
+    if model and not USE_OPENAI and not await get_llm_client().acheck_model(model):
+        return None
+    return model
+
+
+def _is_low_confidence(confidence: Any) -> bool:
+    if isinstance(confidence, bool):
+        return False
+    if isinstance(confidence, (int, float)):
+        # 0~100 척도도 허용
+        value = confidence / 100 if confidence > 1 else confidence
+        return value < LLM_CASCADE_MIN_CONFIDENCE
+    if isinstance(confidence, str):
+        return confidence.strip().lower() in LOW_CONFIDENCE_VALUES
+    return False
+
+
+def needs_escalation(content: Optional[str]) -> Optional[str]:
+    """
+    작은 모델의 응답을 큰 모델로 다시 만들어야 하는지 판단
+
+    Returns:
+        재호출 사유 (재호출이 필요 없으면 None)
+    """
+    if not content or not content.strip():
+        return '빈 응답'
+    try:
+        result = extract_json(content)
+    except Exception:
+        return 'JSON 파싱 실패'
+    if not isinstance(result, dict):
+        return 'JSON 객체가 아님'
+    if _is_low_confidence(result.get('confidence')):
+        return f"낮은 신뢰도 ({result.get('confidence')})"
+    return None
+
+
+def record_cascade(small_model: str, purpose: str, escalation_reason: Optional[str], failed: bool = False):
+    """캐스케이드 결과 집계 및 로그"""
+    with _lock:
+        _stats['small_calls'] += 1
+        if escalation_reason:
+            _stats['escalations'] += 1
+        if failed:
+            _stats['small_failures'] += 1
+    if escalation_reason:
+        print(f"[Model Router] {purpose}: 작은 모델({small_model}) 응답 사용 불가 ({escalation_reason}) -> 기본 모델로 재호출")
+
+
+def cascade_stats() -> Dict[str, Any]:
+    """작은 모델 호출 수, 큰 모델로 재호출한 수 (escalationRate)"""
+    with _lock:
+        stats = dict(_stats)
+    small_calls = stats['small_calls']
+    return {
+        'smallCalls': small_calls,
+        'escalations': stats['escalations'],
+        'smallFailures': stats['small_failures'],
+        'escalationRate': round(stats['escalations'] / small_calls, 3) if small_calls else 0.0,
+    }
@@ -3,22 +3,66 @@
 모든 에이전트를 다단계 분석으로 전환하여 정보 충분성을 평가하고 필요시 추가 탐색 수행
 """
 
+import hashlib
 import json
+import os
 import re
-from typing import Dict, List, Any, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from llm_client import call_llm
+from agent_checkpoint import clear_checkpoint, load_checkpoint, run_fingerprint, save_checkpoint
+from agent_events import ProgressMessages, emit
+from agent_io import UNAVAILABLE_ERRORS, existing_paths_request, llm_request, list_directory_request, read_files_request, run_agent_sync
+from code_search import rank_paths, retrieval_query
+from file_store import DEFAULT_RELEVANCE, PINNED_RELEVANCE, SUGGESTED_RELEVANCE, FileStore
+from http_cache import conditional_headers, get_http_cache
+from llm_scheduler import lane_for_purpose
+from repo_snapshot import RepoSnapshot, count_snapshot, get_snapshot
+from repo_tree import RepoTreeIndex, count_tree, get_tree_index
+from request_deadline import deadline_exceeded, remaining_seconds
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, get_breaker, is_transient_http_error, retry_call
+from single_flight import github_flight
+from speculative_prefetch import PrefetchCache
+from structured_output import GENERIC_JSON, parse_json_response
+from sufficiency_policy import record_sufficiency_decision, rule_based_sufficiency
+from token_budget import allocate_sections, fit_section
 
 MAX_ANALYSIS_STEPS = 10
 
+# GitHub API 호출 재시도 (첫 호출 포함 전체 시도 횟수), 서킷 브레이커 기준
+GITHUB_RETRY = RetryPolicy(int(os.getenv('GITHUB_RETRY_ATTEMPTS', '3')))
+GITHUB_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('GITHUB_CIRCUIT_FAILURE_THRESHOLD', '5'))
+GITHUB_CIRCUIT_RESET_SECONDS = float(os.getenv('GITHUB_CIRCUIT_RESET_SECONDS', '60'))
+# GitHub 파일 읽기 동시 요청 수 (동기/비동기 실행기 공용), 한 번에 읽는 최대 파일 수
+GITHUB_MAX_CONCURRENCY = int(os.getenv('GITHUB_MAX_CONCURRENCY', '10'))
+MAX_FILES_PER_BATCH = 50
+
+# 첫 단계를 측정하기 전 LLM 단계 하나의 예상 시간 (초, 요청 마감 시간 확인에 사용)
+AGENT_STEP_ESTIMATE_SECONDS = float(os.getenv('AGENT_STEP_ESTIMATE_SECONDS', '20'))
+
 def evaluate_information_sufficiency(
     current_result: Dict[str, Any],
     agent_type: str,
-    call_llm_func: Callable,
+    call_llm_func: Optional[Callable],
     step_number: int,
     context: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
+    """현재 분석 결과의 정보 충분성을 평가 (동기 실행, 형식은 evaluate_information_sufficiency_steps 참고)"""
+    return run_agent_sync(
+        evaluate_information_sufficiency_steps(current_result, agent_type, step_number, context),
+        call_llm_func or call_llm
+    )
+
+def evaluate_information_sufficiency_steps(
+    current_result: Dict[str, Any],
+    agent_type: str,
+    step_number: int,
+    context: Optional[Dict[str, Any]] = None,
+    max_tokens: Optional[int] = None
+):
     """
-    현재 분석 결과의 정보 충분성을 평가
+    현재 분석 결과의 정보 충분성을 평가 (에이전트 generator, agent_io 참고)
     
     Returns:
         {
@@ -29,7 +73,16 @@ def evaluate_information_sufficiency(
             "files_to_read": List[str],
             "reason": str
         }
+    
+    에이전트 타입별 규칙으로 판단할 수 있으면 LLM을 호출하지 않습니다 (sufficiency_policy 참고).
     """
+    evaluation = rule_based_sufficiency(agent_type, current_result, step_number, context, MAX_ANALYSIS_STEPS)
+    if evaluation is not None:
+        record_sufficiency_decision(agent_type, 'rules')
+        print(f"[Multi-Step Agent] {agent_type} - 규칙으로 충분성 판단 (LLM 평가 생략): {evaluation.get('reason')}")
+        return evaluation
+    record_sufficiency_decision(agent_type, 'llm')
+    
     evaluation_prompt = f"""당신은 정보 분석 전문가입니다. 현재 분석 결과를 평가하여 충분한 정보가 수집되었는지 판단하세요.
 
 ⚠️ 중요: 반드시 한국어로만 응답하세요.
@@ -39,7 +92,7 @@ def evaluate_information_sufficiency(
 ## 에이전트 타입: {agent_type}
 
 ## 현재 분석 결과:
-{json.dumps(current_result, ensure_ascii=False, indent=2)[:1000]}
+{fit_section(json.dumps(current_result, ensure_ascii=False, indent=2), 0.25)}
 
 ## 평가 기준:
 1. **정보 충분성**: 질문에 답변하기에 충분한 정보가 있는가?
@@ -106,21 +159,14 @@ def evaluate_information_sufficiency(
     system_prompt = "정보 분석 전문가. 분석 결과의 충분성을 냉정하게 평가합니다. 반드시 한국어로만 응답. JSON만 응답."
     
     try:
-        content = call_llm_func(evaluation_prompt, system_prompt)
+        # 평가 호출은 해당 에이전트와 같은 우선순위로 대기
+        content = yield llm_request(
+            evaluation_prompt, system_prompt, max_tokens=max_tokens,
+            purpose='sufficiency_evaluation', lane=lane_for_purpose(agent_type), schema='sufficiency_evaluation'
+        )
         
         # JSON 파싱
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        content = content.strip()
-        if '{' in content:
-            content = content[content.find('{'):]
-        if '}' in content:
-            content = content[:content.rfind('}')+1]
-        
-        evaluation = json.loads(content)
+        evaluation = parse_json_response(content, 'sufficiency_evaluation')
         
         # 최대 단계 도달 시 강제로 충분하다고 판단
         if step_number >= MAX_ANALYSIS_STEPS:
@@ -129,6 +175,8 @@ def evaluate_information_sufficiency(
             evaluation['reason'] = f'최대 분석 단계({MAX_ANALYSIS_STEPS})에 도달했습니다.'
         
         return evaluation
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Multi-Step Agent] 정보 충분성 평가 실패: {e}")
         # 에러 발생 시 기본값 반환 (다음 단계 진행)
@@ -146,16 +194,31 @@ def verify_evidence_relevance(
     task_title: str,
     task_description: str,
     evidence: List[str],
-    call_llm_func: Callable
+    call_llm_func: Optional[Callable] = None
 ) -> Dict[str, Any]:
     """
-    Task 완료 근거(evidence)가 Task 제목과 설명과 관련성이 있는지 검증
+    Task 완료 근거(evidence)의 관련성 검증 (동기 실행, 형식은 verify_evidence_relevance_steps 참고)
+    
+    Args:
+        call_llm_func: LLM 호출 함수 (None이면 공유 LLM 클라이언트 사용)
+    """
+    return run_agent_sync(
+        verify_evidence_relevance_steps(task_title, task_description, evidence),
+        call_llm_func or call_llm
+    )
+
+def verify_evidence_relevance_steps(
+    task_title: str,
+    task_description: str,
+    evidence: List[str]
+):
+    """
+    Task 완료 근거(evidence)가 Task 제목과 설명과 관련성이 있는지 검증 (에이전트 generator)
     
     Args:
         task_title: Task 제목
         task_description: Task 설명
         evidence: 검증할 근거 리스트
-        call_llm_func: LLM 호출 함수
     
     Returns:
         {
@@ -225,21 +288,12 @@ def verify_evidence_relevance(
     system_prompt = "Task 완료 근거 검증 전문가. 근거와 Task 제목의 관련성을 엄격하게 평가합니다. 반드시 한국어로만 응답. JSON만 응답."
     
     try:
-        content = call_llm_func(verification_prompt, system_prompt)
+        content = yield llm_request(
+            verification_prompt, system_prompt, purpose='evidence_verification', schema='evidence_verification'
+        )
         
         # JSON 파싱
-        if '```json' in content:
-            content = content.split('```json')[1].split('```')[0].strip()
-        elif '```' in content:
-            content = content.split('```')[1].split('```')[0].strip()
-        
-        content = content.strip()
-        if '{' in content:
-            content = content[content.find('{'):]
-        if '}' in content:
-            content = content[:content.rfind('}')+1]
-        
-        verification_result = json.loads(content)
+        verification_result = parse_json_response(content, 'evidence_verification')
         
         # 기본값 설정
         if 'is_relevant' not in verification_result:
@@ -248,6 +302,8 @@ def verify_evidence_relevance(
             verification_result['needs_reanalysis'] = len(verification_result.get('irrelevant_evidence', [])) > 0
         
         return verification_result
+    except UNAVAILABLE_ERRORS:
+        raise
     except Exception as e:
         print(f"[Multi-Step Agent] 근거 검증 실패: {e}")
         # 에러 발생 시 기본값 반환 (재분석 필요로 판단)
@@ -260,6 +316,169 @@ def verify_evidence_relevance(
             "reason": f"검증 중 오류 발생: {str(e)}"
         }
 
+def parse_github_repo(github_repo: str) -> Optional[Tuple[str, str]]:
+    """repoUrl에서 (owner, repo) 추출 (GitHub URL이 아니면 None)"""
+    match = re.search(r'github\.com[/:]([^/]+)/([^/]+?)(?:\.git)?/?$', github_repo)
+    if not match:
+        return None
+    return match.group(1), match.group(2).replace('.git', '')
+
+def github_contents_url(owner: str, repo: str, path: str, ref: str = 'main') -> str:
+    """GitHub contents API URL"""
+    url = f'https://api.github.com/repos/{owner}/{repo}/contents/{path}'
+    if ref != 'main':
+        url += f'?ref={ref}'
+    return url
+
+def github_flight_key(kind: str, owner: str, repo: str, path: str, ref: str, github_token: Optional[str], *extra) -> Tuple:
+    """GitHub 조회 병합 키 (토큰마다 접근 권한이 다르므로 토큰 해시 포함)"""
+    token_hash = hashlib.sha256(github_token.encode('utf-8')).hexdigest()[:16] if github_token else ''
+    return (kind, owner.lower(), repo.lower(), path, ref, token_hash) + extra
+
+def github_breaker() -> CircuitBreaker:
+    """GitHub API 서킷 브레이커 (동기/비동기 경로 공용)"""
+    return get_breaker('GitHub API', GITHUB_CIRCUIT_FAILURE_THRESHOLD, GITHUB_CIRCUIT_RESET_SECONDS)
+
+def github_get(url: str, headers: Dict[str, str], timeout: float = 10):
+    """
+    GitHub API GET (일시적 오류는 지터 백오프로 재시도, 연속 실패 시 서킷 브레이커로 즉시 실패)
+
+    HTTP 오류 응답은 requests.HTTPError로 발생합니다 (404 등은 재시도하지 않음).
+    이전에 받은 응답이 있으면 조건부 요청을 보내고, 304면 저장한 본문으로 200 응답을 만들어 반환합니다 (http_cache 참고).
+    """
+    import requests
+
+    cache = get_http_cache()
+    entry = cache.lookup(url, headers)
+    request_headers = conditional_headers(headers, entry)
+
+    def fetch():
+        response = requests.get(url, headers=request_headers, timeout=timeout)
+        response.raise_for_status()
+        return response
+
+    response = retry_call(fetch, GITHUB_RETRY, is_transient_http_error, github_breaker(), 'GitHub API')
+    if response.status_code == 304 and entry is not None:
+        cached = requests.models.Response()
+        cached.status_code = 200
+        cached.url = url
+        cached.encoding = 'utf-8'
+        cached.headers = requests.structures.CaseInsensitiveDict(response.headers)
+        if entry.content_type:
+            cached.headers['Content-Type'] = entry.content_type
+        cached._content = cache.revalidated(entry)
+        return cached
+    if response.status_code == 200:
+        cache.store(url, headers, response.headers, response.content)
+    return response
+
+def warn_github_rate_limit(response_headers):
+    """남은 GitHub API 요청 수가 적으면 경고 출력"""
+    remaining = response_headers.get('X-RateLimit-Remaining', 'unknown')
+    if remaining != 'unknown':
+        remaining_int = int(remaining)
+        if remaining_int < 10:
+            print(f"[Multi-Step Agent] ⚠️ GitHub API rate limit 경고: {remaining_int}개 남음")
+
+def filter_directory_listing(contents: Any) -> Tuple[List[str], List[str]]:
+    """contents API 디렉토리 응답을 (코드 파일 경로, 하위 디렉토리 경로)로 분리"""
+    files = []
+    sub_dirs = []
+    if not isinstance(contents, list):
+        return files, sub_dirs
+    for item in contents:
+        if item.get('type') == 'file':
+            # JavaScript/TypeScript/JSX/Python 파일만
+            file_name = item.get('name', '')
+            if file_name.endswith(('.js', '.jsx', '.ts', '.tsx', '.py')):
+                files.append(item.get('path', ''))
+        elif item.get('type') == 'dir':
+            sub_dirs.append(item.get('path', ''))
+    return files, sub_dirs
+
+def decode_github_file(file_path: str, file_data: Dict[str, Any], max_lines_per_file: int) -> Dict[str, Any]:
+    """contents API 파일 응답을 get_file_contents 결과 형식으로 변환 (라인 수 제한 적용)"""
+    if file_data.get('type') != 'file':
+        return {
+            "filePath": file_path,
+            "content": None,
+            "error": "파일이 아닙니다."
+        }
+    
+    import base64
+    content = base64.b64decode(file_data['content']).decode('utf-8')
+    return file_result(file_path, content, max_lines_per_file, file_data.get('sha'))
+
+def file_result(file_path: str, content: str, max_lines_per_file: int, sha: Optional[str]) -> Dict[str, Any]:
+    """파일 내용을 get_file_contents 결과 형식으로 변환 (라인 수 제한 적용)"""
+    lines = content.split('\n')
+    truncated = False
+    if max_lines_per_file > 0 and len(lines) > max_lines_per_file:
+        content = '\n'.join(lines[:max_lines_per_file])
+        truncated = True
+    
+    return {
+        "filePath": file_path,
+        "content": content,
+        "truncated": truncated,
+        "totalLines": len(lines),
+        "sha": sha,
+        "error": None
+    }
+
+def snapshot_file_results(snapshot: RepoSnapshot, file_paths: List[str], max_lines_per_file: int) -> Dict[str, Dict[str, Any]]:
+    """저장소 스냅샷에서 내용을 읽을 수 있는 파일 결과 (경로 -> 결과, 큰 파일/바이너리는 contents API로 읽어야 함)"""
+    results = {}
+    for file_path in file_paths:
+        if snapshot.has_content(file_path):
+            content = snapshot.read(file_path)
+            if content is not None:
+                results[file_path] = file_result(file_path, content, max_lines_per_file, snapshot.blob(file_path))
+    count_snapshot(filesServed=len(results))
+    return results
+
+def tree_missing_results(tree: RepoTreeIndex, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+    """경로 인덱스로 API 호출 없이 답할 수 있는 오류 결과 (커밋에 없는 경로, 디렉토리)"""
+    results = {}
+    for file_path in file_paths:
+        if tree.is_directory(file_path):
+            results[file_path] = {"filePath": file_path, "content": None, "error": "파일이 아닙니다."}
+        elif tree.missing(file_path):
+            results[file_path] = {"filePath": file_path, "content": None, "error": "404 Not Found: 저장소에 없는 파일입니다."}
+    count_tree(notFoundServed=len(results))
+    return results
+
+def tree_directory_files(tree: RepoTreeIndex, directory_path: str, max_depth: int) -> List[str]:
+    """경로 인덱스에서 list_directory_contents와 같은 결과 (없는 디렉토리는 빈 목록)"""
+    listing = tree.listing(directory_path)
+    if listing is None:
+        return []
+    files, sub_dirs = filter_directory_listing(listing)
+    if max_depth > 0:
+        for sub_path in sub_dirs:
+            # 파일이 너무 많아지면 중단
+            if len(files) >= 100:
+                break
+            files.extend(tree_directory_files(tree, sub_path, max_depth - 1))
+    return files
+
+def existing_paths(
+    github_repo: str,
+    github_token: Optional[str],
+    paths: List[str],
+    ref: str = 'main'
+) -> List[str]:
+    """
+    paths 중 저장소에 있는 경로 (README/설정 파일 찾기 등, 경로 인덱스로 답하며 대소문자 무시)
+
+    경로 인덱스를 쓸 수 없으면 paths를 그대로 반환하므로, 호출한 쪽은 순서대로 읽어 보면 됩니다.
+    """
+    parsed = parse_github_repo(github_repo or '')
+    tree = get_tree_index(parsed[0], parsed[1], ref, github_token) if parsed else None
+    if tree is None:
+        return list(paths)
+    return tree.existing(paths)
+
 def list_directory_contents(
     github_repo: str,
     github_token: Optional[str],
@@ -279,8 +498,36 @@ def list_directory_contents(
     if not github_repo or not directory_path:
         return []
     
+    parsed = parse_github_repo(github_repo)
+    if not parsed:
+        return []
+    owner, repo = parsed
+    
+    # HEAD 커밋 경로 인덱스가 있으면 API 호출 없이 답함 (없는 디렉토리 포함)
+    tree = get_tree_index(owner, repo, ref, github_token)
+    if tree is not None and (tree.complete or directory_path in tree):
+        count_tree(listingsServed=1)
+        return tree_directory_files(tree, directory_path, max_depth)
+    
+    # 같은 디렉토리를 동시에 조회하는 요청은 한 번만 조회하고 결과를 공유
+    files, shared = github_flight.do(
+        github_flight_key('dir', owner, repo, directory_path, ref, github_token, max_depth),
+        lambda: _list_directory_contents_uncached(github_repo, github_token, owner, repo, directory_path, ref, max_depth)
+    )
+    if shared:
+        print(f"[Multi-Step Agent] 진행 중인 동일 디렉토리 조회 결과 공유: {directory_path}")
+    return list(files)
+
+def _list_directory_contents_uncached(
+    github_repo: str,
+    github_token: Optional[str],
+    owner: str,
+    repo: str,
+    directory_path: str,
+    ref: str,
+    max_depth: int
+) -> List[str]:
     try:
-        import requests
         import time
         
         start_time = time.time()
@@ -291,27 +538,10 @@ def list_directory_contents(
         else:
             print(f"[Multi-Step Agent] ⚠️ GitHub 토큰 없음 - rate limit 제한 가능성")
         
-        # repoUrl에서 owner/repo 추출
-        match = re.search(r'github\.com[/:]([^/]+)/([^/]+?)(?:\.git)?/?$', github_repo)
-        if not match:
-            return []
-        
-        owner = match.group(1)
-        repo = match.group(2).replace('.git', '')
-        
-        url = f'https://api.github.com/repos/{owner}/{repo}/contents/{directory_path}'
-        if ref != 'main':
-            url += f'?ref={ref}'
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        response = github_get(github_contents_url(owner, repo, directory_path, ref), headers)
         
         # Rate limit 확인
-        remaining = response.headers.get('X-RateLimit-Remaining', 'unknown')
-        if remaining != 'unknown':
-            remaining_int = int(remaining)
-            if remaining_int < 10:
-                print(f"[Multi-Step Agent] ⚠️ GitHub API rate limit 경고: {remaining_int}개 남음")
+        warn_github_rate_limit(response.headers)
         
         contents = response.json()
         if not isinstance(contents, list):
@@ -321,24 +551,20 @@ def list_directory_contents(
         if elapsed > 2:
             print(f"[Multi-Step Agent] 디렉토리 탐색 느림: {directory_path} ({elapsed:.2f}초)")
         
-        files = []
-        for item in contents:
-            if item.get('type') == 'file':
-                # JavaScript/TypeScript/JSX/Python 파일만
-                file_name = item.get('name', '')
-                if file_name.endswith(('.js', '.jsx', '.ts', '.tsx', '.py')):
-                    files.append(item.get('path', ''))
-            elif item.get('type') == 'dir' and max_depth > 0:
-                # 하위 디렉토리는 재귀적으로 탐색 (깊이 제한)
-                sub_path = item.get('path', '')
-                # 최대 깊이 1로 제한 (속도 향상)
-                sub_files = list_directory_contents(github_repo, github_token, sub_path, ref, max_depth - 1)
-                files.extend(sub_files)
+        files, sub_dirs = filter_directory_listing(contents)
+        if max_depth > 0:
+            # 하위 디렉토리는 재귀적으로 탐색 (최대 깊이 1로 제한, 속도 향상)
+            for sub_path in sub_dirs:
                 # 파일이 너무 많아지면 중단
                 if len(files) >= 100:
                     break
+                sub_files = list_directory_contents(github_repo, github_token, sub_path, ref, max_depth - 1)
+                files.extend(sub_files)
         
         return files
+    except CircuitOpenError as e:
+        print(f"[Multi-Step Agent] 디렉토리 목록 조회 건너뜀 ({directory_path}): {e}")
+        return []
     except Exception as e:
         print(f"[Multi-Step Agent] 디렉토리 목록 조회 실패 ({directory_path}): {e}")
         return []
@@ -368,7 +594,6 @@ def get_file_contents(
         return []
     
     try:
-        import requests
         import time
         
         headers = {}
@@ -379,20 +604,33 @@ def get_file_contents(
             print(f"[Multi-Step Agent] ⚠️ 파일 읽기: {len(file_paths)}개 파일, 토큰 없음 - rate limit 제한 가능성 (시간당 60회)")
         
         # repoUrl에서 owner/repo 추출
-        match = re.search(r'github\.com[/:]([^/]+)/([^/]+?)(?:\.git)?/?$', github_repo)
-        if not match:
+        parsed = parse_github_repo(github_repo)
+        if not parsed:
             print(f"[Multi-Step Agent] ⚠️ GitHub URL 파싱 실패: {github_repo}")
             return []
         
-        owner = match.group(1)
-        repo = match.group(2).replace('.git', '')
+        owner, repo = parsed
         print(f"[Multi-Step Agent] GitHub 저장소: {owner}/{repo}")
         
+        files_to_fetch = unique_paths(file_paths)[:MAX_FILES_PER_BATCH]
+        
+        # HEAD 커밋 스냅샷에서 읽을 수 있는 파일과 경로 인덱스에 없는 파일은 API 호출 없이 답함
+        snapshot = get_snapshot(owner, repo, ref, github_token)
+        from_snapshot = snapshot_file_results(snapshot, files_to_fetch, max_lines_per_file) if snapshot is not None else {}
+        tree = get_tree_index(owner, repo, ref, github_token)
+        if tree is not None:
+            from_snapshot.update(tree_missing_results(tree, [p for p in files_to_fetch if p not in from_snapshot]))
+        api_paths = [file_path for file_path in files_to_fetch if file_path not in from_snapshot]
+        if from_snapshot:
+            print(f"[Multi-Step Agent] 스냅샷/경로 인덱스로 답함: {len(from_snapshot)}개, API로 읽을 파일: {len(api_paths)}개")
+        if not api_paths:
+            return [from_snapshot[file_path] for file_path in files_to_fetch]
+        
         # 첫 번째 요청으로 토큰 검증 및 rate limit 확인
         if github_token:
             try:
                 test_url = f'https://api.github.com/repos/{owner}/{repo}'
-                test_response = requests.get(test_url, headers=headers, timeout=5)
+                test_response = github_get(test_url, headers, timeout=5)
                 rate_limit_remaining = test_response.headers.get('X-RateLimit-Remaining', 'unknown')
                 rate_limit_total = test_response.headers.get('X-RateLimit-Limit', 'unknown')
                 print(f"[Multi-Step Agent] GitHub API 연결 확인: rate limit {rate_limit_remaining}/{rate_limit_total} 남음")
@@ -405,55 +643,30 @@ def get_file_contents(
         
         # 병렬 처리로 파일 읽기
         def fetch_single_file(file_path):
-            """단일 파일 읽기 함수"""
+            """단일 파일 읽기 함수 (동시에 같은 파일을 읽는 요청과 결과 공유)"""
+            result, shared = github_flight.do(
+                github_flight_key('file', owner, repo, file_path, ref, github_token, max_lines_per_file),
+                lambda: fetch_single_file_uncached(file_path)
+            )
+            if shared:
+                print(f"[Multi-Step Agent] 진행 중인 동일 파일 읽기 결과 공유: {file_path}")
+            return dict(result)
+        
+        def fetch_single_file_uncached(file_path):
             try:
                 import time
                 start_time = time.time()
                 
-                url = f'https://api.github.com/repos/{owner}/{repo}/contents/{file_path}'
-                if ref != 'main':
-                    url += f'?ref={ref}'
-                
-                response = requests.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
+                response = github_get(github_contents_url(owner, repo, file_path, ref), headers)
                 
                 # Rate limit 확인
-                remaining = response.headers.get('X-RateLimit-Remaining', 'unknown')
-                if remaining != 'unknown':
-                    remaining_int = int(remaining)
-                    if remaining_int < 10:
-                        print(f"[Multi-Step Agent] ⚠️ GitHub API rate limit 경고: {remaining_int}개 남음")
+                warn_github_rate_limit(response.headers)
                 
                 elapsed = time.time() - start_time
                 if elapsed > 1:
                     print(f"[Multi-Step Agent] 파일 읽기 느림: {file_path} ({elapsed:.2f}초)")
                 
-                file_data = response.json()
-                
-                if file_data.get('type') != 'file':
-                    return {
-                        "filePath": file_path,
-                        "content": None,
-                        "error": "파일이 아닙니다."
-                    }
-                
-                import base64
-                content = base64.b64decode(file_data['content']).decode('utf-8')
-                
-                # 라인 수 제한
-                lines = content.split('\n')
-                truncated = False
-                if max_lines_per_file > 0 and len(lines) > max_lines_per_file:
-                    content = '\n'.join(lines[:max_lines_per_file])
-                    truncated = True
-                
-                return {
-                    "filePath": file_path,
-                    "content": content,
-                    "truncated": truncated,
-                    "totalLines": len(lines),
-                    "error": None
-                }
+                return decode_github_file(file_path, response.json(), max_lines_per_file)
             except Exception as e:
                 return {
                     "filePath": file_path,
@@ -461,23 +674,16 @@ def get_file_contents(
                     "error": str(e)
                 }
         
-        # 병렬 처리 (최대 10개 동시 요청)
-        results = []
-        files_to_fetch = file_paths[:50]  # 최대 50개 파일
-        
-        if len(files_to_fetch) > 1:
+        # 병렬 처리 (최대 GITHUB_MAX_CONCURRENCY개 동시 요청, 결과는 요청한 순서대로)
+        if len(api_paths) > 1:
             # 병렬 처리
-            print(f"[Multi-Step Agent] 병렬 파일 읽기 시작: {len(files_to_fetch)}개 파일")
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_file = {executor.submit(fetch_single_file, file_path): file_path 
-                                 for file_path in files_to_fetch}
-                for future in as_completed(future_to_file):
-                    result = future.result()
-                    results.append(result)
+            print(f"[Multi-Step Agent] 병렬 파일 읽기 시작: {len(api_paths)}개 파일")
+            with ThreadPoolExecutor(max_workers=min(GITHUB_MAX_CONCURRENCY, len(api_paths))) as executor:
+                fetched = dict(zip(api_paths, executor.map(fetch_single_file, api_paths)))
         else:
             # 파일이 1개 이하면 순차 처리
-            for file_path in files_to_fetch:
-                results.append(fetch_single_file(file_path))
+            fetched = {file_path: fetch_single_file(file_path) for file_path in api_paths}
+        results = [from_snapshot.get(file_path) or fetched[file_path] for file_path in files_to_fetch]
         
         file_read_elapsed = time.time() - file_read_start
         successful_reads = len([r for r in results if r.get('content')])
@@ -488,26 +694,200 @@ def get_file_contents(
         print(f"[Multi-Step Agent] 파일 읽기 실패: {e}")
         return []
 
+def unique_paths(paths: List[str], exclude: Optional[set] = None) -> List[str]:
+    """빈 경로와 중복을 제거한 경로 목록 (순서 유지, exclude에 있는 경로 제외)"""
+    seen = set(exclude or ())
+    unique = []
+    for path in paths:
+        if path and path not in seen:
+            seen.add(path)
+            unique.append(path)
+    return unique
+
+def read_new_files_steps(
+    github_repo: str,
+    github_token: Optional[str],
+    file_paths: List[str],
+    accumulated_files: FileStore,
+    limit: Optional[int] = None,
+    prefetched: Optional[PrefetchCache] = None,
+    relevance: float = DEFAULT_RELEVANCE,
+    **kwargs
+):
+    """
+    아직 읽지 않은 파일들을 한 번의 병렬 요청으로 읽어 accumulated_files에 추가 (에이전트 generator)
+    
+    파일마다 요청을 따로 yield하면 GitHub 왕복이 파일 수만큼 순차로 쌓이므로,
+    단계에서 필요한 파일 목록을 먼저 정한 뒤 이 함수로 한 번에 읽습니다.
+    prefetched가 있으면 이전 LLM 호출 중에 선읽기한 파일은 다시 요청하지 않습니다 (speculative_prefetch 참고).
+    이미 읽은 파일을 다시 요청하면 읽지 않고 관련도만 올립니다 (file_store 참고).
+    
+        new_files = yield from read_new_files_steps(github_repo, github_token, paths, accumulated_files, limit=10)
+    
+    Returns:
+        새로 읽은 파일 목록 [{"path": "...", "content": "...", "truncated": bool}, ...] (요청한 순서)
+    """
+    pending = []
+    for path in unique_paths(file_paths):
+        if path in accumulated_files:
+            accumulated_files.touch(path, relevance)
+        else:
+            pending.append(path)
+    if limit is not None:
+        pending = pending[:limit]
+    if not github_repo or not pending:
+        return []
+    
+    by_path, to_fetch = ({}, pending) if prefetched is None else prefetched.take(pending, kwargs.get('max_lines_per_file'))
+    if by_path:
+        print(f"[Multi-Step Agent] 선읽기한 파일 {len(by_path)}개 사용, {len(to_fetch)}개 새로 읽기")
+    if to_fetch:
+        try:
+            file_contents = yield read_files_request(github_repo, github_token, to_fetch, **kwargs)
+        except Exception as e:
+            print(f"[Multi-Step Agent] 파일 읽기 실패 ({len(to_fetch)}개 파일): {e}")
+            file_contents = []
+        for path, file_info in zip(to_fetch, file_contents):
+            by_path[path] = file_info
+    
+    new_files = []
+    for file_info in (by_path[path] for path in pending if path in by_path):
+        if file_info.get('content'):
+            new_file = accumulated_files.add(
+                file_info.get('filePath', ''),
+                file_info['content'],
+                file_info.get('truncated', False),
+                sha=file_info.get('sha'),
+                relevance=relevance
+            )
+            if new_file is not None:
+                new_files.append(new_file)
+    return new_files
+
+# README 파일 후보 (앞에서부터 찾음)
+README_FILES = ["README.md", "README.txt", "readme.md", "README", "readme"]
+# 프로젝트 구조 파악용 설정 파일 후보 (README가 없을 때)
+CONFIG_FILES = ["package.json", "requirements.txt", "pom.xml", "build.gradle", "Cargo.toml"]
+
+# 진행도 분석 2단계 이후 API 엔드포인트 파악을 위해 읽는 파일 (백엔드 라우트, 프론트엔드 API 호출, 컨트롤러)
+PROGRESS_API_FILES = [
+    "backend/routes/user.js", "backend/routes/project.js", "backend/routes/task.js",
+    "backend/routes/ai.js", "backend/routes/github.js", "backend/routes/progress.js",
+    "backend/routes/index.js", "backend/app.js",
+    "morpheus-react/web/src/api/user.js", "morpheus-react/web/src/api/project.js",
+    "morpheus-react/web/src/api/task.js", "morpheus-react/web/src/api/ai.js",
+    "morpheus-react/web/src/api/github.js",
+    "backend/controllers/userController.js", "backend/controllers/projectController.js",
+    "backend/controllers/taskController.js", "backend/controllers/aiController.js",
+    "backend/controllers/githubController.js", "backend/controllers/progressController.js"
+]
+
+# 진행도 분석 3단계 이후 읽는 페이지/컴포넌트 파일 (확실한 파일들)
+PROGRESS_PAGE_FILES = [
+    # 페이지 파일들
+    "morpheus-react/web/src/pages/Login.jsx",
+    "morpheus-react/web/src/pages/SignupPage.jsx",
+    "morpheus-react/web/src/pages/Home.jsx",
+    "morpheus-react/web/src/pages/ProjectPage.jsx",
+    "morpheus-react/web/src/pages/ProjectDetailPage.jsx",
+    "morpheus-react/web/src/pages/AIadvisorPage.jsx",
+    "morpheus-react/web/src/pages/TaskDetailPage.jsx",
+    "morpheus-react/web/src/pages/TaskListPage.jsx",
+    # 컴포넌트 파일들
+    "morpheus-react/web/src/components/ai/ChatBot.jsx",
+    "morpheus-react/web/src/components/tasks/TaskView.jsx",
+    "morpheus-react/web/src/components/tasks/List.jsx",
+    "morpheus-react/web/src/components/tasks/TaskCard.jsx",
+    "morpheus-react/web/src/components/projects/CreateProject.jsx",
+    "morpheus-react/web/src/components/projects/ProjectCard.jsx",
+    "morpheus-react/web/src/components/layout/Layout.jsx",
+    "morpheus-react/web/src/components/layout/CategoryBar.jsx"
+]
+
+# Task 완료 확인 2단계에서 파일 목록을 조회해 코드 검색(경로 BM25)으로 관련 파일을 고르는 디렉토리
+CODE_SEARCH_DIRECTORIES = ["src", "app", "backend", "frontend", "server", "client", "web"]
+# Task 완료 확인 2단계에서 읽는 최대 파일 수
+TASK_COMPLETION_MAX_FILES = 10
+# 읽은 파일을 검색 질문(Task 제목/사용자 질문)과 관련된 청크만 발췌해 프롬프트에 넣는 에이전트
+RETRIEVAL_AGENTS = ("task_completion_agent", "general_qa_agent")
+
+def step2_page_files(all_steps: List[Dict[str, Any]]) -> List[str]:
+    """진행도 분석 2단계 requiredFeatures에서 페이지/컴포넌트 파일 경로 추출"""
+    step2_result = all_steps[1] if len(all_steps) > 1 else {}
+    files_from_step2 = []
+    for feat in step2_result.get('requiredFeatures', []):
+        expected_loc = feat.get('expectedLocation', '')
+        feat_type = feat.get('type', '')
+        
+        if feat_type in ['page', 'component'] and expected_loc:
+            path = expected_loc.lstrip('/')
+            if path.endswith(('.jsx', '.js', '.tsx', '.ts')):
+                if path not in files_from_step2:
+                    files_from_step2.append(path)
+    return files_from_step2
+
+def prefetch_candidates(
+    agent_type: str,
+    step_number: int,
+    context: Dict[str, Any],
+    all_steps: List[Dict[str, Any]]
+) -> Tuple[List[str], Optional[int]]:
+    """
+    step_number 단계의 LLM 호출 중에 선읽기할 파일 (다음 단계에서 읽을 가능성이 높은 파일)과 줄 수 제한
+    
+    - 진행도 분석 2단계: 단계 종료 후 읽는 라우트/API/컨트롤러 목록
+    - 진행도 분석 3단계: 2단계 requiredFeatures의 페이지/컴포넌트 위치 + 확실한 페이지/컴포넌트 목록
+    """
+    if agent_type == "progress_analysis_agent":
+        if step_number == 2:
+            return PROGRESS_API_FILES, None
+        if step_number == 3:
+            return step2_page_files(all_steps)[:30] + PROGRESS_PAGE_FILES, None
+    return [], None
+
 def execute_multi_step_agent(
     agent_type: str,
     context: Dict[str, Any],
-    call_llm_func: Callable,
+    call_llm_func: Optional[Callable],
     user_message: Optional[str] = None,
     initial_prompt_func: Callable = None,
     followup_prompt_func: Callable = None,
     system_prompt: str = "전문가. 반드시 한국어로만 응답. JSON만 응답."
 ) -> Dict[str, Any]:
     """
-    다단계 분석을 수행하는 공통 함수
+    다단계 분석을 동기적으로 수행 (인자와 반환 형식은 multi_step_agent_steps 참고)
+    
+    Args:
+        call_llm_func: LLM 호출 함수 (None이면 공유 LLM 클라이언트 사용)
+    """
+    return run_agent_sync(
+        multi_step_agent_steps(
+            agent_type, context, user_message,
+            initial_prompt_func, followup_prompt_func, system_prompt
+        ),
+        call_llm_func or call_llm
+    )
+
+def multi_step_agent_steps(
+    agent_type: str,
+    context: Dict[str, Any],
+    user_message: Optional[str] = None,
+    initial_prompt_func: Callable = None,
+    followup_prompt_func: Callable = None,
+    system_prompt: str = "전문가. 반드시 한국어로만 응답. JSON만 응답.",
+    max_tokens: Optional[int] = None
+):
+    """
+    다단계 분석을 수행하는 공통 함수 (에이전트 generator, agent_io 참고)
     
     Args:
         agent_type: 에이전트 타입
         context: 컨텍스트 정보
-        call_llm_func: LLM 호출 함수
         user_message: 사용자 메시지 (선택사항)
         initial_prompt_func: 초기 프롬프트 생성 함수
         followup_prompt_func: 후속 프롬프트 생성 함수
         system_prompt: 시스템 프롬프트
+        max_tokens: LLM 응답 토큰 제한 (None이면 실행기의 LLM 함수 기본값)
     
     Returns:
         {
@@ -519,13 +899,44 @@ def execute_multi_step_agent(
     """
     all_steps = []
     current_result = None
+    evaluation = None  # 마지막 정보 충분성 평가 결과
     step_number = 0
-    accumulated_files = []  # 읽은 파일 추적
+    accumulated_files = FileStore()  # 읽은 파일 추적 (경로 인덱스, 중복 제거, 바이트 예산)
     accumulated_commits = []  # 분석한 커밋 추적
-    progress_messages = []  # 진행 상황 메시지 추적
+    progress_messages = ProgressMessages()  # 진행 상황 메시지 추적 (스트리밍 구독자에게도 전달)
+    step_seconds = AGENT_STEP_ESTIMATE_SECONDS  # LLM 단계 하나의 예상 시간 (직전 단계 측정값)
+    partial_reason = None  # 마감 시간 때문에 분석을 일찍 끝낸 경우 그 이유
+    prefetch = PrefetchCache(agent_type)  # LLM 호출 중에 선읽기한 다음 단계 후보 파일 (speculative_prefetch 참고)
+    
+    def out_of_time():
+        # 마감 시간까지 LLM 단계 하나를 더 수행할 시간이 없는지 (선택적 파일 읽기/평가 생략 기준)
+        return deadline_exceeded(step_seconds)
     
     github_repo = context.get('githubRepo', '')
     github_token = context.get('githubToken')
+    # 읽은 파일에서 Task 제목/질문과 관련된 부분만 발췌하기 위한 검색 질문 (prompt_optimizer.compose_prompt 참고)
+    # 프로젝트 전체를 보는 에이전트(진행도 분석 등)는 파일 앞부분 발췌를 그대로 사용
+    if agent_type in RETRIEVAL_AGENTS:
+        context.setdefault('retrievalQuery', retrieval_query(context, user_message))
+    
+    # 같은 실행 ID로 재시도한 요청이면 마지막 완료 단계부터 재개 (agent_checkpoint 참고)
+    fingerprint = run_fingerprint(context, user_message)
+    checkpoint = load_checkpoint(agent_type, fingerprint)
+    if checkpoint:
+        step_number = checkpoint['step_number']
+        all_steps = checkpoint['all_steps']
+        current_result = checkpoint['current_result']
+        accumulated_files = FileStore.from_list(checkpoint['accumulated_files'])
+        accumulated_commits = checkpoint['accumulated_commits']
+        progress_messages.extend(checkpoint['progress_messages'])
+        if checkpoint.get('evaluation') is not None:
+            evaluation = checkpoint['evaluation']
+        if accumulated_files:
+            context['readFiles'] = accumulated_files.view()
+        if checkpoint.get('detailed_commits'):
+            context['detailedCommits'] = checkpoint['detailed_commits']
+        print(f"[Multi-Step Agent] {agent_type} - 체크포인트에서 재개 (완료된 단계: {step_number}, 읽은 파일: {len(accumulated_files)}개)")
+        progress_messages.append(f"♻️ 이전 실행의 {step_number}단계까지 결과를 이어서 분석합니다.")
     
     # 에이전트 타입별 한국어 이름
     agent_name_kr = {
@@ -536,6 +947,20 @@ def execute_multi_step_agent(
         "task_assignment_agent": "Task 할당 추천"
     }.get(agent_type, "분석")
     
+    def save_step_checkpoint():
+        """step_number 단계까지의 상태 저장 (실패 후 같은 실행 ID로 재시도하면 다음 단계부터 재개, 마지막 단계는 저장하지 않음)"""
+        if step_number < MAX_ANALYSIS_STEPS:
+            save_checkpoint(agent_type, fingerprint, step_number, {
+                "step_number": step_number,
+                "all_steps": all_steps,
+                "current_result": current_result,
+                "accumulated_files": accumulated_files.to_list(),
+                "accumulated_commits": accumulated_commits,
+                "detailed_commits": context.get('detailedCommits'),
+                "evaluation": evaluation,
+                "progress_messages": list(progress_messages),
+            })
+    
     while step_number < MAX_ANALYSIS_STEPS:
         step_number += 1
         print(f"[Multi-Step Agent] {agent_type} - 단계 {step_number}/{MAX_ANALYSIS_STEPS} 시작")
@@ -571,44 +996,48 @@ def execute_multi_step_agent(
         
             # 진행도 분석 에이전트의 경우 첫 단계에서 README 파일 자동 읽기
         if step_number == 1 and agent_type == "progress_analysis_agent" and github_repo:
-            # README 파일 찾기 시도
-            readme_files = ["README.md", "README.txt", "readme.md", "README", "readme"]
+            # README 파일 찾기 시도 (경로 인덱스로 실제 있는 파일만 읽음)
             progress_messages.append("📖 README 파일을 찾는 중...")
+            readme_files = yield existing_paths_request(github_repo, github_token, README_FILES)
             
             for readme_file in readme_files:
                 try:
-                    file_contents = get_file_contents(github_repo, github_token, [readme_file])
+                    file_contents = yield read_files_request(github_repo, github_token, [readme_file])
                     if file_contents and file_contents[0].get('content'):
-                        accumulated_files.append({
-                            "path": readme_file,
-                            "content": file_contents[0]['content'],
-                            "truncated": file_contents[0].get('truncated', False)
-                        })
+                        accumulated_files.add(
+                            readme_file,
+                            file_contents[0]['content'],
+                            file_contents[0].get('truncated', False),
+                            sha=file_contents[0].get('sha'),
+                            relevance=PINNED_RELEVANCE
+                        )
                         progress_messages.append(f"✅ {readme_file} 파일을 읽었습니다.")
-                        context['readFiles'] = accumulated_files
+                        context['readFiles'] = accumulated_files.view()
                         break
-                except:
+                except Exception:
                     continue
             
             # 프로젝트 구조 파악을 위한 주요 파일들도 읽기 시도
             if not accumulated_files:
                 # package.json, requirements.txt 등 설정 파일 찾기
-                config_files = ["package.json", "requirements.txt", "pom.xml", "build.gradle", "Cargo.toml"]
                 progress_messages.append("📄 프로젝트 설정 파일을 찾는 중...")
+                config_files = yield existing_paths_request(github_repo, github_token, CONFIG_FILES)
                 
                 for config_file in config_files:
                     try:
-                        file_contents = get_file_contents(github_repo, github_token, [config_file])
+                        file_contents = yield read_files_request(github_repo, github_token, [config_file])
                         if file_contents and file_contents[0].get('content'):
-                            accumulated_files.append({
-                                "path": config_file,
-                                "content": file_contents[0]['content'],
-                                "truncated": file_contents[0].get('truncated', False)
-                            })
+                            accumulated_files.add(
+                                config_file,
+                                file_contents[0]['content'],
+                                file_contents[0].get('truncated', False),
+                                sha=file_contents[0].get('sha'),
+                                relevance=PINNED_RELEVANCE
+                            )
                             progress_messages.append(f"✅ {config_file} 파일을 읽었습니다.")
-                            context['readFiles'] = accumulated_files
+                            context['readFiles'] = accumulated_files.view()
                             break
-                    except:
+                    except Exception:
                         continue
         
         # Task 완료 확인 에이전트: 진행도 분석과 유사한 단계별 파일 읽기
@@ -631,67 +1060,42 @@ def execute_multi_step_agent(
                 if expected_location and expected_location.endswith(('.js', '.jsx', '.ts', '.tsx', '.py')):
                     files_to_read.append(expected_location)
                 
-                # Task 제목에서 키워드 추출하여 관련 파일 찾기 (expectedLocation이 없어도 실행)
-                if '로그인' in task_title or 'login' in task_title or '인증' in task_title or 'auth' in task_title or '회원가입' in task_title or 'signup' in task_title:
-                    files_to_read.extend([
-                        "backend/routes/user.js",
-                        "backend/controllers/userController.js",
-                        "backend/middleware/auth.js",
-                        "morpheus-react/web/src/pages/Login.jsx",
-                        "morpheus-react/web/src/api/user.js"
-                    ])
-                    print(f"[Multi-Step Agent] Task 완료 확인 - 로그인 관련 파일 추가")
-                elif 'github' in task_title or 'git' in task_title:
-                    files_to_read.extend([
-                        "backend/routes/github.js",
-                        "backend/controllers/githubController.js",
-                        "backend/services/githubService.js",
-                        "morpheus-react/web/src/api/github.js"
-                    ])
-                    print(f"[Multi-Step Agent] Task 완료 확인 - GitHub 관련 파일 추가")
-                elif 'task' in task_title or '작업' in task_title:
-                    files_to_read.extend([
-                        "backend/routes/task.js",
-                        "backend/controllers/taskController.js",
-                        "morpheus-react/web/src/api/task.js",
-                        "morpheus-react/web/src/components/tasks/TaskManagement.jsx"
-                    ])
-                    print(f"[Multi-Step Agent] Task 완료 확인 - Task 관련 파일 추가")
-                elif 'ai' in task_title or '에이전트' in task_title:
-                    files_to_read.extend([
-                        "backend/routes/ai.js",
-                        "backend/controllers/aiController.js",
-                        "ai-backend/agent_router.py",
-                        "morpheus-react/web/src/api/ai.js"
-                    ])
-                    print(f"[Multi-Step Agent] Task 완료 확인 - AI 관련 파일 추가")
-                
-                # 중복 제거 및 최대 10개로 제한 (간결하게)
-                files_to_read = list(set(files_to_read))[:10]
+                # 소스 디렉토리(+ 예상 위치의 디렉토리) 파일 목록을 Task 제목/설명/예상 위치로 검색해 관련 파일 찾기 (code_search 참고)
+                search_directories = list(CODE_SEARCH_DIRECTORIES)
+                expected_directory = expected_location.strip('/')
+                if '.' in expected_directory.rsplit('/', 1)[-1]:
+                    expected_directory = expected_directory.rsplit('/', 1)[0] if '/' in expected_directory else ''
+                if expected_directory and expected_directory not in search_directories:
+                    search_directories.append(expected_directory)
+                listed_files = []
+                if not out_of_time():
+                    listings = yield [
+                        list_directory_request(github_repo, github_token, directory)
+                        for directory in search_directories
+                    ]
+                    for files_in_dir in listings:
+                        if not isinstance(files_in_dir, Exception):
+                            listed_files.extend(files_in_dir or [])
+                search_query = f"{retrieval_query(context, user_message)} {expected_location}"
+                searched_files = rank_paths(search_query, listed_files, k=TASK_COMPLETION_MAX_FILES)
+                if searched_files:
+                    files_to_read.extend(searched_files)
+                    print(f"[Multi-Step Agent] Task 완료 확인 - 코드 검색으로 관련 파일 {len(searched_files)}개 선택 (후보 {len(listed_files)}개)")
+
                 
                 print(f"[Multi-Step Agent] Task 완료 확인 - 읽을 파일 목록: {files_to_read}")
                 
-                # 파일 읽기
+                # 파일 읽기 (중복 제거 후 최대 10개를 한 번에 병렬로)
                 read_count = 0
-                for file_path in files_to_read:
-                    if file_path not in [f.get('path', '') for f in accumulated_files]:
-                        try:
-                            file_contents = get_file_contents(github_repo, github_token, [file_path], max_lines_per_file=400)
-                            if file_contents and file_contents[0].get('content'):
-                                accumulated_files.append({
-                                    "path": file_path,
-                                    "content": file_contents[0]['content'],
-                                    "truncated": file_contents[0].get('truncated', False)
-                                })
-                                progress_messages.append(f"✅ {file_path} 파일을 읽었습니다.")
-                                context['readFiles'] = accumulated_files
-                                read_count += 1
-                                print(f"[Multi-Step Agent] Task 완료 확인 - 파일 읽기 성공: {file_path}")
-                            else:
-                                print(f"[Multi-Step Agent] Task 완료 확인 - 파일 읽기 실패 (내용 없음): {file_path}")
-                        except Exception as e:
-                            print(f"[Multi-Step Agent] Task 완료 확인 - 파일 읽기 실패 ({file_path}): {e}")
-                            continue
+                if not out_of_time():
+                    new_files = yield from read_new_files_steps(
+                        github_repo, github_token, files_to_read, accumulated_files,
+                        limit=TASK_COMPLETION_MAX_FILES, prefetched=prefetch, max_lines_per_file=400
+                    )
+                    for file_info in new_files:
+                        progress_messages.append(f"✅ {file_info['path']} 파일을 읽었습니다.")
+                    context['readFiles'] = accumulated_files.view()
+                    read_count = len(new_files)
                 
                 if read_count > 0:
                     print(f"[Multi-Step Agent] Task 완료 확인 - 2단계: {read_count}개 파일 읽기 완료")
@@ -773,66 +1177,79 @@ def execute_multi_step_agent(
                                 if path not in files_to_read_from_step2:
                                     files_to_read_from_step2.append(path)
                 
-                # 추론한 파일들을 읽기
-                for file_path in files_to_read_from_step2:
-                    if file_path not in [f.get('path', '') for f in accumulated_files]:
-                        try:
-                            file_contents = get_file_contents(github_repo, github_token, [file_path])
-                            if file_contents and file_contents[0].get('content'):
-                                accumulated_files.append({
-                                    "path": file_path,
-                                    "content": file_contents[0]['content'],
-                                    "truncated": file_contents[0].get('truncated', False)
-                                })
-                                progress_messages.append(f"✅ {file_path} 파일을 읽었습니다. (2단계 결과 기반)")
-                                context['readFiles'] = accumulated_files
-                        except:
-                            continue
+                # 추론한 파일들을 한 번에 병렬로 읽기
+                if not out_of_time():
+                    new_files = yield from read_new_files_steps(
+                        github_repo, github_token, files_to_read_from_step2, accumulated_files,
+                        prefetched=prefetch, relevance=SUGGESTED_RELEVANCE
+                    )
+                    for file_info in new_files:
+                        progress_messages.append(f"✅ {file_info['path']} 파일을 읽었습니다. (2단계 결과 기반)")
+                    context['readFiles'] = accumulated_files.view()
         
         # 프롬프트 생성 (단계별로 다른 작업 수행)
         if step_number == 1:
             # 1단계: 프로젝트 분석
             if initial_prompt_func:
-                prompt = initial_prompt_func(context, user_message, accumulated_files, accumulated_commits, step_number)
+                prompt = initial_prompt_func(context, user_message, accumulated_files.view(), accumulated_commits, step_number)
             else:
                 # 기본 프롬프트 생성 (에이전트별로 다름)
-                prompt = f"분석을 시작합니다. 컨텍스트: {json.dumps(context, ensure_ascii=False)[:500]}"
+                prompt = f"분석을 시작합니다. 컨텍스트: {fit_section(json.dumps(context, ensure_ascii=False), 0.15)}"
         else:
             # 2단계 이상: 이전 단계 결과를 보여주고 다음 단계 수행
             if followup_prompt_func:
-                prompt = followup_prompt_func(context, current_result, user_message, accumulated_files, accumulated_commits, step_number, all_steps)
+                prompt = followup_prompt_func(context, current_result, user_message, accumulated_files.view(), accumulated_commits, step_number, all_steps)
             else:
                 # 기본 후속 프롬프트
+                sections = allocate_sections([
+                    ('previous', json.dumps(current_result, ensure_ascii=False, indent=2), 1000),
+                    ('files', json.dumps(accumulated_files.view(), ensure_ascii=False), 500),
+                ])
                 prompt = f"""이전 분석 결과를 바탕으로 더 깊이 분석하세요.
 
 이전 분석 결과:
-{json.dumps(current_result, ensure_ascii=False, indent=2)[:1000]}
+{sections['previous']}
 
 읽은 파일:
-{json.dumps(accumulated_files, ensure_ascii=False)[:500]}
+{sections['files']}
 
 추가로 확인해야 할 정보가 있다면 더 자세히 분석하세요."""
         
+        # 다음 단계에서 읽을 가능성이 높은 파일은 이번 LLM 호출과 동시에 선읽기 (GitHub 사용 불가 시 생략)
+        candidates, prefetch_lines = [], None
+        if github_repo and github_breaker().available():
+            candidate_paths, prefetch_lines = prefetch_candidates(agent_type, step_number, context, all_steps)
+            candidates = prefetch.candidates(
+                [path for path in unique_paths(candidate_paths) if path not in accumulated_files], prefetch_lines
+            )
+        
         # LLM 호출
         try:
-            content = call_llm_func(prompt, system_prompt)
+            step_started = time.monotonic()
+            # 단계별 응답 형식이 달라 스키마 없이 JSON 모드만 사용
+            llm_call = llm_request(
+                prompt, system_prompt, max_tokens=max_tokens, purpose=agent_type, schema=GENERIC_JSON
+            )
+            if candidates:
+                read_kwargs = {'max_lines_per_file': prefetch_lines} if prefetch_lines else {}
+                content, prefetched_files = yield [
+                    llm_call, read_files_request(github_repo, github_token, candidates, **read_kwargs)
+                ]
+                prefetch.store(candidates, prefetched_files, prefetch_lines)
+                if isinstance(content, Exception):
+                    raise content
+            else:
+                content = yield llm_call
+            step_seconds = time.monotonic() - step_started
             
             # JSON 파싱
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            content = content.strip()
-            if '{' in content:
-                content = content[content.find('{'):]
-            if '}' in content:
-                content = content[:content.rfind('}')+1]
-            
-            step_result = json.loads(content)
+            step_result = parse_json_response(content)
             step_result['step_number'] = step_number
             all_steps.append(step_result)
             current_result = step_result
+            # 단계 결과를 바로 저장 (마감 시간으로 평가 전에 종료해도 같은 실행 ID로 재시도하면 다음 단계부터 재개)
+            save_step_checkpoint()
+            emit('step', {'agent_type': agent_type, 'step_number': step_number, 'result': step_result})
             
             # 단계 완료 메시지 추가
             if agent_type == "progress_analysis_agent":
@@ -856,12 +1273,18 @@ def execute_multi_step_agent(
             
             print(f"[Multi-Step Agent] {agent_type} - 단계 {step_number} 완료")
             
+        except UNAVAILABLE_ERRORS:
+            # LLM 대기열 초과/서킷 브레이커 열림은 503 + Retry-After로 응답하도록 그대로 전달 (체크포인트는 유지)
+            prefetch.finish()
+            raise
         except Exception as e:
             print(f"[Multi-Step Agent] {agent_type} - 단계 {step_number} 실패: {e}")
-            # 에러 발생 시 이전 결과 사용 또는 기본값 반환
+            # 에러 발생 시 이전 결과 사용 또는 기본값 반환 (체크포인트는 유지되어 같은 실행 ID로 재시도하면 이 단계부터 재개)
             if current_result:
+                partial_reason = f'{step_number}단계 분석 실패로 {step_number - 1}단계까지의 결과를 반환합니다.'
                 break
             else:
+                prefetch.finish()
                 return {
                     "agent_type": agent_type,
                     "error": f"분석 실패: {str(e)}",
@@ -872,8 +1295,15 @@ def execute_multi_step_agent(
                     "analysis_steps": step_number
                 }
         
+        # 충분성 평가를 할 시간도 없으면 평가 없이 현재 결과로 종료
+        if step_number < MAX_ANALYSIS_STEPS and out_of_time():
+            partial_reason = f'응답 시간 제한으로 {step_number}단계까지의 결과를 반환합니다.'
+            print(f"[Multi-Step Agent] {agent_type} - 마감 시간 임박, 평가 없이 분석 종료 (단계 {step_number}, 남은 시간: {remaining_seconds():.1f}초)")
+            progress_messages.append("⏱️ 응답 시간 제한으로 지금까지의 분석 결과를 정리 중...")
+            break
+        
         # 정보 충분성 평가
-        evaluation = evaluate_information_sufficiency(current_result, agent_type, call_llm_func, step_number, context)
+        evaluation = yield from evaluate_information_sufficiency_steps(current_result, agent_type, step_number, context, max_tokens)
         
         print(f"[Multi-Step Agent] {agent_type} - 평가 결과: 충분={evaluation.get('is_sufficient')}, 신뢰도={evaluation.get('confidence')}")
         
@@ -883,62 +1313,29 @@ def execute_multi_step_agent(
             progress_messages.append(f"✨ 분석 완료! 최종 결과를 정리 중...")
             break
         
+        # GitHub API 서킷 브레이커가 열려 있으면 추가 탐색(파일 읽기)이 모두 실패하므로 현재 결과로 종료
+        if github_repo and evaluation.get('needs_more_info', False) and not github_breaker().available():
+            print(f"[Multi-Step Agent] {agent_type} - GitHub API 사용 불가, 추가 탐색 없이 분석 종료 (단계 {step_number})")
+            progress_messages.append("⚠️ GitHub API를 일시적으로 사용할 수 없어 현재까지의 정보로 분석을 마칩니다.")
+            break
+        
+        # 다음 단계를 마칠 시간이 없으면 추가 탐색 없이 현재 결과로 종료
+        if step_number < MAX_ANALYSIS_STEPS and out_of_time():
+            partial_reason = f'응답 시간 제한으로 {step_number}단계까지의 결과를 반환합니다.'
+            print(f"[Multi-Step Agent] {agent_type} - 마감 시간 임박, 추가 탐색 없이 분석 종료 (단계 {step_number}, 남은 시간: {remaining_seconds():.1f}초)")
+            progress_messages.append("⏱️ 응답 시간 제한으로 지금까지의 분석 결과를 정리 중...")
+            break
+        
         # 추가 정보가 필요한 경우 파일 읽기
         if evaluation.get('needs_more_info', False) and step_number < MAX_ANALYSIS_STEPS:
             files_to_read = evaluation.get('files_to_read', [])
             commits_to_analyze = evaluation.get('commits_to_analyze', [])
             
-            # Task 완료 확인 에이전트: 제안된 파일을 Task 제목 기반으로 필터링
+            # Task 완료 확인 에이전트: 제안된 파일을 검색 질문(Task 제목/설명)과 관련된 순서로 재정렬 (code_search 참고)
             if agent_type == "task_completion_agent" and files_to_read:
-                task = context.get('task', {})
-                task_title = task.get('title', '').lower()
-                
-                # Task 제목 키워드 추출
-                task_keywords = []
-                if '로그인' in task_title or 'login' in task_title or '인증' in task_title or 'auth' in task_title or '회원가입' in task_title:
-                    task_keywords = ['user', 'login', 'auth', '인증', '로그인', '회원가입']
-                elif 'github' in task_title or 'git' in task_title:
-                    task_keywords = ['github', 'git']
-                elif 'task' in task_title or '작업' in task_title:
-                    task_keywords = ['task', '작업']
-                elif 'ai' in task_title or '에이전트' in task_title:
-                    task_keywords = ['ai', '에이전트', 'agent']
-                
-                # Task 제목과 관련 없는 파일 필터링
-                if task_keywords:
-                    filtered_files = []
-                    for file_path in files_to_read:
-                        file_path_lower = file_path.lower()
-                        # 파일 경로에 Task 키워드가 포함되어 있는지 확인
-                        if any(keyword in file_path_lower for keyword in task_keywords):
-                            filtered_files.append(file_path)
-                        else:
-                            print(f"[Multi-Step Agent] Task 완료 확인 - 파일 필터링: {file_path} (Task 제목 '{task_title}'와 무관)")
-                    
-                    if filtered_files:
-                        files_to_read = filtered_files
-                        print(f"[Multi-Step Agent] Task 완료 확인 - 필터링 후 파일 목록: {files_to_read}")
-                    else:
-                        print(f"[Multi-Step Agent] Task 완료 확인 - 모든 파일이 필터링됨, Task 제목 기반 파일 사용")
-                        # 필터링으로 모든 파일이 제거되면 Task 제목 기반 파일 사용
-                        if '로그인' in task_title or 'login' in task_title:
-                            files_to_read = [
-                                "backend/routes/user.js",
-                                "backend/controllers/userController.js",
-                                "backend/middleware/auth.js"
-                            ]
-                        elif 'github' in task_title:
-                            files_to_read = [
-                                "backend/routes/github.js",
-                                "backend/controllers/githubController.js"
-                            ]
-                        elif 'task' in task_title:
-                            files_to_read = [
-                                "backend/routes/task.js",
-                                "backend/controllers/taskController.js"
-                            ]
-                        else:
-                            files_to_read = []
+                ranked_files = rank_paths(context.get('retrievalQuery'), files_to_read, k=len(files_to_read))
+                files_to_read = ranked_files + [path for path in files_to_read if path not in ranked_files]
+                print(f"[Multi-Step Agent] Task 완료 확인 - 제안 파일 순위: {files_to_read}")
             
             # Task 완료 확인 에이전트: 3단계 이상에서 추가 파일 읽기 (필요시)
             if agent_type == "task_completion_agent" and github_repo and step_number >= 3:
@@ -948,21 +1345,13 @@ def execute_multi_step_agent(
                     if additional_files:
                         progress_messages.append(f"📄 추가 파일을 읽는 중... ({len(additional_files)}개)")
                         
-                        for file_path in additional_files:
-                            if file_path not in [f.get('path', '') for f in accumulated_files]:
-                                try:
-                                    file_contents = get_file_contents(github_repo, github_token, [file_path], max_lines_per_file=400)
-                                    if file_contents and file_contents[0].get('content'):
-                                        accumulated_files.append({
-                                            "path": file_path,
-                                            "content": file_contents[0]['content'],
-                                            "truncated": file_contents[0].get('truncated', False)
-                                        })
-                                        progress_messages.append(f"✅ {file_path} 파일을 읽었습니다.")
-                                        context['readFiles'] = accumulated_files
-                                except Exception as e:
-                                    print(f"[Multi-Step Agent] Task 완료 확인 - 추가 파일 읽기 실패 ({file_path}): {e}")
-                                    continue
+                        new_files = yield from read_new_files_steps(
+                            github_repo, github_token, additional_files, accumulated_files,
+                            prefetched=prefetch, relevance=SUGGESTED_RELEVANCE, max_lines_per_file=400
+                        )
+                        for file_info in new_files:
+                            progress_messages.append(f"✅ {file_info['path']} 파일을 읽었습니다.")
+                        context['readFiles'] = accumulated_files.view()
             
             # 진행도 분석의 경우 소스코드 구조 파악을 위한 추가 파일 읽기
             if agent_type == "progress_analysis_agent" and github_repo:
@@ -974,82 +1363,22 @@ def execute_multi_step_agent(
                     progress_messages.append("🔍 API 엔드포인트를 파악하기 위해 라우트 파일들을 찾는 중...")
                     
                     # 2단계에서 추론한 파일들은 이미 위에서 읽었으므로, 추가로 일반적인 파일들도 읽기
-                    # 백엔드 API 라우트 파일들 (2단계에서 읽지 못한 경우를 대비)
-                    backend_routes = [
-                        "backend/routes/user.js", "backend/routes/project.js", "backend/routes/task.js",
-                        "backend/routes/ai.js", "backend/routes/github.js", "backend/routes/progress.js",
-                        "backend/routes/index.js", "backend/app.js"
-                    ]
-                    
-                    # 프론트엔드 API 호출 파일들
-                    frontend_api = [
-                        "morpheus-react/web/src/api/user.js", "morpheus-react/web/src/api/project.js",
-                        "morpheus-react/web/src/api/task.js", "morpheus-react/web/src/api/ai.js",
-                        "morpheus-react/web/src/api/github.js"
-                    ]
+                    # (백엔드 라우트, 프론트엔드 API 호출, 컨트롤러 - 2단계에서 읽지 못한 경우를 대비)
+                    all_files_to_read = PROGRESS_API_FILES
                     
-                    # 컨트롤러 파일들
-                    controllers = [
-                        "backend/controllers/userController.js", "backend/controllers/projectController.js",
-                        "backend/controllers/taskController.js", "backend/controllers/aiController.js",
-                        "backend/controllers/githubController.js", "backend/controllers/progressController.js"
-                    ]
-                    
-                    all_files_to_read = backend_routes + frontend_api + controllers
-                    
-                    for file_path in all_files_to_read:
-                        if file_path not in [f.get('path', '') for f in accumulated_files]:
-                            try:
-                                file_contents = get_file_contents(github_repo, github_token, [file_path])
-                                if file_contents and file_contents[0].get('content'):
-                                    accumulated_files.append({
-                                        "path": file_path,
-                                        "content": file_contents[0]['content'],
-                                        "truncated": file_contents[0].get('truncated', False)
-                                    })
-                                    progress_messages.append(f"✅ {file_path} 파일을 읽었습니다.")
-                                    context['readFiles'] = accumulated_files
-                            except:
-                                continue
+                    new_files = yield from read_new_files_steps(github_repo, github_token, all_files_to_read, accumulated_files, prefetched=prefetch)
+                    for file_info in new_files:
+                        progress_messages.append(f"✅ {file_info['path']} 파일을 읽었습니다.")
+                    context['readFiles'] = accumulated_files.view()
                 
                 elif step_number == 3:
                     # 3단계: 2단계 결과 기반 페이지/컴포넌트 파일 읽기 + 동적 탐색
                     progress_messages.append("🔍 프로젝트 구조를 파악하여 페이지와 컴포넌트 파일들을 찾는 중...")
                     
                     # 2단계 결과에서 페이지/컴포넌트 파일 경로 추출
-                    step2_result = all_steps[1] if len(all_steps) > 1 else {}
-                    required_features = step2_result.get('requiredFeatures', [])
-                    
-                    files_from_step2 = []
-                    for feat in required_features:
-                        expected_loc = feat.get('expectedLocation', '')
-                        feat_type = feat.get('type', '')
-                        
-                        if feat_type in ['page', 'component'] and expected_loc:
-                            path = expected_loc.lstrip('/')
-                            if path.endswith(('.jsx', '.js', '.tsx', '.ts')):
-                                if path not in files_from_step2:
-                                    files_from_step2.append(path)
-                    
-                    # 2단계에서 예상한 파일들을 우선적으로 읽기
-                    read_count = 0
-                    for file_path in files_from_step2:
-                        if file_path not in [f.get('path', '') for f in accumulated_files] and read_count < 30:
-                            try:
-                                file_contents = get_file_contents(github_repo, github_token, [file_path])
-                                if file_contents and file_contents[0].get('content'):
-                                    accumulated_files.append({
-                                        "path": file_path,
-                                        "content": file_contents[0]['content'],
-                                        "truncated": file_contents[0].get('truncated', False)
-                                    })
-                                    progress_messages.append(f"✅ {file_path} 파일을 읽었습니다. (2단계 결과 기반)")
-                                    context['readFiles'] = accumulated_files
-                                    read_count += 1
-                            except:
-                                continue
+                    files_from_step2 = step2_page_files(all_steps)
                     
-                    # 추가로 동적 탐색 (2단계에서 찾지 못한 경우)
+                    # 동적 탐색: 후보 디렉토리 목록을 한 번에 병렬로 조회
                     directories_to_explore = [
                         "morpheus-react/web/src/pages",
                         "morpheus-react/web/src/components",
@@ -1064,55 +1393,31 @@ def execute_multi_step_agent(
                     ]
                     
                     discovered_files = []
-                    for directory in directories_to_explore:
-                        try:
-                            files_in_dir = list_directory_contents(github_repo, github_token, directory)
+                    if not out_of_time():
+                        listings = yield [
+                            list_directory_request(github_repo, github_token, directory)
+                            for directory in directories_to_explore
+                        ]
+                        for directory, files_in_dir in zip(directories_to_explore, listings):
+                            if isinstance(files_in_dir, Exception) or not files_in_dir:
+                                continue
                             discovered_files.extend(files_in_dir)
-                            if files_in_dir:
-                                progress_messages.append(f"📁 {directory} 디렉토리에서 {len(files_in_dir)}개 파일 발견")
-                        except:
-                            continue
+                            progress_messages.append(f"📁 {directory} 디렉토리에서 {len(files_in_dir)}개 파일 발견")
                     
-                    # 기존 하드코딩된 파일 목록도 포함 (확실한 파일들)
-                    known_files = [
-                        # 페이지 파일들
-                        "morpheus-react/web/src/pages/Login.jsx",
-                        "morpheus-react/web/src/pages/SignupPage.jsx",
-                        "morpheus-react/web/src/pages/Home.jsx",
-                        "morpheus-react/web/src/pages/ProjectPage.jsx",
-                        "morpheus-react/web/src/pages/ProjectDetailPage.jsx",
-                        "morpheus-react/web/src/pages/AIadvisorPage.jsx",
-                        "morpheus-react/web/src/pages/TaskDetailPage.jsx",
-                        "morpheus-react/web/src/pages/TaskListPage.jsx",
-                        # 컴포넌트 파일들
-                        "morpheus-react/web/src/components/ai/ChatBot.jsx",
-                        "morpheus-react/web/src/components/tasks/TaskView.jsx",
-                        "morpheus-react/web/src/components/tasks/List.jsx",
-                        "morpheus-react/web/src/components/tasks/TaskCard.jsx",
-                        "morpheus-react/web/src/components/projects/CreateProject.jsx",
-                        "morpheus-react/web/src/components/projects/ProjectCard.jsx",
-                        "morpheus-react/web/src/components/layout/Layout.jsx",
-                        "morpheus-react/web/src/components/layout/CategoryBar.jsx"
-                    ]
                     
-                    all_files_to_read = list(set(known_files + discovered_files))  # 중복 제거
-                    
-                    max_files_to_read = 50  # 최대 50개로 증가
-                    for file_path in all_files_to_read:
-                        if file_path not in [f.get('path', '') for f in accumulated_files] and read_count < max_files_to_read:
-                            try:
-                                file_contents = get_file_contents(github_repo, github_token, [file_path])
-                                if file_contents and file_contents[0].get('content'):
-                                    accumulated_files.append({
-                                        "path": file_path,
-                                        "content": file_contents[0]['content'],
-                                        "truncated": file_contents[0].get('truncated', False)
-                                    })
-                                    progress_messages.append(f"✅ {file_path} 파일을 읽었습니다.")
-                                    context['readFiles'] = accumulated_files
-                                    read_count += 1
-                            except:
-                                continue
+                    # 2단계에서 예상한 파일(최대 30개) -> 확실한 파일(기존 하드코딩 목록) -> 탐색한 파일 순으로 최대 50개를 한 번에 병렬로 읽기
+                    step2_files = set(files_from_step2[:30])
+                    all_files_to_read = files_from_step2[:30] + PROGRESS_PAGE_FILES + discovered_files
+                    read_count = 0
+                    if not out_of_time():
+                        new_files = yield from read_new_files_steps(
+                            github_repo, github_token, all_files_to_read, accumulated_files, limit=MAX_FILES_PER_BATCH, prefetched=prefetch
+                        )
+                        for file_info in new_files:
+                            suffix = " (2단계 결과 기반)" if file_info['path'] in step2_files else ""
+                            progress_messages.append(f"✅ {file_info['path']} 파일을 읽었습니다.{suffix}")
+                        context['readFiles'] = accumulated_files.view()
+                        read_count = len(new_files)
                     
                     if read_count == 0:
                         progress_messages.append("⚠️ 페이지나 컴포넌트 파일을 찾지 못했습니다. 프로젝트 구조를 확인 중...")
@@ -1123,23 +1428,14 @@ def execute_multi_step_agent(
             if files_to_read and github_repo:
                 print(f"[Multi-Step Agent] {agent_type} - 파일 읽기 시작: {files_to_read}")
                 progress_messages.append(f"📄 관련 파일을 읽는 중... ({len(files_to_read)}개 파일)")
-                file_contents = get_file_contents(github_repo, github_token, files_to_read)
-                
-                # 읽은 파일을 accumulated_files에 추가
-                for file_info in file_contents:
-                    if file_info.get('content'):
-                        file_path = file_info.get('filePath', '')
-                        # 중복 방지
-                        if file_path not in [f.get('path', '') for f in accumulated_files]:
-                            accumulated_files.append({
-                                "path": file_path,
-                                "content": file_info['content'],
-                                "truncated": file_info.get('truncated', False)
-                            })
+                # 이미 읽은 파일은 제외하고 한 번에 병렬로 읽어 accumulated_files에 추가
+                new_files = yield from read_new_files_steps(
+                    github_repo, github_token, files_to_read, accumulated_files, prefetched=prefetch, relevance=SUGGESTED_RELEVANCE
+                )
                 
                 # 컨텍스트에 파일 내용 추가
-                context['readFiles'] = accumulated_files
-                progress_messages.append(f"✅ 파일 읽기 완료 ({len([f for f in file_contents if f.get('content')])}개 파일)")
+                context['readFiles'] = accumulated_files.view()
+                progress_messages.append(f"✅ 파일 읽기 완료 ({len(new_files)}개 파일)")
             
             # 커밋 상세 분석 (필요시)
             if commits_to_analyze:
@@ -1148,20 +1444,31 @@ def execute_multi_step_agent(
                 context['detailedCommits'] = commits_to_analyze
                 accumulated_commits.extend(commits_to_analyze)
         
+        # 평가/파일 읽기까지 끝난 상태로 체크포인트 갱신 (재개하면 읽은 파일과 평가 결과도 이어서 사용)
+        save_step_checkpoint()
+        
         # 다음 단계로 진행
         if step_number >= MAX_ANALYSIS_STEPS:
             print(f"[Multi-Step Agent] {agent_type} - 최대 단계 도달, 분석 종료")
             progress_messages.append(f"✨ 최대 분석 단계에 도달했습니다. 최종 결과를 정리 중...")
             break
     
+    prefetch.finish()
+    
+    # 끝까지 완료된 실행은 체크포인트 삭제 (부분 결과면 재시도를 위해 유지)
+    if partial_reason is None:
+        clear_checkpoint(agent_type)
+    
     # 최종 결과 구성
     final_response = {
         "agent_type": agent_type,
         "response": current_result if current_result else {},
         "analysis_steps": step_number,
         "all_steps": all_steps,
-        "confidence": evaluation.get('confidence', 'medium') if 'evaluation' in locals() else 'low',
-        "progress_messages": progress_messages  # 진행 상황 메시지 추가
+        "confidence": evaluation.get('confidence', 'medium') if evaluation is not None else 'low',
+        "progress_messages": progress_messages,  # 진행 상황 메시지 추가
+        "partial": partial_reason is not None,  # 마감 시간이나 단계 실패로 충분성 확인 전에 종료한 결과
+        "partial_reason": partial_reason
     }
     
     return final_response
@@ -0,0 +1,256 @@
+"""
+Ollama 엔드포인트 풀
+여러 Ollama 서버에 요청을 나누어 보냅니다.
+- 노드 선택: 진행 중인 요청 수가 가장 적은 노드 (해당 모델이 설치된 노드 우선)
+- 상태 확인: 주기적으로 /api/tags 호출 (설치된 모델 목록도 함께 갱신)
+- 장애 노드 제외: 노드마다 서킷 브레이커 (연속 실패 시 일정 시간 제외, 시험 호출이나 상태 확인에 성공하면 복귀)
+- 연결 실패/과부하 응답 시 다른 노드로 재시도 (LLMClient에서 attempts() 사용)
+- 모든 노드가 제외되면 요청을 보내지 않고 즉시 CircuitOpenError
+
+    OLLAMA_BASE_URLS=http://gpu-1:11434,http://gpu-2:11434
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+import httpx
+
+from resilience import CircuitBreaker, CircuitOpenError
+
+# 노드가 요청을 처리하지 못했음을 뜻하는 응답 (게이트웨이 오류, 대기열 초과, 재시작 중)
+UNAVAILABLE_STATUS_CODES = {502, 503, 504}
+
+
+class NodeUnavailableError(httpx.HTTPStatusError):
+    """노드가 요청을 처리하지 않고 거절함 (다른 노드로 보내거나 잠시 후 재시도 가능)"""
+
+
+# 다른 노드로 다시 보내도 안전한 오류 (요청이 서버에 전달되지 않았거나 처리되지 않은 경우)
+FAILOVER_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, NodeUnavailableError)
+
+
+def raise_for_node_status(response: httpx.Response):
+    """응답 상태 확인 (노드 과부하/장애 응답은 NodeUnavailableError, 그 외 오류는 HTTPStatusError)"""
+    if response.status_code in UNAVAILABLE_STATUS_CODES:
+        raise NodeUnavailableError(
+            f"Ollama 서버 응답 불가 ({response.status_code})", request=response.request, response=response
+        )
+    response.raise_for_status()
+
+
+def parse_base_urls(value: str) -> List[str]:
+    """쉼표로 구분된 URL 목록 파싱 (중복 제거, 순서 유지)"""
+    urls = []
+    for url in value.split(','):
+        url = url.strip().rstrip('/')
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+class OllamaNode:
+    """Ollama 서버 하나 (HTTP 연결 풀과 상태)"""
+
+    def __init__(self, base_url: str, timeout: float, limits: httpx.Limits, breaker: CircuitBreaker):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._limits = limits
+        self.http = httpx.Client(base_url=base_url, timeout=timeout, limits=limits)
+        self._async_http = None
+        self.outstanding = 0           # 진행 중인 요청 수
+        self.requests = 0              # 누적 요청 수
+        self.breaker = breaker         # 열려 있는 동안 선택 대상에서 제외
+        self.models: Optional[Set[str]] = None  # 마지막 상태 확인에서 본 모델 목록 (None: 아직 모름)
+
+    def get_async_http(self) -> httpx.AsyncClient:
+        """비동기 HTTP 클라이언트 (현재 이벤트 루프에서 처음 호출될 때 생성)"""
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self._limits)
+        return self._async_http
+
+    def close(self):
+        self.http.close()
+
+    async def aclose(self):
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+
+
+class OllamaPool:
+    """
+    Ollama 노드 풀
+
+    노드가 하나뿐이면 상태 확인 스레드를 띄우지 않으며, 기존 단일 URL 동작과 같습니다.
+    모든 노드의 서킷 브레이커가 열려 있으면 타임아웃까지 기다리지 않고 CircuitOpenError로 바로 실패합니다.
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        timeout: float,
+        limits: httpx.Limits,
+        health_check_interval: float = 15.0,
+        eject_seconds: float = 30.0,
+        failure_threshold: int = 2
+    ):
+        if not base_urls:
+            raise ValueError("Ollama 엔드포인트가 하나 이상 필요합니다.")
+        self.health_check_interval = health_check_interval
+        self.eject_seconds = eject_seconds
+        self.failure_threshold = max(1, failure_threshold)
+        self.nodes = [
+            OllamaNode(url, timeout, limits, CircuitBreaker(f"Ollama({url})", self.failure_threshold, eject_seconds))
+            for url in base_urls
+        ]
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def base_urls(self) -> List[str]:
+        return [node.base_url for node in self.nodes]
+
+    def _pick(self, model: Optional[str], exclude: Sequence[OllamaNode]) -> Optional[OllamaNode]:
+        with self._lock:
+            healthy = [node for node in self.nodes if node not in exclude and node.breaker.available()]
+            if not healthy:
+                return None
+            if model:
+                # 모델 목록을 아직 모르는 노드는 설치되어 있다고 가정
+                with_model = [node for node in healthy if node.models is None or model in node.models]
+                healthy = with_model or healthy
+            return min(healthy, key=lambda node: (node.outstanding, node.requests))
+
+    def attempts(self, model: Optional[str] = None) -> Iterator[OllamaNode]:
+        """
+        요청을 보낼 노드를 장애 조치 순서대로 반환 (각 노드는 한 번씩만)
+
+        보낼 수 있는 노드가 하나도 없으면(모든 서킷 브레이커가 열림) CircuitOpenError가 발생합니다.
+        """
+        tried: List[OllamaNode] = []
+        while True:
+            node = self._pick(model, tried)
+            if node is None:
+                if not tried:
+                    raise self.unavailable_error()
+                return
+            tried.append(node)
+            try:
+                # half-open 노드는 시험 호출 하나만 통과
+                node.breaker.before_call()
+            except CircuitOpenError:
+                continue
+            yield node
+
+    def unavailable_error(self) -> CircuitOpenError:
+        retry_after = min(node.breaker.retry_after() for node in self.nodes)
+        last_error = next((node.breaker.last_error for node in self.nodes if node.breaker.last_error), None)
+        return CircuitOpenError(f"Ollama({', '.join(self.base_urls)})", retry_after, last_error)
+
+    @contextmanager
+    def lease(self, node: OllamaNode):
+        """노드의 진행 중인 요청 수 집계 (least outstanding 선택에 사용)"""
+        with self._lock:
+            node.outstanding += 1
+            node.requests += 1
+        try:
+            yield node
+        finally:
+            with self._lock:
+                node.outstanding -= 1
+
+    def record_success(self, node: OllamaNode):
+        node.breaker.record_success()
+
+    def record_failure(self, node: OllamaNode, error: Exception):
+        """실패 기록 (연속 실패가 기준 이상이면 서킷 브레이커가 열려 노드 제외)"""
+        node.breaker.record_failure(error)
+
+    def _apply_health(self, node: OllamaNode, tags: Optional[Dict[str, Any]], error: Optional[Exception]):
+        if error is not None:
+            self.record_failure(node, error)
+            return
+        with self._lock:
+            node.models = {m.get('name', '') for m in tags.get('models', [])}
+        node.breaker.record_success()
+
+    def check_health(self):
+        """모든 노드에 /api/tags 요청 (설치된 모델 목록 갱신, 실패 노드 제외/복구 노드 복귀)"""
+        for node in self.nodes:
+            try:
+                response = node.http.get('/api/tags', timeout=5.0)
+                response.raise_for_status()
+                self._apply_health(node, response.json(), None)
+            except Exception as e:
+                self._apply_health(node, None, e)
+
+    async def acheck_health(self):
+        """check_health의 비동기 버전 (노드를 동시에 확인)"""
+        async def check(node):
+            try:
+                response = await node.get_async_http().get('/api/tags', timeout=5.0)
+                response.raise_for_status()
+                self._apply_health(node, response.json(), None)
+            except Exception as e:
+                self._apply_health(node, None, e)
+
+        await asyncio.gather(*[check(node) for node in self.nodes])
+
+    def has_model(self, model: str) -> bool:
+        """상태 확인 결과 기준으로 모델이 설치된 노드가 하나라도 있는지 (태그가 없는 이름은 :latest로 봄)"""
+        names = {model, model if ':' in model else f"{model}:latest"}
+        with self._lock:
+            return any(
+                node.models is not None and not names.isdisjoint(node.models) and node.breaker.available()
+                for node in self.nodes
+            )
+
+    def any_available(self) -> bool:
+        """서킷 브레이커가 닫혀 있거나 시험 호출을 보낼 수 있는 노드가 있는지"""
+        return any(node.breaker.available() for node in self.nodes)
+
+    def any_reachable(self) -> bool:
+        """마지막 상태 확인에 응답한 노드가 있는지 (모델 미설치와 연결 실패 구분용)"""
+        with self._lock:
+            return any(node.models is not None and node.breaker.consecutive_failures == 0 for node in self.nodes)
+
+    def start_health_checks(self):
+        """노드가 여러 개면 주기적 상태 확인 스레드 시작"""
+        if len(self.nodes) <= 1 or self._health_thread is not None:
+            return
+
+        def loop():
+            while not self._stopped.wait(self.health_check_interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=loop, name='ollama-health-check', daemon=True)
+        self._health_thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = []
+            for node in self.nodes:
+                breaker = node.breaker.stats()
+                nodes.append({
+                    'baseUrl': node.base_url,
+                    'healthy': breaker['state'] == 'closed',
+                    'circuit': breaker['state'],
+                    'outstanding': node.outstanding,
+                    'requests': node.requests,
+                    'failures': breaker['failures'],
+                    'models': sorted(node.models) if node.models is not None else None,
+                    'lastError': breaker['lastError'],
+                })
+            return {'nodes': nodes}
+
+    def close(self):
+        self._stopped.set()
+        for node in self.nodes:
+            node.close()
+
+    async def aclose(self):
+        for node in self.nodes:
+            await node.aclose()
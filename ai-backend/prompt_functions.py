@@ -9,40 +9,24 @@ from prompt_optimizer import (
     create_optimized_progress_prompt,
     create_initial_completion_prompt,
     create_followup_completion_prompt,
-    create_task_assignment_prompt
+    create_task_assignment_prompt,
+    compose_prompt
 )
+from token_budget import allocate_sections, fit_section, truncate_to_tokens
 
 def create_task_suggestion_step1_prompt(context, user_message, read_files, analyzed_commits, step_number=1):
     """1단계: 프로젝트 정보 파악"""
-    projectName = context.get('projectName', '프로젝트')
-    projectDescription = context.get('projectDescription', '')
     githubRepo = context.get('githubRepo', '')
-    projectStartDate = context.get('projectStartDate', '')
     
-    # README 파일 내용 (있는 경우)
-    readme_content = ""
-    if read_files:
-        for file_info in read_files:
-            path = file_info.get('path', '').lower()
-            if 'readme' in path:
-                readme_content = file_info.get('content', '')[:1000]  # 최대 1000자
-                break
+    # README 파일 존재 여부 (내용은 접두부의 파일 발췌에 포함됨)
+    has_readme = any('readme' in file_info.get('path', '').lower() and file_info.get('content') for file_info in read_files or [])
     
     has_github = githubRepo and githubRepo.strip() != ''
     
     prompt = f"""당신은 소프트웨어 프로젝트 분석 전문가입니다. 프로젝트의 기본 정보와 구조를 파악하세요.
 
-## 프로젝트 기본 정보:
-- 프로젝트 이름: {projectName}
-- 프로젝트 설명: {projectDescription if projectDescription else '없음'}
-- GitHub 저장소: {githubRepo if has_github else '연결 안 됨'}
-- 프로젝트 시작일: {projectStartDate if projectStartDate else '알 수 없음'}
-
-## README 파일 내용:
-{readme_content if readme_content else 'README 파일 없음'}
-
 ## 분석 요청:
-위 정보를 바탕으로 다음을 분석하세요:
+위 프로젝트 프로필과 README 파일 내용{'' if has_readme else '(README 파일 없음)'}을 바탕으로 다음을 분석하세요:
 
 1. **프로젝트 핵심 기능**: 프로젝트 설명과 README에서 핵심 기능을 추출하세요.
 2. **기술 스택**: 사용된 기술, 프레임워크, 라이브러리 등을 파악하세요.
@@ -64,12 +48,12 @@ def create_task_suggestion_step1_prompt(context, user_message, read_files, analy
     }}
   }},
   "hasGithub": {str(has_github).lower()},
-  "hasReadme": {str(bool(readme_content)).lower()}
+  "hasReadme": {str(has_readme).lower()}
 }}
 
 ⚠️ 중요: 반드시 위 JSON 형식으로만 응답하세요. 한국어로 응답하세요."""
 
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_task_suggestion_initial_prompt(context, user_message, read_files, analyzed_commits, step_number=1):
     """Task 제안 에이전트 초기 프롬프트 (레거시 - 호환성 유지용)"""
@@ -112,7 +96,7 @@ def create_task_suggestion_file_selection_prompt(context, user_message, file_lis
     prompt = f"""당신은 소프트웨어 프로젝트 분석 전문가입니다. Task 제안을 위해 필요한 파일만 선택하세요.
 
 ## 프로젝트 정보:
-- 프로젝트 설명: {projectDescription[:200] if projectDescription else '없음'}
+- 프로젝트 설명: {truncate_to_tokens(projectDescription, 120) if projectDescription else '없음'}
 - 핵심 기능: {', '.join(core_features[:5]) if core_features else '없음'}
 - 기술 스택: {', '.join(tech_stack[:5]) if tech_stack else '없음'}
 
@@ -159,15 +143,6 @@ def create_task_suggestion_step2_prompt(context, user_message, read_files, analy
     step1_result = previous_step_result or {}
     project_info = step1_result.get('projectInfo', {})
     
-    # 읽은 파일 정보 (소스코드)
-    files_context = ""
-    if read_files:
-        files_context = "\n\n## 읽은 소스코드 파일:\n"
-        for file_info in read_files[:30]:  # 최대 30개 파일
-            path = file_info.get('path', '')
-            content = file_info.get('content', '')[:500]  # 최대 500줄
-            files_context += f"\n### 파일: {path}\n```\n{content}\n```\n"
-    
     # 커밋 요약
     commit_summary = ""
     if commits:
@@ -191,14 +166,14 @@ def create_task_suggestion_step2_prompt(context, user_message, read_files, analy
     prompt = f"""당신은 소프트웨어 코드 분석 전문가입니다. 현재 진행 중인 Task와 실제 구현된 기능을 파악하세요.
 
 ## 1단계 분석 결과 (프로젝트 정보):
-{json.dumps(project_info, ensure_ascii=False, indent=2)[:500]}
+{fit_section(json.dumps(project_info, ensure_ascii=False, indent=2), 0.15)}
 
 ## 현재 Task 목록:
 {task_summary if task_summary else '현재 Task 없음'}
 
 {commit_summary if commit_summary else ''}
 
-{files_context if files_context else '소스코드 파일 없음 (GitHub 미연결 또는 파일 미읽음)'}
+{'' if read_files else '소스코드 파일 없음 (GitHub 미연결 또는 파일 미읽음)'}
 
 ## 분석 요청:
 위 정보를 바탕으로 다음을 분석하세요:
@@ -240,7 +215,7 @@ def create_task_suggestion_step2_prompt(context, user_message, read_files, analy
 
 ⚠️ 중요: 반드시 위 JSON 형식으로만 응답하세요. 한국어로 응답하세요."""
 
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_task_suggestion_followup_prompt(context, previous_result, user_message, read_files, analyzed_commits, step_number=2, all_steps=None):
     """Task 제안 에이전트 후속 프롬프트 (레거시 - 호환성 유지용)"""
@@ -277,18 +252,25 @@ def create_task_suggestion_step3_prompt(context, user_message, read_files, analy
     githubRepo = context.get('githubRepo', '')
     has_github = githubRepo and githubRepo.strip() != ''
     
+    # 이전 단계 결과는 토큰 예산 안에서 가중치대로 배분
+    sections = allocate_sections([
+        ('project_info', json.dumps(project_info, ensure_ascii=False, indent=2), 800),
+        ('code_structure', json.dumps(code_structure, ensure_ascii=False, indent=2), 500),
+        ('description', projectDescription, 500),
+    ])
+    
     prompt = f"""당신은 소프트웨어 프로젝트 관리 전문가입니다. 프로젝트 목표 대비 부족한 기능을 Task로 제안하세요.
 
 ## 1단계 결과 (프로젝트 정보):
-{json.dumps(project_info, ensure_ascii=False, indent=2)[:800]}
+{sections['project_info']}
 
 ## 2단계 결과 (현재 Task 및 구현 상태):
 - 현재 Task: {len(current_tasks)}개
 - 구현된 기능: {len(implemented_features)}개
-- 코드 구조: {json.dumps(code_structure, ensure_ascii=False, indent=2)[:500]}
+- 코드 구조: {sections['code_structure']}
 
 ## 프로젝트 설명:
-{projectDescription if projectDescription else '없음'}
+{sections['description'] if projectDescription else '없음'}
 
 ## 분석 요청:
 위 정보를 바탕으로 다음을 수행하세요:
@@ -344,7 +326,7 @@ def create_task_suggestion_step3_prompt(context, user_message, read_files, analy
 
 ⚠️ 중요: 반드시 위 JSON 형식으로만 응답하세요. 한국어로 응답하세요."""
 
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_task_suggestion_step4_prompt(context, user_message, read_files, analyzed_commits, step_number=4, all_steps=None):
     """4단계: 보안 및 리팩토링 개선점 제안 (GitHub 연결 시만 실행)"""
@@ -356,25 +338,20 @@ def create_task_suggestion_step4_prompt(context, user_message, read_files, analy
     implemented_features = step2_result.get('implementedFeatures', [])
     code_structure = step2_result.get('codeStructure', {})
     
-    # 읽은 소스코드 파일들
-    files_context = ""
-    if read_files:
-        files_context = "\n## 분석할 소스코드 파일:\n"
-        for file_info in read_files[:30]:  # 최대 30개 파일
-            path = file_info.get('path', '')
-            content = file_info.get('content', '')
-            # 보안/리팩토링 분석에 필요한 부분만 추출
-            files_context += f"\n### 파일: {path}\n```\n{content[:800]}\n```\n"
+    sections = allocate_sections([
+        ('implemented_features', json.dumps(implemented_features, ensure_ascii=False, indent=2), 500),
+        ('code_structure', json.dumps(code_structure, ensure_ascii=False, indent=2), 300),
+    ])
     
     prompt = f"""당신은 소프트웨어 보안 및 코드 품질 분석 전문가입니다. 실제 소스코드를 기반으로 보안 취약점과 리팩토링 포인트를 식별하세요.
 
 ## 2단계 결과 (구현된 기능):
-{json.dumps(implemented_features, ensure_ascii=False, indent=2)[:500]}
+{sections['implemented_features']}
 
 ## 코드 구조:
-{json.dumps(code_structure, ensure_ascii=False, indent=2)[:300]}
+{sections['code_structure']}
 
-{files_context if files_context else '소스코드 파일 없음'}
+{'분석할 소스코드: 위 읽은 파일 내용' if read_files else '소스코드 파일 없음'}
 
 ## 분석 요청:
 
@@ -435,7 +412,7 @@ def create_task_suggestion_step4_prompt(context, user_message, read_files, analy
 - 파일 경로와 라인 번호를 정확히 명시하세요.
 - 반드시 위 JSON 형식으로만 응답하세요. 한국어로 응답하세요."""
 
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_task_suggestion_step5_prompt(context, user_message, read_files, analyzed_commits, step_number=5, all_steps=None):
     """5단계: Task 형식으로 통합 및 출력"""
@@ -462,17 +439,22 @@ def create_task_suggestion_step5_prompt(context, user_message, read_files, analy
     githubRepo = context.get('githubRepo', '')
     has_github = githubRepo and githubRepo.strip() != ''
     
+    sections = allocate_sections([
+        ('missing_tasks', json.dumps(missing_tasks, ensure_ascii=False, indent=2), 1000),
+        ('step4', json.dumps({"securityIssues": security_issues, "refactoringSuggestions": refactoring_suggestions}, ensure_ascii=False, indent=2) if has_github else "", 1000),
+    ])
+    
     prompt = f"""당신은 Task 관리 전문가입니다. 3단계와 4단계 결과를 통합하여 일관된 Task 형식으로 출력하세요.
 
 ## 프로젝트 정보:
 - 프로젝트 이름: {project_name}
 
 ## 3단계 결과 (부족한 Task):
-{json.dumps(missing_tasks, ensure_ascii=False, indent=2)[:1000]}
+{sections['missing_tasks']}
 
 ## 4단계 결과 (보안/리팩토링):
 {"보안 이슈: " + str(len(security_issues)) + "개, 리팩토링 제안: " + str(len(refactoring_suggestions)) + "개" if has_github else "GitHub 미연결로 4단계 건너뜀"}
-{json.dumps({"securityIssues": security_issues, "refactoringSuggestions": refactoring_suggestions}, ensure_ascii=False, indent=2)[:1000] if has_github else ""}
+{sections['step4']}
 
 ## 통합 요청:
 위 결과를 통합하여 다음을 수행하세요:
@@ -528,36 +510,18 @@ def create_task_suggestion_step5_prompt(context, user_message, read_files, analy
 
 ⚠️ 중요: 반드시 위 JSON 형식으로만 응답하세요. 한국어로 응답하세요."""
 
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_progress_analysis_initial_prompt(context, user_message, read_files, analyzed_commits, step_number=1):
     """진행도 분석 에이전트 초기 프롬프트 (1단계: 프로젝트 분석)"""
     commits = context.get('commits', [])
     tasks = context.get('tasks', [])
-    projectDescription = context.get('projectDescription', '')
-    projectStartDate = context.get('projectStartDate', None)
-    projectDueDate = context.get('projectDueDate', None)
-    
-    # 읽은 파일 내용 추가
-    files_section = ""
-    if read_files:
-        files_section = "\n\n## 📄 읽은 파일 내용:\n\n"
-        for file_info in read_files:
-            file_path = file_info.get('path', '')
-            file_content = file_info.get('content', '')
-            if file_content:
-                content_preview = file_content[:3000] if len(file_content) > 3000 else file_content
-                files_section += f"### 파일: {file_path}\n```\n{content_preview}\n```\n\n"
     
     prompt = f"""진행도 분석을 단계별로 수행합니다. 현재는 **1단계: 프로젝트 분석**입니다.
 
-## 프로젝트 정보:
-- 프로젝트 설명: {projectDescription[:200] if projectDescription else '없음'}
-- 프로젝트 시작일: {projectStartDate or '미정'}
-- 프로젝트 마감일: {projectDueDate or '미정'}
+## 프로젝트 현황:
 - 총 커밋 수: {len(commits)}개
 - 총 Task 수: {len(tasks)}개
-{files_section}
 
 ## 1단계 작업: 프로젝트 분석 및 핵심 기능 정의
 읽은 파일(README, 설정 파일 등)과 프로젝트 설명을 바탕으로 **전체적인 코드나 문서를 점검**하여 다음을 작성하세요:
@@ -621,7 +585,7 @@ def create_progress_analysis_initial_prompt(context, user_message, read_files, a
 - 예시: projectName: "To-do-ai-agent" (실제 값), projectDescription: "이 프로젝트는 AI Agent가 핵심 기능이고, 진행도 분석, Task 제안, Task 완료 확인 등의 기능이 있습니다." (기능 중심 설명)
 - coreFeatures 예시: [{{id: "auth", name: "사용자 인증", description: "로그인, 회원가입, 로그아웃 등 사용자 인증 기능", weight: 1.0}}, {{id: "project", name: "프로젝트 관리", description: "프로젝트 생성, 수정, 삭제, 조회 등 프로젝트 관리 기능", weight: 1.0}}, {{id: "task", name: "Task 관리", description: "Task 생성, 수정, 삭제, 조회 등 Task 관리 기능", weight: 1.0}}, {{id: "ai", name: "AI 기능", description: "진행도 분석, Task 제안, Task 완료 확인 등 AI 기능", weight: 1.0}}, {{id: "github", name: "GitHub 연동", description: "GitHub 저장소 연동 및 커밋/이슈 조회 기능", weight: 1.0}}]"""
     
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_progress_analysis_followup_prompt(context, previous_result, user_message, read_files, analyzed_commits, step_number, all_steps):
     """진행도 분석 에이전트 후속 프롬프트 (단계별)"""
@@ -634,17 +598,6 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
     step3_result = all_steps[2] if len(all_steps) > 2 else {}
     step4_result = all_steps[3] if len(all_steps) > 3 else {}
     
-    # 읽은 파일 내용
-    files_section = ""
-    if read_files:
-        files_section = "\n\n## 📄 읽은 파일 내용:\n\n"
-        for f in read_files[-10:]:  # 최근 10개 파일
-            path = f.get('path', '')
-            content = f.get('content', '')
-            if content:
-                content_preview = content[:2000] if len(content) > 2000 else content
-                files_section += f"### 파일: {path}\n```\n{content_preview}\n```\n\n"
-    
     if step_number == 2:
         # 2단계: 기능 분석 (각 핵심 기능에 필요한 세부 기능들 파악)
         core_features = step1_result.get('coreFeatures', [])
@@ -654,12 +607,11 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
 
 ## 이전 단계(1단계) 결과:
 프로젝트 이름: {step1_result.get('projectName', 'N/A')}
-프로젝트 설명: {step1_result.get('projectDescription', 'N/A')[:200]}...
+프로젝트 설명: {truncate_to_tokens(step1_result.get('projectDescription', 'N/A'), 120, marker='')}...
 
 ### 핵심 기능 목록:
 {core_features_text}
 
-{files_section}
 
 ## 2단계 작업: 각 핵심 기능별 세부 기능 분석
 이전 단계에서 정의한 **각 핵심 기능**에 대해, 그 기능을 구현하기 위해 필요한 **세부 기능들**을 나열하세요.
@@ -735,7 +687,6 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
 필요한 기능 목록:
 {required_features_text}
 
-{files_section}
 
 ## 3단계 작업: 구현된 기능 확인 및 핵심 기능별 진행도 계산
 위에서 읽은 파일 내용을 **반드시 활용하여** 실제 소스코드에서 확인된 기능을 찾고, **각 핵심 기능별로 진행도를 계산**하세요.
@@ -899,7 +850,7 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
 
 ### 1단계: 프로젝트 분석
 프로젝트 이름: {step1_result.get('projectName', 'N/A')}
-프로젝트 설명: {step1_result.get('projectDescription', 'N/A')[:200]}...
+프로젝트 설명: {truncate_to_tokens(step1_result.get('projectDescription', 'N/A'), 120, marker='')}...
 
 ### 2단계: 필요한 기능 분석
 필요한 기능 수: {len(required_features)}개
@@ -907,9 +858,8 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
 ### 3단계: 구현된 기능 확인
 구현된 기능 수: {len(implemented_features)}개
 구현된 기능 목록:
-{json.dumps(implemented_features, ensure_ascii=False, indent=2)[:2000]}
+{fit_section(json.dumps(implemented_features, ensure_ascii=False, indent=2), 0.5)}
 
-{files_section}
 
 ## 4단계 작업: 미구현 기능 분석
 필요한 기능 목록과 구현된 기능 목록을 **정확히** 비교하여, 아직 구현되지 않은 기능을 찾으세요.
@@ -1012,27 +962,33 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
             expected_loc = feat.get('expectedLocation', '')
             missing_list.append(f"- **{name}**: {expected_loc}")
         
+        sections = allocate_sections([
+            ('required', json.dumps(required_features, ensure_ascii=False, indent=2), 1500),
+            ('implemented', json.dumps(implemented_features, ensure_ascii=False, indent=2), 2000),
+            ('missing', json.dumps(missing_features, ensure_ascii=False, indent=2), 1000),
+        ])
+        
         prompt = f"""진행도 분석 **5단계: 평가 및 진행도 계산**입니다.
 
 ## 이전 단계 결과 요약:
 
 ### 1단계: 프로젝트 분석
 프로젝트 이름: {project_name}
-프로젝트 설명: {project_desc[:200]}...
+프로젝트 설명: {truncate_to_tokens(project_desc, 120, marker='')}...
 
 ### 2단계: 필요한 기능 분석
 필요한 기능 목록:
-{json.dumps(required_features, ensure_ascii=False, indent=2)[:1500]}
+{sections['required']}
 **총 필요한 기능 수: {total_required}개**
 
 ### 3단계: 구현된 기능 확인
 구현된 기능 목록:
-{json.dumps(implemented_features, ensure_ascii=False, indent=2)[:2000]}
+{sections['implemented']}
 **총 구현된 기능 수: {total_implemented}개**
 
 ### 4단계: 미구현 기능 분석
 미구현 기능 목록:
-{json.dumps(missing_features, ensure_ascii=False, indent=2)[:1000]}
+{sections['missing']}
 **총 미구현 기능 수: {total_missing}개**
 
 ## 5단계 작업: 정확한 평가 및 진행도 계산
@@ -1122,7 +1078,7 @@ def create_progress_analysis_followup_prompt(context, previous_result, user_mess
 - 총평은 2-3줄로 간결하게 작성하세요.
 - API 완전성을 체크하여 누락된 API가 있는지 확인하세요."""
     
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_task_completion_initial_prompt(context, user_message, read_files, analyzed_commits, step_number=1):
     """Task 완료 확인 에이전트 초기 프롬프트"""
@@ -1133,7 +1089,7 @@ def create_task_completion_initial_prompt(context, user_message, read_files, ana
     if not task:
         return "Task 정보가 필요합니다."
     
-    return create_initial_completion_prompt(task, commits, projectDescription)
+    return compose_prompt(context, read_files, create_initial_completion_prompt(task, commits, projectDescription))
 
 def create_task_completion_followup_prompt(context, previous_result, user_message, read_files, analyzed_commits, step_number=2, all_steps=None):
     """Task 완료 확인 에이전트 후속 프롬프트"""
@@ -1160,7 +1116,7 @@ def create_task_completion_followup_prompt(context, previous_result, user_messag
             task_keywords = ['ai', 'AI', 'agent', '에이전트']
         
         files_context = "\n\n## ⚠️ 실제 코드 파일 내용 (반드시 이 내용을 기반으로 분석하세요):\n"
-        files_context += f"**매우 중요**: 아래 파일 내용에서 Task 제목 \"{task_title}\"와 **직접 관련된 부분만** 찾아서 분석하세요.\n\n"
+        files_context += f"**매우 중요**: 위 읽은 파일 내용에서 Task 제목 \"{task_title}\"와 **직접 관련된 부분만** 찾아서 분석하세요.\n\n"
         files_context += f"**Task 제목 핵심 키워드**: {', '.join(task_keywords) if task_keywords else task_title}\n\n"
         files_context += f"**분석 규칙**:\n"
         files_context += f"- 파일 내용에서 위 핵심 키워드가 포함된 함수/코드만 찾으세요.\n"
@@ -1170,42 +1126,27 @@ def create_task_completion_followup_prompt(context, previous_result, user_messag
         files_context += f"- 예: Task 제목이 \"유저 로그인 기능\"인 경우:\n"
         files_context += f"  * ✅ 찾아야 할 것: login, Login, 인증, auth 등의 키워드가 있는 함수/코드\n"
         files_context += f"  * ❌ 무시해야 할 것: task, Task, 할당, assign, 멤버, member 등 다른 기능의 코드\n"
-        files_context += f"- Task 할당, 멤버 조회, 디버깅 로그 등 다른 기능의 코드는 **절대 근거로 사용하지 마세요**.\n\n"
-        
-        for file_info in read_files:
-            path = file_info.get('path', '')
-            content = file_info.get('content', '')
-            truncated = file_info.get('truncated', False)
-            
-            # 파일 내용을 더 많이 포함 (최대 2000자)
-            content_preview = content[:2000] if len(content) > 2000 else content
-            files_context += f"### 파일: {path}\n"
-            if truncated:
-                files_context += f"*(파일이 잘림, 전체 {len(content.split(chr(10)))}줄 중 일부만 표시)\n"
-            files_context += f"```\n{content_preview}\n```\n\n"
-            files_context += f"**위 파일에서 Task 제목 \"{task_title}\"와 직접 관련된 함수/코드만 찾으세요.**\n\n"
-            files_context += "---\n\n"
+        files_context += f"- Task 할당, 멤버 조회, 디버깅 로그 등 다른 기능의 코드는 **절대 근거로 사용하지 마세요**.\n"
+        files_context += f"- 분석한 파일: {', '.join(file_info.get('path', '') for file_info in read_files)}\n"
     
     base_prompt = create_followup_completion_prompt(task, previous_result, commits, projectDescription)
     
     if read_files:
-        return base_prompt + files_context + f"\n\n**⚠️ 최종 확인**:\n" + \
+        return compose_prompt(context, read_files, base_prompt + files_context + f"\n\n**⚠️ 최종 확인**:\n" + \
                f"1. 위 실제 코드 파일 내용을 확인하세요.\n" + \
                f"2. 파일 내용에서 Task 제목 \"{task_title}\"와 **직접 관련된 부분만** 찾으세요.\n" + \
                f"3. evidence에는 Task 제목 \"{task_title}\"와 직접 관련된 증거만 포함하세요.\n" + \
                f"4. 다른 기능(예: Task 할당, 멤버 조회 등)과 관련된 코드는 **절대 근거로 사용하지 마세요**.\n" + \
                f"5. 파일 경로와 함께 해당 파일의 어떤 함수/코드가 Task와 관련있는지 명시하세요.\n" + \
-               f"예: \"backend/controllers/userController.js의 login 함수에서 로그인 API 구현 확인\""
+               f"예: \"backend/controllers/userController.js의 login 함수에서 로그인 API 구현 확인\"")
     else:
-        return base_prompt
+        return compose_prompt(context, read_files, base_prompt)
 
 def create_general_qa_initial_prompt(context, user_message, read_files, analyzed_commits, step_number=1):
     """일반 QA 에이전트 초기 프롬프트"""
     commits = context.get('commits', [])
     issues = context.get('issues', [])
     tasks = context.get('tasks', [])
-    projectDescription = context.get('projectDescription', '')
-    githubRepo = context.get('githubRepo', '')
     
     # 프로젝트 통계 계산
     task_stats = {
@@ -1234,9 +1175,13 @@ def create_general_qa_initial_prompt(context, user_message, read_files, analyzed
     recent_commits = sum(1 for c in commits if c.get('date') and 
                         datetime.fromisoformat(c.get('date').replace('Z', '+00:00')) >= week_ago)
     
+    # 커밋/Task 상세 정보 (질문과 의미가 가까운 항목을 찾았으면 최근 항목 대신 사용, general_qa_agent 참고)
+    relevant_commits = context.get('relevantCommits') or []
+    relevant_tasks = context.get('relevantTasks') or []
+    
     # 최근 커밋 상세 정보
     recent_commits_detail = []
-    for commit in commits[:10]:
+    for commit in relevant_commits or commits[:10]:
         recent_commits_detail.append({
             "message": commit.get('message', '')[:150],
             "date": commit.get('date', ''),
@@ -1247,7 +1192,7 @@ def create_general_qa_initial_prompt(context, user_message, read_files, analyzed
     
     # 최근 Task 상세 정보
     recent_tasks_detail = []
-    for task in tasks[:10]:
+    for task in relevant_tasks or tasks[:10]:
         recent_tasks_detail.append({
             "title": task.get('title', ''),
             "status": task.get('status', 'todo'),
@@ -1256,17 +1201,24 @@ def create_general_qa_initial_prompt(context, user_message, read_files, analyzed
             "assignedUserId": task.get('assignedUserId', '')
         })
     
+    if relevant_commits:
+        commits_heading = f"질문과 관련된 커밋 상세 ({len(recent_commits_detail)}개)"
+    else:
+        commits_heading = f"최근 커밋 상세 (최근 {len(recent_commits_detail)}개)"
+    if relevant_tasks:
+        tasks_heading = f"질문과 관련된 Task 상세 ({len(recent_tasks_detail)}개)"
+    else:
+        tasks_heading = f"최근 Task 상세 (최근 {len(recent_tasks_detail)}개)"
+    
+    sections = allocate_sections([
+        ('commits', json.dumps(recent_commits_detail, ensure_ascii=False, indent=2), 2000),
+        ('tasks', json.dumps(recent_tasks_detail, ensure_ascii=False, indent=2), 2000),
+    ])
+    
     prompt = f"""당신은 프로젝트 관리 AI 어시스턴트입니다. 사용자의 질문에 대해 프로젝트 정보를 바탕으로 **구체적이고 상세하며 친절하게** 답변하세요.
 
 ⚠️ 중요: 반드시 한국어로만 응답하고, JSON 형식으로만 응답하세요.
 
-## 사용자 질문
-"{user_message}"
-
-## 프로젝트 정보
-- 프로젝트 설명: {projectDescription[:500] if projectDescription else '설명 없음'}
-- GitHub 저장소: {githubRepo if githubRepo else '연결되지 않음'}
-
 ## 프로젝트 통계
 **Task (작업)**
 - 전체: {task_stats['total']}개
@@ -1286,11 +1238,11 @@ def create_general_qa_initial_prompt(context, user_message, read_files, analyzed
 - 열림: {issue_stats['open']}개
 - 닫힘: {issue_stats['closed']}개
 
-## 최근 커밋 상세 (최근 {len(recent_commits_detail)}개)
-{json.dumps(recent_commits_detail, ensure_ascii=False, indent=2)[:2000]}
+## {commits_heading}
+{sections['commits']}
 
-## 최근 Task 상세 (최근 {len(recent_tasks_detail)}개)
-{json.dumps(recent_tasks_detail, ensure_ascii=False, indent=2)[:2000]}
+## {tasks_heading}
+{sections['tasks']}
 
 ## 답변 규칙
 1. 제공된 프로젝트 정보와 통계를 활용하여 사용자 질문에 **구체적이고 상세하게** 답변하세요.
@@ -1324,25 +1276,34 @@ def create_general_qa_initial_prompt(context, user_message, read_files, analyzed
   "can_answer": false,
   "message": "정중한 거부 메시지를 한국어로 작성",
   "suggestion": "대신 사용할 수 있는 기능 제안"
-}}"""
+}}
+
+## 사용자 질문
+"{user_message}"
+"""
     
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
 def create_general_qa_followup_prompt(context, previous_result, user_message, read_files, analyzed_commits, step_number=2, all_steps=None):
     """일반 QA 에이전트 후속 프롬프트"""
+    sections = allocate_sections([
+        ('previous', json.dumps(previous_result, ensure_ascii=False, indent=2), 1000),
+        ('paths', json.dumps([f.get('path', '') for f in read_files], ensure_ascii=False), 500),
+    ])
     prompt = f"""이전 답변을 보완하여 더 정확하고 상세한 답변을 제공하세요.
 
-## 사용자 질문
-"{user_message}"
-
 ## 이전 답변:
-{json.dumps(previous_result, ensure_ascii=False, indent=2)[:1000]}
+{sections['previous']}
 
 ## 읽은 파일:
-{json.dumps([f.get('path', '') for f in read_files], ensure_ascii=False)[:500]}
+{sections['paths']}
 
-위 파일 내용을 참고하여 더 정확하고 구체적인 답변을 제공하세요. JSON 형식으로만 응답하세요."""
-    return prompt
+위 파일 내용을 참고하여 더 정확하고 구체적인 답변을 제공하세요. JSON 형식으로만 응답하세요.
+
+## 사용자 질문
+"{user_message}"
+"""
+    return compose_prompt(context, read_files, prompt)
 
 def create_task_assignment_initial_prompt(context, user_message, read_files, analyzed_commits, step_number=1):
     """Task 할당 추천 에이전트 초기 프롬프트 (개선된 버전)"""
@@ -1351,7 +1312,7 @@ def create_task_assignment_initial_prompt(context, user_message, read_files, ana
     task_tags = context.get('taskTags', [])
     project_members_with_tags = context.get('projectMembersWithTags', [])
     
-    return create_task_assignment_prompt(task_title, task_description, project_members_with_tags, task_tags)
+    return compose_prompt(context, read_files, create_task_assignment_prompt(task_title, task_description, project_members_with_tags, task_tags))
 
 def create_task_assignment_followup_prompt(context, previous_result, user_message, read_files, analyzed_commits, step_number=2, all_steps=None):
     """Task 할당 추천 에이전트 후속 프롬프트 (개선된 버전)"""
@@ -1370,6 +1331,11 @@ def create_task_assignment_followup_prompt(context, previous_result, user_messag
         task_tags_str = ", ".join(task_tags)
         task_tags_section = f"\n**Task 태그**: {task_tags_str}\n"
     
+    sections = allocate_sections([
+        ('previous', json.dumps(previous_result, ensure_ascii=False, indent=2), 1000),
+        ('members', json.dumps(project_members_with_tags, ensure_ascii=False, indent=2), 800),
+    ])
+    
     prompt = f"""이전 분석 결과를 바탕으로 더 정확한 Task 할당 추천을 수행하세요.
 
 ## Task 정보:
@@ -1377,10 +1343,10 @@ def create_task_assignment_followup_prompt(context, previous_result, user_messag
 **설명**: {task_description}{task_tags_section}
 
 ## 이전 분석 결과:
-{json.dumps(previous_result, ensure_ascii=False, indent=2)[:1000]}
+{sections['previous']}
 
 ## 프로젝트 멤버 정보:
-{json.dumps(project_members_with_tags, ensure_ascii=False, indent=2)[:800]}
+{sections['members']}
 
 ## 개선 요청:
 1. **이전 추천 검증**: 이전에 추천된 사용자가 정말 적합한지 재검토하세요.
@@ -1405,5 +1371,5 @@ def create_task_assignment_followup_prompt(context, previous_result, user_messag
 }}
 
 ⚠️ 중요: 반드시 위 JSON 형식으로만 응답하세요. 한국어로 응답하세요."""
-    return prompt
+    return compose_prompt(context, read_files, prompt)
 
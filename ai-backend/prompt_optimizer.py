@@ -4,6 +4,128 @@
 """
 
 import json
+import os
+
+from code_search import CodeIndex, select_excerpts
+from token_budget import allocate_sections, estimate_tokens, file_excerpt_budget, fit_section, truncate_to_tokens
+
+# 안정 접두부(프로젝트 프로필 + 파일 발췌) 설정
+# 같은 프로젝트/같은 실행 안에서는 접두부가 바이트 단위로 동일해야 Ollama가 KV 캐시를 재사용합니다.
+# 파일 발췌 전체 예산은 모델 컨텍스트 길이로 정해집니다 (token_budget.file_excerpt_budget).
+PROMPT_FILE_EXCERPT_TOKENS = int(os.getenv('PROMPT_FILE_EXCERPT_TOKENS', '600'))  # 파일당 최대 토큰 수
+PROMPT_OMITTED_CHUNKS = int(os.getenv('PROMPT_OMITTED_CHUNKS', '3'))  # 생략된 파일에서 가져올 관련 청크 수
+PROMPT_PREFIX_SEPARATOR = "\n\n---\n\n"
+
+def build_project_profile(context):
+    """
+    프로젝트 프로필 (접두부의 첫 부분)
+    요청마다 바뀌는 값(커밋/Task 수, 현재 시각 등)은 넣지 않습니다.
+    """
+    context = context or {}
+    projectName = context.get('projectName') or '없음'
+    projectDescription = context.get('projectDescription') or ''
+    githubRepo = (context.get('githubRepo') or '').strip()
+    return f"""## 프로젝트 프로필
+- 프로젝트 이름: {projectName}
+- 프로젝트 설명: {truncate_to_tokens(projectDescription, 300) if projectDescription else '없음'}
+- GitHub 저장소: {githubRepo if githubRepo else '연결 안 됨'}
+- 프로젝트 시작일: {context.get('projectStartDate') or '미정'}
+- 프로젝트 마감일: {context.get('projectDueDate') or '미정'}"""
+
+def build_file_excerpts(read_files, max_tokens_per_file=None, max_total_tokens=None, query=None):
+    """
+    읽은 파일 발췌 (접두부의 두 번째 부분)
+
+    파일은 읽은 순서대로 이어 붙이므로, 다음 단계에서 파일이 추가되어도
+    이전 단계의 발췌는 그대로 앞부분에 남습니다. 전체 예산을 넘는 파일은 본문 없이 경로만 반환합니다.
+    query(Task 제목/사용자 질문)가 있으면 파일당 예산을 넘는 파일은 앞부분 대신 질문과 관련된 청크만 발췌합니다 (code_search 참고).
+
+    Returns:
+        (발췌 텍스트, 예산 초과로 생략된 파일 경로 리스트)
+    """
+    max_tokens_per_file = max_tokens_per_file or PROMPT_FILE_EXCERPT_TOKENS
+    max_total_tokens = max_total_tokens or file_excerpt_budget()
+
+    excerpts = []
+    omitted = []
+    seen = set()
+    total = 0
+    for file_info in read_files or []:
+        path = file_info.get('path') or file_info.get('filePath', '')
+        content = file_info.get('content') or ''
+        if not content or path in seen:
+            continue
+        seen.add(path)
+
+        preview = None
+        if query and estimate_tokens(content) > max_tokens_per_file:
+            preview = select_excerpts(content, query, max_tokens_per_file)
+        if preview is None:
+            preview = truncate_to_tokens(content, max_tokens_per_file, marker='')
+            truncated = " (일부만 표시)" if file_info.get('truncated') or len(preview) < len(content) else ""
+        else:
+            truncated = " (관련 부분만 표시)"
+        preview_tokens = estimate_tokens(preview)
+        if omitted or total + preview_tokens > max_total_tokens:
+            omitted.append(path)
+            continue
+        total += preview_tokens
+        excerpts.append(f"### 파일: {path}{truncated}\n```\n{preview}\n```")
+
+    if not excerpts:
+        return "", omitted
+    return "## 📄 읽은 파일 내용\n\n" + "\n\n".join(excerpts), omitted
+
+def build_omitted_chunks(read_files, omitted, query, k=None, max_tokens=None):
+    """
+    예산 초과로 생략된 파일에서 질문과 관련된 청크 k개 (가변 접미부에 넣음)
+
+    생략된 파일 전체를 청크로 나눠 BM25로 검색하므로 (code_search.CodeIndex),
+    나중에 읽어 접두부에 들어가지 못한 파일도 질문과 관련된 부분은 프롬프트에 포함됩니다.
+    """
+    k = PROMPT_OMITTED_CHUNKS if k is None else k
+    if not omitted or not query or k <= 0:
+        return ""
+    max_tokens = max_tokens or PROMPT_FILE_EXCERPT_TOKENS
+    omitted_paths = set(omitted)
+    files = {}
+    for file_info in read_files or []:
+        path = file_info.get('path') or file_info.get('filePath', '')
+        if path in omitted_paths and path not in files:
+            files[path] = file_info
+    index = CodeIndex()
+    index.add_files(files.values())
+
+    chunks = []
+    used = 0
+    for _, chunk in index.search(query, k=k):
+        cost = estimate_tokens(chunk.text) + 8
+        if used + cost > max_tokens:
+            continue
+        chunks.append(f"### 파일: {chunk.path} (L{chunk.start}-{chunk.end})\n```\n{chunk.text}\n```")
+        used += cost
+    if not chunks:
+        return ""
+    return "## 생략된 파일의 관련 코드\n\n" + "\n\n".join(chunks)
+
+def compose_prompt(context, read_files, task_prompt):
+    """
+    안정 접두부 + 가변 접미부로 프롬프트 조립
+
+    접두부: 프로젝트 프로필, 읽은 파일 발췌 (실행 내내 앞부분이 바뀌지 않음)
+    접미부: 단계별 지시문, 이전 단계 결과, 사용자 메시지 (task_prompt)
+    """
+    profile = build_project_profile(context)
+    query = (context or {}).get('retrievalQuery')
+    excerpts, omitted = build_file_excerpts(read_files, query=query)
+
+    prefix = profile if not excerpts else profile + "\n\n" + excerpts
+    if omitted:
+        related = build_omitted_chunks(read_files, omitted, query)
+        if related:
+            task_prompt = related + "\n\n" + task_prompt
+        task_prompt = "## 추가로 읽은 파일 (내용 생략):\n" + "\n".join(f"- {path}" for path in omitted) + "\n\n" + task_prompt
+    return prefix + PROMPT_PREFIX_SEPARATOR + task_prompt
 
 def summarize_commit_message(msg, max_length=80):
     """커밋 메시지를 요약합니다."""
@@ -93,10 +215,15 @@ def create_optimized_task_suggestion_prompt(commits, issues, currentTasks, proje
     
     # 정보 충분성 체크는 agent_router.py에서 처리되므로 여기서는 제거
     
+    sections = allocate_sections([
+        ('commits', json.dumps(recent_commits_detail, ensure_ascii=False, indent=2), 2000),
+        ('issues', json.dumps(open_issues_detail, ensure_ascii=False, indent=2), 1500),
+    ])
+    
     prompt = f"""프로젝트를 종합적으로 분석하여 **구체적이고 실용적인 Task**를 제안하세요.
 
 ## 프로젝트 정보:
-- 프로젝트 설명: {projectDescription[:200] if projectDescription else '없음'}
+- 프로젝트 설명: {truncate_to_tokens(projectDescription, 120) if projectDescription else '없음'}
 - GitHub 저장소: {githubRepo if githubRepo else '연결되지 않음'}
 
 ## 프로젝트 현황:
@@ -113,10 +240,10 @@ def create_optimized_task_suggestion_prompt(commits, issues, currentTasks, proje
 - {task_summary}
 
 ## 최근 커밋 상세 (최근 {len(recent_commits_detail)}개):
-{json.dumps(recent_commits_detail, ensure_ascii=False, indent=2)[:2000] if recent_commits_detail else '커밋 없음'}
+{sections['commits'] if recent_commits_detail else '커밋 없음'}
 
 ## 열린 이슈 상세 (최근 {len(open_issues_detail)}개):
-{json.dumps(open_issues_detail, ensure_ascii=False, indent=2)[:1500] if open_issues_detail else '이슈 없음'}
+{sections['issues'] if open_issues_detail else '이슈 없음'}
 
 ## Task 제안 요청사항:
 위 정보를 종합적으로 분석하여 **구체적이고 실용적인 Task**를 제안하세요.
@@ -191,10 +318,15 @@ def create_optimized_progress_prompt(commits, tasks, projectDescription, project
             "assignedUserId": task.get('assignedUserId', '')
         })
     
+    sections = allocate_sections([
+        ('commits', json.dumps(commit_details, ensure_ascii=False, indent=2), 1500),
+        ('tasks', json.dumps(task_details, ensure_ascii=False, indent=2), 1000),
+    ])
+    
     prompt = f"""프로젝트 진행도 분석을 수행하세요. 다음 데이터를 종합적으로 분석하여 상세하고 구체적인 분석 결과를 제공하세요.
 
 ## 프로젝트 정보:
-- 프로젝트 설명: {projectDescription[:200]}
+- 프로젝트 설명: {truncate_to_tokens(projectDescription, 120)}
 - 프로젝트 시작일: {projectStartDate or '미정'}
 - 프로젝트 마감일: {projectDueDate or '미정'}
 
@@ -211,10 +343,10 @@ def create_optimized_progress_prompt(commits, tasks, projectDescription, project
 - 최근 7일 커밋: {recent_week}개
 
 ## 최근 커밋 상세 (최근 {len(commit_details)}개):
-{json.dumps(commit_details, ensure_ascii=False, indent=2)[:1500]}
+{sections['commits']}
 
 ## Task 상세 (최근 {len(task_details)}개):
-{json.dumps(task_details, ensure_ascii=False, indent=2)[:1000]}
+{sections['tasks']}
 
 ## 분석 요청사항:
 다음 항목들을 **구체적이고 상세하게** 분석하여 JSON 형식으로 응답하세요. 
@@ -488,10 +620,10 @@ def create_followup_completion_prompt(task, initial_analysis, commits, projectDe
             path = f.get('path', '')
             patch = f.get('patch', '')
             if patch:
-                patch_preview = patch[:600] if len(patch) > 600 else patch
+                patch_preview = truncate_to_tokens(patch, 200, marker='')
                 code_changes.append(f"  파일: {path}")
                 code_changes.append(f"    코드 변경:\n{patch_preview}")
-                if len(patch) > 600:
+                if len(patch_preview) < len(patch):
                     code_changes.append(f"    ... (총 {len(patch)}자)")
             else:
                 code_changes.append(f"  파일: {path} (코드 변경사항 없음)")
@@ -506,7 +638,8 @@ SHA: {commit.get('sha', '')[:8]}
 """
         commits_detail.append(commit_info)
     
-    commits_text = '\n'.join(commits_detail) if commits_detail else "커밋 없음"
+    # 커밋 30개 x 파일 10개의 패치가 컨텍스트를 넘지 않도록 구간 예산 전체로 제한
+    commits_text = fit_section('\n'.join(commits_detail)) if commits_detail else "커밋 없음"
     
     prompt = f"""당신은 Task 완료 여부를 최종 판단하는 AI 에이전트입니다.
 
@@ -699,7 +832,7 @@ def create_intent_classification_prompt(user_message, conversation_history=None,
     if project_context:
         project_info = f"""
 ## 프로젝트 정보:
-- 프로젝트 설명: {project_context.get('projectDescription', 'N/A')[:200]}
+- 프로젝트 설명: {truncate_to_tokens(project_context.get('projectDescription') or 'N/A', 120)}
 - 커밋 수: {len(project_context.get('commits', []))}개
 - Task 수: {len(project_context.get('tasks', []))}개
 - 이슈 수: {len(project_context.get('issues', []))}개
@@ -0,0 +1,283 @@
+"""
+GitHub 저장소 스냅샷 (HEAD 커밋별 로컬 사본)
+에이전트가 파일을 하나씩 contents API로 읽는 대신, 저장소 tarball을 HEAD 커밋마다 한 번만 받아
+텍스트 파일을 디스크에 보관하고 get_file_contents/list_directory_contents가 여기서 읽습니다.
+
+    snapshot = get_snapshot(owner, repo, ref, github_token)   # HEAD가 그대로면 API 호출 1회(HEAD 확인)도 TTL 동안 생략
+    if snapshot is not None:                                  # 처음 보는 커밋은 백그라운드에서 만드는 동안 None
+        snapshot.read("README.md")       # 내용 (스냅샷에 없는 파일이면 None)
+        snapshot.tree.listing("src")     # 경로 인덱스 (repo_tree.RepoTreeIndex)
+
+- 저장 위치: REPO_SNAPSHOT_DIR/<프로젝트 키>/<커밋 SHA>.json (경로 -> blob SHA 목록), blobs/<blob SHA> (파일 내용)
+  blob은 내용 주소로 저장하므로 HEAD가 바뀌어도 바뀐 파일만 새로 씁니다.
+- 프로젝트 키와 HEAD 확인은 repo_tree와 공용이며, 스냅샷 목록으로 만든 경로 인덱스를 repo_tree에 등록합니다.
+- 크기가 REPO_SNAPSHOT_MAX_FILE_BYTES를 넘거나 UTF-8이 아닌 파일은 경로만 기록하며, 이런 파일은 contents API로 읽습니다.
+- 디스크에 없는 커밋의 tarball은 백그라운드 스레드에서 받으며, 그동안과 다운로드가 실패하거나
+  REPO_SNAPSHOT_MAX_BYTES보다 클 때(받는 도중 중단)는 None을 반환하고, 호출한 쪽은 contents API로 읽습니다.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from repo_tree import REPO_SNAPSHOT_HEAD_TTL, RepoTreeIndex, github_headers, project_key, remember_tree, resolve_head
+from single_flight import github_flight
+
+# 저장소 스냅샷 사용 여부
+REPO_SNAPSHOT_ENABLED = os.getenv('REPO_SNAPSHOT_ENABLED', 'true').lower() == 'true'
+# 스냅샷 저장 디렉토리
+REPO_SNAPSHOT_DIR = os.getenv(
+    'REPO_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'repo_snapshots')
+)
+# 받을 tarball의 최대 크기 (바이트, 넘으면 스냅샷을 만들지 않음)
+REPO_SNAPSHOT_MAX_BYTES = int(os.getenv('REPO_SNAPSHOT_MAX_BYTES', str(50 * 1024 * 1024)))
+# 스냅샷에 내용을 보관할 파일의 최대 크기 (바이트)
+REPO_SNAPSHOT_MAX_FILE_BYTES = int(os.getenv('REPO_SNAPSHOT_MAX_FILE_BYTES', str(512 * 1024)))
+# 프로젝트마다 디스크에 남겨 둘 커밋 스냅샷 수
+REPO_SNAPSHOT_KEEP = 2
+
+_lock = threading.Lock()
+_stats = {
+    'builds': 0, 'buildsStarted': 0, 'buildFailures': 0, 'diskLoads': 0, 'blobsWritten': 0, 'blobsReused': 0, 'filesServed': 0
+}
+# 프로젝트 키 -> 마지막으로 사용한 스냅샷
+_snapshots: Dict[str, 'RepoSnapshot'] = {}
+# 프로젝트 키, 커밋 SHA -> 스냅샷 생성 실패 시각
+_failures: Dict[Tuple[str, str], float] = {}
+# 백그라운드에서 만들고 있는 (프로젝트 키, 커밋 SHA)
+_building: Set[Tuple[str, str]] = set()
+
+
+def count_snapshot(**counts: int):
+    """스냅샷 사용 통계 증가 (get_file_contents 등에서 사용)"""
+    with _lock:
+        for name, value in counts.items():
+            _stats[name] += value
+
+
+def blob_sha(data: bytes) -> str:
+    """git blob SHA (GitHub contents API 응답의 sha와 같은 값)"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class RepoSnapshot:
+    """커밋 하나의 저장소 사본 (경로 -> blob SHA, 내용을 보관하지 않은 파일은 None)"""
+
+    def __init__(self, key: str, sha: str, files: Dict[str, Optional[str]], directory: str = REPO_SNAPSHOT_DIR):
+        self.key = key
+        self.sha = sha
+        self.files = files
+        self.blob_dir = os.path.join(directory, key, 'blobs')
+        self.tree = RepoTreeIndex(files.items())
+
+    def has_content(self, path: str) -> bool:
+        """내용을 스냅샷에서 읽을 수 있는 파일인지 (큰 파일/바이너리는 False)"""
+        return self.files.get(path.strip('/')) is not None
+
+    def blob(self, path: str) -> Optional[str]:
+        return self.files.get(path.strip('/'))
+
+    def read(self, path: str) -> Optional[str]:
+        """파일 내용 (스냅샷에 내용이 없으면 None)"""
+        sha = self.blob(path)
+        if sha is None:
+            return None
+        try:
+            with open(os.path.join(self.blob_dir, sha), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def _manifest_path(key: str, sha: str, directory: str = REPO_SNAPSHOT_DIR) -> str:
+    return os.path.join(directory, key, f"{sha}.json")
+
+
+def _load_manifest(key: str, sha: str) -> Optional[RepoSnapshot]:
+    path = _manifest_path(key, sha)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"[Repo Snapshot] {key} 스냅샷 목록을 읽을 수 없어 다시 받습니다: {e}")
+        return None
+    count_snapshot(diskLoads=1)
+    return RepoSnapshot(key, sha, manifest.get('files', {}))
+
+
+def _download_tarball(url: str, headers: Dict[str, str]) -> bytes:
+    """
+    tarball 다운로드 (REPO_SNAPSHOT_MAX_BYTES를 넘으면 받는 도중에 중단)
+
+    Content-Length가 한도를 넘으면 본문을 받지 않고, 길이를 알 수 없으면(chunked) 읽으면서 확인합니다.
+    github_get과 같은 재시도/서킷 브레이커를 사용하며, 조건부 요청 캐시에는 저장하지 않습니다 (본문이 큼).
+    """
+    import requests
+    from multi_step_agent import GITHUB_RETRY, github_breaker
+    from resilience import is_transient_http_error, retry_call
+
+    def fetch():
+        with requests.get(url, headers=headers, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) > REPO_SNAPSHOT_MAX_BYTES:
+                raise ValueError(f"tarball이 너무 큽니다 ({length}바이트)")
+            buffer = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                buffer.write(chunk)
+                if buffer.tell() > REPO_SNAPSHOT_MAX_BYTES:
+                    raise ValueError(f"tarball이 너무 큽니다 ({REPO_SNAPSHOT_MAX_BYTES}바이트 초과)")
+            return buffer.getvalue()
+
+    return retry_call(fetch, GITHUB_RETRY, is_transient_http_error, github_breaker(), 'GitHub API')
+
+
+def _build_snapshot(owner: str, repo: str, sha: str, key: str, github_token: Optional[str]) -> RepoSnapshot:
+    """tarball을 받아 텍스트 파일을 blob으로 저장하고 목록 파일 작성"""
+    start_time = time.time()
+    tarball = _download_tarball(f'https://api.github.com/repos/{owner}/{repo}/tarball/{sha}', github_headers(github_token))
+
+    blob_dir = os.path.join(REPO_SNAPSHOT_DIR, key, 'blobs')
+    os.makedirs(blob_dir, exist_ok=True)
+    files: Dict[str, Optional[str]] = {}
+    written = reused = 0
+    with tarfile.open(fileobj=io.BytesIO(tarball), mode='r:gz') as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            # 최상위 디렉토리(owner-repo-sha/) 제거
+            path = member.name.split('/', 1)[1] if '/' in member.name else ''
+            if not path:
+                continue
+            files[path] = None
+            if member.size > REPO_SNAPSHOT_MAX_FILE_BYTES:
+                continue
+            data = archive.extractfile(member).read()
+            try:
+                data.decode('utf-8')
+            except UnicodeDecodeError:
+                continue
+            sha1 = blob_sha(data)
+            blob_path = os.path.join(blob_dir, sha1)
+            if os.path.exists(blob_path):
+                reused += 1
+            else:
+                temp_path = f"{blob_path}.tmp{threading.get_ident()}"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, blob_path)
+                written += 1
+            files[path] = sha1
+
+    manifest_path = _manifest_path(key, sha)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'owner': owner, 'repo': repo, 'sha': sha, 'files': files}, f, ensure_ascii=False)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    _prune(key)
+    count_snapshot(builds=1, blobsWritten=written, blobsReused=reused)
+    print(
+        f"[Repo Snapshot] {owner}/{repo}@{sha[:7]} 스냅샷 생성: 파일 {len(files)}개 "
+        f"(새 blob {written}개, 재사용 {reused}개), 소요 시간: {time.time() - start_time:.2f}초"
+    )
+    return RepoSnapshot(key, sha, files)
+
+
+def _prune(key: str):
+    """최근 REPO_SNAPSHOT_KEEP개 커밋 스냅샷만 남기고, 어느 스냅샷도 쓰지 않는 blob 삭제"""
+    project_dir = os.path.join(REPO_SNAPSHOT_DIR, key)
+    manifests = sorted(
+        (os.path.join(project_dir, name) for name in os.listdir(project_dir) if name.endswith('.json')),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    if len(manifests) <= REPO_SNAPSHOT_KEEP:
+        return
+    for path in manifests[REPO_SNAPSHOT_KEEP:]:
+        os.remove(path)
+    referenced = set()
+    for path in manifests[:REPO_SNAPSHOT_KEEP]:
+        with open(path, encoding='utf-8') as f:
+            referenced.update(sha for sha in json.load(f).get('files', {}).values() if sha)
+    blob_dir = os.path.join(project_dir, 'blobs')
+    for name in os.listdir(blob_dir):
+        if name not in referenced:
+            os.remove(os.path.join(blob_dir, name))
+
+
+def _remember_snapshot(key: str, snapshot: RepoSnapshot):
+    with _lock:
+        _snapshots[key] = snapshot
+    remember_tree(key, snapshot.sha, snapshot.tree)
+
+
+def _build_in_background(owner: str, repo: str, sha: str, key: str, github_token: Optional[str]):
+    """
+    tarball을 받아 스냅샷을 만드는 스레드 시작 (같은 커밋은 한 번만)
+
+    요청 처리 중에 최대 60초짜리 다운로드를 기다리지 않도록, 만드는 동안의 요청은 contents API로 읽고
+    다음 요청부터 스냅샷을 사용합니다.
+    """
+    with _lock:
+        if (key, sha) in _building:
+            return
+        _building.add((key, sha))
+        _stats['buildsStarted'] += 1
+
+    def build():
+        try:
+            _remember_snapshot(key, _build_snapshot(owner, repo, sha, key, github_token))
+        except Exception as e:
+            count_snapshot(buildFailures=1)
+            print(f"[Repo Snapshot] {owner}/{repo}@{sha[:7]} 스냅샷 생성 실패 - contents API 사용: {e}")
+            # 같은 커밋은 HEAD TTL 동안 다시 시도하지 않음
+            with _lock:
+                _failures[(key, sha)] = time.time()
+        finally:
+            with _lock:
+                _building.discard((key, sha))
+
+    threading.Thread(target=build, name='repo-snapshot-build', daemon=True).start()
+
+
+def get_snapshot(owner: str, repo: str, ref: str = 'main', github_token: Optional[str] = None) -> Optional[RepoSnapshot]:
+    """
+    ref의 현재 HEAD 커밋 스냅샷 (메모리 -> 디스크 순으로 찾음)
+
+    비활성화되었거나 HEAD 확인에 실패했거나 스냅샷을 아직 만들지 않았으면 None (호출한 쪽은 contents API로 읽음).
+    디스크에 없는 커밋은 백그라운드에서 tarball을 받아 만들며, 같은 커밋은 동시에 요청해도 한 번만 받습니다.
+    """
+    if not REPO_SNAPSHOT_ENABLED or not owner or not repo:
+        return None
+    key = project_key(owner, repo, github_token)
+    sha = resolve_head(owner, repo, ref, key, github_token)
+    if not sha:
+        return None
+    with _lock:
+        snapshot = _snapshots.get(key)
+        failed_at = _failures.get((key, sha))
+    if snapshot is not None and snapshot.sha == sha:
+        return snapshot
+    if failed_at is not None and time.time() - failed_at < REPO_SNAPSHOT_HEAD_TTL:
+        return None
+
+    snapshot, _ = github_flight.do(('snapshot', key, sha), lambda: _load_manifest(key, sha))
+    if snapshot is None:
+        _build_in_background(owner, repo, sha, key, github_token)
+        return None
+    _remember_snapshot(key, snapshot)
+    return snapshot
+
+
+def snapshot_stats() -> Dict[str, Any]:
+    """스냅샷 생성 수(시작/완료), 새로 쓴/재사용한 blob 수, 스냅샷에서 읽은 파일 수, 메모리에 있는 프로젝트별 커밋"""
+    with _lock:
+        snapshots = {key: snapshot.sha[:7] for key, snapshot in _snapshots.items()}
+        return {'enabled': REPO_SNAPSHOT_ENABLED, 'snapshots': snapshots, **_stats}
@@ -0,0 +1,284 @@
+"""
+GitHub 저장소 경로 인덱스 (git trees API 재귀 조회 1회)
+디렉토리마다 contents API를 호출하고 README/설정 파일 이름을 하나씩 읽어 보는 대신,
+ref의 HEAD 커밋 트리 전체를 한 번에 받아 메모리 경로 인덱스로 보관합니다.
+디렉토리 목록, 파일/디렉토리 존재 확인, README/설정 파일 찾기는 추가 API 호출 없이 인덱스로 답합니다.
+
+    tree = get_tree_index(owner, repo, ref, github_token)
+    if tree is not None:
+        tree.listing("src")                               # contents API 디렉토리 응답 형식
+        "src/pages" in tree                               # 파일 또는 디렉토리 존재 여부
+        tree.existing(["README.md", "readme.md"])         # 실제로 있는 경로 (대소문자 무시)
+        tree.files_with_extension(".jsx", under="web")    # 확장자별 파일
+
+- HEAD 커밋 확인 결과는 REPO_SNAPSHOT_HEAD_TTL 동안 재사용합니다 (repo_snapshot과 공용).
+- 인덱스는 커밋마다 보관하되(LRU) 트리 SHA가 같으면 같은 인덱스를 공유하며,
+  저장소 스냅샷(repo_snapshot)을 만든 커밋은 스냅샷 목록으로 만든 인덱스를 등록해 트리를 따로 받지 않습니다.
+- 트리가 너무 커서 GitHub가 잘라서 보낸 경우(truncated) 인덱스에 없는 경로를 "없음"으로 답하지 않습니다.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from single_flight import github_flight
+
+# HEAD 커밋 확인 결과를 재사용하는 시간 (초)
+REPO_SNAPSHOT_HEAD_TTL = float(os.getenv('REPO_SNAPSHOT_HEAD_TTL', '60'))
+# 경로 인덱스 사용 여부
+REPO_TREE_INDEX_ENABLED = os.getenv('REPO_TREE_INDEX_ENABLED', 'true').lower() == 'true'
+# 메모리에 보관할 커밋 인덱스 수
+REPO_TREE_CACHE_SIZE = int(os.getenv('REPO_TREE_CACHE_SIZE', '32'))
+
+_lock = threading.Lock()
+_stats = {
+    'headChecks': 0, 'treeFetches': 0, 'treeFetchFailures': 0, 'treeReuses': 0, 'snapshotTrees': 0,
+    'listingsServed': 0, 'existenceChecks': 0, 'notFoundServed': 0
+}
+# 프로젝트 키, ref -> (HEAD 커밋 SHA 또는 None(실패), 확인 시각)
+_heads: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+# 프로젝트 키, 커밋 SHA -> 인덱스 (LRU)
+_commit_trees: 'OrderedDict[Tuple[str, str], RepoTreeIndex]' = OrderedDict()
+# 프로젝트 키, 커밋 SHA -> 트리 조회 실패 시각
+_failures: Dict[Tuple[str, str], float] = {}
+
+
+def count_tree(**counts: int):
+    """경로 인덱스 사용 통계 증가 (list_directory_contents 등에서 사용)"""
+    with _lock:
+        for name, value in counts.items():
+            _stats[name] += value
+
+
+def project_key(owner: str, repo: str, github_token: Optional[str]) -> str:
+    """프로젝트 키 (owner_repo-토큰 해시, 토큰마다 접근할 수 있는 저장소가 다름)"""
+    token_hash = hashlib.sha256(github_token.encode('utf-8')).hexdigest()[:8] if github_token else 'public'
+    readable = re.sub(r'[^A-Za-z0-9_.-]+', '_', f"{owner}_{repo}".lower())[:60]
+    return f"{readable}-{token_hash}"
+
+
+def github_headers(github_token: Optional[str], accept: Optional[str] = None) -> Dict[str, str]:
+    headers = {}
+    if accept:
+        headers['Accept'] = accept
+    if github_token:
+        headers['Authorization'] = f'token {github_token}'
+    return headers
+
+
+def resolve_head(owner: str, repo: str, ref: str, key: str, github_token: Optional[str]) -> Optional[str]:
+    """ref의 현재 커밋 SHA (REPO_SNAPSHOT_HEAD_TTL 동안 재사용, 'main'은 기본 브랜치로 해석)"""
+    now = time.time()
+    with _lock:
+        cached = _heads.get((key, ref))
+    if cached is not None and now - cached[1] < REPO_SNAPSHOT_HEAD_TTL:
+        return cached[0]
+
+    from multi_step_agent import github_get, warn_github_rate_limit
+
+    # contents API는 ref='main'일 때 ref 없이 기본 브랜치를 읽으므로 같은 커밋을 기준으로 함
+    head_ref = 'HEAD' if ref == 'main' else ref
+    sha = None
+    try:
+        response = github_get(
+            f'https://api.github.com/repos/{owner}/{repo}/commits/{head_ref}',
+            github_headers(github_token, 'application/vnd.github.sha'),
+            timeout=5
+        )
+        warn_github_rate_limit(response.headers)
+        sha = response.text.strip() or None
+    except Exception as e:
+        print(f"[Repo Tree] {owner}/{repo}@{ref} HEAD 확인 실패: {e}")
+    with _lock:
+        _heads[(key, ref)] = (sha, now)
+        _stats['headChecks'] += 1
+    return sha
+
+
+class RepoTreeIndex:
+    """커밋 하나의 경로 인덱스 (파일 경로 -> blob SHA, 디렉토리별/확장자별 조회)"""
+
+    def __init__(self, files: Iterable[Tuple[str, Optional[str]]], directories: Iterable[str] = (), sha: Optional[str] = None, complete: bool = True):
+        self.sha = sha
+        self.complete = complete
+        self.blobs: Dict[str, Optional[str]] = {}
+        # 디렉토리 경로 -> 바로 아래 항목 (이름 -> 'file' / 'dir')
+        self.children: Dict[str, Dict[str, str]] = {'': {}}
+        self.by_extension: Dict[str, List[str]] = {}
+        self._lower: Dict[str, str] = {}
+        for directory in directories:
+            self._add_parents(directory + '/x')
+        for path, blob in files:
+            self.blobs[path] = blob
+            self._add_parents(path)
+            self.by_extension.setdefault(posixpath.splitext(path)[1].lower(), []).append(path)
+            self._lower.setdefault(path.lower(), path)
+        for directory in self.children:
+            self._lower.setdefault(directory.lower(), directory)
+
+    def _add_parents(self, path: str):
+        parts = path.split('/')
+        for depth in range(len(parts) - 1):
+            parent = '/'.join(parts[:depth])
+            directory = '/'.join(parts[:depth + 1])
+            self.children.setdefault(parent, {})[parts[depth]] = 'dir'
+            self.children.setdefault(directory, {})
+        if path in self.blobs:
+            self.children['/'.join(parts[:-1])][parts[-1]] = 'file'
+
+    def __len__(self) -> int:
+        return len(self.blobs)
+
+    def __contains__(self, path: str) -> bool:
+        """파일 또는 디렉토리가 있는지"""
+        path = path.strip('/')
+        return path in self.blobs or path in self.children
+
+    def is_file(self, path: str) -> bool:
+        return path.strip('/') in self.blobs
+
+    def is_directory(self, path: str) -> bool:
+        return path.strip('/') in self.children
+
+    def missing(self, path: str) -> bool:
+        """확실히 없는 경로인지 (잘린 트리면 항상 False)"""
+        return self.complete and path not in self
+
+    def resolve(self, path: str) -> Optional[str]:
+        """대소문자를 무시하고 실제 경로 찾기 (없으면 None)"""
+        path = path.strip('/')
+        if path in self:
+            return path
+        return self._lower.get(path.lower())
+
+    def existing(self, paths: Iterable[str]) -> List[str]:
+        """paths 중 실제로 있는 경로 (대소문자를 무시해 실제 경로로 바꾸고 중복 제거, 순서 유지)"""
+        found = []
+        for path in paths:
+            resolved = self.resolve(path)
+            if resolved is None and not self.complete:
+                resolved = path
+            if resolved is not None and resolved not in found:
+                found.append(resolved)
+        count_tree(existenceChecks=1)
+        return found
+
+    def listing(self, directory_path: str) -> Optional[List[Dict[str, str]]]:
+        """contents API 디렉토리 응답 형식의 목록 (디렉토리가 없으면 None)"""
+        directory_path = directory_path.strip('/')
+        children = self.children.get(directory_path)
+        if children is None:
+            return None
+        prefix = f"{directory_path}/" if directory_path else ''
+        return [
+            {"type": kind, "name": name, "path": prefix + name}
+            for name, kind in sorted(children.items())
+        ]
+
+    def files_with_extension(self, *extensions: str, under: str = '') -> List[str]:
+        """확장자별 파일 경로 (under 디렉토리 아래만)"""
+        prefix = f"{under.strip('/')}/" if under.strip('/') else ''
+        return [
+            path
+            for extension in extensions
+            for path in self.by_extension.get(extension.lower(), [])
+            if path.startswith(prefix)
+        ]
+
+
+def _remember(key: str, commit_sha: str, index: RepoTreeIndex):
+    with _lock:
+        _commit_trees[(key, commit_sha)] = index
+        _commit_trees.move_to_end((key, commit_sha))
+        while len(_commit_trees) > REPO_TREE_CACHE_SIZE:
+            _commit_trees.popitem(last=False)
+
+
+def remember_tree(key: str, commit_sha: str, index: RepoTreeIndex):
+    """저장소 스냅샷으로 만든 인덱스 등록 (같은 커밋은 트리를 따로 받지 않음)"""
+    with _lock:
+        known = _commit_trees.get((key, commit_sha))
+    if known is None:
+        count_tree(snapshotTrees=1)
+        _remember(key, commit_sha, index)
+
+
+def _fetch_tree(owner: str, repo: str, commit_sha: str, key: str, github_token: Optional[str]) -> Optional[RepoTreeIndex]:
+    from multi_step_agent import github_get, warn_github_rate_limit
+
+    start_time = time.time()
+    try:
+        response = github_get(
+            f'https://api.github.com/repos/{owner}/{repo}/git/trees/{commit_sha}?recursive=1',
+            github_headers(github_token),
+            timeout=30
+        )
+        warn_github_rate_limit(response.headers)
+        data = response.json()
+    except Exception as e:
+        count_tree(treeFetchFailures=1)
+        print(f"[Repo Tree] {owner}/{repo}@{commit_sha[:7]} 트리 조회 실패 - contents API 사용: {e}")
+        with _lock:
+            _failures[(key, commit_sha)] = time.time()
+        return None
+
+    tree_sha = data.get('sha')
+    with _lock:
+        shared = next((index for index in _commit_trees.values() if tree_sha and index.sha == tree_sha), None)
+    if shared is not None:
+        # 트리가 같은 커밋(빈 머지 커밋, 되돌린 커밋 등)은 인덱스 공유
+        count_tree(treeFetches=1, treeReuses=1)
+        return shared
+
+    entries = data.get('tree') or []
+    index = RepoTreeIndex(
+        ((entry['path'], entry.get('sha')) for entry in entries if entry.get('type') == 'blob'),
+        (entry['path'] for entry in entries if entry.get('type') == 'tree'),
+        sha=tree_sha,
+        complete=not data.get('truncated', False)
+    )
+    count_tree(treeFetches=1)
+    suffix = " (잘린 트리)" if not index.complete else ""
+    print(f"[Repo Tree] {owner}/{repo}@{commit_sha[:7]} 경로 인덱스 생성: 파일 {len(index)}개{suffix}, 소요 시간: {time.time() - start_time:.2f}초")
+    return index
+
+
+def get_tree_index(owner: str, repo: str, ref: str = 'main', github_token: Optional[str] = None) -> Optional[RepoTreeIndex]:
+    """
+    ref의 현재 HEAD 커밋 경로 인덱스 (커밋마다 트리 조회 1회, 같은 커밋의 동시 조회는 병합)
+
+    비활성화되었거나 HEAD 확인/트리 조회에 실패하면 None (호출한 쪽은 contents API 사용).
+    """
+    if not REPO_TREE_INDEX_ENABLED or not owner or not repo:
+        return None
+    key = project_key(owner, repo, github_token)
+    commit_sha = resolve_head(owner, repo, ref, key, github_token)
+    if not commit_sha:
+        return None
+    with _lock:
+        index = _commit_trees.get((key, commit_sha))
+        if index is not None:
+            _commit_trees.move_to_end((key, commit_sha))
+            return index
+        failed_at = _failures.get((key, commit_sha))
+    if failed_at is not None and time.time() - failed_at < REPO_SNAPSHOT_HEAD_TTL:
+        return None
+
+    index, _ = github_flight.do(
+        ('tree', key, commit_sha),
+        lambda: _fetch_tree(owner, repo, commit_sha, key, github_token)
+    )
+    if index is not None:
+        _remember(key, commit_sha, index)
+    return index
+
+
+def tree_stats() -> Dict[str, Any]:
+    """HEAD 확인/트리 조회 수, 인덱스로 답한 디렉토리 목록/존재 확인/없는 파일 수, 메모리에 있는 인덱스 수"""
+    with _lock:
+        return {'enabled': REPO_TREE_INDEX_ENABLED, 'indexes': len(_commit_trees), **_stats}
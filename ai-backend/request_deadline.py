@@ -0,0 +1,76 @@
+"""
+요청 마감 시간 (deadline) 전달
+호출한 쪽(Node.js 백엔드)이 응답을 기다리는 시간을 헤더로 받아, 다단계 에이전트가
+단계마다 남은 시간을 확인하고 시간이 부족하면 선택적 작업(추가 파일 읽기, 충분성 평가)을 건너뛴 뒤
+지금까지의 결과를 부분 결과(partial)로 반환하도록 합니다.
+
+    X-Request-Timeout-Ms: 120000   (호출한 쪽의 타임아웃, 밀리초)
+
+    with request_deadline(deadline_from_headers(request.headers)):
+        result = execute_progress_analysis_agent(...)   # 단계마다 deadline_exceeded()로 확인
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# 호출한 쪽의 타임아웃 헤더 (밀리초)
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+# 응답 직렬화/전송에 남겨 둘 시간 (초, 헤더의 타임아웃에서 뺌)
+DEADLINE_SAFETY_MARGIN = float(os.getenv('DEADLINE_SAFETY_MARGIN', '5'))
+# 헤더가 없을 때 적용할 기본 마감 시간 (초, 0이면 제한 없음)
+DEFAULT_REQUEST_DEADLINE = float(os.getenv('DEFAULT_REQUEST_DEADLINE', '0'))
+
+# 마감 시각 (time.monotonic 기준, None이면 제한 없음)
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('request_deadline', default=None)
+
+
+def deadline_from_headers(headers) -> Optional[float]:
+    """요청 헤더에서 남은 시간(초) 계산 (헤더가 없거나 잘못되면 DEFAULT_REQUEST_DEADLINE, 0이면 None)"""
+    value = headers.get(DEADLINE_HEADER)
+    seconds = DEFAULT_REQUEST_DEADLINE
+    if value:
+        try:
+            seconds = float(value) / 1000.0
+        except ValueError:
+            print(f"[Request Deadline] 잘못된 {DEADLINE_HEADER} 헤더 무시: {value}")
+    if seconds <= 0:
+        return None
+    return max(0.0, seconds - DEADLINE_SAFETY_MARGIN)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """
+    블록 안의 작업에 마감 시간 지정 (None이면 바깥 마감 시간 유지)
+
+    바깥에 더 이른 마감 시간이 있으면 그 시각을 유지합니다.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    """마감까지 남은 시간 (초, 마감 시간이 없으면 None)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_exceeded(reserve: float = 0.0) -> bool:
+    """남은 시간이 reserve초 이하인지 (마감 시간이 없으면 항상 False)"""
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= reserve
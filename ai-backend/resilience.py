@@ -0,0 +1,272 @@
+"""
+외부 호출 복원력 (재시도 + 서킷 브레이커)
+Ollama, GitHub API처럼 일시적으로 실패할 수 있는 외부 서비스 호출에 사용합니다.
+
+- 재시도: 멱등 호출만, 지수 백오프 + 전체 지터 (여러 요청이 같은 시각에 몰려 재시도하지 않도록)
+- 서킷 브레이커: 외부 서비스(엔드포인트)마다 하나, 연속 실패가 기준 이상이면 열림(open) 상태가 되어
+  reset_seconds 동안 호출을 보내지 않고 즉시 CircuitOpenError를 발생시킴 (타임아웃까지 기다리지 않음)
+  이후 한 번의 시험 호출(half-open)이 성공하면 닫힘(closed)으로 복귀
+
+    breaker = get_breaker('GitHub API')
+    response = retry_call(lambda: requests.get(url, timeout=10), GITHUB_RETRY, is_transient_http_error, breaker, 'GitHub API')
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+import requests
+
+# 재시도 백오프 설정 (초)
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '0.5'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '8'))
+# 서킷 브레이커 기본값 (Ollama 노드는 OLLAMA_FAILURE_THRESHOLD, OLLAMA_EJECT_SECONDS 사용)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+
+# 재시도할 HTTP 상태 코드 (요청 한도 초과, 게이트웨이/서버 과부하)
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 호출하지 않음 (retry_after초 후 재시도 권장)"""
+
+    def __init__(self, upstream: str, retry_after: int, last_error: Optional[str] = None):
+        message = f"{upstream} 호출 일시 중단: 연속 실패로 서킷 브레이커가 열려 있습니다 ({retry_after}초 후 재시도)"
+        if last_error:
+            message += f" - 마지막 오류: {last_error}"
+        super().__init__(message)
+        self.upstream = upstream
+        self.retry_after = retry_after
+        self.last_error = last_error
+
+
+class RetryPolicy:
+    """재시도 횟수와 백오프 (attempts는 첫 호출을 포함한 전체 시도 횟수)"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry_number: int, retry_after: Optional[float] = None) -> float:
+        """retry_number번째 재시도 전 대기 시간 (전체 지터, 서버가 Retry-After를 주면 그 값 이상)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry_number)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """외부 서비스 하나의 서킷 브레이커 (스레드 안전, 동기/비동기 경로 공용)"""
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.failures = 0
+        self.successes = 0
+        self.rejected = 0
+        self.opened_until = 0.0       # 이 시각(time.monotonic)까지 열림
+        self.probe_started = None     # half-open 시험 호출 시작 시각 (결과가 기록되지 않으면 reset_seconds 후 다시 허용)
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _state(self, now: float) -> str:
+        if self.consecutive_failures < self.failure_threshold:
+            return CLOSED
+        return OPEN if now < self.opened_until else HALF_OPEN
+
+    def _probe_allowed(self, now: float) -> bool:
+        return self.probe_started is None or now - self.probe_started >= self.reset_seconds
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def available(self) -> bool:
+        """지금 호출을 보낼 수 있는지 (상태를 바꾸지 않음)"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            return state == CLOSED or (state == HALF_OPEN and self._probe_allowed(now))
+
+    def retry_after(self) -> int:
+        with self._lock:
+            return max(1, int(self.opened_until - time.monotonic() + 0.999))
+
+    def before_call(self):
+        """호출 전 확인 (열려 있으면 CircuitOpenError, half-open이면 시험 호출 하나만 통과)"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probe_allowed(now):
+                self.probe_started = now
+                return
+            self.rejected += 1
+            retry_after = max(1, int(self.opened_until - now + 0.999))
+            last_error = self.last_error
+        raise CircuitOpenError(self.name, retry_after, last_error)
+
+    def record_success(self):
+        with self._lock:
+            recovered = self.consecutive_failures >= self.failure_threshold
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.opened_until = 0.0
+            self.probe_started = None
+        if recovered:
+            print(f"[Resilience] {self.name} 서킷 브레이커 닫힘 (호출 재개)")
+
+    def record_failure(self, error: Any):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            self.probe_started = None
+            opened = self.consecutive_failures >= self.failure_threshold
+            if opened:
+                self.opened_until = time.monotonic() + self.reset_seconds
+        if opened:
+            print(f"[Resilience] {self.name} 서킷 브레이커 열림 ({self.reset_seconds:.0f}초, 연속 실패 {self.consecutive_failures}회): {error}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'state': self._state(now),
+                'consecutiveFailures': self.consecutive_failures,
+                'failures': self.failures,
+                'successes': self.successes,
+                'rejected': self.rejected,
+                'retryAfter': max(0, int(self.opened_until - now + 0.999)),
+                'lastError': self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS) -> CircuitBreaker:
+    """이름별 공유 서킷 브레이커 (최초 호출 시 생성, 이후 설정 인자는 무시)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, failure_threshold, reset_seconds)
+                _breakers[name] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """등록된 서킷 브레이커별 상태"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def _response_of(error: BaseException):
+    return getattr(error, 'response', None)
+
+
+def is_transient_http_error(error: BaseException) -> bool:
+    """다시 시도하면 성공할 수 있는 오류 (연결 실패, 타임아웃, 429/5xx)"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return True
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)):
+        response = _response_of(error)
+        return response is not None and response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """응답의 Retry-After 헤더 (초 단위만 지원, 없으면 None)"""
+    response = _response_of(error)
+    if response is None:
+        return None
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_call(
+    func: Callable[[], Any],
+    policy: RetryPolicy,
+    is_retryable: Callable[[BaseException], bool] = is_transient_http_error,
+    breaker: Optional[CircuitBreaker] = None,
+    name: str = '외부 호출'
+) -> Any:
+    """
+    멱등 호출을 재시도와 서킷 브레이커로 감싸서 실행
+
+    재시도 대상이 아닌 오류(404 등)는 바로 전달하며 브레이커 실패로 세지 않습니다.
+    브레이커가 열리면 남은 재시도 없이 CircuitOpenError를 발생시킵니다.
+    """
+    for attempt in range(policy.attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None:
+                if retryable:
+                    breaker.record_failure(e)
+                else:
+                    breaker.record_success()
+            if not retryable or attempt + 1 >= policy.attempts:
+                raise
+            delay = policy.delay(attempt, retry_after_seconds(e))
+            print(f"[Resilience] {name} 실패, {delay:.2f}초 후 재시도 ({attempt + 1}/{policy.attempts - 1}): {e}")
+            time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def aretry_call(
+    func: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    is_retryable: Callable[[BaseException], bool] = is_transient_http_error,
+    breaker: Optional[CircuitBreaker] = None,
+    name: str = '외부 호출'
+) -> Any:
+    """retry_call의 비동기 버전"""
+    for attempt in range(policy.attempts):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = await func()
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None:
+                if retryable:
+                    breaker.record_failure(e)
+                else:
+                    breaker.record_success()
+            if not retryable or attempt + 1 >= policy.attempts:
+                raise
+            delay = policy.delay(attempt, retry_after_seconds(e))
+            print(f"[Resilience] {name} 실패, {delay:.2f}초 후 재시도 ({attempt + 1}/{policy.attempts - 1}): {e}")
+            await asyncio.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
@@ -0,0 +1,132 @@
+"""
+동일 요청 병합 (single-flight)
+같은 키의 작업이 이미 진행 중이면 새로 수행하지 않고 진행 중인 작업의 결과를 함께 받습니다.
+같은 프로젝트에서 동시에 진행도 분석을 요청하면 README/라우트 파일 조회와 LLM 생성이
+한 번만 수행됩니다.
+
+    result, shared = llm_flight.do(key, lambda: client.chat(prompt, system_prompt))
+    result, shared = await llm_flight.ado(key, lambda: client.achat(prompt, system_prompt))
+
+shared가 True면 다른 요청이 수행한 결과이므로, 변경 가능한 객체는 복사해서 사용하세요.
+동기(스레드) 호출과 비동기(이벤트 루프) 호출은 서로 병합되지 않습니다.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """진행 중인 동기 작업 (완료 시 event가 설정됨)"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """키별로 진행 중인 작업을 하나로 병합"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        # 이벤트 루프별 진행 중인 작업 {(loop id, key): asyncio.Future}
+        self._async_calls: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._executed = 0
+        self._shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        fn()을 키당 한 번만 실행 (동기, 스레드 간 병합)
+
+        Returns:
+            (결과, 다른 호출의 결과를 공유했는지 여부). fn이 예외를 던지면 대기 중인 호출에도 같은 예외가 전달됩니다.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+            else:
+                self._shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """do()의 비동기 버전 (같은 이벤트 루프 안의 코루틴끼리 병합)"""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        future = self._async_calls.get(loop_key)
+        if future is not None:
+            with self._lock:
+                self._shared += 1
+            try:
+                # 대기 중인 호출이 취소되어도 진행 중인 작업은 취소하지 않음
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 작업을 수행하던 요청(클라이언트 연결 끊김 등)이 취소됨 -> 직접 수행
+                return await self.ado(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[loop_key] = future
+        with self._lock:
+            self._executed += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # 대기자가 없을 때 "exception was never retrieved" 경고 방지
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._async_calls.pop(loop_key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """실행 횟수, 병합된(생략된) 호출 수, 현재 진행 중인 작업 수"""
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'shared': self._shared,
+                'in_flight': len(self._calls) + len(self._async_calls)
+            }
+
+
+# LLM 생성 (키: llm_cache.make_cache_key)
+llm_flight = SingleFlight('llm')
+# GitHub 파일/디렉토리 조회 (키: multi_step_agent.github_flight_key)
+github_flight = SingleFlight('github')
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        llm_flight.name: llm_flight.stats(),
+        github_flight.name: github_flight.stats(),
+    }
@@ -0,0 +1,108 @@
+"""
+GitHub 파일 선읽기 (speculative prefetch)
+다단계 에이전트는 파일 읽기와 LLM 호출을 번갈아 하므로 파일을 읽는 동안 GPU가, 생성하는 동안 네트워크가 놉니다.
+다음 단계에서 읽을 가능성이 높은 파일(고정된 라우트/컨트롤러 목록, 2단계 requiredFeatures의 예상 위치)을
+현재 단계의 LLM 호출과 같은 요청 리스트로 yield해 동시에 읽어 두고,
+실제 읽기(read_new_files_steps)에서는 선읽기한 내용을 먼저 사용합니다.
+
+    prefetch = PrefetchCache(agent_type)          # 에이전트 실행(요청) 범위
+    content, files = yield [llm_request(...), read_files_request(repo, token, candidates)]
+    prefetch.store(candidates, files)
+    ...
+    new_files = yield from read_new_files_steps(repo, token, paths, accumulated_files, prefetched=prefetch)
+    prefetch.finish()                             # 사용/미사용 파일 수 집계
+
+선읽기는 내용이 있는 파일만 보관하며, 사용되지 않은 파일은 실행이 끝나면 버립니다.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# 선읽기 사용 여부
+SPECULATIVE_PREFETCH_ENABLED = os.getenv('SPECULATIVE_PREFETCH_ENABLED', 'true').lower() == 'true'
+# LLM 호출 한 번과 함께 선읽기할 최대 파일 수
+PREFETCH_MAX_FILES = int(os.getenv('PREFETCH_MAX_FILES', '30'))
+
+# get_file_contents의 기본 max_lines_per_file (같은 줄 수 제한으로 읽은 내용만 재사용)
+DEFAULT_MAX_LINES = 500
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class PrefetchCache:
+    """에이전트 실행 하나 범위의 선읽기 파일 (파일 경로, 줄 수 제한) -> get_file_contents 결과 항목"""
+
+    def __init__(self, agent_type: str):
+        self.agent_type = agent_type
+        self._entries: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self.requested = 0   # 선읽기 요청한 파일 수
+        self.prefetched = 0  # 내용을 받아 보관한 파일 수
+        self.used = 0        # 실제 읽기에서 사용된 파일 수
+
+    def candidates(self, paths: List[str], max_lines_per_file: Optional[int] = None) -> List[str]:
+        """이미 선읽기한 파일을 제외한 후보 (최대 PREFETCH_MAX_FILES개, 선읽기를 끄면 빈 리스트)"""
+        if not SPECULATIVE_PREFETCH_ENABLED:
+            return []
+        max_lines = max_lines_per_file or DEFAULT_MAX_LINES
+        return [path for path in paths if (path, max_lines) not in self._entries][:PREFETCH_MAX_FILES]
+
+    def store(self, paths: List[str], file_contents: Any, max_lines_per_file: Optional[int] = None):
+        """선읽기 결과 보관 (실패한 요청은 예외 객체로 전달되며 무시)"""
+        self.requested += len(paths)
+        if isinstance(file_contents, Exception):
+            print(f"[Prefetch] {self.agent_type} 선읽기 실패 ({len(paths)}개 파일): {file_contents}")
+            return
+        max_lines = max_lines_per_file or DEFAULT_MAX_LINES
+        stored = 0
+        for file_info in file_contents or []:
+            path = file_info.get('filePath', '')
+            if path and file_info.get('content') and (path, max_lines) not in self._entries:
+                self._entries[(path, max_lines)] = file_info
+                stored += 1
+        self.prefetched += stored
+        print(f"[Prefetch] {self.agent_type} - LLM 호출 중 {len(paths)}개 파일 선읽기, {stored}개 보관")
+
+    def take(self, paths: List[str], max_lines_per_file: Optional[int] = None) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """선읽기한 파일과 아직 읽어야 할 경로로 나눔 (사용한 항목은 캐시에서 제거)"""
+        max_lines = max_lines_per_file or DEFAULT_MAX_LINES
+        hits = {}
+        misses = []
+        for path in paths:
+            entry = self._entries.pop((path, max_lines), None)
+            if entry is None:
+                misses.append(path)
+            else:
+                hits[path] = entry
+        self.used += len(hits)
+        return hits, misses
+
+    def finish(self):
+        """실행 종료 시 사용/미사용 선읽기 파일 수 집계"""
+        if not self.requested:
+            return
+        with _lock:
+            counts = _stats.setdefault(self.agent_type, {'runs': 0, 'requested': 0, 'prefetched': 0, 'used': 0})
+            counts['runs'] += 1
+            counts['requested'] += self.requested
+            counts['prefetched'] += self.prefetched
+            counts['used'] += self.used
+        print(f"[Prefetch] {self.agent_type} - 선읽기 {self.prefetched}개 중 {self.used}개 사용")
+
+
+def prefetch_stats() -> Dict[str, Any]:
+    """선읽기한 파일 수, 실제 사용된 수(usedRate), 버린 수, 에이전트 타입별 집계"""
+    with _lock:
+        by_agent = {agent_type: dict(counts) for agent_type, counts in _stats.items()}
+    prefetched = sum(counts['prefetched'] for counts in by_agent.values())
+    used = sum(counts['used'] for counts in by_agent.values())
+    return {
+        'enabled': SPECULATIVE_PREFETCH_ENABLED,
+        'requestedFiles': sum(counts['requested'] for counts in by_agent.values()),
+        'prefetchedFiles': prefetched,
+        'usedFiles': used,
+        'wastedFiles': prefetched - used,
+        'usedRate': round(used / prefetched, 3) if prefetched else 0.0,
+        'byAgent': by_agent,
+    }
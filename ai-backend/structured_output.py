@@ -0,0 +1,360 @@
+"""
+구조화된 JSON 출력
+프롬프트 종류별 JSON 스키마를 LLM 요청에 함께 보내 형식이 맞는 응답만 생성하게 하고
+(Ollama `format`, OpenAI `response_format`), 응답 파싱을 한 곳에서 처리합니다.
+
+    with response_format('intent_classification'):
+        content = call_llm(prompt, system_prompt)
+    intent = parse_json_response(content, 'intent_classification')
+
+에이전트 코드에서는 llm_request(..., schema='intent_classification')로 지정합니다.
+형식이 단계마다 다른 다단계 분석 결과는 스키마 없이 JSON 모드(GENERIC_JSON)만 사용합니다.
+"""
+
+import contextvars
+import copy
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Union
+
+# 스키마 없이 "유효한 JSON"만 강제 (Ollama format="json", OpenAI json_object)
+GENERIC_JSON = 'json'
+
+_CONFIDENCE = {'type': 'string', 'enum': ['high', 'medium', 'low'], 'default': 'medium'}
+_STRING_LIST = {'type': 'array', 'items': {'type': 'string'}, 'default': []}
+
+_TASK_SUGGESTION = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': 'string'},
+        'category': {'type': 'string', 'enum': ['feature', 'refactor', 'security', 'performance', 'maintenance']},
+        'priority': {'type': 'string', 'enum': ['High', 'Medium', 'Low']},
+        'estimatedHours': {'type': 'number'},
+        'reason': {'type': 'string'},
+        'location': {'type': 'string'},
+        'tags': _STRING_LIST,
+    },
+    'required': ['title', 'description', 'category', 'priority'],
+}
+
+# 프롬프트 종류별 응답 스키마 (default는 파싱 후 빠진 필드를 채우는 값)
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    'intent_classification': {
+        'type': 'object',
+        'properties': {
+            'agent_type': {
+                'type': 'string',
+                'enum': [
+                    'task_suggestion_agent', 'progress_analysis_agent', 'task_completion_agent',
+                    'task_assignment_agent', 'general_qa_agent',
+                ],
+                'default': 'general_qa_agent',
+            },
+            'confidence': _CONFIDENCE,
+            'reason': {'type': 'string', 'default': ''},
+            'extracted_info': {
+                'type': 'object',
+                'properties': {
+                    'task_title': {'type': 'string'},
+                    'question_type': {'type': 'string'},
+                    'keywords': {'type': 'array', 'items': {'type': 'string'}},
+                },
+                'default': {},
+            },
+        },
+        'required': ['agent_type', 'confidence', 'reason'],
+    },
+    'sufficiency_evaluation': {
+        'type': 'object',
+        'properties': {
+            'is_sufficient': {'type': 'boolean', 'default': False},
+            'confidence': _CONFIDENCE,
+            'needs_more_info': {'type': 'boolean', 'default': False},
+            'next_search_strategy': {'type': 'string', 'default': ''},
+            'files_to_read': _STRING_LIST,
+            'commits_to_analyze': _STRING_LIST,
+            'reason': {'type': 'string', 'default': ''},
+        },
+        'required': ['is_sufficient', 'confidence', 'needs_more_info', 'reason'],
+    },
+    'evidence_verification': {
+        'type': 'object',
+        'properties': {
+            'is_relevant': {'type': 'boolean'},
+            'relevance_score': {'type': 'number', 'default': 0},
+            'relevant_evidence': _STRING_LIST,
+            'irrelevant_evidence': _STRING_LIST,
+            'needs_reanalysis': {'type': 'boolean'},
+            'reason': {'type': 'string', 'default': ''},
+        },
+        'required': ['is_relevant', 'relevance_score', 'needs_reanalysis', 'reason'],
+    },
+    'file_selection': {
+        'type': 'object',
+        'properties': {
+            'selectedFiles': _STRING_LIST,
+            'reason': {'type': 'string', 'default': ''},
+        },
+        'required': ['selectedFiles'],
+    },
+    # 1차/2차 Task 완료 분석, 근거 재분석 (needsMoreInfo에 따라 필드가 다름)
+    'task_completion': {
+        'type': 'object',
+        'properties': {
+            'needsMoreInfo': {'type': 'boolean', 'default': False},
+            'isCompleted': {'type': 'boolean'},
+            'completionPercentage': {'type': 'number'},
+            'confidence': _CONFIDENCE,
+            'reason': {'type': 'string', 'default': ''},
+            'evidence': _STRING_LIST,
+            'recommendation': {'type': 'string'},
+            'expectedLocation': {'type': 'string'},
+            'searchStrategy': {'type': 'string'},
+            'currentAnalysis': {'type': 'string'},
+            'locationFound': {'type': 'string'},
+            'implementationStatus': {'type': 'string'},
+        },
+        'required': ['reason'],
+    },
+    'task_matching': {
+        'type': 'object',
+        'properties': {
+            'matched_task_ids': {'type': 'array', 'items': {'type': ['integer', 'string']}, 'default': []},
+            'reason': {'type': 'string', 'default': ''},
+            'task_count': {'type': 'integer', 'default': 0},
+        },
+        'required': ['matched_task_ids', 'reason', 'task_count'],
+    },
+    'task_suggestions': {
+        'type': 'array',
+        'items': _TASK_SUGGESTION,
+    },
+    'task_suggestion_final': {
+        'type': 'object',
+        'properties': {
+            'suggestions': {'type': 'array', 'items': _TASK_SUGGESTION, 'default': []},
+        },
+        'required': ['suggestions'],
+    },
+    'project_creation': {
+        'type': 'object',
+        'properties': {
+            'title': {'type': 'string'},
+            'description': {'type': 'string'},
+        },
+        'required': ['title', 'description'],
+    },
+    'task_assignment': {
+        'type': 'object',
+        'properties': {
+            'recommendedUserId': {'type': ['integer', 'null']},
+            'reason': {'type': 'string', 'default': ''},
+            'confidence': _CONFIDENCE,
+            'requiredSkills': _STRING_LIST,
+            'matchScore': {'type': 'number'},
+            'alternativeUsers': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {'userId': {'type': 'integer'}, 'reason': {'type': 'string'}},
+                    'required': ['userId'],
+                },
+                'default': [],
+            },
+        },
+        'required': ['recommendedUserId', 'reason', 'confidence'],
+    },
+}
+
+# 현재 실행 컨텍스트에서 LLM 요청에 붙일 출력 형식 (스키마 이름 또는 GENERIC_JSON)
+_response_format: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('llm_response_format', default=None)
+
+
+class StructuredOutputError(json.JSONDecodeError):
+    """응답에서 기대한 형식의 JSON을 찾지 못함 (json.JSONDecodeError로도 처리 가능)"""
+
+
+@contextmanager
+def response_format(schema: Optional[str]):
+    """블록 안의 LLM 호출에 출력 형식 지정 (None이면 바깥 설정 유지)"""
+    if schema is None:
+        yield
+        return
+    if schema != GENERIC_JSON and schema not in SCHEMAS:
+        raise ValueError(f"알 수 없는 출력 스키마: {schema}")
+    token = _response_format.set(schema)
+    try:
+        yield
+    finally:
+        _response_format.reset(token)
+
+
+def current_format() -> Optional[str]:
+    return _response_format.get()
+
+
+def ollama_format(schema: Optional[str] = None) -> Optional[Union[str, Dict[str, Any]]]:
+    """Ollama /api/chat의 format 값 (지정된 형식이 없으면 None)"""
+    schema = schema or current_format()
+    if schema is None:
+        return None
+    if schema == GENERIC_JSON:
+        return 'json'
+    return SCHEMAS[schema]
+
+
+def openai_response_format(model: str, schema: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    OpenAI chat.completions의 response_format 값
+
+    json_schema를 지원하는 모델(gpt-4o 이후)은 스키마를 그대로 보내고, 그 외 모델은 json_object 모드를 사용합니다.
+    두 방식 모두 최상위가 객체여야 하므로 배열 스키마는 형식을 지정하지 않습니다.
+    """
+    schema = schema or current_format()
+    if schema is None:
+        return None
+    definition = SCHEMAS.get(schema)
+    if definition is not None and definition.get('type') != 'object':
+        return None
+    if definition is not None and model.startswith(('gpt-4o', 'gpt-4.1', 'gpt-5')):
+        return {'type': 'json_schema', 'json_schema': {'name': schema, 'schema': definition, 'strict': False}}
+    return {'type': 'json_object'}
+
+
+def _strip_code_fence(content: str) -> str:
+    if '```json' in content:
+        return content.split('```json')[1].split('```')[0]
+    if '```' in content:
+        return content.split('```')[1].split('```')[0]
+    return content
+
+
+class JsonCompletionTracker:
+    """
+    스트리밍 응답의 최상위 JSON 값이 닫혔는지 추적 (조각 단위로 입력, 문자열 안의 괄호는 무시)
+
+    첫 여는 괄호 전의 텍스트(```json 등)는 건너뜁니다.
+
+        tracker = JsonCompletionTracker()
+        for piece in stream:
+            end = tracker.feed(piece)
+            if end is not None:
+                piece = piece[:end]  # 닫는 괄호까지만 사용
+                break
+    """
+
+    __slots__ = ('depth', 'in_string', 'escaped', 'started', 'complete')
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.complete = False
+
+    def feed(self, text: str) -> Optional[int]:
+        """text를 이어서 읽고, 최상위 값이 닫혔으면 text 안에서 닫는 괄호 다음 위치 반환 (아니면 None)"""
+        if self.complete:
+            return 0
+        for index, ch in enumerate(text):
+            if not self.started:
+                if ch in '{[':
+                    self.started = True
+                    self.depth = 1
+                continue
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                self.depth += 1
+            elif ch in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    return index + 1
+        return None
+
+
+def _balanced_end(text: str, start: int) -> int:
+    """start 위치의 괄호와 짝이 맞는 닫는 괄호 위치 (문자열 안의 괄호는 무시, 없으면 -1)"""
+    end = JsonCompletionTracker().feed(text[start:])
+    return start + end - 1 if end is not None else -1
+
+
+def extract_json(content: Optional[str], expect: str = 'object') -> Any:
+    """
+    LLM 응답 텍스트에서 JSON 값 추출
+
+    코드 블록(```json)을 벗기고, 앞뒤 설명문이 붙어 있으면 짝이 맞는 괄호 구간만 파싱합니다.
+
+    Args:
+        expect: 'object' 또는 'array' (찾을 최상위 값의 종류)
+    """
+    if not content or not content.strip():
+        raise StructuredOutputError("빈 응답", content or '', 0)
+    text = _strip_code_fence(content).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    opener = '[' if expect == 'array' else '{'
+    start = text.find(opener)
+    while start != -1:
+        end = _balanced_end(text, start)
+        if end == -1:
+            break
+        try:
+            return json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            start = text.find(opener, start + 1)
+
+    # 닫히지 않은 JSON 등: 기존 방식(첫 여는 괄호 ~ 마지막 닫는 괄호)으로 마지막 시도
+    closer = ']' if expect == 'array' else '}'
+    start, end = text.find(opener), text.rfind(closer)
+    if start != -1 and end > start:
+        return json.loads(text[start:end + 1])
+    raise StructuredOutputError(f"응답에서 JSON {expect}를 찾지 못했습니다", text, 0)
+
+
+def _apply_defaults(value: Dict[str, Any], definition: Dict[str, Any]) -> Dict[str, Any]:
+    for key, prop in definition.get('properties', {}).items():
+        if key not in value and 'default' in prop:
+            value[key] = copy.deepcopy(prop['default'])
+    return value
+
+
+def parse_json_response(content: Optional[str], schema: Optional[str] = None, default: Any = None) -> Any:
+    """
+    LLM 응답을 JSON으로 파싱하고 스키마 기본값을 채움
+
+    Args:
+        content: LLM 응답 텍스트
+        schema: SCHEMAS의 스키마 이름 (최상위 타입 확인, 빠진 필드에 default 채움)
+        default: 파싱 실패 시 반환할 값 (None이면 StructuredOutputError 발생)
+    """
+    definition = SCHEMAS.get(schema) if schema else None
+    expect = definition.get('type', 'object') if definition else 'object'
+    try:
+        value = extract_json(content, 'array' if expect == 'array' else 'object')
+        if definition is not None:
+            expected_type = list if expect == 'array' else dict
+            if not isinstance(value, expected_type):
+                raise StructuredOutputError(f"응답 JSON이 {expect}가 아닙니다 (스키마: {schema})", content or '', 0)
+            if expect == 'object':
+                value = _apply_defaults(value, definition)
+        return value
+    except json.JSONDecodeError as e:
+        if default is None:
+            if isinstance(e, StructuredOutputError):
+                raise
+            raise StructuredOutputError(f"JSON 파싱 실패: {e.msg}", e.doc, e.pos) from e
+        print(f"[Structured Output] JSON 파싱 실패 (스키마: {schema or '없음'}): {e}")
+        return copy.deepcopy(default)
@@ -0,0 +1,220 @@
+"""
+정보 충분성 판단 정책 (규칙 우선, 결론이 나지 않을 때만 LLM 평가)
+다단계 에이전트는 단계마다 "정보가 충분한가"를 판단해야 하는데, 매번 LLM에 물으면
+분석 한 단계에 생성이 두 번씩 듭니다. 대부분은 단계 결과에 채워진 필드, 읽은 파일 수,
+결과가 보고한 신뢰도만으로 판단할 수 있으므로 에이전트 타입별 규칙으로 먼저 판단하고,
+규칙이 None(판단 불가)을 반환할 때만 LLM 평가를 호출합니다.
+
+    evaluation = rule_based_sufficiency(agent_type, current_result, step_number, context, MAX_ANALYSIS_STEPS)
+    if evaluation is None:
+        evaluation = (LLM 평가)
+
+에이전트 타입별 정책 (SUFFICIENCY_POLICY, SUFFICIENCY_POLICY_AGENTS):
+- rules: 규칙으로 판단하고 결론이 나지 않을 때만 LLM 평가 (기본값)
+- llm: 항상 LLM 평가 (이전 동작)
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+POLICY_RULES = 'rules'
+POLICY_LLM = 'llm'
+
+
+def _parse_agent_policies(value: str) -> Dict[str, str]:
+    """SUFFICIENCY_POLICY_AGENTS 환경 변수 파싱 (예: "general_qa_agent=llm,task_assignment_agent=rules")"""
+    policies = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        agent_type, policy = item.split('=', 1)
+        policy = policy.strip().lower()
+        if policy not in (POLICY_RULES, POLICY_LLM):
+            print(f"[Sufficiency Policy] 잘못된 정책 설정 무시: {item}")
+            continue
+        policies[agent_type.strip()] = policy
+    return policies
+
+
+# 기본 정책과 에이전트 타입별 정책
+SUFFICIENCY_POLICY = os.getenv('SUFFICIENCY_POLICY', POLICY_RULES).strip().lower()
+SUFFICIENCY_POLICY_AGENTS = _parse_agent_policies(os.getenv('SUFFICIENCY_POLICY_AGENTS', ''))
+
+# 진행도 분석 프롬프트의 단계 수 (5단계에서 진행도를 계산)
+PROGRESS_ANALYSIS_STEPS = 5
+# Task 완료 확인 프롬프트의 단계 수 (3단계에서 완료 여부를 판단)
+TASK_COMPLETION_STEPS = 3
+# 이 길이 이상의 답변이면 일반 질문 답변이 완성된 것으로 봄
+MIN_ANSWER_LENGTH = 20
+
+HIGH_CONFIDENCE_VALUES = {'high', '높음'}
+MEDIUM_CONFIDENCE_VALUES = {'medium', '보통', '중간'}
+
+SufficiencyRule = Callable[[Dict[str, Any], int, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _confidence(result: Dict[str, Any]) -> str:
+    """결과의 confidence를 high/medium/low로 정규화 (없으면 medium)"""
+    value = str(result.get('confidence') or 'medium').strip().lower()
+    if value in HIGH_CONFIDENCE_VALUES:
+        return 'high'
+    if value in MEDIUM_CONFIDENCE_VALUES:
+        return 'medium'
+    return 'low'
+
+
+def sufficient(confidence: str, reason: str) -> Dict[str, Any]:
+    """충분하다는 판단 (LLM 평가와 같은 형식)"""
+    return {
+        "is_sufficient": True,
+        "confidence": confidence,
+        "needs_more_info": False,
+        "next_search_strategy": "",
+        "files_to_read": [],
+        "commits_to_analyze": [],
+        "reason": reason,
+        "source": POLICY_RULES,
+    }
+
+
+def continue_analysis(confidence: str, reason: str, strategy: str, files_to_read=None) -> Dict[str, Any]:
+    """다음 단계로 진행한다는 판단 (LLM 평가와 같은 형식)"""
+    return {
+        "is_sufficient": False,
+        "confidence": confidence,
+        "needs_more_info": True,
+        "next_search_strategy": strategy,
+        "files_to_read": list(files_to_read or []),
+        "commits_to_analyze": [],
+        "reason": reason,
+        "source": POLICY_RULES,
+    }
+
+
+def _progress_analysis_rule(result: Dict[str, Any], step_number: int, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # 5단계 결과(진행도 + 서술형 응답)가 나오면 완료, 그 전에는 정해진 다음 단계로 진행
+    if result.get('currentProgress') is not None and result.get('narrativeResponse'):
+        return sufficient(_confidence(result), '진행도와 최종 분석 결과가 모두 작성되었습니다.')
+    if step_number < PROGRESS_ANALYSIS_STEPS:
+        return continue_analysis(
+            _confidence(result),
+            f'{PROGRESS_ANALYSIS_STEPS}단계 진행도 계산 전입니다.',
+            f'{step_number + 1}단계 분석 진행'
+        )
+    return None
+
+
+def _task_completion_rule(result: Dict[str, Any], step_number: int, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    confidence = _confidence(result)
+    has_verdict = isinstance(result.get('isCompleted'), bool)
+    needs_more_info = bool(result.get('needsMoreInfo'))
+    has_repo = bool(context.get('githubRepo'))
+    files_read = len(context.get('readFiles') or [])
+
+    if has_verdict and not needs_more_info:
+        if confidence == 'high':
+            return sufficient(confidence, '완료 여부를 높은 신뢰도로 판단했습니다.')
+        # 코드를 확인했거나 확인할 저장소가 없으면 중간 신뢰도로도 충분
+        if confidence == 'medium' and (files_read > 0 or not has_repo):
+            return sufficient(confidence, f'완료 여부를 판단했습니다. (읽은 파일 {files_read}개)')
+
+    # 저장소가 있으면 정해진 단계(예상 위치 파일 읽기 -> 코드 분석)까지는 규칙으로 진행
+    if has_repo and step_number < TASK_COMPLETION_STEPS and (needs_more_info or not has_verdict or files_read == 0):
+        expected_location = str(result.get('expectedLocation') or '')
+        files_to_read = [expected_location] if '/' in expected_location and '.' in expected_location.rsplit('/', 1)[-1] else []
+        return continue_analysis(
+            confidence,
+            '코드 확인이 필요합니다.' if files_read == 0 else '추가 분석이 필요합니다.',
+            result.get('searchStrategy') or '예상 구현 위치의 코드 확인',
+            files_to_read
+        )
+    return None
+
+
+def _general_qa_rule(result: Dict[str, Any], step_number: int, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    message = str(result.get('message') or '').strip()
+    if result.get('can_answer') is False and message:
+        return sufficient('high', '답변할 수 없는 질문으로 판단했습니다.')
+    if len(message) >= MIN_ANSWER_LENGTH and _confidence(result) != 'low':
+        return sufficient(_confidence(result), '답변이 작성되었습니다.')
+    return None
+
+
+def _task_assignment_rule(result: Dict[str, Any], step_number: int, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if result.get('recommendedUserId') is not None and _confidence(result) in ('high', 'medium'):
+        return sufficient(_confidence(result), '담당자 추천이 완료되었습니다.')
+    return None
+
+
+# 에이전트 타입별 규칙 (등록되지 않은 타입은 항상 LLM 평가)
+SUFFICIENCY_RULES: Dict[str, SufficiencyRule] = {
+    'progress_analysis_agent': _progress_analysis_rule,
+    'task_completion_agent': _task_completion_rule,
+    'general_qa_agent': _general_qa_rule,
+    'task_assignment_agent': _task_assignment_rule,
+}
+
+
+def register_sufficiency_rule(agent_type: str, rule: SufficiencyRule):
+    """에이전트 타입의 충분성 규칙 등록/교체 (rule(result, step_number, context) -> 평가 dict 또는 None)"""
+    SUFFICIENCY_RULES[agent_type] = rule
+
+
+def sufficiency_policy(agent_type: str) -> str:
+    """에이전트 타입에 적용할 정책 (rules 또는 llm)"""
+    return SUFFICIENCY_POLICY_AGENTS.get(agent_type, SUFFICIENCY_POLICY)
+
+
+def rule_based_sufficiency(
+    agent_type: str,
+    current_result: Any,
+    step_number: int,
+    context: Optional[Dict[str, Any]],
+    max_steps: int
+) -> Optional[Dict[str, Any]]:
+    """
+    규칙으로 충분성 판단 (판단할 수 없거나 정책이 llm이면 None)
+
+    반환 형식은 LLM 평가(evaluate_information_sufficiency_steps)와 같으며 source: "rules"가 추가됩니다.
+    """
+    if sufficiency_policy(agent_type) != POLICY_RULES:
+        return None
+    if step_number >= max_steps:
+        return sufficient('medium', f'최대 분석 단계({max_steps})에 도달했습니다.')
+    rule = SUFFICIENCY_RULES.get(agent_type)
+    if rule is None or not isinstance(current_result, dict):
+        return None
+    try:
+        return rule(current_result, step_number, context or {})
+    except Exception as e:
+        print(f"[Sufficiency Policy] {agent_type} 규칙 판단 실패, LLM 평가 사용: {e}")
+        return None
+
+
+def record_sufficiency_decision(agent_type: str, source: str):
+    """판단 출처 집계 (rules: LLM 호출을 생략한 판단, llm: LLM 평가)"""
+    with _lock:
+        counts = _stats.setdefault(agent_type, {'rules': 0, 'llm': 0})
+        counts[source] += 1
+
+
+def sufficiency_stats() -> Dict[str, Any]:
+    """규칙으로 판단한 수(= 생략한 LLM 호출 수), LLM 평가 수, 에이전트 타입별 집계"""
+    with _lock:
+        by_agent = {agent_type: dict(counts) for agent_type, counts in _stats.items()}
+    rule_decisions = sum(counts['rules'] for counts in by_agent.values())
+    llm_evaluations = sum(counts['llm'] for counts in by_agent.values())
+    total = rule_decisions + llm_evaluations
+    return {
+        'policy': SUFFICIENCY_POLICY,
+        'agentPolicies': dict(SUFFICIENCY_POLICY_AGENTS),
+        'ruleDecisions': rule_decisions,
+        'llmEvaluations': llm_evaluations,
+        'llmCallsAvoided': rule_decisions,
+        'ruleRate': round(rule_decisions / total, 3) if total else 0.0,
+        'byAgent': by_agent,
+    }
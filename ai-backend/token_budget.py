@@ -0,0 +1,191 @@
+"""
+토큰 예산 관리
+문자 수 대신 추정 토큰 수로 프롬프트 구간의 길이를 정하고, 요청마다 Ollama num_ctx를 설정합니다.
+
+- 토큰 추정: 한글은 글자당 약 1토큰, 영문/코드는 약 3.5자당 1토큰 (Qwen 계열 BPE 기준의 보수적 추정)
+- 구간 배분: 모델 컨텍스트 예산의 일정 비율을 구간별 가중치로 나누고, 짧은 구간이 남긴 몫은 다른 구간에 재분배
+- num_ctx: 프롬프트 + 응답(max_tokens)이 들어가는 가장 작은 창 크기 (2048, 4096, 8192, ...)
+
+    sections = allocate_sections([
+        ('implemented', json.dumps(implemented_features, ensure_ascii=False, indent=2), 2),
+        ('missing', json.dumps(missing_features, ensure_ascii=False, indent=2), 1),
+    ])
+    prompt = f"...{sections['implemented']}...{sections['missing']}..."
+"""
+
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+# 모델별 최대 컨텍스트 길이 (토큰, "모델=토큰" 쉼표 구분으로 추가/변경)
+DEFAULT_CONTEXT_WINDOWS = {
+    'qwen2.5': 32768,
+    'qwen2.5-coder': 32768,
+    'exaone3.5': 32768,
+    'llama3': 8192,
+    'llama3.1': 131072,
+    'llama3.2': 131072,
+    'gemma2': 8192,
+    'mistral': 32768,
+    'gpt-3.5-turbo': 16385,
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+}
+# 컨텍스트 길이를 모르는 모델의 기본값
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# num_ctx 상한 (창이 클수록 KV 캐시 메모리가 커지므로 모델 최대치보다 작게 제한)
+LLM_MAX_NUM_CTX = int(os.getenv('LLM_MAX_NUM_CTX', '16384'))
+LLM_MIN_NUM_CTX = int(os.getenv('LLM_MIN_NUM_CTX', '2048'))
+# 추정 오차와 채팅 템플릿 토큰을 위한 여유분
+NUM_CTX_MARGIN_TOKENS = 128
+
+# 입력 예산 중 파일 발췌(접두부)와 프롬프트 데이터 구간(접미부)에 배분하는 비율
+# 나머지는 프로젝트 프로필, 지시문, 사용자 메시지에 사용됩니다.
+PROMPT_FILE_BUDGET_SHARE = float(os.getenv('PROMPT_FILE_BUDGET_SHARE', '0.5'))
+PROMPT_SECTION_BUDGET_SHARE = float(os.getenv('PROMPT_SECTION_BUDGET_SHARE', '0.25'))
+
+TRUNCATION_MARKER = "\n...(생략)"
+
+
+def _parse_context_windows(value: str) -> Dict[str, int]:
+    """LLM_CONTEXT_WINDOWS 환경 변수 파싱 (예: "qwen2.5:14b=32768,my-model=8192")"""
+    windows = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        model, tokens = item.rsplit('=', 1)
+        try:
+            windows[model.strip()] = int(tokens)
+        except ValueError:
+            print(f"[Token Budget] 잘못된 컨텍스트 길이 설정 무시: {item}")
+    return windows
+
+
+LLM_CONTEXT_WINDOWS = {**DEFAULT_CONTEXT_WINDOWS, **_parse_context_windows(os.getenv('LLM_CONTEXT_WINDOWS', ''))}
+
+
+def _char_cost(ch: str) -> float:
+    code = ord(ch)
+    if code < 128:
+        return 1 / 3.5
+    if 0xAC00 <= code <= 0xD7A3 or 0x3130 <= code <= 0x318F or 0x1100 <= code <= 0x11FF:
+        # 한글 음절/자모: 자주 쓰는 음절은 1토큰, 드문 음절은 바이트 단위로 나뉨
+        return 1.2
+    # 그 외 유니코드(한자, 이모지 등)는 대부분 2토큰 이상
+    return 1.5
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """텍스트의 토큰 수 추정 (한글 인식, 실제보다 조금 크게 추정)"""
+    if not text:
+        return 0
+    ascii_count = len(text.encode('ascii', 'ignore'))
+    if ascii_count == len(text):
+        return int(ascii_count / 3.5) + 1
+    cost = ascii_count / 3.5
+    for ch in text:
+        if ord(ch) >= 128:
+            cost += _char_cost(ch)
+    return int(cost) + 1
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+    """추정 토큰 수가 max_tokens를 넘지 않도록 뒷부분을 잘라냄 (잘린 경우 marker 추가)"""
+    if not text:
+        return ''
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens - estimate_tokens(marker))
+    cost = 0.0
+    end = 0
+    for index, ch in enumerate(text):
+        cost += _char_cost(ch)
+        if cost > limit:
+            end = index
+            break
+    return text[:end] + marker
+
+
+def context_window(model: Optional[str]) -> int:
+    """모델의 최대 컨텍스트 길이 (정확한 이름 -> 태그를 뺀 이름 순으로 조회)"""
+    if not model:
+        return DEFAULT_CONTEXT_WINDOW
+    if model in LLM_CONTEXT_WINDOWS:
+        return LLM_CONTEXT_WINDOWS[model]
+    family = model.split(':', 1)[0]
+    return LLM_CONTEXT_WINDOWS.get(family, DEFAULT_CONTEXT_WINDOW)
+
+
+def _default_model() -> str:
+    # 순환 import 방지 (llm_client가 이 모듈을 사용)
+    from llm_client import OLLAMA_MODEL, OPENAI_MODEL, USE_OPENAI
+    return OPENAI_MODEL if USE_OPENAI else OLLAMA_MODEL
+
+
+def input_budget(model: Optional[str] = None, max_tokens: int = 2000) -> int:
+    """모델에 보낼 수 있는 입력(시스템 + 사용자 프롬프트) 토큰 예산"""
+    model = model or _default_model()
+    window = max(LLM_MIN_NUM_CTX, min(context_window(model), LLM_MAX_NUM_CTX))
+    return max(512, window - max_tokens - NUM_CTX_MARGIN_TOKENS)
+
+
+def num_ctx_for(prompt_tokens: int, max_tokens: int, model: Optional[str] = None) -> int:
+    """프롬프트와 응답이 들어가는 가장 작은 컨텍스트 창 (2의 거듭제곱, LLM_MAX_NUM_CTX 이하)"""
+    needed = prompt_tokens + max_tokens + NUM_CTX_MARGIN_TOKENS
+    limit = max(LLM_MIN_NUM_CTX, min(context_window(model), LLM_MAX_NUM_CTX))
+    num_ctx = LLM_MIN_NUM_CTX
+    while num_ctx < needed and num_ctx < limit:
+        num_ctx = min(num_ctx * 2, limit)
+    return num_ctx
+
+
+def allocate(sections: Sequence[Tuple[str, str, float]], total_tokens: int) -> Dict[str, str]:
+    """
+    구간별 가중치에 따라 토큰 예산을 나누고 각 구간을 자름
+
+    예산보다 짧은 구간은 그대로 두고 남은 몫을 나머지 구간에 가중치대로 다시 나눕니다.
+
+    Args:
+        sections: [(이름, 텍스트, 가중치), ...]
+        total_tokens: 전체 토큰 예산
+
+    Returns:
+        {이름: 예산에 맞게 자른 텍스트}
+    """
+    needs = {name: estimate_tokens(text) for name, text, _ in sections}
+    weights = {name: max(weight, 0.01) for name, _, weight in sections}
+    texts = {name: text or '' for name, text, _ in sections}
+    budgets: Dict[str, int] = {}
+    remaining = list(needs)
+    available = total_tokens
+
+    while remaining:
+        weight_sum = sum(weights[name] for name in remaining)
+        fits = [name for name in remaining if needs[name] <= available * weights[name] / weight_sum]
+        if not fits:
+            for name in remaining:
+                budgets[name] = int(available * weights[name] / weight_sum)
+            break
+        for name in fits:
+            budgets[name] = needs[name]
+            available -= needs[name]
+            remaining.remove(name)
+
+    return {name: truncate_to_tokens(texts[name], budgets[name]) for name in texts}
+
+
+def allocate_sections(sections: Sequence[Tuple[str, str, float]], model: Optional[str] = None) -> Dict[str, str]:
+    """프롬프트 데이터 구간 배분 (모델 입력 예산의 PROMPT_SECTION_BUDGET_SHARE 사용)"""
+    return allocate(sections, int(input_budget(model) * PROMPT_SECTION_BUDGET_SHARE))
+
+
+def fit_section(text: Optional[str], share: float = 1.0, model: Optional[str] = None) -> str:
+    """단일 데이터 구간을 구간 예산의 share 비율에 맞게 자름"""
+    budget = int(input_budget(model) * PROMPT_SECTION_BUDGET_SHARE * share)
+    return truncate_to_tokens(text, budget)
+
+
+def file_excerpt_budget(model: Optional[str] = None) -> int:
+    """파일 발췌(프롬프트 접두부) 전체 토큰 예산 (모델별로 고정되어 실행 중 접두부가 바뀌지 않음)"""
+    return int(input_budget(model) * PROMPT_FILE_BUDGET_SHARE)
+
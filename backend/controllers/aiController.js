@@ -6,6 +6,15 @@ var AI_BACKEND_URL = process.env.AI_BACKEND_URL || 'http://localhost:5001';
 
 console.log('[AI Controller] AI 백엔드 URL:', AI_BACKEND_URL);
 
+// AI 백엔드에 응답 대기 시간(타임아웃)을 함께 전달
+// AI 백엔드는 남은 시간이 부족하면 분석을 일찍 마치고 부분 결과(partial: true)를 반환함
+function aiRequestOptions(timeoutMs) {
+  return {
+    timeout: timeoutMs,
+    headers: { 'X-Request-Timeout-Ms': String(timeoutMs) }
+  };
+}
+
 // Task 제안
 exports.taskSuggestion = async function(req, res, next) {
   console.log('[AI Controller] taskSuggestion 요청 수신:', { 
@@ -416,11 +425,10 @@ exports.progressAnalysis = async function(req, res, next) {
             tasks: tasks,
             projectDescription: project.description || project.title,
             projectStartDate: project.created_at || null,
-            projectDueDate: null  // 프로젝트에 마감일 필드가 없으면 null
+            projectDueDate: null,  // 프로젝트에 마감일 필드가 없으면 null
+            runId: req.body.runId  // 실패 후 같은 runId로 재시도하면 마지막 완료 단계부터 재개
           },
-          {
-            timeout: 120000
-          }
+          aiRequestOptions(120000)
         );
         
         console.log('[AI Controller] progressAnalysis - AI 백엔드 응답 수신:', {
@@ -746,11 +754,10 @@ exports.taskCompletionCheck = async function(req, res, next) {
           {
             task: task,
             commits: commits,
-            projectDescription: project.description || project.title
+            projectDescription: project.description || project.title,
+            runId: req.body.runId  // 실패 후 같은 runId로 재시도하면 마지막 완료 단계부터 재개
           },
-          {
-            timeout: 120000
-          }
+          aiRequestOptions(120000)
         );
         
         console.log('[AI Controller] taskCompletionCheck - AI 백엔드 응답 수신:', {
@@ -1212,7 +1219,8 @@ exports.chat = async function(req, res, next) {
               projectStartDate: project.created_at || null,
               projectDueDate: null,
               projectMembersWithTags: projectMembersWithTags
-            }
+            },
+            runId: req.body.runId  // 실패 후 같은 runId로 재시도하면 마지막 완료 단계부터 재개
           },
           {
             timeout: 360000 // 6분 타임아웃